@@ -0,0 +1,66 @@
+"""Compare throughput of the bulk and per event batch assembly paths"""
+
+import argparse
+import time
+
+from vlne.data.data_generator import DataGenerator
+
+from synthetic import (
+    add_synthetic_parser, make_synthetic_dataset,
+    SYNTHETIC_INPUT_GROUPS, SYNTHETIC_TARGET_GROUPS
+)
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser("Benchmark batch assembly")
+    add_synthetic_parser(parser)
+
+    parser.add_argument(
+        '--batch-size',
+        help    = 'batch size',
+        default = 1024,
+        dest    = 'batch_size',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--batches',
+        help    = 'maximum number of batches to time',
+        default = 100,
+        dest    = 'batches',
+        type    = int,
+    )
+
+    return parser.parse_args()
+
+def time_batches(dgen, n_batches):
+    """Return number of batches per second `dgen` produces"""
+    n_batches = min(n_batches, len(dgen))
+    start     = time.perf_counter()
+
+    for index in range(n_batches):
+        _ = dgen[index]
+
+    return n_batches / (time.perf_counter() - start)
+
+def main():
+    cmdargs = parse_cmdargs()
+    dset    = make_synthetic_dataset(cmdargs)
+
+    results = {}
+
+    for bulk in [ False, True ]:
+        dgen = DataGenerator(
+            dset, SYNTHETIC_INPUT_GROUPS, SYNTHETIC_TARGET_GROUPS,
+            batch_size = cmdargs.batch_size,
+            bulk       = bulk,
+        )
+
+        label = 'bulk' if bulk else 'per event'
+        results[label] = time_batches(dgen, cmdargs.batches)
+
+        print(f"{label:>10} : {results[label]:10.2f} batches/s")
+
+    print(f"   speedup : {results['bulk'] / results['per event']:10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Measure HDF read throughput of the block shuffled batches"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+from vlne.data.samplers       import BlockShuffleSampler
+from vlne.data.samplers.funcs import calc_reads_per_batch
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser("Benchmark block shuffle sampler")
+
+    parser.add_argument(
+        '--events',
+        help    = 'number of events in the synthetic HDF file',
+        default = 1000000,
+        dest    = 'events',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--vars',
+        help    = 'number of variables per event',
+        default = 32,
+        dest    = 'vars',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--chunk-size',
+        help    = 'number of rows in a HDF chunk',
+        default = 4096,
+        dest    = 'chunk_size',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        help    = 'batch size',
+        default = 1024,
+        dest    = 'batch_size',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--block-sizes',
+        help    = 'block sizes to benchmark',
+        default = [ 1, 32, 128, 512 ],
+        dest    = 'block_sizes',
+        nargs   = '+',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--window',
+        help    = 'number of blocks to shuffle events within',
+        default = 4,
+        dest    = 'window',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--batches',
+        help    = 'maximum number of batches to time',
+        default = 200,
+        dest    = 'batches',
+        type    = int,
+    )
+
+    return parser.parse_args()
+
+def create_hdf(path, cmdargs):
+    prg = np.random.default_rng(0)
+
+    with h5py.File(path, 'w') as f:
+        dset = f.create_dataset(
+            'data', (cmdargs.events, cmdargs.vars), dtype = np.float32,
+            chunks = (cmdargs.chunk_size, cmdargs.vars)
+        )
+
+        for start in range(0, cmdargs.events, cmdargs.chunk_size):
+            end = min(start + cmdargs.chunk_size, cmdargs.events)
+            dset[start:end] = prg.normal(size = (end - start, cmdargs.vars))
+
+def read_batch(dset, indices):
+    """Read sorted `indices` from `dset` with one read per contiguous run"""
+    breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+    starts = np.concatenate([ [ 0 ], breaks ])
+    ends   = np.concatenate([ breaks, [ len(indices) ] ])
+
+    return np.concatenate([
+        dset[indices[s]:indices[e - 1] + 1] for (s, e) in zip(starts, ends)
+    ])
+
+def benchmark(path, sampler, n_batches):
+    n_batches = min(n_batches, len(sampler))
+    batches   = [ sampler[i] for i in range(n_batches) ]
+    nbytes    = 0
+
+    with h5py.File(path, 'r') as f:
+        dset  = f['data']
+        start = time.perf_counter()
+
+        for indices in batches:
+            nbytes += read_batch(dset, indices).nbytes
+
+        elapsed = time.perf_counter() - start
+
+    return (calc_reads_per_batch(batches), nbytes / elapsed / 2**20)
+
+def main():
+    cmdargs = parse_cmdargs()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'data.h5')
+        create_hdf(path, cmdargs)
+
+        samplers = {
+            'sequential' : BlockShuffleSampler(
+                cmdargs.events, cmdargs.batch_size, shuffle = False
+            ),
+        }
+
+        for block_size in cmdargs.block_sizes:
+            samplers[f'block {block_size}'] = BlockShuffleSampler(
+                cmdargs.events, cmdargs.batch_size,
+                block_size = block_size,
+                window     = cmdargs.window,
+            )
+
+        for (label, sampler) in samplers.items():
+            reads, speed = benchmark(path, sampler, cmdargs.batches)
+            print(
+                f"{label:>12} : {reads:8.1f} reads/batch, {speed:8.1f} MB/s"
+            )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Measure shuffled HDF reads with and without the chunk cache"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+from vlne.data.hdf_chunk_frame import HDFChunkFrame
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser("Benchmark HDF chunk cache")
+
+    parser.add_argument(
+        '--events',
+        help    = 'number of events in the synthetic HDF file',
+        default = 200000,
+        dest    = 'events',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--vars',
+        help    = 'number of columns',
+        default = 16,
+        dest    = 'vars',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        help    = 'batch size',
+        default = 1024,
+        dest    = 'batch_size',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--cache',
+        help    = 'chunk cache budget',
+        default = '1G',
+        dest    = 'cache',
+    )
+
+    return parser.parse_args()
+
+def create_hdf(path, cmdargs):
+    """Create HDF file with the layout of `HDFExporter`"""
+    prg = np.random.default_rng(0)
+
+    with h5py.File(path, 'w') as f:
+        for var in range(cmdargs.vars):
+            f.create_dataset(
+                f'var{var}',
+                data   = prg.normal(size = cmdargs.events).astype(np.float32),
+                chunks = True, compression = 'gzip', compression_opts = 9
+            )
+
+def read_plain(path, columns, batches):
+    with h5py.File(path, 'r') as f:
+        for indices in batches:
+            # h5py requires increasing indices
+            indices = np.sort(indices)
+            _ = [ f[column][indices] for column in columns ]
+
+def read_cached(path, columns, batches, cache):
+    df = HDFChunkFrame(path, chunk_cache = cache)
+
+    for indices in batches:
+        _ = [ df[column][indices] for column in columns ]
+
+    df.log_stats()
+
+def benchmark(func, *args):
+    start_wall = time.perf_counter()
+    start_cpu  = time.process_time()
+
+    func(*args)
+
+    return (
+        time.perf_counter() - start_wall, time.process_time() - start_cpu
+    )
+
+def main():
+    cmdargs = parse_cmdargs()
+    columns = [ f'var{var}' for var in range(cmdargs.vars) ]
+
+    order   = np.random.default_rng(0).permutation(cmdargs.events)
+    batches = [
+        order[start:start + cmdargs.batch_size]
+            for start in range(0, cmdargs.events, cmdargs.batch_size)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'data.h5')
+        create_hdf(path, cmdargs)
+
+        for (label, func, args) in [
+            ('plain',  read_plain,  (path, columns, batches)),
+            ('cached', read_cached, (path, columns, batches, cmdargs.cache)),
+        ]:
+            wall, cpu = benchmark(func, *args)
+            print(
+                f"{label:>8} : {wall:8.2f} s wall, {cpu:8.2f} s CPU,"
+                f" {cmdargs.events / wall:10.0f} events/s"
+            )
+
+if __name__ == '__main__':
+    main()
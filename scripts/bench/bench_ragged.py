@@ -0,0 +1,130 @@
+"""Compare padded and ragged vlarr inputs on a skewed multiplicity sample"""
+
+import argparse
+import time
+
+import numpy as np
+
+from vlne.data.data_generator import DataGenerator
+from vlne.data.data_generator.funcs.collate  import is_ragged
+from vlne.data.data_generator.keras_sequence import KerasSequence
+from vlne.keras.models import model_lstm_v2, model_trans_v1
+
+from synthetic import (
+    add_synthetic_parser, make_synthetic_dataset,
+    SYNTHETIC_INPUT_GROUPS, SYNTHETIC_TARGET_GROUPS
+)
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser("Benchmark ragged vlarr inputs")
+    add_synthetic_parser(parser)
+    parser.set_defaults(dist = 'skewed', events = 50000)
+
+    parser.add_argument(
+        '--batch-size',
+        help    = 'batch size',
+        default = 1024,
+        dest    = 'batch_size',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--model',
+        help    = 'model to benchmark',
+        choices = [ 'lstm_v2', 'trans_v1' ],
+        default = 'lstm_v2',
+        dest    = 'model',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--steps',
+        help    = 'number of training steps to time',
+        default = 20,
+        dest    = 'steps',
+        type    = int,
+    )
+
+    return parser.parse_args()
+
+def calc_input_size(inputs):
+    """Return size of `inputs` in bytes"""
+    result = 0
+
+    for value in inputs.values():
+        if is_ragged(value):
+            result += sum(x.nbytes for x in value)
+        else:
+            result += value.nbytes
+
+    return result
+
+def make_model(cmdargs, ragged):
+    if cmdargs.model == 'trans_v1':
+        model_kwargs = { 'num_hidden' : 32, 'ffn_num_hidden' : 64 }
+        make_base    = model_trans_v1
+    else:
+        model_kwargs = {
+            'lstm_units' : 32, 'layers_pre' : [ 64, 64 ], 'n_resblocks' : 0
+        }
+        make_base    = model_lstm_v2
+
+    model = make_base(
+        **model_kwargs,
+        layers_post         = [ 64, 64 ],
+        input_groups_scalar = {
+            'input_slice' : [ f'x{i}' for i in range(cmdargs.scalar_vars) ],
+        },
+        input_groups_vlarr  = {
+            'input_png' : [ f'y{i}' for i in range(cmdargs.vlarr_vars) ],
+        },
+        target_groups       = { 'total' : [ 'total' ] },
+        ragged              = ragged,
+    )
+
+    model.compile(loss = 'mean_absolute_percentage_error', optimizer = 'adam')
+    return model
+
+def benchmark(dset, cmdargs, ragged):
+    dgen = DataGenerator(
+        dset, SYNTHETIC_INPUT_GROUPS, SYNTHETIC_TARGET_GROUPS,
+        batch_size = cmdargs.batch_size,
+        ragged     = ragged,
+    )
+
+    steps = min(cmdargs.steps, len(dgen))
+    size  = np.mean([ calc_input_size(dgen[i][0]) for i in range(steps) ])
+
+    model = make_model(cmdargs, ragged)
+    seq   = KerasSequence(dgen)
+
+    # Warm up graph tracing
+    model.fit(seq, epochs = 1, steps_per_epoch = 1, verbose = 0)
+
+    start = time.perf_counter()
+    model.fit(seq, epochs = 1, steps_per_epoch = steps, verbose = 0)
+    step_time = (time.perf_counter() - start) / steps
+
+    return (size, step_time)
+
+def main():
+    cmdargs = parse_cmdargs()
+    dset    = make_synthetic_dataset(cmdargs)
+
+    lengths = np.diff(dset.vlarr['input_png'][1])
+    print(
+        f"vlarr lengths: mean {lengths.mean():.2f}, "
+        f"99% {np.quantile(lengths, 0.99):.0f}, max {lengths.max()}"
+    )
+
+    for ragged in [ False, True ]:
+        label = 'ragged' if ragged else 'padded'
+        size, step_time = benchmark(dset, cmdargs, ragged)
+
+        print(
+            f"{label:>8} : {size / 2**20:8.2f} MiB/batch,"
+            f" {1000 * step_time:8.2f} ms/step"
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Compare step times of KerasSequence and tf.data input pipelines"""
+
+import argparse
+import time
+
+from vlne.data.data_generator import DataGenerator
+from vlne.data.data_generator.keras_sequence    import KerasSequence
+from vlne.data.data_generator.tf_data_generator import (
+    TFDataGenerator, get_keras_data
+)
+from vlne.keras.models import model_lstm_v2
+
+from synthetic import (
+    add_synthetic_parser, make_synthetic_dataset,
+    SYNTHETIC_INPUT_GROUPS, SYNTHETIC_TARGET_GROUPS
+)
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser("Benchmark tf.data input pipeline")
+    add_synthetic_parser(parser)
+    parser.set_defaults(events = 50000)
+
+    parser.add_argument(
+        '--batch-size',
+        help    = 'batch size',
+        default = 1024,
+        dest    = 'batch_size',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--epochs',
+        help    = 'number of training epochs to time',
+        default = 2,
+        dest    = 'epochs',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--workers',
+        help    = 'number of keras workers for the Sequence backend',
+        default = 0,
+        dest    = 'workers',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--ragged',
+        help    = 'use ragged vlarr inputs',
+        action  = 'store_true',
+        dest    = 'ragged',
+    )
+
+    return parser.parse_args()
+
+def make_model(cmdargs):
+    model = model_lstm_v2(
+        lstm_units          = 32,
+        layers_pre          = [ 64, 64 ],
+        layers_post         = [ 64, 64 ],
+        input_groups_scalar = {
+            'input_slice' : [ f'x{i}' for i in range(cmdargs.scalar_vars) ],
+        },
+        input_groups_vlarr  = {
+            'input_png' : [ f'y{i}' for i in range(cmdargs.vlarr_vars) ],
+        },
+        target_groups       = { 'total' : [ 'total' ] },
+        ragged              = cmdargs.ragged,
+    )
+
+    model.compile(loss = 'mean_absolute_percentage_error', optimizer = 'adam')
+    return model
+
+def make_backends(dset, cmdargs):
+    dgen = DataGenerator(
+        dset, SYNTHETIC_INPUT_GROUPS, SYNTHETIC_TARGET_GROUPS,
+        batch_size = cmdargs.batch_size,
+        ragged     = cmdargs.ragged,
+    )
+
+    return {
+        'sequence'      : KerasSequence(dgen),
+        'tf-data'       : TFDataGenerator(dgen),
+        'tf-data+cache' : TFDataGenerator(dgen, cache = True),
+    }
+
+def benchmark(dgen, cmdargs, kwargs):
+    model = make_model(cmdargs)
+    data  = get_keras_data(dgen, shuffle = True)
+
+    # Warm up graph tracing
+    model.fit(data, epochs = 1, steps_per_epoch = 1, verbose = 0, **kwargs)
+
+    start = time.perf_counter()
+    model.fit(data, epochs = cmdargs.epochs, verbose = 0, **kwargs)
+
+    return (time.perf_counter() - start) / (cmdargs.epochs * len(dgen))
+
+def main():
+    cmdargs = parse_cmdargs()
+    dset    = make_synthetic_dataset(cmdargs)
+
+    for (label, dgen) in make_backends(dset, cmdargs).items():
+        kwargs = {}
+
+        if (label == 'sequence') and (cmdargs.workers > 0):
+            kwargs = {
+                'workers'             : cmdargs.workers,
+                'use_multiprocessing' : True,
+            }
+
+        step_time = benchmark(dgen, cmdargs, kwargs)
+        print(f"{label:>16} : {1000 * step_time:8.2f} ms/step")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Compare post-transform and read time vlarr truncation"""
+
+import argparse
+import time
+
+import numpy as np
+
+from vlndata.data_frame import DictFrame
+from vlne.data.truncation import VlarrLimitFrame
+
+from synthetic import add_synthetic_parser, make_synthetic_dataset
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser("Benchmark read time vlarr truncation")
+    add_synthetic_parser(parser)
+    parser.set_defaults(dist = 'skewed', length = 100, events = 20000)
+
+    parser.add_argument(
+        '--limit',
+        help    = 'vlarr limit (e.g. max_prongs)',
+        default = 5,
+        dest    = 'limit',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--no-sort',
+        action  = 'store_false',
+        help    = 'do not sort vlarr before truncation',
+        dest    = 'sort',
+    )
+
+    return parser.parse_args()
+
+def make_vlarr_frame(cmdargs):
+    """Create data frame with one per event vlarr column per variable"""
+    dset = make_synthetic_dataset(cmdargs)
+    values, offsets = dset.vlarr['input_png']
+
+    data = {}
+
+    for var in range(values.shape[1]):
+        column = np.empty(len(offsets) - 1, dtype = object)
+        column[:] = [
+            values[start:end, var]
+                for (start, end) in zip(offsets[:-1], offsets[1:])
+        ]
+        data[f'png.var{var}'] = column
+
+    return (DictFrame(data), list(data.keys()))
+
+def read_events(df, columns, limit, sort):
+    """Read events with mask-nan, descending sort and truncation"""
+    result = 0
+    data   = [ df[column] for column in columns ]
+
+    for idx in range(len(df)):
+        event = np.stack([ x[idx] for x in data ], axis = 1)
+        event = np.nan_to_num(event)
+
+        if sort:
+            event = event[np.argsort(-event[:, 0], kind = 'stable')]
+
+        result += len(event[:limit])
+
+    return result
+
+def benchmark(df, columns, cmdargs):
+    start = time.perf_counter()
+    n     = read_events(df, columns, cmdargs.limit, cmdargs.sort)
+
+    return (n, time.perf_counter() - start)
+
+def main():
+    cmdargs = parse_cmdargs()
+    df, columns = make_vlarr_frame(cmdargs)
+
+    lengths = np.array([ len(x) for x in df[columns[0]] ])
+    print(
+        f"vlarr lengths: mean {lengths.mean():.2f}, "
+        f"99% {np.quantile(lengths, 0.99):.0f}, max {lengths.max()}"
+    )
+
+    order  = (columns[0], False, True) if cmdargs.sort else None
+    limits = { column : (cmdargs.limit, order) for column in columns }
+
+    df_limit = VlarrLimitFrame(df, limits)
+
+    # Precompute orderings and truncated columns once
+    start = time.perf_counter()
+    _ = [ df_limit[column] for column in columns ]
+    prep_time = time.perf_counter() - start
+
+    for (label, frame) in [ ('post', df), ('read', df_limit) ]:
+        n, elapsed = benchmark(frame, columns, cmdargs)
+        print(
+            f"{label:>6} : {len(df) / elapsed:10.0f} events/s"
+            f" ({n} elements kept)"
+        )
+
+    print(f"read time truncation setup: {prep_time:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""Compare time-to-target validation loss of weighted loss and sampling"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from tensorflow import keras
+
+from vlne.data.data_generator import DataGenerator
+from vlne.data.data_generator.funcs.weights  import flat_weights
+from vlne.data.data_generator.keras_sequence import KerasSequence
+from vlne.data.dataset  import ArrayDataset
+from vlne.data.samplers import WeightedSampler
+from vlne.keras.models  import model_lstm_v2
+
+from synthetic import SYNTHETIC_INPUT_GROUPS, SYNTHETIC_TARGET_GROUPS
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser("Benchmark weighted sampling")
+
+    parser.add_argument(
+        '--events',
+        help    = 'number of training events',
+        default = 200000,
+        dest    = 'events',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        help    = 'batch size',
+        default = 1024,
+        dest    = 'batch_size',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--epochs',
+        help    = 'number of training epochs',
+        default = 10,
+        dest    = 'epochs',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--clip',
+        help    = 'flat weights clip',
+        default = 50,
+        dest    = 'clip',
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--seed',
+        help    = 'random seed',
+        default = 0,
+        dest    = 'seed',
+        type    = int,
+    )
+
+    return parser.parse_args()
+
+def make_dataset(n, clip, prg):
+    """Create dataset with a steeply falling energy spectrum"""
+    energy = np.minimum(prg.exponential(0.5, size = n), 5)
+    coeffs = prg.uniform(0.5, 1.5, size = (1, 10))
+
+    scalar = {
+        'input_slice' : (
+              energy[:, np.newaxis] * coeffs
+            + 0.1 * prg.normal(size = (n, 10))
+        ).astype(np.float32),
+        'total' : energy[:, np.newaxis].astype(np.float32),
+    }
+
+    lengths = prg.poisson(3, size = n)
+    offsets = np.concatenate([ [ 0 ], np.cumsum(lengths) ])
+    vlarr   = {
+        'input_png' : (
+            prg.normal(size = (offsets[-1], 4)).astype(np.float32), offsets
+        ),
+    }
+
+    weights = flat_weights(pd.DataFrame({ 'trueE' : energy }), clip = clip)
+    return ArrayDataset(scalar, vlarr, df = { 'weight' : weights })
+
+class ValLossTimer(keras.callbacks.Callback):
+    """Record wall time of each validation loss measurement"""
+
+    def __init__(self):
+        super().__init__()
+        self.history = []
+        self._start  = None
+
+    def on_train_begin(self, logs = None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs = None):
+        self.history.append(
+            (time.perf_counter() - self._start, logs['val_loss'])
+        )
+
+def make_model():
+    model = model_lstm_v2(
+        lstm_units          = 16,
+        layers_pre          = [ 64, 64 ],
+        layers_post         = [ 64, 64 ],
+        input_groups_scalar = {
+            'input_slice' : [ f'x{i}' for i in range(10) ],
+        },
+        input_groups_vlarr  = { 'input_png' : [ f'y{i}' for i in range(4) ] },
+        target_groups       = { 'total' : [ 'total' ] },
+    )
+
+    model.compile(loss = 'mean_absolute_percentage_error', optimizer = 'adam')
+    return model
+
+def train(dset_train, dset_val, cmdargs, weighted_sampling):
+    weights = { 'total' : 'weight' }
+    sampler = None
+
+    if weighted_sampling:
+        sampler = WeightedSampler(
+            dset_train.df['weight'], cmdargs.batch_size, seed = cmdargs.seed
+        )
+        weights = None
+
+    dgen_train = DataGenerator(
+        dset_train, SYNTHETIC_INPUT_GROUPS, SYNTHETIC_TARGET_GROUPS,
+        batch_size = cmdargs.batch_size,
+        weights    = weights,
+        sampler    = sampler,
+    )
+
+    # Validation loss is always weighted, so both modes are comparable
+    dgen_val = DataGenerator(
+        dset_val, SYNTHETIC_INPUT_GROUPS, SYNTHETIC_TARGET_GROUPS,
+        batch_size = cmdargs.batch_size,
+        weights    = { 'total' : 'weight' },
+    )
+
+    keras.utils.set_random_seed(cmdargs.seed)
+
+    timer = ValLossTimer()
+    model = make_model()
+
+    model.fit(
+        KerasSequence(dgen_train),
+        epochs          = cmdargs.epochs,
+        validation_data = KerasSequence(dgen_val),
+        callbacks       = [ timer ],
+        verbose         = 0,
+    )
+
+    return timer.history
+
+def get_time_to_target(history, target):
+    for (elapsed, loss) in history:
+        if loss <= target:
+            return elapsed
+
+    return np.nan
+
+def main():
+    cmdargs = parse_cmdargs()
+    prg     = np.random.default_rng(cmdargs.seed)
+
+    dset_train = make_dataset(cmdargs.events,      cmdargs.clip, prg)
+    dset_val   = make_dataset(cmdargs.events // 4, cmdargs.clip, prg)
+
+    histories = {
+        'weighted loss'     : train(dset_train, dset_val, cmdargs, False),
+        'weighted sampling' : train(dset_train, dset_val, cmdargs, True),
+    }
+
+    # Target is the best loss that both modes have reached
+    target = max(min(l for (_, l) in h) for h in histories.values())
+    print(f"Target weighted validation loss: {target:.3f}")
+
+    for (label, history) in histories.items():
+        print(
+            f"{label:>18} : {get_time_to_target(history, target):8.1f} s"
+            f" to target, {history[-1][0] / len(history):8.1f} s/epoch,"
+            f" final loss {history[-1][1]:.3f}"
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Compare worker pool throughput for different batch request orders.
+
+The workers can be profiled with py-spy (pip install py-spy):
+    py-spy record --subprocesses -- python bench_worker_pool.py
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from vlne.data.data_generator import DataGenerator
+from vlne.data.data_generator.idata_decorator import IDataDecorator
+from vlne.data.data_generator.shuffling_generator import ShufflingGenerator
+from vlne.data.data_generator.worker_pool_generator import (
+    WorkerPoolGenerator
+)
+
+from synthetic import (
+    add_synthetic_parser, make_synthetic_dataset,
+    SYNTHETIC_INPUT_GROUPS, SYNTHETIC_TARGET_GROUPS
+)
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser("Benchmark worker pool batch orders")
+    add_synthetic_parser(parser)
+    parser.set_defaults(events = 50000)
+
+    parser.add_argument(
+        '--batch-size',
+        help    = 'batch size',
+        default = 1024,
+        dest    = 'batch_size',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--epochs',
+        help    = 'number of epochs to time',
+        default = 2,
+        dest    = 'epochs',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--workers',
+        help    = 'number of worker processes',
+        default = 4,
+        dest    = 'workers',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--delay',
+        help    = 'extra time (ms) to build a batch, e.g. to decode it',
+        default = 10,
+        dest    = 'delay',
+        type    = float,
+    )
+
+    return parser.parse_args()
+
+class DelayedGenerator(IDataDecorator):
+    """Decorator that emulates expensive batch construction"""
+
+    def __init__(self, dgen, delay):
+        super().__init__(dgen)
+        self._delay = delay
+
+    def __getitem__(self, index):
+        time.sleep(self._delay)
+        return self._dgen[index]
+
+def keras_order(dgen, epoch):
+    """Shuffled batch order of `keras.Model.fit(shuffle = True)`"""
+    return np.random.default_rng(epoch).permutation(len(dgen))
+
+def sequential_order(dgen, epoch):
+    # pylint: disable=unused-argument
+    return np.arange(len(dgen))
+
+def benchmark(dgen, get_order, epochs):
+    start = time.perf_counter()
+
+    for epoch in range(epochs):
+        for index in get_order(dgen, epoch):
+            dgen[index]
+
+        dgen.on_epoch_end()
+
+    return epochs * len(dgen) / (time.perf_counter() - start)
+
+def main():
+    cmdargs = parse_cmdargs()
+    dset    = make_synthetic_dataset(cmdargs)
+
+    def make_dgen():
+        return DelayedGenerator(
+            DataGenerator(
+                dset, SYNTHETIC_INPUT_GROUPS, SYNTHETIC_TARGET_GROUPS,
+                batch_size = cmdargs.batch_size,
+            ),
+            cmdargs.delay / 1000
+        )
+
+    def make_pool(dgen):
+        return WorkerPoolGenerator(dgen, cmdargs.workers)
+
+    setups = {
+        'no pool'                 : (make_dgen, sequential_order),
+        'pool, sequential'        : (
+            lambda : make_pool(make_dgen()), sequential_order
+        ),
+        'pool, keras shuffle'     : (
+            lambda : make_pool(make_dgen()), keras_order
+        ),
+        'pool, ShufflingGenerator' : (
+            lambda : make_pool(ShufflingGenerator(make_dgen())),
+            sequential_order
+        ),
+    }
+
+    for (label, (make, get_order)) in setups.items():
+        dgen  = make()
+        speed = benchmark(dgen, get_order, cmdargs.epochs)
+
+        if hasattr(dgen, 'close'):
+            dgen.close()
+
+        print(f"{label:>26} : {speed:8.1f} batches/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Synthetic datasets for the data pipeline benchmarks"""
+
+import numpy as np
+
+from vlne.data.dataset import ArrayDataset
+
+def add_synthetic_parser(parser):
+    """Add command line options that parametrize synthetic dataset"""
+
+    parser.add_argument(
+        '--events',
+        help    = 'number of events in the synthetic dataset',
+        default = 100000,
+        dest    = 'events',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--scalar-vars',
+        help    = 'number of scalar variables',
+        default = 10,
+        dest    = 'scalar_vars',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--vlarr-vars',
+        help    = 'number of vlarr variables',
+        default = 20,
+        dest    = 'vlarr_vars',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--length',
+        help    = 'mean vlarr length',
+        default = 5,
+        dest    = 'length',
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--dist',
+        choices = [ 'poisson', 'skewed' ],
+        help    = 'vlarr length distribution',
+        default = 'poisson',
+        dest    = 'dist',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--seed',
+        help    = 'random seed',
+        default = 0,
+        dest    = 'seed',
+        type    = int,
+    )
+
+def generate_lengths(prg, n, length, dist):
+    """Generate `n` vlarr lengths with mean `length`"""
+    if dist == 'poisson':
+        return prg.poisson(length, size = n)
+
+    if dist == 'skewed':
+        # Log-normal multiplicities: most events are short, but there is a
+        # long tail of events with hundreds of particles.
+        sigma = 1.5
+        mu    = np.log(max(length, 1e-3)) - sigma**2 / 2
+        return np.round(prg.lognormal(mu, sigma, size = n)).astype(np.int64)
+
+    raise ValueError(f"Unknown length distribution: {dist}")
+
+def make_synthetic_dataset(cmdargs):
+    """Create synthetic `ArrayDataset` parametrized by `cmdargs`"""
+    prg = np.random.default_rng(cmdargs.seed)
+    n   = cmdargs.events
+
+    lengths     = generate_lengths(prg, n, cmdargs.length, cmdargs.dist)
+    offsets     = np.zeros(n + 1, dtype = np.int64)
+    offsets[1:] = np.cumsum(lengths)
+
+    scalar = {
+        'input_slice' : prg.normal(
+            size = (n, cmdargs.scalar_vars)
+        ).astype(np.float32),
+        'total' : prg.uniform(0, 5, size = (n, 1)).astype(np.float32),
+    }
+
+    vlarr = {
+        'input_png' : (
+            prg.normal(
+                size = (offsets[-1], cmdargs.vlarr_vars)
+            ).astype(np.float32),
+            offsets
+        ),
+    }
+
+    return ArrayDataset(scalar, vlarr)
+
+SYNTHETIC_INPUT_GROUPS  = [ 'input_slice', 'input_png' ]
+SYNTHETIC_TARGET_GROUPS = [ 'total' ]
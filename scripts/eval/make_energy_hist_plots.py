@@ -61,12 +61,12 @@ def main():
     setup_logging()
     cmdargs = parse_cmdargs()
 
-    dgen, args, model, _outdir, plotdir, preset = \
+    dgen, _args, model, _outdir, plotdir, preset = \
         standard_eval_prologue(cmdargs, PRESETS_EVAL)
 
     hist_specs = make_hist_specs(cmdargs, preset)
 
-    pred_model_dict = predict_energies(args, dgen, model)
+    pred_model_dict = predict_energies(dgen, model)
     true_dict       = get_true_energies(dgen)
     pred_base_dict  = get_base_energies(dgen, preset.base_map)
 
@@ -80,12 +80,12 @@ def main():
     setup_logging()
     cmdargs = parse_cmdargs()
 
-    dgen, args, model, _outdir, plotdir, preset = \
+    dgen, _args, model, _outdir, plotdir, preset = \
         standard_eval_prologue(cmdargs, PRESETS_EVAL)
 
     relres_specs = make_plot_specs(cmdargs, preset)
 
-    pred_model_dict = predict_energies(args, dgen, model)
+    pred_model_dict = predict_energies(dgen, model)
     true_dict       = get_true_energies(dgen)
     pred_base_dict  = get_base_energies(dgen, preset.base_map)
 
@@ -177,8 +177,8 @@ def save_stats(var_list, stat_list, label, plotdir):
     df.to_csv('%s/stats_%s.csv' % (plotdir, label))
 
 def make_perturb_profile(
-    smeared_var_generator, var_list, stat_list, args, model, hist_specs,
-    preset, plotdir, label, cmdargs
+    smeared_var_generator, var_list, stat_list, model, hist_specs, preset,
+    plotdir, label, cmdargs
 ):
     """
     Evaluate performance for generators yielded by `smeared_var_generator`
@@ -193,7 +193,7 @@ def make_perturb_profile(
         logging.info("Evaluating '%s' var...", vname)
 
         stats, _ = eval_model(
-            args, KerasSequence(dgen), model, hist_specs, cmdargs.fit_margin
+            KerasSequence(dgen), model, hist_specs, cmdargs.fit_margin
         )
 
         var_list .append(f"{vname} : {cmdargs.smear}")
@@ -214,7 +214,7 @@ def main():
 
     hist_specs = make_hist_specs(cmdargs, preset)
     var_list   = [ 'none' ]
-    stat_list  = [ eval_model(args, dgen, model, hist_specs)[0] ]
+    stat_list  = [ eval_model(dgen, model, hist_specs)[0] ]
 
     scalar_groups = args.data.input_groups_scalar or []
     vlarr_groups  = args.data.input_groups_vlarr or []
@@ -222,14 +222,14 @@ def main():
     for group_name in scalar_groups:
         make_perturb_profile(
             scalar_perturb_generator(args, dgen, group_name, cmdargs.smear),
-            var_list, stat_list, args, model, hist_specs, preset, plotdir,
+            var_list, stat_list, model, hist_specs, preset, plotdir,
             group_name, cmdargs
         )
 
     for group_name in vlarr_groups:
         make_perturb_profile(
             vlarr_perturb_generator(args, dgen, group_name, cmdargs.smear),
-            var_list, stat_list, args, model, hist_specs, preset, plotdir,
+            var_list, stat_list, model, hist_specs, preset, plotdir,
             group_name, cmdargs
         )
 
@@ -107,7 +107,7 @@ def main():
 
     dgen = load_data(args, splits = 'test')[0]
 
-    test_preds_dict  = predict_energies(args, dgen, model)
+    test_preds_dict  = predict_energies(dgen, model)
     null_energy_dict = get_true_energies(dgen)
 
     for idx, label in enumerate(LABELS):
@@ -16,6 +16,9 @@ setuptools.setup(
         'Programming Language :: Python :: 3 :: Only',
     ],
     description      = 'Package to develop neutrino energy estimators',
+    extras_require   = {
+        'bfloat16' : [ 'ml_dtypes', ],
+    },
     install_requires = [
         'numpy',
         'pandas',
@@ -0,0 +1,40 @@
+"""Test serialization of the configuration classes"""
+
+import json
+import unittest
+
+from vlne.args.config      import Config
+from vlne.args.data_config import DataConfig
+
+class TestsConfig(unittest.TestCase):
+    """Test serialization of the configuration classes"""
+
+    def test_optional_keys(self):
+        """Test that unset optional keys are not serialized"""
+        data_config = DataConfig(frame = 'data.csv')
+        values      = json.loads(data_config.to_json())
+
+        for key in DataConfig.optional_keys:
+            self.assertNotIn(key, values)
+
+        self.assertIn('frame', values)
+        self.assertIn('shuffle', values)
+
+        data_config.sampler = 'block-shuffle'
+        values = json.loads(data_config.to_json())
+
+        self.assertEqual(values['sampler'], 'block-shuffle')
+
+    def test_hash(self):
+        """Test that unset optional keys do not change config hash"""
+        data = { 'frame' : 'data.csv', 'seed' : 1 }
+
+        config = Config(data = data)
+        other  = Config(data = { **data, 'backend' : None })
+        self.assertEqual(config.get_hash(), other.get_hash())
+
+        other = Config(data = { **data, 'backend' : 'tf-data' })
+        self.assertNotEqual(config.get_hash(), other.get_hash())
+
+if __name__ == '__main__':
+    unittest.main()
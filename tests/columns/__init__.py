@@ -0,0 +1 @@
+"""Tests of `vlne.data.columns` functions"""
@@ -0,0 +1,51 @@
+"""Test selection of the data frame columns to load"""
+
+import unittest
+
+from vlne.args.data_config import DataConfig
+from vlne.data.columns     import get_required_columns, is_column_needed
+
+class TestsColumns(unittest.TestCase):
+    """Test selection of the data frame columns to load"""
+
+    def test_required_columns(self):
+        """Test that all referenced columns are required"""
+        data_config = DataConfig(
+            input_groups_scalar = { 'event' : [ 'calE', 'nHit' ] },
+            input_groups_vlarr  = { 'png'   : [ 'png.calE' ] },
+            target_groups       = { 'total' : [ 'trueE' ] },
+            weights             = { 'total' : 'weight' },
+        )
+
+        self.assertEqual(
+            get_required_columns(data_config, [ 'reco.nuE' ]),
+            set([ 'calE', 'nHit', 'png.calE', 'trueE', 'weight', 'reco.nuE' ])
+        )
+
+    def test_extra_vars_columns(self):
+        """Test that extra vars are replaced by their input columns"""
+        data_config = DataConfig(
+            input_groups_scalar = { 'event' : [ 'calE' ] },
+            target_groups       = { 'total' : [ 'trueE' ] },
+            weights             = { 'total' : 'flat_weight' },
+            extra_vars          = {
+                'flat_weight' : { 'name' : 'flat', 'var' : 'trueNuE' },
+            },
+        )
+
+        self.assertEqual(
+            get_required_columns(data_config),
+            set([ 'calE', 'trueE', 'trueNuE' ])
+        )
+
+    def test_column_needed(self):
+        """Test matching of the auxiliary file datasets to columns"""
+        columns = [ 'calE', 'png.calE' ]
+
+        self.assertTrue(is_column_needed('calE',  columns))
+        self.assertTrue(is_column_needed('png.calE_index', columns))
+        self.assertFalse(is_column_needed('calEx', columns))
+        self.assertFalse(is_column_needed('nHit',  columns))
+
+if __name__ == '__main__':
+    unittest.main()
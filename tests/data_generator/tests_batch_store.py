@@ -0,0 +1,163 @@
+"""Test correctness of the on-disk batch store"""
+
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from vlne.data.data_generator.funcs.batch_store import (
+    BatchStore, batch_store_exists, write_batch_store
+)
+from vlne.data.data_generator.idata_generator  import IDataGenerator
+from vlne.data.data_generator.replay_generator import ReplayGenerator
+from vlne.data.samplers import SequentialSampler
+
+class ListGenerator(IDataGenerator):
+    """Generator that returns precomputed batches"""
+
+    def __init__(self, batches):
+        super().__init__(None, [], [])
+        self._batches = batches
+
+    @property
+    def weights(self):
+        return {}
+
+    def __len__(self):
+        return len(self._batches)
+
+    def __getitem__(self, index):
+        return self._batches[index]
+
+def make_batch(n, length, ragged = False):
+    prg = np.random.default_rng(n * 100 + length)
+
+    if ragged:
+        lengths = prg.integers(0, length + 1, size = n)
+        offsets = np.concatenate([ [ 0 ], np.cumsum(lengths) ])
+        vlarr   = (
+            prg.normal(size = (offsets[-1], 2)).astype(np.float32), offsets
+        )
+    else:
+        vlarr = prg.normal(size = (n, length, 2)).astype(np.float32)
+
+    inputs  = {
+        'input_slice' : prg.normal(size = (n, 3)).astype(np.float32),
+        'input_png'   : vlarr,
+    }
+    targets = { 'total' : prg.normal(size = (n, 1)) }
+    weights = { 'total' : np.ones(n) }
+
+    return (inputs, targets, weights)
+
+class TestsBatchStore(unittest.TestCase):
+    """Test correctness of the on-disk batch store"""
+
+    def _compare_batches(self, batch_test, batch_null):
+        self.assertEqual(len(batch_test), len(batch_null))
+
+        for (part_test, part_null) in zip(batch_test, batch_null):
+            self.assertEqual(set(part_test.keys()), set(part_null.keys()))
+
+            for (k, v) in part_null.items():
+                if isinstance(v, tuple):
+                    self.assertTrue(np.array_equal(part_test[k][0], v[0]))
+                    self.assertTrue(np.array_equal(part_test[k][1], v[1]))
+                else:
+                    self.assertEqual(part_test[k].dtype, v.dtype)
+                    self.assertTrue(np.array_equal(part_test[k], v))
+
+    def _test_roundtrip(self, ragged):
+        batches = [
+            make_batch(4, 5, ragged), make_batch(4, 2, ragged),
+            make_batch(3, 0, ragged),
+        ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'store')
+            write_batch_store(ListGenerator(batches), path)
+
+            self.assertTrue(batch_store_exists(path))
+            store = BatchStore(path)
+
+            self.assertEqual(len(store), len(batches))
+
+            for (idx, batch) in enumerate(batches):
+                self._compare_batches(store[idx], batch)
+
+            store = pickle.loads(pickle.dumps(store))
+            self._compare_batches(store[1], batches[1])
+
+    def test_roundtrip_dense(self):
+        """Test that dense batches are restored exactly"""
+        self._test_roundtrip(False)
+
+    def test_roundtrip_ragged(self):
+        """Test that ragged batches are restored exactly"""
+        self._test_roundtrip(True)
+
+    def test_replay(self):
+        """Test that replay generator serves stored batches"""
+        batches = [ make_batch(2, 3), make_batch(2, 1) ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'store')
+            write_batch_store(ListGenerator(batches), path)
+
+            dgen = ReplayGenerator(ListGenerator([ None, None ]), path)
+
+            self.assertEqual(len(dgen), 2)
+            self._compare_batches(dgen[0], batches[0])
+
+            with self.assertRaises(ValueError):
+                ReplayGenerator(ListGenerator([ None ]), path)
+
+    def test_replay_lazy(self):
+        """Test that replayed data generator is constructed on demand"""
+        batches = [ make_batch(2, 3, True), make_batch(1, 1, True) ]
+        calls   = []
+
+        def make_dgen():
+            calls.append(None)
+            return ListGenerator([ None, None ])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'store')
+            write_batch_store(ListGenerator(batches), path)
+
+            dgen = ReplayGenerator(
+                make_dgen, path, SequentialSampler(3, 2)
+            )
+
+            self.assertEqual(len(dgen), 2)
+            self.assertEqual(dgen.store.n_events, 3)
+            self.assertEqual(dgen.input_groups, [ 'input_png', 'input_slice' ])
+            self.assertEqual(dgen.target_groups, [ 'total' ])
+            self.assertTrue(dgen.ragged and dgen.replayed)
+            self.assertFalse(dgen.sampler.shuffle)
+            self._compare_batches(dgen[1], batches[1])
+
+            dgen.on_epoch_end()
+            self.assertEqual(len(calls), 0)
+
+            self.assertEqual(dgen.weights, {})
+            self.assertIsNone(dgen.dataset)
+            self.assertEqual(len(calls), 1)
+
+    def test_failed_write(self):
+        """Test that interrupted writes do not leave a store behind"""
+        batches = [ make_batch(2, 3), None ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'store')
+
+            with self.assertRaises(Exception):
+                write_batch_store(ListGenerator(batches), path)
+
+            self.assertFalse(batch_store_exists(path))
+            self.assertEqual(os.listdir(tmpdir), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+"""Test correctness of the batch level transformations"""
+
+import unittest
+import numpy as np
+
+from vlne.data.data_generator import DataGenerator
+from vlne.data.data_generator.funcs.batch_transforms import (
+    BatchTransforms, split_batch_transforms
+)
+from vlne.data.data_generator.funcs.collate import ragged_from_list
+from vlne.data.dataset import ArrayDataset
+from vlne.data.transforms import split_transform_levels
+from vlne.args.data_config import DataConfig
+
+SCALAR_GROUPS = { 'input_slice' : [ 'a', 'b' ] }
+VLARR_GROUPS  = { 'input_png'   : [ 'x', 'y' ] }
+
+def make_noise(correlated, sigma = 0.1):
+    return {
+        'name'          : 'noise',
+        'noise'         : { 'name' : 'gaussian', 'mu' : 0, 'sigma' : sigma },
+        'correlated'    : correlated,
+        'relative'      : True,
+        'scalar_groups' : { 'input_slice' : [ 'b' ] },
+        'vlarr_groups'  : { 'input_png'   : [ 'x', 'y' ] },
+    }
+
+SHUFFLE = { 'name' : 'vlarr-shuffle', 'vlarr_group' : 'input_png' }
+
+def make_batch(n = 1000, seed = 0):
+    prg     = np.random.default_rng(seed)
+    lengths = prg.integers(0, 10, size = n)
+    events  = [
+        prg.uniform(1, 2, size = (length, 2)).astype(np.float32)
+            for length in lengths
+    ]
+
+    return {
+        'input_slice' : prg.uniform(1, 2, size = (n, 2)).astype(np.float32),
+        'input_png'   : ragged_from_list(events, n_vars = 2),
+    }
+
+class TestsBatchTransforms(unittest.TestCase):
+    """Test correctness of the batch level transformations"""
+
+    def test_split(self):
+        """Test that only a suffix of transformations is moved to batches"""
+        noise      = make_noise(True)
+        transforms = [ 'mask-nan', noise, 'vlarr-sort-like', SHUFFLE, noise ]
+
+        self.assertEqual(
+            split_batch_transforms(transforms, SCALAR_GROUPS, VLARR_GROUPS),
+            (transforms[:3], transforms[3:])
+        )
+        self.assertEqual(
+            split_batch_transforms(
+                transforms, SCALAR_GROUPS, VLARR_GROUPS, { 'input_png' : 5 }
+            ),
+            (transforms[:4], transforms[4:])
+        )
+
+    def test_graph_split(self):
+        """Test that only input augmentation of training is moved to model"""
+        noise_target = {
+            **make_noise(False), 'scalar_groups' : { 'target' : [ 'c' ] }
+        }
+        transforms   = [ 'mask-nan', noise_target, make_noise(True), SHUFFLE ]
+
+        data_config = DataConfig(
+            input_groups_scalar = SCALAR_GROUPS,
+            input_groups_vlarr  = VLARR_GROUPS,
+            target_groups       = { 'target' : [ 'c' ] },
+            transform_train     = transforms,
+            transform_test      = transforms,
+            augment             = 'graph',
+        )
+
+        self.assertEqual(
+            split_transform_levels(data_config, 'train'),
+            (transforms[:1], transforms[1:2], transforms[2:])
+        )
+        self.assertEqual(
+            split_transform_levels(data_config, 'test'),
+            (transforms[:1], transforms[1:], [])
+        )
+
+        data_config.augment = 'unknown'
+
+        with self.assertRaises(ValueError):
+            split_transform_levels(data_config, 'train')
+
+    def test_correlated_noise(self):
+        """Test that correlated noise is shared by event variables"""
+        batch  = make_batch()
+        result = BatchTransforms(
+            [ make_noise(True) ], SCALAR_GROUPS, VLARR_GROUPS, seed = 0
+        )(batch)
+
+        values, offsets = batch['input_png']
+        scale  = result['input_slice'][:, 1] / batch['input_slice'][:, 1]
+
+        self.assertTrue(np.array_equal(
+            result['input_slice'][:, 0], batch['input_slice'][:, 0]
+        ))
+        self.assertAlmostEqual(np.std(scale), 0.1, delta = 0.01)
+
+        for idx in range(len(offsets) - 1):
+            event = slice(offsets[idx], offsets[idx + 1])
+            self.assertTrue(np.allclose(
+                result['input_png'][0][event] / values[event], scale[idx],
+                rtol = 1e-5
+            ))
+
+    def test_uncorrelated_noise(self):
+        """Test that uncorrelated noise has the requested spread"""
+        batch  = make_batch()
+        result = BatchTransforms(
+            [ make_noise(False, 0.2) ], SCALAR_GROUPS, VLARR_GROUPS, seed = 0
+        )(batch)
+
+        scale = result['input_png'][0] / batch['input_png'][0]
+
+        self.assertAlmostEqual(np.mean(scale), 1,   delta = 0.01)
+        self.assertAlmostEqual(np.std(scale),  0.2, delta = 0.01)
+
+    def test_shuffle(self):
+        """Test that shuffle permutes elements within events"""
+        batch  = make_batch()
+        result = BatchTransforms(
+            [ SHUFFLE ], SCALAR_GROUPS, VLARR_GROUPS, seed = 0
+        )(batch)
+
+        values, offsets = batch['input_png']
+        self.assertTrue(np.array_equal(result['input_png'][1], offsets))
+        self.assertFalse(np.array_equal(result['input_png'][0], values))
+
+        for idx in range(len(offsets) - 1):
+            event = slice(offsets[idx], offsets[idx + 1])
+            self.assertTrue(np.array_equal(
+                np.sort(result['input_png'][0][event], axis = 0),
+                np.sort(values[event], axis = 0)
+            ))
+
+    def test_batch_seeds(self):
+        """Test that random numbers depend on epoch and batch index only"""
+        batch      = make_batch()
+        transforms = BatchTransforms(
+            [ make_noise(False) ], SCALAR_GROUPS, VLARR_GROUPS, seed = 0
+        )
+
+        result_1 = transforms(batch, 1)['input_png'][0]
+        result_0 = transforms(batch, 0)['input_png'][0]
+
+        self.assertFalse(np.array_equal(result_0, result_1))
+        self.assertTrue(np.array_equal(
+            result_1, transforms(batch, 1)['input_png'][0]
+        ))
+
+        transforms.on_epoch_end()
+        self.assertFalse(np.array_equal(
+            result_0, transforms(batch, 0)['input_png'][0]
+        ))
+
+        other = BatchTransforms(
+            [ make_noise(False) ], SCALAR_GROUPS, VLARR_GROUPS, seed = 0
+        )
+        self.assertTrue(np.array_equal(
+            result_0, other(batch, 0)['input_png'][0]
+        ))
+
+    def test_data_generator(self):
+        """Test that data generator pads batches after transformations"""
+        batch = make_batch(n = 100)
+        dset  = ArrayDataset(
+            { 'input_slice' : batch['input_slice'] },
+            { 'input_png'   : batch['input_png'] },
+        )
+        transforms = BatchTransforms(
+            [ SHUFFLE ], SCALAR_GROUPS, VLARR_GROUPS, seed = 0
+        )
+
+        dgen = DataGenerator(
+            dset, [ 'input_slice', 'input_png' ], [ 'input_slice' ],
+            batch_size = 10, transforms = transforms
+        )
+
+        inputs, _, _ = dgen[0]
+        lengths      = np.diff(batch['input_png'][1][:11])
+
+        self.assertEqual(inputs['input_png'].shape[:2], (10, lengths.max()))
+        self.assertTrue(np.all(
+            (inputs['input_png'][:, :, 0] == 0)
+            == (np.arange(lengths.max())[np.newaxis, :] >= lengths[:, None])
+        ))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Test correctness of the batch collation functions"""
+
+import unittest
+import numpy as np
+
+from vlne.data.data_generator.funcs.collate import (
+    ragged_from_list, take_ragged, pad_ragged, collate_bulk_batch,
+    collate_events_ragged
+)
+
+from ..data import X_PNG3D_1, X_PNG3D_2, X_SLICE_1, X_SLICE_2
+
+def make_png3d_events():
+    return [
+        np.array([ x1, x2 ], dtype = np.float32).T.reshape((-1, 2))
+            for (x1, x2) in zip(X_PNG3D_1, X_PNG3D_2)
+    ]
+
+def pad_events(events, pad = 0):
+    max_length = max(len(x) for x in events)
+    result     = np.full((len(events), max_length, 2), pad, dtype = np.float32)
+
+    for (idx, event) in enumerate(events):
+        result[idx, :len(event)] = event
+
+    return result
+
+class TestsCollate(unittest.TestCase):
+    """Test correctness of the batch collation functions"""
+
+    def test_ragged_roundtrip(self):
+        """Test that ragged conversion preserves events"""
+        events          = make_png3d_events()
+        values, offsets = ragged_from_list(events)
+
+        self.assertEqual(list(offsets), [ 0, 3, 4, 4, 5, 7 ])
+
+        for (idx, event) in enumerate(events):
+            self.assertTrue(np.array_equal(
+                values[offsets[idx]:offsets[idx + 1]], event
+            ))
+
+    def test_take_ragged(self):
+        """Test extraction of a subset of ragged events"""
+        events          = make_png3d_events()
+        values, offsets = ragged_from_list(events)
+
+        for indices in [ [ 4, 0, 2 ], [ 1, 2, 3 ], [ 2 ], [] ]:
+            batch_values, batch_offsets = take_ragged(values, offsets, indices)
+            self.assertEqual(len(batch_offsets), len(indices) + 1)
+
+            for (idx, index) in enumerate(indices):
+                self.assertTrue(np.array_equal(
+                    batch_values[batch_offsets[idx]:batch_offsets[idx + 1]],
+                    events[index]
+                ))
+
+    def test_pad_ragged(self):
+        """Test that padding of ragged events matches per event padding"""
+        events = make_png3d_events()
+        result = pad_ragged(*ragged_from_list(events), pad = -1)
+
+        self.assertTrue(np.array_equal(result, pad_events(events, pad = -1)))
+
+    def test_pad_ragged_truncated(self):
+        """Test padding of ragged events with length limit"""
+        events = make_png3d_events()
+        result = pad_ragged(*ragged_from_list(events), max_length = 1)
+
+        self.assertTrue(np.array_equal(result, pad_events(events)[:, :1]))
+
+    def test_collate_bulk_batch(self):
+        """Test collation of a mixed scalar/vlarr bulk batch"""
+        events = make_png3d_events()
+        slices = np.array([ X_SLICE_1, X_SLICE_2 ], dtype = np.float32).T
+
+        result = collate_bulk_batch({
+            'input_slice' : slices,
+            'input_png3d' : ragged_from_list(events),
+        })
+
+        self.assertTrue(np.array_equal(result['input_slice'], slices))
+        self.assertTrue(np.array_equal(
+            result['input_png3d'], pad_events(events)
+        ))
+
+    def test_collate_events_ragged(self):
+        """Test collation of per event dicts into a ragged batch"""
+        events = make_png3d_events()
+        slices = np.array([ X_SLICE_1, X_SLICE_2 ], dtype = np.float32).T
+
+        result = collate_events_ragged([
+            { 'input_slice' : s, 'input_png3d' : e }
+                for (s, e) in zip(slices, events)
+        ])
+
+        values, offsets = ragged_from_list(events)
+
+        self.assertTrue(np.array_equal(result['input_slice'], slices))
+        self.assertTrue(np.array_equal(result['input_png3d'][0], values))
+        self.assertTrue(np.array_equal(result['input_png3d'][1], offsets))
+
+if __name__ == '__main__':
+    unittest.main()
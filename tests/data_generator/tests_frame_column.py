@@ -0,0 +1,66 @@
+"""Test correctness of the lazy data frame columns"""
+
+import unittest
+
+import numpy as np
+
+from vlne.data.data_generator.funcs.frame_column import (
+    ConstColumn, FrameColumn
+)
+
+class RowFrame:
+    """Minimal data frame that supports (column, rows) keys"""
+
+    def __init__(self, data):
+        self._data = { k : np.asarray(v) for (k, v) in data.items() }
+        self.reads = []
+
+    def __len__(self):
+        return len(next(iter(self._data.values())))
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            (column, rows) = key
+            self.reads.append(len(rows))
+            return self._data[column][rows]
+
+        self.reads.append(len(self))
+        return self._data[key]
+
+class TestsFrameColumn(unittest.TestCase):
+    """Test correctness of the lazy data frame columns"""
+
+    def setUp(self):
+        self.values = np.array([ 0.5, 1.5, 2.5, 3.5, 4.5 ])
+        self.df     = RowFrame({ 'w' : self.values })
+
+    def test_frame_column_rows(self):
+        """Test that only the requested rows are read"""
+        column = FrameColumn(self.df, 'w')
+
+        self.assertEqual(len(column), len(self.values))
+        self.assertEqual(list(column[[ 3, 1 ]]), [ 3.5, 1.5 ])
+        self.assertEqual(self.df.reads, [ 2 ])
+
+    def test_frame_column_keys(self):
+        """Test that slices, masks and ints are accepted as row keys"""
+        column = FrameColumn(self.df, 'w')
+        mask   = np.array([ True, False, True, False, False ])
+
+        self.assertEqual(list(column[1:3]), [ 1.5, 2.5 ])
+        self.assertEqual(list(column[mask]), [ 0.5, 2.5 ])
+        self.assertEqual(column[-1], 4.5)
+        self.assertTrue(np.array_equal(np.asarray(column), self.values))
+
+    def test_const_column(self):
+        """Test that constant column mimics an array of ones"""
+        column = ConstColumn(4)
+
+        self.assertEqual(len(column), 4)
+        self.assertEqual(list(column[[ 0, 2 ]]), [ 1, 1 ])
+        self.assertEqual(list(column[1:]), [ 1, 1, 1 ])
+        self.assertEqual(column[3], 1)
+        self.assertTrue(np.array_equal(np.asarray(column), np.ones(4)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Test correctness of the memory bounded LRU cache"""
+
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from vlne.data.data_generator.funcs.lru_cache import LRUCache, calc_nbytes
+
+def make_item(n):
+    return { 'x' : np.zeros(n, dtype = np.float32) }
+
+class TestsLRUCache(unittest.TestCase):
+    """Test correctness of the memory bounded LRU cache"""
+
+    def test_calc_nbytes(self):
+        """Test memory usage of nested structures"""
+        batch = (make_item(10), { 'y' : np.zeros((2, 3)) }, [ make_item(1) ])
+        self.assertEqual(calc_nbytes(batch), 40 + 48 + 4)
+
+    def test_eviction(self):
+        """Test that least recently used items are evicted first"""
+        cache = LRUCache(budget = 100)
+
+        cache.put(0, make_item(10))
+        cache.put(1, make_item(10))
+        self.assertIsNotNone(cache.get(0))
+
+        cache.put(2, make_item(10))
+
+        self.assertIsNone(cache.get(1))
+        self.assertIsNotNone(cache.get(0))
+        self.assertIsNotNone(cache.get(2))
+
+        self.assertEqual(cache.nbytes, 80)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.hits, 3)
+        self.assertEqual(cache.misses, 1)
+
+    def test_count_miss(self):
+        """Test that repeated lookups may skip counting the misses"""
+        cache = LRUCache(budget = None)
+
+        self.assertIsNone(cache.get(0, count_miss = False))
+        self.assertIsNone(cache.get(0))
+
+        cache.put(0, make_item(1))
+        self.assertIsNotNone(cache.get(0, count_miss = False))
+
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 1)
+
+    def test_oversized_item(self):
+        """Test that items larger than budget are not cached"""
+        cache = LRUCache(budget = 10)
+        cache.put(0, make_item(10))
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_unbounded(self):
+        """Test that unbounded cache never evicts items"""
+        cache = LRUCache(budget = None)
+
+        for i in range(100):
+            cache.put(i, make_item(100))
+
+        self.assertEqual(len(cache), 100)
+        self.assertEqual(cache.evictions, 0)
+
+    def test_concurrent_access(self):
+        """Test that concurrent get/put keep the cache consistent"""
+        cache = LRUCache(budget = 1000)
+
+        def worker(seed):
+            prg = np.random.default_rng(seed)
+
+            for key in prg.integers(0, 50, size = 20000):
+                item = cache.get(key)
+
+                if item is None:
+                    cache.put(key, make_item(int(key) + 1))
+                else:
+                    self.assertEqual(len(item['x']), key + 1)
+
+        # Switch threads often to expose races
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+        try:
+            with ThreadPoolExecutor(max_workers = 8) as executor:
+                list(executor.map(worker, range(8)))
+        finally:
+            sys.setswitchinterval(interval)
+
+        items  = [ cache.get(key) for key in range(50) ]
+        nbytes = sum(calc_nbytes(x) for x in items if x is not None)
+
+        self.assertLessEqual(cache.nbytes, 1000)
+        self.assertEqual(cache.nbytes, nbytes)
+        self.assertEqual(len(cache), sum(x is not None for x in items))
+        self.assertEqual(cache.hits + cache.misses, 8 * 20000 + 50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Test correctness of the background batch prefetching"""
+
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from vlne.data.data_generator.idata_generator import IDataGenerator
+from vlne.data.data_generator.prefetching_generator import (
+    PrefetchingGenerator
+)
+
+class SlowGenerator(IDataGenerator):
+    """Generator that returns batch index after a delay"""
+
+    def __init__(self, n, delay = 0.001):
+        super().__init__(None, [], [])
+        self._n     = n
+        self._delay = delay
+        self._lock  = threading.Lock()
+        self.epochs = 0
+        self.calls  = []
+
+    @property
+    def weights(self):
+        return {}
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, index):
+        if (index < 0) or (index >= self._n):
+            raise IndexError(index)
+
+        with self._lock:
+            self.calls.append(index)
+
+        time.sleep(self._delay)
+        return index
+
+    def on_epoch_end(self):
+        self.epochs += 1
+
+class TestsPrefetchingGenerator(unittest.TestCase):
+    """Test correctness of the background batch prefetching"""
+
+    def test_order(self):
+        """Test that prefetched batches are returned in order"""
+        dgen = PrefetchingGenerator(SlowGenerator(20), prefetch = 4)
+
+        for _ in range(2):
+            batches = [ dgen[i] for i in range(len(dgen)) ]
+
+            self.assertEqual(batches, list(range(20)))
+            self.assertEqual(len(dgen.wait_times), 20)
+            dgen.on_epoch_end()
+
+        # pylint: disable=protected-access
+        self.assertEqual(dgen._dgen.epochs, 2)
+        dgen.close()
+
+    def test_out_of_order(self):
+        """Test random access to the prefetching generator"""
+        dgen = PrefetchingGenerator(SlowGenerator(20), prefetch = 3)
+
+        for index in [ 5, 2, 3, 19, 0, 7 ]:
+            self.assertEqual(dgen[index], index)
+
+        dgen.close()
+
+    def test_shuffled_order(self):
+        """Test that batches are correct when requested in shuffled order"""
+        slow = SlowGenerator(30)
+        dgen = PrefetchingGenerator(slow, prefetch = 4)
+
+        for order in np.random.default_rng(0).permuted(
+            np.tile(np.arange(30), (3, 1)), axis = 1
+        ):
+            self.assertEqual([ dgen[i] for i in order ], list(order))
+            dgen.on_epoch_end()
+
+        dgen.close()
+
+    def test_keep_window(self):
+        """Test that batches following an out of order index are kept"""
+        slow = SlowGenerator(20, delay = 0.01)
+        dgen = PrefetchingGenerator(slow, prefetch = 4)
+
+        # Batch 0 is requested again, e.g. by a retry of the consumer
+        self.assertEqual(dgen[0], 0)
+        self.assertEqual(dgen[0], 0)
+        self.assertEqual([ dgen[i] for i in range(1, 10) ], list(range(1, 10)))
+        dgen.close()
+
+        # Prefetched batches 1-4 were not abandoned by the repeated request
+        for index in range(1, 5):
+            self.assertEqual(slow.calls.count(index), 1)
+
+if __name__ == '__main__':
+    unittest.main()
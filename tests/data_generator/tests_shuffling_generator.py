@@ -0,0 +1,60 @@
+"""Test correctness of the batch order reshuffling"""
+
+import unittest
+
+import numpy as np
+
+from vlne.data.data_generator.prefetching_generator import (
+    PrefetchingGenerator
+)
+from vlne.data.data_generator.shuffling_generator import ShufflingGenerator
+
+from .tests_prefetching_generator import SlowGenerator
+
+class TestsShufflingGenerator(unittest.TestCase):
+    """Test correctness of the batch order reshuffling"""
+
+    def test_permutation(self):
+        """Test that every batch is visited once per epoch in a new order"""
+        dgen   = ShufflingGenerator(SlowGenerator(20, delay = 0), seed = 1)
+        orders = []
+
+        for _ in range(3):
+            order = [ dgen[i] for i in range(len(dgen)) ]
+
+            self.assertEqual(sorted(order), list(range(20)))
+            self.assertEqual(order, list(dgen.order))
+
+            orders.append(order)
+            dgen.on_epoch_end()
+
+        self.assertNotEqual(orders[0], orders[1])
+        self.assertNotEqual(orders[1], orders[2])
+
+    def test_seed(self):
+        """Test that batch order is reproducible with a fixed seed"""
+        dgen_1 = ShufflingGenerator(SlowGenerator(20, delay = 0), seed = 1)
+        dgen_2 = ShufflingGenerator(SlowGenerator(20, delay = 0), seed = 1)
+
+        for _ in range(2):
+            self.assertTrue(np.array_equal(dgen_1.order, dgen_2.order))
+            dgen_1.on_epoch_end()
+            dgen_2.on_epoch_end()
+
+    def test_prefetching(self):
+        """Test that prefetching of reshuffled batches builds them once"""
+        slow = SlowGenerator(30)
+        dgen = PrefetchingGenerator(ShufflingGenerator(slow), prefetch = 4)
+
+        for _ in range(2):
+            order = list(dgen._dgen.order)   # pylint: disable=protected-access
+            self.assertEqual([ dgen[i] for i in range(len(dgen)) ], order)
+
+            dgen.on_epoch_end()
+
+        dgen.close()
+
+        self.assertEqual(sorted(slow.calls), sorted(2 * list(range(30))))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Test correctness of the tf.data backend"""
+
+import unittest
+
+import numpy as np
+
+try:
+    from vlne.data.data_generator.tf_data_generator import (
+        EpochEndCallback, TFDataGenerator
+    )
+except ImportError:
+    TFDataGenerator = None
+
+from vlne.data.data_generator.idata_generator import IDataGenerator
+
+class EpochGenerator(IDataGenerator):
+    """Generator which batches hold the epoch they are constructed in"""
+
+    def __init__(self, n):
+        super().__init__(None, [ 'input' ], [ 'total' ])
+        self._n     = n
+        self.epoch  = 0
+        self.builds = []
+
+    @property
+    def weights(self):
+        return {}
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, index):
+        self.builds.append(index)
+        values = np.full((2, 1), 100 * self.epoch + index, dtype = np.float32)
+
+        return (
+            { 'input' : values }, { 'total' : values },
+            { 'total' : np.ones(2, dtype = np.float32) }
+        )
+
+    def on_epoch_end(self):
+        self.epoch += 1
+
+def get_values(dataset, n):
+    it = iter(dataset)
+    return [ int(next(it)[0]['input'][0, 0]) for _ in range(n) ]
+
+@unittest.skipIf(TFDataGenerator is None, "tensorflow is not available")
+class TestsTFDataGenerator(unittest.TestCase):
+    """Test correctness of the tf.data backend"""
+
+    def test_probe_reused(self):
+        """Test that batch probed by constructor is not constructed twice"""
+        dgen   = EpochGenerator(4)
+        tfdgen = TFDataGenerator(dgen, parallel_calls = 1)
+
+        values = get_values(tfdgen.get_tf_dataset(), 4)
+
+        self.assertEqual(values, [ 0, 1, 2, 3 ])
+        self.assertEqual(sorted(dgen.builds), [ 0, 1, 2, 3 ])
+
+    def test_probe_dropped(self):
+        """Test that probed batch is not served after an epoch end"""
+        dgen   = EpochGenerator(3)
+        tfdgen = TFDataGenerator(dgen, parallel_calls = 1)
+
+        EpochEndCallback([ tfdgen ]).on_epoch_end(0)
+        values = get_values(tfdgen.get_tf_dataset(), 3)
+
+        self.assertEqual(values, [ 100, 101, 102 ])
+
+    def test_repeat_epoch_end(self):
+        """Test that repeated epochs see the updated data generator"""
+        dgen   = EpochGenerator(4)
+        tfdgen = TFDataGenerator(dgen, parallel_calls = 4)
+
+        values = get_values(tfdgen.get_tf_dataset(repeat = True), 12)
+
+        self.assertEqual(
+            values, [ 100 * (k // 4) + (k % 4) for k in range(12) ]
+        )
+
+    def test_repeat_callback(self):
+        """Test that callback leaves epoch ends to the repeated datasets"""
+        dgen   = EpochGenerator(4)
+        tfdgen = TFDataGenerator(dgen)
+
+        tfdgen.get_tf_dataset(repeat = True)
+        EpochEndCallback([ tfdgen ]).on_epoch_end(0)
+
+        self.assertEqual(dgen.epoch, 0)
+
+    def test_repeat_shuffle(self):
+        """Test that every batch is visited once per repeated epoch"""
+        dgen   = EpochGenerator(8)
+        tfdgen = TFDataGenerator(dgen)
+
+        values = get_values(
+            tfdgen.get_tf_dataset(shuffle = True, repeat = True), 16
+        )
+
+        self.assertEqual(sorted(values[:8]), list(range(8)))
+        self.assertEqual(sorted(values[8:]), list(range(100, 108)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,12 +2,15 @@
 
 import unittest
 
+import numpy as np
+
 from vlndata.data_frame import DictFrame
 from vlne.data.data_generator.funcs.weights import (
-    calc_flat_whist, flat_weights
+    calc_flat_whist, flat_weights, flat_weights_chunked
 )
 
 from ..data import nan_equal
+from .tests_frame_column import RowFrame
 
 class TestsWeights(unittest.TestCase):
     """Test correctness of the weights calculations"""
@@ -124,6 +127,36 @@ class TestsWeights(unittest.TestCase):
 
         self.assertTrue(nan_equal(weights_test, weights_null))
 
+    def test_flat_weights_chunked(self):
+        """Test that chunked flat weights match the in-memory ones"""
+        prg    = np.random.default_rng(0)
+        values = prg.exponential(1.5, size = 1000)
+        values[:10] = [ -1, 0, 5, 5.5, 10, 2, 2, 2, 1, 0.1 ]
+
+        specs = [
+            { 'bins' : 10, 'range' : (0, 5), 'clip' : None },
+            { 'bins' : 10, 'range' : (0, 5), 'clip' : 3    },
+            { 'bins' : 7,  'range' : None,   'clip' : None },
+            { 'bins' : np.array([ 0, 0.5, 1, 2, 4 ]), 'range' : None },
+        ]
+
+        for spec in specs:
+            with self.subTest(spec = spec):
+                weights_null = flat_weights(
+                    DictFrame({ 'weight' : values }), var = 'weight', **spec
+                )
+
+                df  = RowFrame({ 'weight' : values })
+                out = np.full(len(values), np.nan)
+
+                weights_test = flat_weights_chunked(
+                    df, out, 64, var = 'weight', **spec
+                )
+
+                self.assertIs(weights_test, out)
+                self.assertTrue(np.allclose(weights_test, weights_null))
+                self.assertTrue(max(df.reads) <= 64)
+
 if __name__ == '__main__':
     unittest.main()
 
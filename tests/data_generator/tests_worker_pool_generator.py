@@ -0,0 +1,141 @@
+"""Test correctness of the shared memory worker pool"""
+
+import unittest
+import numpy as np
+
+from vlne.data.data_generator.idata_generator import IDataGenerator
+from vlne.data.data_generator.shuffling_generator import ShufflingGenerator
+from vlne.data.data_generator.worker_pool_generator import (
+    WorkerPoolGenerator
+)
+
+class IndexGenerator(IDataGenerator):
+    """Generator which batches encode batch index and epoch"""
+
+    def __init__(self, n):
+        super().__init__(None, [ 'input' ], [ 'target' ])
+        self._n     = n
+        self.epochs = 0
+
+    @property
+    def weights(self):
+        return {}
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, index):
+        # Batch size grows with index to exercise slot resizing
+        size    = 10 * (index + 1)
+        value   = 100 * self.epochs + index
+        offsets = np.arange(size + 1, dtype = np.int64)
+
+        return (
+            {
+                'input' : np.full((size, 3), value, dtype = np.float32),
+                'png'   : (np.full((size, 2), value, np.float32), offsets),
+            },
+            { 'target' : np.full((size, 1), value, dtype = np.float32) },
+            { 'target' : np.ones(size, dtype = np.float32) },
+        )
+
+    def on_epoch_end(self):
+        self.epochs += 1
+
+def get_batch_value(batch):
+    inputs, targets, _ = batch
+    values = [
+        np.unique(inputs['input']),
+        np.unique(inputs['png'][0]),
+        np.unique(targets['target']),
+    ]
+
+    assert all(len(x) == 1 for x in values)
+    assert len(set(x[0] for x in values)) == 1
+
+    return int(values[0][0])
+
+class TestsWorkerPoolGenerator(unittest.TestCase):
+    """Test correctness of the shared memory worker pool"""
+
+    def test_order(self):
+        """Test that batches are returned in order with the epoch state"""
+        dgen = WorkerPoolGenerator(IndexGenerator(20), workers = 2)
+
+        for epoch in range(2):
+            values = [ get_batch_value(dgen[i]) for i in range(len(dgen)) ]
+
+            self.assertEqual(values, [ 100 * epoch + i for i in range(20) ])
+            self.assertEqual(len(dgen.wait_times), 20)
+            dgen.on_epoch_end()
+
+        dgen.close()
+
+    def test_shape(self):
+        """Test that batches are restored with correct shapes and dtypes"""
+        dgen = WorkerPoolGenerator(IndexGenerator(10), workers = 2)
+
+        for index in range(len(dgen)):
+            inputs, targets, weights = dgen[index]
+
+            self.assertEqual(inputs['input'].shape, (10 * (index + 1), 3))
+            self.assertEqual(inputs['png'][1].dtype, np.int64)
+            self.assertEqual(len(inputs['png'][1]), 10 * (index + 1) + 1)
+            self.assertEqual(targets['target'].dtype, np.float32)
+            self.assertTrue(np.all(weights['target'] == 1))
+
+        dgen.close()
+
+    def test_held_batches(self):
+        """Test that the last `hold` batches are not overwritten"""
+        dgen    = WorkerPoolGenerator(IndexGenerator(30), 2, hold = 3)
+        batches = []
+
+        for index in range(len(dgen)):
+            batches.append(dgen[index])
+
+            for prev in range(max(index - 3, 0), index + 1):
+                self.assertEqual(get_batch_value(batches[prev]), prev)
+
+        dgen.close()
+
+    def test_out_of_order(self):
+        """Test random access to the worker pool"""
+        dgen = WorkerPoolGenerator(IndexGenerator(20), workers = 2)
+
+        for index in [ 5, 2, 3, 19, 0, 7, 8, 9, 1 ]:
+            self.assertEqual(get_batch_value(dgen[index]), index)
+
+        dgen.close()
+
+    def test_shuffled_order(self):
+        """Test batches requested in a shuffled order, as keras did"""
+        dgen = WorkerPoolGenerator(IndexGenerator(20), workers = 2)
+        prg  = np.random.default_rng(0)
+
+        for epoch in range(2):
+            for index in prg.permutation(len(dgen)):
+                self.assertEqual(
+                    get_batch_value(dgen[index]), 100 * epoch + index
+                )
+
+            dgen.on_epoch_end()
+
+        dgen.close()
+
+    def test_shuffling_generator(self):
+        """Test that reshuffled batches are built in the permuted order"""
+        shuffled = ShufflingGenerator(IndexGenerator(20), seed = 1)
+        dgen     = WorkerPoolGenerator(shuffled, workers = 2)
+
+        for epoch in range(2):
+            order  = list(shuffled.order)
+            values = [ get_batch_value(dgen[i]) for i in range(len(dgen)) ]
+
+            self.assertEqual(values, [ 100 * epoch + i for i in order ])
+            dgen.on_epoch_end()
+
+        dgen.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Test correctness of the compact storage of cached arrays"""
+
+import unittest
+import numpy as np
+
+from vlne.data.data_generator.funcs.compact import ArrayCompactor
+from vlne.data.dataset import ArrayDataset, CachedDataset
+
+from .tests_precache import ListDataset, make_events
+
+try:
+    import ml_dtypes
+except ImportError:
+    ml_dtypes = None
+
+INPUT_GROUPS = [ 'input_slice', 'input_png' ]
+COLUMNS      = {
+    'input_slice' : [ 'slice.calE', 'slice.nHit' ],
+    'input_png'   : [ 'png.calE', 'png.nHit' ],
+}
+
+def make_compactor(dtype = 'float16'):
+    return ArrayCompactor(dtype, INPUT_GROUPS, COLUMNS)
+
+class TestsCompact(unittest.TestCase):
+    """Test correctness of the compact storage of cached arrays"""
+
+    def _test_dataset(self, dtype, rtol):
+        events = make_events()
+        dset   = ArrayDataset.from_events(events)
+        result = dset.compact(make_compactor(dtype))
+
+        self.assertEqual(result.scalar['input_slice'].dtype.name, dtype)
+        self.assertEqual(result.vlarr['input_png'][0].dtype.name, dtype)
+
+        batch = result.get_batch(np.arange(len(events)))
+        self.assertEqual(batch['input_slice'].dtype, np.float32)
+        self.assertEqual(batch['input_png'][0].dtype, np.float32)
+
+        for (idx, event) in enumerate(events):
+            for (k, v) in event.items():
+                self.assertTrue(
+                    np.allclose(result[idx][k], v, rtol = rtol, atol = 0)
+                )
+
+    def test_float16_dataset(self):
+        """Test that float16 dataset returns float32 values of inputs"""
+        self._test_dataset('float16', 1e-3)
+
+    @unittest.skipIf(ml_dtypes is None, "ml_dtypes is not available")
+    def test_bfloat16_dataset(self):
+        """Test that bfloat16 dataset returns float32 values of inputs"""
+        self._test_dataset('bfloat16', 1e-2)
+
+    def test_targets(self):
+        """Test that targets and weights are stored as float32"""
+        compactor = make_compactor()
+        batch     = compactor.compact_batch((
+            { 'input_slice' : np.ones((4, 2), dtype = np.float64) },
+            { 'total'       : np.ones((4, 1), dtype = np.float64) },
+            { 'total'       : np.ones(4,      dtype = np.float64) },
+        ))
+
+        self.assertEqual(batch[0]['input_slice'].dtype, np.float16)
+        self.assertEqual(batch[1]['total'].dtype, np.float32)
+        self.assertEqual(batch[2]['total'].dtype, np.float32)
+
+        self.assertEqual(compactor.nbytes_full,    3 * 4 * 8 + 4 * 8)
+        self.assertEqual(compactor.nbytes_compact, 4 * 2 * 2 + 2 * 4 * 4)
+
+    def test_range_check(self):
+        """Test that overflowing and imprecise columns are reported"""
+        compactor = make_compactor()
+        values    = np.array([ [ 1e5, 1 ], [ 1e-9, 2 ] ], dtype = np.float32)
+
+        with self.assertLogs('vlne.data', level = 'WARNING') as logs:
+            compactor.compact({ 'input_slice' : values })
+
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn('overflows', logs.output[0])
+        self.assertIn('loses precision', logs.output[1])
+        self.assertTrue(all('slice.calE' in x for x in logs.output))
+
+    def test_cached_dataset(self):
+        """Test that events are cached compactly and restored"""
+        events = make_events()
+        dset   = CachedDataset(
+            ListDataset(events), None, compactor = make_compactor()
+        )
+
+        for _ in range(2):
+            for (idx, event) in enumerate(events):
+                self.assertEqual(dset[idx]['input_png'].dtype, np.float32)
+                self.assertTrue(np.allclose(
+                    dset[idx]['input_png'], event['input_png'], rtol = 1e-3
+                ))
+
+        self.assertLess(dset.cache.nbytes, sum(
+            sum(x.nbytes for x in event.values()) for event in events
+        ))
+
+if __name__ == '__main__':
+    unittest.main()
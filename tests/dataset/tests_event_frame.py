@@ -0,0 +1,144 @@
+"""Test correctness of the data frame of dataset events"""
+
+import unittest
+import numpy as np
+
+from vlne.data.data_generator import DataGenerator
+from vlne.data.dataset     import CachedDataset, PrefixCachedDataset
+from vlne.data.event_frame import EventFrame
+
+from .tests_materialize import SCALAR_GROUPS, VLARR_GROUPS
+from .tests_precache    import ListDataset, make_events
+
+class CountingDataset(ListDataset):
+    """Dataset that counts event reads"""
+
+    def __init__(self, events):
+        super().__init__(events)
+        self.reads = 0
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return super().__getitem__(index)
+
+class FrameEventsDataset:
+    """Dataset that reads events back from the columns of a data frame"""
+
+    def __init__(self, df, scalar_groups, vlarr_groups):
+        self.df = df
+        self._groups = { **scalar_groups, **vlarr_groups }
+        self._vlarr  = set(vlarr_groups)
+
+    def __len__(self):
+        return len(self.df)
+
+    def __getitem__(self, index):
+        result = {}
+
+        for (group, columns) in self._groups.items():
+            values = [ self.df[x][index] for x in columns ]
+            axis   = 1 if group in self._vlarr else 0
+
+            result[group] = np.stack(values, axis = axis)
+
+        return result
+
+class TestsEventFrame(unittest.TestCase):
+    """Test correctness of the data frame of dataset events"""
+
+    def setUp(self):
+        self.events = make_events()
+        self.weight = np.linspace(0, 1, len(self.events), dtype = np.float32)
+        self.dset   = CountingDataset(self.events)
+        self.df     = EventFrame(
+            self.dset, SCALAR_GROUPS, VLARR_GROUPS, { 'weight' : self.weight }
+        )
+
+    def test_columns(self):
+        """Test that columns are split from the event groups"""
+        self.assertEqual(len(self.df), len(self.events))
+
+        for (idx, event) in enumerate(self.events):
+            self.assertEqual(
+                self.df['slice.nHit'][idx], event['input_slice'][1]
+            )
+            self.assertEqual(self.df['trueE'][idx], event['total'][0])
+            self.assertTrue(np.array_equal(
+                self.df['png.calE'][idx], event['input_png'][:, 0]
+            ))
+
+        self.assertTrue(np.array_equal(
+            np.asarray(self.df['slice.calE']),
+            [ x['input_slice'][0] for x in self.events ]
+        ))
+
+    def test_rows(self):
+        """Test that rows are read with the tuple keys"""
+        rows   = [ 2, 0, 1 ]
+        values = self.df['png.nHit', rows]
+
+        self.assertEqual(values.dtype, object)
+        self.assertEqual(len(values), len(rows))
+
+        for (row, value) in zip(rows, values):
+            self.assertTrue(np.array_equal(
+                value, self.events[row]['input_png'][:, 1]
+            ))
+
+        self.assertTrue(np.array_equal(
+            self.df['slice.calE', rows],
+            [ self.events[x]['input_slice'][0] for x in rows ]
+        ))
+
+    def test_passthrough(self):
+        """Test that columns outside of the groups are read from df"""
+        self.assertIs(self.df['weight'], self.weight)
+        self.assertEqual(self.dset.reads, 0)
+
+    def test_cached_events(self):
+        """Test that cached events are read from the dataset once"""
+        dset = CountingDataset(self.events)
+        df   = EventFrame(
+            CachedDataset(dset, None), SCALAR_GROUPS, VLARR_GROUPS, {}
+        )
+
+        for column in [ 'slice.calE', 'slice.nHit', 'png.calE', 'trueE' ]:
+            for idx in range(len(df)):
+                _ = df[column][idx]
+
+        self.assertEqual(dset.reads, len(self.events))
+
+    def test_prefix_cache_stats(self):
+        """Test that prefix cache counters are logged at the epoch end"""
+        cache = CachedDataset(
+            ListDataset(self.events), None, name = 'train-prefix'
+        )
+        df    = EventFrame(cache, SCALAR_GROUPS, VLARR_GROUPS, {})
+        dset  = PrefixCachedDataset(
+            FrameEventsDataset(df, SCALAR_GROUPS, VLARR_GROUPS), cache
+        )
+        dgen  = DataGenerator(
+            dset, [ 'input_slice', 'input_png' ], [ 'total' ],
+            batch_size = 2
+        )
+
+        # Each column of each event is read from the cache
+        n_columns = sum(
+            len(x) for x in [ *SCALAR_GROUPS.values(), *VLARR_GROUPS.values() ]
+        )
+        n_reads   = n_columns * len(self.events)
+
+        for misses in [ len(self.events), 0 ]:
+            for idx in range(len(dgen)):
+                _ = dgen[idx]
+
+            with self.assertLogs('vlne.data', level = 'INFO') as logs:
+                dgen.on_epoch_end()
+
+            self.assertTrue(any(
+                f'Cache train-prefix: {n_reads - misses} hits,'
+                f' {misses} misses' in x for x in logs.output
+            ))
+
+if __name__ == '__main__':
+    unittest.main()
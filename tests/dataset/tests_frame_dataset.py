@@ -0,0 +1,70 @@
+"""Test correctness of the bulk reads of dataset frames"""
+
+import unittest
+import numpy as np
+
+from vlne.data.dataset import ArrayDataset, FrameDataset
+
+from ..data import TEST_DATA, TEST_DATA_LEN
+from ..truncation.tests_truncation import ListFrame
+from .tests_precache import ListDataset, make_events
+
+SCALAR_GROUPS = {
+    'input_slice' : [ 'x_slice1', 'x_slice2' ],
+    'total'       : [ 'target_total' ],
+}
+VLARR_GROUPS  = { 'input_png' : [ 'x_png2d1', 'x_png2d2' ] }
+
+class TestsFrameDataset(unittest.TestCase):
+    """Test correctness of the bulk reads of dataset frames"""
+
+    def setUp(self):
+        self.events   = make_events()
+        self.dset     = ListDataset(self.events)
+        self.dset.df  = ListFrame(TEST_DATA)
+        self.expected = ArrayDataset.from_events(self.events)
+
+    def _compare(self, batch, expected):
+        self.assertEqual(set(batch), set(expected))
+
+        for (group, values) in expected.items():
+            if group in VLARR_GROUPS:
+                self.assertTrue(np.array_equal(batch[group][0], values[0]))
+                self.assertTrue(np.array_equal(batch[group][1], values[1]))
+            else:
+                self.assertTrue(np.array_equal(batch[group], values))
+
+    def test_get_batch(self):
+        """Test that bulk batches match the per event ones"""
+        dset = FrameDataset(self.dset, SCALAR_GROUPS, VLARR_GROUPS)
+
+        for indices in [ np.arange(TEST_DATA_LEN), [ 3 ], [ 4, 0, 2 ] ]:
+            self._compare(
+                dset.get_batch(indices), self.expected.get_batch(indices)
+            )
+
+    def test_vlarr_limits(self):
+        """Test that vlarr groups are truncated to their limits"""
+        dset    = FrameDataset(
+            self.dset, SCALAR_GROUPS, VLARR_GROUPS, { 'input_png' : 1 }
+        )
+        indices = np.arange(TEST_DATA_LEN)
+
+        values, offsets = dset.get_batch(indices)['input_png']
+        lengths = [ min(len(x), 1) for x in TEST_DATA['x_png2d1'] ]
+
+        self.assertTrue(np.array_equal(np.diff(offsets), lengths))
+        self.assertTrue(np.array_equal(
+            values[:, 0], [ x[0] for x in TEST_DATA['x_png2d1'] if x ]
+        ))
+
+    def test_events(self):
+        """Test that events and attributes are taken from the dataset"""
+        dset = FrameDataset(self.dset, SCALAR_GROUPS, VLARR_GROUPS)
+
+        self.assertEqual(len(dset), TEST_DATA_LEN)
+        self.assertIs(dset[1], self.events[1])
+        self.assertIs(dset.df, self.dset.df)
+
+if __name__ == '__main__':
+    unittest.main()
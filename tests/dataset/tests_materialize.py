@@ -0,0 +1,75 @@
+"""Test correctness of the materialized transformations storage"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from vlne.data.dataset     import ArrayDataset
+from vlne.data.materialize import (
+    load_materialized, make_derived_frame, materialized_exists,
+    save_materialized
+)
+
+from .tests_precache import make_events
+
+SCALAR_GROUPS = {
+    'input_slice' : [ 'slice.calE', 'slice.nHit' ],
+    'total'       : [ 'trueE' ],
+}
+VLARR_GROUPS  = { 'input_png' : [ 'png.calE', 'png.nHit' ] }
+
+class TestsMaterialize(unittest.TestCase):
+    """Test correctness of the materialized transformations storage"""
+
+    def setUp(self):
+        dset = ArrayDataset.from_events(make_events())
+
+        self.scalar  = dset.scalar
+        self.vlarr   = dset.vlarr
+        self.columns = {
+            'weight' : np.linspace(0, 1, len(dset), dtype = np.float32)
+        }
+
+    def test_save_load(self):
+        """Test that saved arrays are loaded back unchanged"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'store')
+
+            self.assertFalse(materialized_exists(path))
+            save_materialized(path, self.scalar, self.vlarr, self.columns)
+            self.assertTrue(materialized_exists(path))
+
+            scalar, vlarr, columns = load_materialized(path)
+
+            for (group, values) in self.scalar.items():
+                self.assertTrue(np.array_equal(scalar[group], values))
+
+            for (group, (values, offsets)) in self.vlarr.items():
+                self.assertTrue(np.array_equal(vlarr[group][0], values))
+                self.assertTrue(np.array_equal(vlarr[group][1], offsets))
+
+            self.assertTrue(
+                np.array_equal(columns['weight'], self.columns['weight'])
+            )
+
+    def test_derived_frame(self):
+        """Test that derived frame exposes columns of the groups"""
+        df = make_derived_frame(
+            self.scalar, self.vlarr, self.columns, SCALAR_GROUPS, VLARR_GROUPS
+        )
+        values, offsets = self.vlarr['input_png']
+
+        self.assertTrue(np.array_equal(
+            df['slice.nHit'], self.scalar['input_slice'][:, 1]
+        ))
+        self.assertTrue(np.array_equal(df['weight'], self.columns['weight']))
+
+        for idx in range(len(offsets) - 1):
+            self.assertTrue(np.array_equal(
+                df['png.nHit'][idx], values[offsets[idx]:offsets[idx+1], 1]
+            ))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Test correctness of the parallel dataset precaching"""
+
+import unittest
+import numpy as np
+
+from vlne.data.dataset.precache import precache_dataset
+
+from ..data import (
+    X_PNG2D_1, X_PNG2D_2, X_SLICE_1, X_SLICE_2, TARGET_TOTAL, TEST_DATA_LEN
+)
+
+class ListDataset:
+    """Dataset that returns events from a list"""
+
+    def __init__(self, events):
+        self._events = events
+        self.df      = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def __getitem__(self, index):
+        return self._events[index]
+
+def make_events(n_repeat = 1):
+    result = []
+
+    for _ in range(n_repeat):
+        for i in range(TEST_DATA_LEN):
+            result.append({
+                'input_slice' : np.array(
+                    [ X_SLICE_1[i], X_SLICE_2[i] ], dtype = np.float32
+                ),
+                'input_png'   : np.array(
+                    [ X_PNG2D_1[i], X_PNG2D_2[i] ], dtype = np.float32
+                ).T.reshape((-1, 2)),
+                'total'       : np.array([ TARGET_TOTAL[i] ]),
+            })
+
+    return result
+
+class TestsPrecache(unittest.TestCase):
+    """Test correctness of the parallel dataset precaching"""
+
+    def _test_precache(self, events, workers, chunk_size):
+        dset = precache_dataset(
+            ListDataset(events), workers, chunk_size = chunk_size
+        )
+
+        self.assertEqual(len(dset), len(events))
+
+        for (idx, event) in enumerate(events):
+            for (k, v) in event.items():
+                self.assertEqual(dset[idx][k].dtype, v.dtype)
+                self.assertTrue(np.array_equal(dset[idx][k], v))
+
+    def test_single_chunk(self):
+        """Test precaching with a single chunk"""
+        self._test_precache(make_events(), 2, None)
+
+    def test_multiple_chunks(self):
+        """Test precaching with chunks that include empty vlarrs"""
+        self._test_precache(make_events(10), 3, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Test correctness of the streaming resolution accumulator"""
+
+import unittest
+
+import numpy as np
+
+try:
+    import cafplot
+except ImportError:
+    cafplot = None
+
+@unittest.skipIf(cafplot is None, "cafplot is not available")
+class TestsResolutionAccumulator(unittest.TestCase):
+    """Test correctness of the streaming resolution accumulator"""
+
+    def setUp(self):
+        prg = np.random.default_rng(0)
+
+        self.true    = prg.uniform(0.5, 5, size = 2000)
+        self.pred    = self.true * (1 + prg.normal(0, 0.2, size = 2000))
+        self.weights = prg.uniform(0.1, 2, size = 2000)
+
+    def accumulate(self, bins, hist_range, batch_size = 128):
+        # pylint: disable=import-outside-toplevel
+        from vlne.eval.resolution import ResolutionAccumulator
+
+        result = ResolutionAccumulator(bins, hist_range, (-1, 1))
+
+        for start in range(0, len(self.true), batch_size):
+            batch = slice(start, start + batch_size)
+            result.update(
+                self.pred[batch], self.true[batch], self.weights[batch]
+            )
+
+        return result
+
+    def test_stats(self):
+        """Test that accumulated stats match the in-memory ones"""
+        # pylint: disable=import-outside-toplevel
+        from vlne.eval.resolution import calc_resolution_stats
+
+        stats_null = calc_resolution_stats(
+            self.pred, self.true, self.weights, (-1, 1)
+        )
+        stats_test = self.accumulate(50, (-1, 1)).get_stats()
+
+        for (k, v) in stats_null.items():
+            if k == 'median':
+                self.assertAlmostEqual(stats_test[k], v, delta = 1e-3)
+            else:
+                self.assertAlmostEqual(stats_test[k], v)
+
+    def test_hist(self):
+        """Test that accumulated hist matches the in-memory one"""
+        # pylint: disable=import-outside-toplevel
+        from vlne.eval.resolution import calc_resolution_hist
+
+        for (bins, hist_range) in [
+            (50, (-1, 1)), (np.array([ -1, -0.1, 0, 0.2, 1 ]), None)
+        ]:
+            with self.subTest(bins = bins):
+                rhist_null = calc_resolution_hist(
+                    self.pred, self.true, self.weights, bins, hist_range
+                )
+                rhist_test = self.accumulate(bins, hist_range).get_hist()
+
+                self.assertTrue(
+                    np.allclose(rhist_test.bins_x, rhist_null.bins_x)
+                )
+                self.assertTrue(np.allclose(rhist_test.hist, rhist_null.hist))
+                self.assertTrue(
+                    np.allclose(rhist_test.err_sq, rhist_null.err_sq)
+                )
+
+    def test_unknown_range(self):
+        """Test that histogram range must be known in advance"""
+        # pylint: disable=import-outside-toplevel
+        from vlne.eval.resolution import ResolutionAccumulator
+
+        with self.assertRaises(ValueError):
+            ResolutionAccumulator(50, None)
+
+if __name__ == '__main__':
+    unittest.main()
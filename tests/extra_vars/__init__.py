@@ -0,0 +1 @@
+"""Tests of the cached extra variables"""
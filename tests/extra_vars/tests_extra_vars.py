@@ -0,0 +1,104 @@
+"""Test correctness of the cached extra variables"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from vlndata.data_frame import DictFrame
+from vlne.data.data_generator.funcs.weights import flat_weights
+from vlne.data.extra_vars  import (
+    get_extra_var_path, load_extra_var, parse_extra_vars
+)
+from vlne.data.sharded_frame import get_files_stat
+
+from ..data_generator.tests_frame_column import RowFrame
+
+VAR_SPEC = { 'name' : 'flat', 'bins' : 5, 'range' : (0, 5) }
+
+class TestsExtraVars(unittest.TestCase):
+    """Test correctness of the cached extra variables"""
+
+    def setUp(self):
+        self.df = DictFrame({ 'trueE' : [ 1, 2, 2, 3, 4, 0.5, 4.5 ] })
+
+    def test_unknown_variable(self):
+        """Test that unknown variables are rejected"""
+        with self.assertRaises(ValueError):
+            parse_extra_vars({ 'weight' : 'unknown' })
+
+    def test_no_cache(self):
+        """Test that variables are computed without data files"""
+        func = parse_extra_vars({ 'weight' : VAR_SPEC })['weight']
+
+        self.assertTrue(np.allclose(
+            func(self.df), flat_weights(self.df, bins = 5, range = (0, 5))
+        ))
+
+    def test_cache(self):
+        """Test that values are saved, reused and invalidated"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'data.csv')
+
+            with open(path, 'wt') as f:
+                f.write('trueE\n')
+
+            stat   = get_files_stat([ path ])
+            values = load_extra_var(self.df, 'weight', VAR_SPEC, stat)
+            cached = get_extra_var_path('weight', VAR_SPEC, stat)
+
+            self.assertTrue(os.path.exists(cached))
+
+            # Cached values are used instead of recomputing them
+            np.save(cached, np.arange(len(self.df), dtype = np.float64))
+
+            result = load_extra_var(self.df, 'weight', VAR_SPEC, stat)
+            self.assertIsInstance(result, np.memmap)
+            self.assertEqual(list(result), list(range(len(self.df))))
+
+            # Different selection or a modified file invalidate the cache
+            result = load_extra_var(
+                self.df, 'weight', VAR_SPEC, stat, fingerprint = [ 'sel' ]
+            )
+            self.assertTrue(np.allclose(result, values))
+
+            with open(path, 'at') as f:
+                f.write('1\n')
+
+            result = load_extra_var(
+                self.df, 'weight', VAR_SPEC, get_files_stat([ path ])
+            )
+            self.assertTrue(np.allclose(result, values))
+
+    def test_chunked(self):
+        """Test that chunked variables are written directly to the cache"""
+        values = np.asarray(self.df['trueE'])
+        null   = flat_weights(self.df, bins = 5, range = (0, 5))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'data.csv')
+
+            with open(path, 'wt') as f:
+                f.write('trueE\n')
+
+            stat = get_files_stat([ path ])
+            df   = RowFrame({ 'trueE' : values })
+
+            result = load_extra_var(
+                df, 'weight', VAR_SPEC, stat, chunk_size = 2
+            )
+
+            self.assertIsInstance(result, np.memmap)
+            self.assertTrue(np.allclose(result, null))
+            self.assertTrue(max(df.reads) <= 2)
+            self.assertTrue(
+                os.path.exists(get_extra_var_path('weight', VAR_SPEC, stat))
+            )
+
+        # Without data files the values are kept in memory
+        result = load_extra_var(df, 'weight', VAR_SPEC, chunk_size = 3)
+        self.assertTrue(np.allclose(result, null))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1 @@
+"""Tests of the input feature statistics"""
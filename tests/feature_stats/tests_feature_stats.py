@@ -0,0 +1,99 @@
+"""Test correctness of the streaming input feature statistics"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from vlne.data.feature_stats import (
+    calc_feature_stats, load_feature_stats, unpack_feature_stats
+)
+from vlne.data.sharded_frame import get_files_stat
+
+from ..data_generator.tests_frame_column import RowFrame
+
+class TestsFeatureStats(unittest.TestCase):
+    """Test correctness of the streaming input feature statistics"""
+
+    def setUp(self):
+        np.random.seed(1)
+
+        self.scalar = np.random.normal(3, 2, size = 103)
+        self.scalar[[ 5, 17, 60 ]] = np.nan
+
+        self.vlarr = np.empty(103, dtype = object)
+        for idx in range(len(self.vlarr)):
+            self.vlarr[idx] = np.random.uniform(
+                -1, 5, size = np.random.randint(0, 4)
+            )
+
+        self.df = RowFrame({ 'x' : self.scalar, 'v' : self.vlarr })
+
+    def assert_stats(self, stats, values):
+        valid = values[~np.isnan(values)]
+
+        self.assertEqual(stats['count'], len(valid))
+        self.assertAlmostEqual(stats['mean'], np.mean(valid))
+        self.assertAlmostEqual(stats['var'],  np.var(valid))
+        self.assertAlmostEqual(stats['min'],  np.min(valid))
+        self.assertAlmostEqual(stats['max'],  np.max(valid))
+        self.assertAlmostEqual(
+            stats['nan_fraction'], np.mean(np.isnan(values))
+        )
+
+    def test_chunked_stats(self):
+        """Test that stats merged over chunks match the numpy ones"""
+        stats = unpack_feature_stats(
+            calc_feature_stats(self.df, [ 'x', 'v' ], chunk_size = 10),
+            [ 'x', 'v' ]
+        )
+
+        self.assert_stats(stats['x'], self.scalar)
+        self.assert_stats(stats['v'], np.concatenate(self.vlarr))
+        self.assertTrue(max(self.df.reads) <= 10)
+
+    def test_empty_column(self):
+        """Test stats of a column without non NaN values"""
+        df    = RowFrame({ 'x' : np.full(5, np.nan) })
+        stats = unpack_feature_stats(
+            calc_feature_stats(df, [ 'x' ], chunk_size = 2), [ 'x' ]
+        )['x']
+
+        self.assertEqual(stats['count'], 0)
+        self.assertEqual(stats['nan_fraction'], 1)
+
+    def test_workers(self):
+        """Test that parallel stats match the sequential ones"""
+        null   = calc_feature_stats(self.df, [ 'x', 'v' ], chunk_size = 7)
+        result = calc_feature_stats(
+            self.df, [ 'x', 'v' ], workers = 3, chunk_size = 7
+        )
+
+        self.assertTrue(np.allclose(result, null))
+
+    def test_cache(self):
+        """Test that stats are saved and reused"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'data.csv')
+
+            with open(path, 'wt') as f:
+                f.write('x\n')
+
+            stat  = get_files_stat([ path ])
+            stats = load_feature_stats(self.df, [ 'x' ], stat)
+
+            self.df.reads = []
+            result = load_feature_stats(self.df, [ 'x' ], stat)
+
+            self.assertEqual(self.df.reads, [])
+            self.assertEqual(result, stats)
+
+            # Different rows are not served by the saved stats
+            result = load_feature_stats(
+                self.df, [ 'x' ], stat, fingerprint = [ 'sel' ]
+            )
+            self.assertNotEqual(self.df.reads, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1 @@
+"""Tests of the HDF data frames"""
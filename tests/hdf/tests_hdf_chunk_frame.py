@@ -0,0 +1,119 @@
+"""Test correctness of the chunk cached HDF frame"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+from vlne.data.hdf_chunk_frame import HDFChunkFrame
+
+N_ROWS     = 1000
+CHUNK_SIZE = 100
+
+def create_hdf(path):
+    with h5py.File(path, 'w') as f:
+        f.create_dataset(
+            'x', data = np.arange(N_ROWS, dtype = np.float32),
+            chunks = (CHUNK_SIZE, ), compression = 'gzip'
+        )
+
+        png = f.create_dataset(
+            'png.x', (N_ROWS, ), chunks = (CHUNK_SIZE, ),
+            dtype = h5py.vlen_dtype(np.float32)
+        )
+        png[:] = [
+            np.full(i % 4, i, dtype = np.float32) for i in range(N_ROWS)
+        ]
+
+@unittest.skipIf(h5py is None, "h5py is not available")
+class TestsHDFChunkFrame(unittest.TestCase):
+    """Test correctness of the chunk cached HDF frame"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path   = os.path.join(self.tmpdir.name, 'data.h5')
+        create_hdf(self.path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_random_rows(self):
+        """Test that shuffled rows are read correctly"""
+        df   = HDFChunkFrame(self.path)
+        rows = np.random.default_rng(0).permutation(N_ROWS)[:300]
+
+        self.assertEqual(len(df), N_ROWS)
+        self.assertTrue(np.all(df['x'][rows] == rows))
+        self.assertTrue(np.all(df['x', rows] == rows))
+        self.assertEqual(df['x'][7], 7)
+
+        png = df['png.x'][rows]
+        self.assertTrue(all(
+            np.all(x == i) and (len(x) == i % 4) for (x, i) in zip(png, rows)
+        ))
+
+    def test_chunk_reuse(self):
+        """Test that each chunk is decompressed once"""
+        df   = HDFChunkFrame(self.path, columns = [ 'x' ])
+        rows = np.random.default_rng(0).permutation(N_ROWS)
+
+        for batch in np.split(rows[:500], 50):
+            _ = df['x'][batch]
+
+        self.assertEqual(df.cache.misses, N_ROWS // CHUNK_SIZE)
+        self.assertEqual(df.columns(), [ 'x' ])
+
+    def test_concurrent_reads(self):
+        """Test that chunks are decompressed once by concurrent readers"""
+        df      = HDFChunkFrame(self.path, columns = [ 'x' ])
+        rng     = np.random.default_rng(0)
+        batches = np.split(rng.integers(0, N_ROWS, size = 2 * N_ROWS), 200)
+        errors  = []
+
+        def read(batches):
+            for batch in batches:
+                if not np.all(df['x', batch] == batch):
+                    errors.append(batch)
+
+        threads = [
+            threading.Thread(target = read, args = (batches[i::8], ))
+                for i in range(8)
+        ]
+
+        with self.assertLogs('vlne.data', level = 'INFO') as logs:
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+
+        # Stats are logged (and reset) after every `N_ROWS` reads
+        stats = [ x for x in logs.output if 'Chunk cache' in x ]
+
+        self.assertEqual(len(stats), 2)
+        self.assertIn(f' {N_ROWS // CHUNK_SIZE} misses', stats[0])
+        self.assertIn(' 0 misses', stats[1])
+
+    def test_budget(self):
+        """Test that the cache stays within its budget"""
+        budget = 3 * CHUNK_SIZE * 4
+        df     = HDFChunkFrame(self.path, chunk_cache = budget)
+
+        _ = df['x'][np.arange(N_ROWS)[::-1]]
+
+        self.assertLessEqual(df.cache.nbytes, budget)
+        self.assertEqual(len(df.cache), 3)
+        self.assertTrue(np.all(np.asarray(df['x']) == np.arange(N_ROWS)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Test that ragged vlarr inputs match the padded ones"""
+
+import types
+import unittest
+
+import numpy as np
+
+try:
+    import tensorflow as tf
+
+    from vlne.keras.models import model_lstm_v2, model_trans_v1
+    from vlne.train.setup  import select_base_model
+except ImportError:
+    tf = None
+
+from vlne.consts import DEF_MASK
+from vlne.data.data_generator.funcs.collate import pad_ragged
+
+INPUT_GROUPS_SCALAR = { 'input_slice' : [ 'x1', 'x2' ] }
+INPUT_GROUPS_VLARR  = { 'input_png'   : [ 'y1', 'y2', 'y3' ] }
+TARGET_GROUPS       = { 'total'       : [ 'total' ] }
+
+def make_inputs(lengths, seed = 0):
+    prg     = np.random.default_rng(seed)
+    offsets = np.concatenate([ [ 0 ], np.cumsum(lengths) ])
+    values  = prg.normal(size = (offsets[-1], 3)).astype(np.float32)
+    scalar  = prg.normal(size = (len(lengths), 2)).astype(np.float32)
+
+    ragged = tf.RaggedTensor.from_row_splits(values, offsets)
+    padded = pad_ragged(values, offsets, pad = DEF_MASK)
+
+    return ([ scalar, ragged ], [ scalar, padded ])
+
+def copy_weights(src, dst):
+    """Copy weights between models that differ only by the input masking"""
+    layers = { x.name.replace('-masked', '') : x for x in src.layers }
+
+    for layer in dst.layers:
+        if layer.weights:
+            layer.set_weights(
+                layers[layer.name.replace('-masked', '')].get_weights()
+            )
+
+@unittest.skipIf(tf is None, "tensorflow with keras 2 is not available")
+class TestsRagged(unittest.TestCase):
+    """Test that ragged vlarr inputs match the padded ones"""
+
+    def _test_model(self, make_model, **kwargs):
+        models = []
+
+        for ragged in [ True, False ]:
+            # Reset automatic layer names, such that both models match
+            tf.keras.backend.clear_session()
+
+            models.append(make_model(
+                input_groups_scalar = INPUT_GROUPS_SCALAR,
+                input_groups_vlarr  = INPUT_GROUPS_VLARR,
+                target_groups       = TARGET_GROUPS,
+                ragged              = ragged,
+                **kwargs
+            ))
+
+        copy_weights(models[0], models[1])
+
+        inputs_ragged, inputs_padded = make_inputs([ 3, 1, 5, 2 ])
+        preds = [
+            model.predict(x, verbose = 0)
+                for (model, x) in zip(models, [ inputs_ragged, inputs_padded ])
+        ]
+
+        self.assertTrue(np.allclose(preds[0], preds[1], atol = 1e-5))
+
+    def test_lstm_v2(self):
+        """Test that ragged lstm_v2 predicts the same as the padded one"""
+        self._test_model(
+            model_lstm_v2, lstm_units = 8, layers_pre = [ 16 ],
+            layers_post = [ 16 ], n_resblocks = 0, seq_norm = 'batch'
+        )
+
+    def test_trans_v1(self):
+        """Test that ragged trans_v1 predicts the same as the padded one"""
+        self._test_model(
+            model_trans_v1, num_heads = 2, num_hidden = 8,
+            ffn_num_hidden = 16, num_blocks = 1, layers_post = [ 16 ]
+        )
+
+    def test_unsupported_model(self):
+        """Test that models without ragged inputs reject the option"""
+        args = types.SimpleNamespace(
+            model       = {
+                'name' : 'slice_linear', 'kwargs' : { 'ragged' : True }
+            },
+            regularizer = 'l2',
+            data = types.SimpleNamespace(
+                input_groups_scalar = INPUT_GROUPS_SCALAR,
+                input_groups_vlarr  = INPUT_GROUPS_VLARR,
+                target_groups       = TARGET_GROUPS,
+                vlarr_limits        = None,
+            ),
+        )
+
+        with self.assertRaisesRegex(ValueError, 'ragged not supported'):
+            select_base_model(args)
+
+if __name__ == '__main__':
+    unittest.main()
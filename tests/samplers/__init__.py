@@ -0,0 +1 @@
+"""Various `vlne.data.samplers` tests"""
@@ -0,0 +1,98 @@
+"""Test correctness of the block shuffle sampler"""
+
+import unittest
+import numpy as np
+
+from vlne.data.data_generator import DataGenerator
+from vlne.data.samplers       import BlockShuffleSampler
+from vlne.data.samplers.funcs import calc_reads_per_batch
+
+def get_all_batches(sampler):
+    return [ sampler[i] for i in range(len(sampler)) ]
+
+class TestsBlockShuffleSampler(unittest.TestCase):
+    """Test correctness of the block shuffle sampler"""
+
+    def test_events_covered(self):
+        """Test that every event is sampled exactly once per epoch"""
+        sampler = BlockShuffleSampler(1000, 32, block_size = 16, seed = 1)
+
+        for _ in range(3):
+            indices = np.sort(np.concatenate(get_all_batches(sampler)))
+            self.assertTrue(np.array_equal(indices, np.arange(1000)))
+            self.assertTrue(np.array_equal(
+                np.sort(sampler.event_order), np.arange(1000)
+            ))
+
+            sampler.on_epoch_end()
+
+    def test_batches_reshuffled(self):
+        """Test that batch composition changes between epochs"""
+        sampler = BlockShuffleSampler(1000, 32, block_size = 16, seed = 1)
+        batches = get_all_batches(sampler)
+
+        sampler.on_epoch_end()
+
+        self.assertFalse(all(
+            np.array_equal(x, y)
+                for (x, y) in zip(batches, get_all_batches(sampler))
+        ))
+
+    def test_reads_local(self):
+        """Test that batches consist of a few contiguous blocks"""
+        sampler = BlockShuffleSampler(
+            1024, 64, block_size = 16, window = 1, seed = 1
+        )
+
+        self.assertLessEqual(calc_reads_per_batch(get_all_batches(sampler)), 4)
+
+    def test_reads_counted(self):
+        """Test that reads per batch are counted while order is built"""
+        sampler = BlockShuffleSampler(1000, 32, block_size = 16, seed = 1)
+
+        for _ in range(3):
+            self.assertAlmostEqual(
+                sampler.reads_per_batch,
+                calc_reads_per_batch(get_all_batches(sampler))
+            )
+            sampler.on_epoch_end()
+
+    def test_throughput_logged(self):
+        """Test that read throughput is logged at the end of each epoch"""
+        sampler = BlockShuffleSampler(100, 32, block_size = 16, seed = 1)
+        dataset = [
+            { 'x' : np.full(2**12, i, dtype = np.float32), 'y' : np.ones(1) }
+                for i in range(100)
+        ]
+        dgen    = DataGenerator(
+            dataset, [ 'x' ], [ 'y' ], batch_size = 32, sampler = sampler
+        )
+
+        for idx in range(len(dgen)):
+            self.assertTrue(np.array_equal(
+                dgen[idx][0]['x'][:, 0], sampler[idx]
+            ))
+
+        with self.assertLogs('vlne.data', level = 'INFO') as logs:
+            dgen.on_epoch_end()
+
+        # 100 events of 16 KiB inputs and 8 byte targets
+        self.assertTrue(any(
+            'MB/s read (1.6 MB' in x for x in logs.output
+        ))
+
+    def test_no_shuffle_sequential(self):
+        """Test that unshuffled sampler produces sequential batches"""
+        sampler = BlockShuffleSampler(100, 32, shuffle = False)
+
+        self.assertEqual(len(sampler), 4)
+        self.assertIsNone(sampler.event_order)
+        self.assertTrue(np.array_equal(sampler[3], np.arange(96, 100)))
+
+    def test_reads_per_batch(self):
+        """Test calculation of the number of contiguous runs"""
+        batches = [ np.array([ 0, 1, 2, 5, 6, 9 ]), np.array([ 3, 4 ]) ]
+        self.assertAlmostEqual(calc_reads_per_batch(batches), (3 + 1) / 2)
+
+if __name__ == '__main__':
+    unittest.main()
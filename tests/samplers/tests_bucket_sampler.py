@@ -0,0 +1,72 @@
+"""Test correctness of the length bucketed sampler"""
+
+import unittest
+import numpy as np
+
+from vlne.data.samplers       import BucketSampler, SequentialSampler
+from vlne.data.samplers.funcs import calc_padding_fraction
+
+def get_all_batches(sampler):
+    return [ sampler[i] for i in range(len(sampler)) ]
+
+class TestsBucketSampler(unittest.TestCase):
+    """Test correctness of the length bucketed sampler"""
+
+    def setUp(self):
+        prg = np.random.default_rng(0)
+        self.lengths = {
+            'input_png3d' : prg.poisson(3, size = 1000),
+            'input_png2d' : prg.geometric(0.1, size = 1000),
+        }
+
+    def test_events_covered(self):
+        """Test that every event is sampled exactly once per epoch"""
+        sampler = BucketSampler(self.lengths, 32, n_buckets = 5, seed = 1)
+
+        for _ in range(3):
+            indices = np.sort(np.concatenate(get_all_batches(sampler)))
+            self.assertTrue(np.array_equal(indices, np.arange(1000)))
+            self.assertTrue(np.array_equal(
+                np.sort(sampler.event_order), np.arange(1000)
+            ))
+
+            sampler.on_epoch_end()
+
+    def test_batch_size(self):
+        """Test that batches do not exceed batch size"""
+        sampler = BucketSampler(self.lengths, 32, n_buckets = 5, seed = 1)
+        self.assertTrue(all(len(b) <= 32 for b in get_all_batches(sampler)))
+
+    def test_padding_reduced(self):
+        """Test that bucketing reduces padding fraction"""
+        sampler  = BucketSampler(self.lengths, 32, n_buckets = 10, seed = 1)
+        baseline = SequentialSampler(1000, 32)
+
+        self.assertLess(
+            calc_padding_fraction(self.lengths, get_all_batches(sampler)),
+            calc_padding_fraction(self.lengths, get_all_batches(baseline)),
+        )
+
+    def test_no_shuffle_deterministic(self):
+        """Test that unshuffled sampler does not change between epochs"""
+        sampler = BucketSampler(self.lengths, 32, shuffle = False)
+        order   = sampler.event_order
+
+        sampler.on_epoch_end()
+        self.assertTrue(np.array_equal(order, sampler.event_order))
+
+    def test_padding_fraction(self):
+        """Test padding fraction calculation"""
+        lengths = { 'x' : np.array([ 1, 3, 2, 2 ]) }
+
+        # batch [0, 1] : 2 * 3 = 6 slots, 4 used
+        # batch [2, 3] : 2 * 2 = 4 slots, 4 used
+        self.assertAlmostEqual(
+            calc_padding_fraction(
+                lengths, [ np.array([ 0, 1 ]), np.array([ 2, 3 ]) ]
+            ),
+            1 - 8 / 10
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Test correctness of the weighted sampler"""
+
+import unittest
+import numpy as np
+
+from vlne.data.samplers       import WeightedSampler
+from vlne.data.samplers.funcs import build_alias_table, sample_alias
+
+class TestsWeightedSampler(unittest.TestCase):
+    """Test correctness of the weighted sampler"""
+
+    def test_alias_table_distribution(self):
+        """Test that alias table reproduces outcome probabilities"""
+        weights = np.array([ 1, 0, 3, 6, 0.5, 0.5 ])
+        prob, alias = build_alias_table(weights)
+
+        # Exact probability of each outcome from the alias table
+        result = prob.copy()
+        np.add.at(result, alias, 1 - prob)
+
+        self.assertTrue(np.allclose(
+            result / len(weights), weights / weights.sum()
+        ))
+
+    def test_alias_sampling(self):
+        """Test that sampled frequencies follow the weights"""
+        prg     = np.random.default_rng(0)
+        weights = prg.lognormal(0, 1, size = 20)
+
+        prob, alias = build_alias_table(weights)
+        samples     = sample_alias(prob, alias, 200000, prg)
+        freqs       = np.bincount(samples, minlength = 20) / len(samples)
+
+        self.assertTrue(np.allclose(
+            freqs, weights / weights.sum(), atol = 5e-3
+        ))
+
+    def test_zero_weights_never_sampled(self):
+        """Test that events with zero weights are never drawn"""
+        weights = np.array([ 0, 1, 0, 2, 0 ], dtype = np.float64)
+        sampler = WeightedSampler(weights, 8, n_samples = 1000, seed = 1)
+
+        for _ in range(2):
+            samples = np.concatenate(
+                [ sampler[i] for i in range(len(sampler)) ]
+            )
+            self.assertEqual(len(samples), 1000)
+            self.assertTrue(set(samples.tolist()) <= { 1, 3 })
+
+            sampler.on_epoch_end()
+
+    def test_invalid_weights(self):
+        """Test that invalid weights are rejected"""
+        with self.assertRaises(ValueError):
+            build_alias_table([ 0, 0 ])
+
+        with self.assertRaises(ValueError):
+            build_alias_table([ 1, -1, 2 ])
+
+if __name__ == '__main__':
+    unittest.main()
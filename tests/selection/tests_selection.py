@@ -0,0 +1,118 @@
+"""Test correctness of the event selection"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from vlndata.data_frame import DictFrame
+from vlne.data.selection import (
+    apply_selection, evaluate_selection, get_selection_index_path,
+    load_selection_index
+)
+
+class RowFrame:
+    """Data frame that records rows read from it"""
+
+    def __init__(self, columns):
+        self._columns = { k : np.asarray(v) for (k, v) in columns.items() }
+        self.reads    = []
+
+    def __len__(self):
+        return len(next(iter(self._columns.values())))
+
+    def __getitem__(self, key):
+        column, rows = key if isinstance(key, tuple) else (key, slice(None))
+        self.reads.append(np.arange(len(self))[rows])
+
+        return self._columns[column][rows]
+
+    def get_vlarr(self, column, rows):
+        return self[column, rows]
+
+    def columns(self):
+        return list(self._columns)
+
+class TestsSelection(unittest.TestCase):
+    """Test correctness of the event selection"""
+
+    def setUp(self):
+        self.df = DictFrame({
+            'isCC'  : [ 1, 0, 1, 1, 0, 1 ],
+            'trueE' : [ 1, 2, 7, 3, 4, 0.5 ],
+            'pdg'   : [ 12, 14, -12, 14, 12, -12 ],
+        })
+
+    def test_evaluate_selection(self):
+        """Test vectorized evaluation of predicates"""
+        selection = [
+            [ 'isCC',  '==', 1 ],
+            [ 'trueE', '<',  5 ],
+            [ 'pdg',   'in', [ 12, -12 ] ],
+        ]
+
+        self.assertEqual(
+            list(evaluate_selection(self.df, selection)), [ 0, 5 ]
+        )
+
+    def test_unknown_operator(self):
+        """Test that unknown operators are rejected"""
+        with self.assertRaises(ValueError):
+            evaluate_selection(self.df, [ [ 'isCC', '~', 1 ] ])
+
+    def test_selection_frame(self):
+        """Test that selection frame exposes only the selected rows"""
+        df = apply_selection(self.df, [ [ 'pdg', 'not in', [ 14 ] ] ])
+
+        self.assertEqual(len(df), 4)
+        self.assertTrue(np.array_equal(df['trueE'], [ 1, 7, 4, 0.5 ]))
+
+    def test_selected_rows_read(self):
+        """Test that only the selected rows are read from the frame"""
+        base = RowFrame({ 'trueE' : [ 1, 2, 7, 3, 4, 0.5 ] })
+        df   = apply_selection(base, [ [ 'trueE', '>', 2 ] ])
+        base.reads = []
+
+        self.assertTrue(np.array_equal(df['trueE'], [ 7, 3, 4 ]))
+        self.assertEqual([ list(x) for x in base.reads ], [ [ 2, 3, 4 ] ])
+
+    def test_frame_methods(self):
+        """Test that row indexed methods are remapped to selected rows"""
+        base = RowFrame({ 'trueE' : [ 1, 2, 7, 3, 4, 0.5 ] })
+        df   = apply_selection(base, [ [ 'trueE', '>', 2 ] ])
+
+        self.assertEqual(df.get_vlarr('trueE', 1), 3)
+        self.assertEqual(list(df.get_vlarr('trueE', [ 2, 0 ])), [ 4, 7 ])
+        self.assertEqual(df.columns(), [ 'trueE' ])
+
+        with self.assertRaises(AttributeError):
+            _ = df.read_rows
+
+        with self.assertRaises(AttributeError):
+            _ = df.unknown
+
+    def test_index_cache(self):
+        """Test that row index is saved and reused"""
+        selection = [ [ 'trueE', '>=', 2 ] ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'data.csv')
+
+            with open(path, 'wt') as f:
+                f.write('trueE\n')
+
+            index      = load_selection_index(self.df, selection, path)
+            index_path = get_selection_index_path(path, selection)
+
+            self.assertTrue(os.path.exists(index_path))
+            self.assertEqual(list(index), [ 1, 2, 3, 4 ])
+
+            # Cached index is used instead of re-evaluating the selection
+            np.save(index_path, np.array([ 3 ]))
+
+            index = load_selection_index(self.df, selection, path)
+            self.assertEqual(list(index), [ 3 ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1 @@
+"""Tests of the sharded data frames"""
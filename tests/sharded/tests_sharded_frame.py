@@ -0,0 +1,150 @@
+"""Test correctness of the sharded data frames"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from vlndata.data_frame import DictFrame
+from vlne.data.sharded_frame import (
+    FNAME_SHARD_INDEX, create_sharded_frame, load_shard_index
+)
+
+def make_vlarr(lengths, start):
+    result = np.empty(len(lengths), dtype = object)
+    result[:] = [
+        np.arange(length, dtype = np.float32) + start + i
+            for (i, length) in enumerate(lengths)
+    ]
+
+    return result
+
+class VlarrFrame(DictFrame):
+    """Data frame with a row indexed method"""
+
+    def get_vlarr(self, column, rows):
+        return self[column, rows]
+
+class ShardOpener:
+    """Open shards saved as `.npy` files and count the opened shards"""
+
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self, path):
+        self.opened.append(os.path.basename(path))
+        data = np.load(path, allow_pickle = True).item()
+
+        return VlarrFrame(data)
+
+class TestsShardedFrame(unittest.TestCase):
+    """Test correctness of the sharded data frames"""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sizes  = [ 3, 5, 2 ]
+        start = 0
+
+        for (idx, size) in enumerate(self.sizes):
+            self.save_shard(idx, start, size)
+            start += size
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def save_shard(self, idx, start, size):
+        np.save(
+            os.path.join(self.tmpdir.name, f'shard_{idx}.npy'),
+            {
+                'x'   : np.arange(start, start + size, dtype = np.float32),
+                'png' : make_vlarr(np.arange(size) % 3 + 1, start),
+            },
+            allow_pickle = True
+        )
+
+    def create_frame(self, opener, threads = 2, column_cache = None):
+        return create_sharded_frame(
+            'shard_*.npy', opener, self.tmpdir.name, threads = threads,
+            column_cache = column_cache
+        )
+
+    def test_columns(self):
+        """Test that columns are concatenated across shards"""
+        df = self.create_frame(ShardOpener())
+
+        self.assertEqual(len(df), 10)
+        self.assertTrue(np.all(df['x'] == np.arange(10)))
+        self.assertEqual(len(df['png']), 10)
+        self.assertEqual(df['png'][4][0], 4)
+
+    def test_column_cache(self):
+        """Test that whole columns are kept only within the cache budget"""
+        df = self.create_frame(ShardOpener())
+        self.assertIsNot(df['x'], df['x'])
+
+        df = self.create_frame(ShardOpener(), column_cache = '1M')
+        self.assertIs(df['x'], df['x'])
+        self.assertTrue(np.all(df['x'] == np.arange(10)))
+
+        # Column of 10 float32 values does not fit into the budget
+        df = self.create_frame(ShardOpener(), column_cache = 16)
+        self.assertIsNot(df['x'], df['x'])
+
+    def test_rows(self):
+        """Test reading of rows scattered over several shards"""
+        df   = self.create_frame(ShardOpener())
+        rows = np.array([ 9, 0, 4, 3, 8, 2 ])
+
+        self.assertTrue(np.all(df['x', rows] == rows))
+        self.assertTrue(np.all(df['x', 2:5] == [ 2, 3, 4 ]))
+        self.assertEqual(df['x', 7], 7)
+        self.assertEqual(df['x', -1], 9)
+
+        png = df['png', rows]
+        self.assertEqual([ x[0] for x in png ], list(rows))
+
+    def test_frame_methods(self):
+        """Test that row indexed methods read rows of the right shards"""
+        df   = self.create_frame(ShardOpener())
+        rows = np.array([ 9, 0, 4 ])
+
+        self.assertEqual(df.get_vlarr('x', 7), 7)
+        self.assertTrue(np.all(df.get_vlarr('x', rows) == rows))
+        self.assertEqual(df.get_vlarr('png', 4)[0], 4)
+        self.assertEqual(df.columns(), [ 'x', 'png' ])
+
+        with self.assertRaises(AttributeError):
+            _ = df.unknown
+
+    def test_index(self):
+        """Test that only new shards are inspected on index update"""
+        opener = ShardOpener()
+        self.create_frame(opener)
+
+        index = load_shard_index(
+            os.path.join(self.tmpdir.name, FNAME_SHARD_INDEX)
+        )
+        self.assertEqual(
+            sorted(x[2] for x in index.values()), sorted(self.sizes)
+        )
+
+        self.save_shard(3, 10, 4)
+
+        opener = ShardOpener()
+        df     = self.create_frame(opener)
+
+        self.assertEqual(opener.opened, [ 'shard_3.npy' ])
+        self.assertEqual(len(df), 14)
+        self.assertTrue(np.all(df['x'] == np.arange(14)))
+
+    def test_missing(self):
+        """Test that patterns without matches are rejected"""
+        with self.assertRaises(ValueError):
+            create_sharded_frame(
+                'missing_*.npy', ShardOpener(), self.tmpdir.name
+            )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1 @@
+"""Tests of the persisted data splits"""
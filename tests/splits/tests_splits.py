@@ -0,0 +1,74 @@
+"""Test correctness of the persisted data splits"""
+
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+import numpy as np
+
+from vlndata.data_frame import DictFrame
+from vlne.args.data_config import DataConfig
+from vlne.data.sharded_frame import get_files_stat
+from vlne.data.splits import load_split_indices, split_data_frame
+
+def fake_split_indices(n, data_config):
+    # pylint: disable=unused-argument
+    perm = np.random.default_rng(0).permutation(n).astype(np.int32)
+    return [ perm[:6], perm[6:8], perm[8:] ]
+
+class TestsSplits(unittest.TestCase):
+    """Test correctness of the persisted data splits"""
+
+    def setUp(self):
+        self.df = DictFrame({ 'trueE' : np.arange(10, dtype = np.float32) })
+        self.data_config = DataConfig(
+            val_size = 0.2, test_size = 0.2, shuffle = True
+        )
+
+    def test_no_split(self):
+        """Test that frame is returned as is without shuffle and splits"""
+        df = split_data_frame(self.df, DataConfig(), [ [ 'path', 0, 0 ] ])
+        self.assertIs(df, self.df)
+
+    @mock.patch(
+        'vlne.data.splits.compute_split_indices',
+        side_effect = fake_split_indices
+    )
+    def test_index_cache(self, compute):
+        """Test that split indices are saved once and memory-mapped"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'data.csv')
+
+            with open(path, 'wt') as f:
+                f.write('trueE\n')
+
+            stat     = get_files_stat([ path ])
+            expected = fake_split_indices(10, self.data_config)
+
+            for _ in range(2):
+                result = load_split_indices(10, self.data_config, stat)
+
+                for (indices, exp) in zip(result, expected):
+                    self.assertEqual(indices.dtype, np.int32)
+                    self.assertTrue(np.array_equal(indices, exp))
+
+            self.assertEqual(compute.call_count, 1)
+            self.assertIsInstance(result[0], np.memmap)
+
+            # Different split settings are saved separately
+            self.data_config.seed = 1
+            load_split_indices(10, self.data_config, stat)
+            self.assertEqual(compute.call_count, 2)
+
+            df_list = split_data_frame(self.df, self.data_config, stat)
+
+            self.assertEqual([ len(x) for x in df_list ], [ 6, 2, 2 ])
+            self.assertTrue(np.array_equal(
+                np.sort(np.concatenate([ x['trueE'] for x in df_list ])),
+                np.arange(10)
+            ))
+
+if __name__ == '__main__':
+    unittest.main()
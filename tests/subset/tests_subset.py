@@ -0,0 +1,86 @@
+"""Test correctness of the stratified subsets"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from vlndata.data_frame import DictFrame
+from vlne.data.sharded_frame import get_files_stat
+from vlne.data.subset import (
+    apply_subset, draw_subset, get_strata, load_subset_index
+)
+
+class TestsSubset(unittest.TestCase):
+    """Test correctness of the stratified subsets"""
+
+    def setUp(self):
+        rng     = np.random.default_rng(0)
+        self.df = DictFrame({
+            'trueE' : np.concatenate((
+                rng.uniform(0, 1, 9000), rng.uniform(4, 5, 1000)
+            ))
+        })
+
+    def test_invalid(self):
+        """Test that invalid specifications are rejected"""
+        for subset in [
+            { 'var' : 'trueE' },
+            { 'fraction' : 0.5, 'size' : 10 },
+            { 'fraction' : 1.5 },
+            { 'size' : 10, 'unknown' : 1 },
+        ]:
+            with self.assertRaises(ValueError):
+                draw_subset(self.df, subset)
+
+    def test_strata(self):
+        """Test that overflow values fall into the edge strata"""
+        strata = get_strata(np.array([ -1, 0.5, 2.5, 9 ]), 5, (0, 5))
+        self.assertEqual(list(strata), [ 0, 0, 2, 4 ])
+
+    def test_stratified(self):
+        """Test that subset has the requested size and distribution"""
+        for subset in [ { 'fraction' : 0.1 }, { 'size' : 1000 } ]:
+            index = draw_subset(self.df, { 'bins' : 5, **subset })
+
+            self.assertEqual(len(index), 1000)
+            self.assertEqual(len(np.unique(index)), 1000)
+            self.assertTrue(np.all(np.diff(index) > 0))
+            self.assertEqual(np.sum(self.df['trueE'][index] > 4), 100)
+
+    def test_reproducible(self):
+        """Test that the subset is determined by its seed"""
+        subset = { 'fraction' : 0.1 }
+
+        self.assertTrue(np.array_equal(
+            draw_subset(self.df, subset), draw_subset(self.df, subset)
+        ))
+        self.assertFalse(np.array_equal(
+            draw_subset(self.df, subset),
+            draw_subset(self.df, { 'seed' : 1, **subset })
+        ))
+
+    def test_index_cache(self):
+        """Test that subset index is saved and reused"""
+        subset = { 'size' : 10 }
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'data.csv')
+
+            with open(path, 'wt') as f:
+                f.write('trueE\n')
+
+            stat  = get_files_stat([ path ])
+            index = load_subset_index(self.df, subset, stat)
+            df    = apply_subset(self.df, subset, stat)
+
+            self.assertEqual(len(df), 10)
+            self.assertTrue(np.array_equal(df.index, index))
+            self.assertTrue(
+                np.array_equal(df['trueE'], self.df['trueE'][index])
+            )
+            self.assertEqual(len(os.listdir(tmpdir)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
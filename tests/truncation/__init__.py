@@ -0,0 +1 @@
+"""Tests of the read time vlarr truncation"""
@@ -0,0 +1,141 @@
+"""Test correctness of the read time vlarr truncation"""
+
+import unittest
+
+import numpy as np
+
+from vlne.args.data_config import DataConfig
+from vlne.data.truncation  import (
+    get_group_read_order, get_read_limits, VlarrLimitFrame
+)
+
+SORT = {
+    'name'        : 'vlarr-sort',
+    'vlarr_group' : 'png',
+    'column'      : 'png.calE',
+    'ascending'   : False,
+}
+
+class ListFrame:
+    """Minimal data frame of per event vlarr columns"""
+
+    def __init__(self, data):
+        self._data = data
+
+    def __len__(self):
+        return len(next(iter(self._data.values())))
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            column, rows = key
+            values = self._data[column]
+
+            if isinstance(rows, (int, np.integer)):
+                return values[rows]
+
+            return [ values[i] for i in np.arange(len(self))[rows] ]
+
+        return self._data[key]
+
+    def get_vlarr(self, column, rows):
+        return self[column, rows]
+
+    def columns(self):
+        return list(self._data)
+
+class TestsTruncation(unittest.TestCase):
+    """Test correctness of the read time vlarr truncation"""
+
+    def test_read_order(self):
+        """Test detection of transformations compatible with truncation"""
+        noise = { 'name' : 'noise', 'noise' : 'gaussian' }
+        order = ('png.calE', False, True)
+
+        self.assertEqual(get_group_read_order(None, 'png'), (True, None))
+        self.assertEqual(
+            get_group_read_order([ 'mask-nan', SORT, noise ], 'png'),
+            (True, order)
+        )
+        self.assertEqual(
+            get_group_read_order([ noise, SORT ], 'png'), (False, None)
+        )
+        self.assertEqual(
+            get_group_read_order(
+                [ { 'name' : 'vlarr-shuffle', 'vlarr_group' : 'png' } ], 'png'
+            ),
+            (False, None)
+        )
+        self.assertEqual(
+            get_group_read_order([ SORT ], 'other'), (True, None)
+        )
+
+    def test_mismatched_splits(self):
+        """Test that truncation is skipped if splits disagree on ordering"""
+        data_config = DataConfig(
+            input_groups_vlarr = { 'png' : [ 'png.calE', 'png.nHit' ] },
+            vlarr_limits       = { 'png' : 2 },
+            transform_train    = [ SORT ],
+        )
+
+        self.assertEqual(get_read_limits(data_config), {})
+
+        data_config.transform_test = [ SORT ]
+        self.assertEqual(
+            get_read_limits(data_config),
+            {
+                'png.calE' : (2, ('png.calE', False, False)),
+                'png.nHit' : (2, ('png.calE', False, False)),
+            }
+        )
+
+    def test_truncate_first(self):
+        """Test truncation to the first elements"""
+        frame = ListFrame({
+            'a' : [ np.arange(5), np.arange(1) ],
+            'b' : [ 1, 2 ],
+        })
+        df = VlarrLimitFrame(frame, { 'a' : (2, None) })
+
+        self.assertEqual([ list(x) for x in df['a'] ], [ [ 0, 1 ], [ 0 ] ])
+        self.assertEqual(df['b'], [ 1, 2 ])
+
+    def test_truncate_top(self):
+        """Test truncation to the top elements of a sorted vlarr"""
+        calE = [ np.array([ 1, 5, 3, 4 ]), np.array([ np.nan, 2 ]) ]
+        nHit = [ np.array([ 10, 50, 30, 40 ]), np.array([ 1, 20 ]) ]
+
+        order = ('calE', False, True)
+        df    = VlarrLimitFrame(
+            ListFrame({ 'calE' : calE, 'nHit' : nHit }),
+            { 'calE' : (2, order), 'nHit' : (2, order) }
+        )
+
+        self.assertEqual(
+            [ list(x) for x in df['nHit'] ], [ [ 50, 40 ], [ 20, 1 ] ]
+        )
+
+    def test_truncate_rows(self):
+        """Test that rows and row indexed methods are truncated"""
+        calE = [ np.array([ 1, 5, 3, 4 ]), np.array([ np.nan, 2 ]) ]
+        nHit = [ np.array([ 10, 50, 30, 40 ]), np.array([ 1, 20 ]) ]
+
+        order = ('calE', False, True)
+        df    = VlarrLimitFrame(
+            ListFrame({ 'calE' : calE, 'nHit' : nHit, 'b' : [ 1, 2 ] }),
+            { 'calE' : (2, order), 'nHit' : (2, order) }
+        )
+
+        self.assertEqual(list(df['nHit', 0]), [ 50, 40 ])
+        self.assertEqual(
+            [ list(x) for x in df['nHit', [ 1, 0 ]] ],
+            [ [ 20, 1 ], [ 50, 40 ] ]
+        )
+        self.assertEqual(list(df.get_vlarr('nHit', 1)), [ 20, 1 ])
+        self.assertEqual(df.get_vlarr('b', 1), 2)
+        self.assertEqual(df.columns(), [ 'calE', 'nHit', 'b' ])
+
+        with self.assertRaises(AttributeError):
+            _ = df.unknown
+
+if __name__ == '__main__':
+    unittest.main()
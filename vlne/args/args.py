@@ -47,10 +47,36 @@ class Args:
     vars_mod_slice : list of str or None, optional
         A list of strings that define how slice inputs from `Config` should be
         modified. C.f. `vars_mod_png2d` parameter.
-    cache : bool, optional
-        If True data batches will be cached in RAM. Default: False.
+    cache : bool or int, optional
+        If True data batches will be cached in RAM. If int, then it specifies
+        a memory budget (in bytes) of LRU caches of batches or events, that
+        will be shared between the loaded data splits. Default: False.
     precache : bool, optional
         If True data batches will be precached in RAM. Default: False.
+    prefetch : int or None, optional
+        Number of batches to prepare in background threads ahead of their
+        use. If None then no prefetching will be done. Default: None.
+    batch_store : str or None, optional
+        Directory where collated batches of deterministic data splits will be
+        stored on disk and replayed from by subsequent runs with the same
+        data configuration. If None then batches will not be stored.
+        Default: None.
+    materialize : bool, str or None, optional
+        If not None, the deterministic prefix of the dataset transformations
+        will be applied once to the whole dataset instead of on every event
+        access. If str, the transformed datasets will be saved to (and
+        reused from) this directory. Default: None.
+    cache_dtype : str or None, optional
+        If not None, cached input groups will be stored in this compact
+        dtype ('float16' or 'bfloat16') and targets in float32. Inputs are
+        cast back to float32 when batches are extracted. Default: None.
+    memory_limit : int or None, optional
+        If not None, data will be handled out-of-core, such that the memory
+        used by the data pipeline and evaluation stays within this budget
+        (in bytes). Caches are bounded by it, in-memory precaching and
+        materialization are disabled, derived columns are computed in chunks
+        and evaluation statistics are accumulated batch by batch.
+        Default: None.
     workers : int or None, optional
         Number of parallel workers to spawn for the purpose of data batch
         generation. If None then no parallelization will be used.
@@ -90,6 +116,11 @@ class Args:
 
         'cache',
         'precache',
+        'prefetch',
+        'batch_store',
+        'materialize',
+        'cache_dtype',
+        'memory_limit',
         'workers',
 
         'log_level',
@@ -105,6 +136,11 @@ class Args:
         save_best    = True,
         workers      = None,
         log_level    = 'INFO',
+        prefetch     = None,
+        batch_store  = None,
+        materialize  = None,
+        cache_dtype  = None,
+        memory_limit = None,
     ):
         self.config       = config
         self.savedir      = savedir
@@ -113,6 +149,11 @@ class Args:
         self.root_outdir  = root_outdir
         self.cache        = (cache or precache)
         self.precache     = precache
+        self.prefetch     = prefetch
+        self.batch_store  = batch_store
+        self.materialize  = materialize
+        self.cache_dtype  = cache_dtype
+        self.memory_limit = memory_limit
         self.save_best    = save_best
         self.workers      = workers
         self.log_level    = log_level
@@ -167,6 +208,11 @@ class Args:
         save_best      = True,
         workers        = 0,
         log_level      = 'INFO',
+        prefetch       = None,
+        batch_store    = None,
+        materialize    = None,
+        cache_dtype    = None,
+        memory_limit   = None,
         **conf_dict
     ):
         config  = Config(**conf_dict)
@@ -174,7 +220,8 @@ class Args:
 
         result = Args(
             config, savedir, label, root_datadir, root_outdir, cache, precache,
-            save_best, workers, log_level
+            save_best, workers, log_level, prefetch, batch_store, materialize,
+            cache_dtype, memory_limit
         )
 
         result.save()
@@ -4,8 +4,17 @@ class ConfigBase:
 
     __slots__ = []
 
+    # Keys that are not serialized when they are None. Keys added after
+    # the configs were first saved go here, such that the serialized old
+    # configs (and their hashes) stay the same.
+    optional_keys = ()
+
     def to_dict(self):
-        return { x : getattr(self, x) for x in self.__slots__ }
+        return {
+            x : getattr(self, x) for x in self.__slots__
+                if (x not in self.optional_keys)
+                or (getattr(self, x) is not None)
+        }
 
     def to_json(self, **kwargs):
         return json.dumps(self, default = lambda x : x.to_dict(), **kwargs)
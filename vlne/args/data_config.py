@@ -14,6 +14,8 @@ class DataConfig(ConfigBase):
     # pylint: disable=too-many-instance-attributes
     __slots__ = (
         'frame',
+        'selection',
+        'subset',
         'extra_vars',
         'input_groups_scalar',
         'input_groups_vlarr',
@@ -21,16 +23,25 @@ class DataConfig(ConfigBase):
         'vlarr_limits',
         'transform_train',
         'transform_test',
+        'augment',
         'val_size',
         'test_size',
         'seed',
         'shuffle',
         'weights',
+        'sampler',
+        'backend',
+    )
+
+    optional_keys = (
+        'selection', 'subset', 'augment', 'sampler', 'backend',
     )
 
     def __init__(
         self,
         frame               = None,
+        selection           = None,
+        subset              = None,
         extra_vars          = None,
         input_groups_scalar = None,
         input_groups_vlarr  = None,
@@ -38,13 +49,18 @@ class DataConfig(ConfigBase):
         vlarr_limits        = None,
         transform_train     = None,
         transform_test      = None,
+        augment             = None,
         val_size            = None,
         test_size           = None,
         seed                = 0,
         shuffle             = None,
         weights             = None,
+        sampler             = None,
+        backend             = None,
     ):
         self.frame               = frame
+        self.selection           = selection
+        self.subset              = subset
         self.extra_vars          = extra_vars
         self.input_groups_scalar = input_groups_scalar
         self.input_groups_vlarr  = input_groups_vlarr
@@ -52,11 +68,14 @@ class DataConfig(ConfigBase):
         self.vlarr_limits        = vlarr_limits
         self.transform_train     = transform_train
         self.transform_test      = transform_test
+        self.augment             = augment
         self.val_size            = val_size
         self.test_size           = test_size
         self.seed                = seed
         self.shuffle             = shuffle
         self.weights             = weights
+        self.sampler             = sampler
+        self.backend             = backend
 
 def parse_prong_sorter_transform(prong_sorters):
     if prong_sorters is None:
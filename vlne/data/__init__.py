@@ -1,4 +1,4 @@
-from .data import load_data, create_data_generators
+from .data import load_data, load_input_stats, create_data_generators
 
-__all__ = [ 'load_data', 'create_data_generators' ]
+__all__ = [ 'load_data', 'load_input_stats', 'create_data_generators' ]
 
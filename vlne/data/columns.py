@@ -0,0 +1,134 @@
+"""
+Functions to determine which data frame columns a run needs.
+"""
+
+import csv
+import logging
+import os
+
+from vlne.funcs import unpack_name_args
+from vlne.data.selection import get_selection_columns
+from vlne.data.subset    import get_subset_columns
+
+LOGGER = logging.getLogger('vlne.data')
+
+# Default arguments of the extra variables that name input columns
+EXTRA_VAR_INPUTS = {
+    'flat' : { 'var' : 'trueE' },
+}
+
+def get_group_columns(groups):
+    """Return set of columns of a dict of variable groups"""
+    if groups is None:
+        return set()
+
+    return set(col for columns in groups.values() for col in columns)
+
+def get_extra_var_inputs(extra_vars):
+    """Return set of columns that extra variables are computed from"""
+    result = set()
+
+    for var_spec in (extra_vars or {}).values():
+        name, kwargs = unpack_name_args(var_spec)
+
+        for (arg, default) in EXTRA_VAR_INPUTS.get(name, {}).items():
+            result.add(kwargs.get(arg, default))
+
+    return result
+
+def get_required_columns(data_config, extra_columns = None):
+    """Return the set of frame columns needed to construct datasets.
+
+    Parameters
+    ----------
+    data_config : DataConfig
+        Data configuration.
+    extra_columns : list of str or None, optional
+        Additional columns to load, e.g. columns of the baseline energies of
+        an evaluation preset. Default: None.
+
+    Returns
+    -------
+    set of str
+        Union of the input, target, weight, selection and subset columns and
+        columns used to compute `extra_vars`, excluding `extra_vars`
+        themselves.
+    """
+    result = set()
+
+    result |= get_group_columns(data_config.input_groups_scalar)
+    result |= get_group_columns(data_config.input_groups_vlarr)
+    result |= get_group_columns(data_config.target_groups)
+    result |= set((data_config.weights or {}).values())
+    result |= get_extra_var_inputs(data_config.extra_vars)
+    result |= get_selection_columns(data_config.selection)
+    result |= get_subset_columns(data_config.subset)
+    result |= set(extra_columns or [])
+
+    result -= set((data_config.extra_vars or {}).keys())
+
+    return result
+
+def is_column_needed(name, columns):
+    # Auxiliary datasets (e.g. vlarr indices) are prefixed by a column name
+    return any(
+        (name == col) or name.startswith((col + '_', col + '.'))
+            for col in columns
+    )
+
+def get_hdf_column_sizes(path):
+    """Return dict of on-disk sizes of the top level datasets of HDF file"""
+    # pylint: disable=import-outside-toplevel
+    import h5py
+
+    result = {}
+
+    with h5py.File(path, 'r') as f:
+        for (name, dset) in f.items():
+            if isinstance(dset, h5py.Dataset):
+                result[name] = dset.id.get_storage_size()
+
+    return result
+
+def get_csv_column_sizes(path):
+    """Return dict of estimated sizes of columns of CSV file"""
+    with open(path, 'rt', newline = '') as f:
+        header = next(csv.reader(f))
+
+    size = os.path.getsize(path) / max(len(header), 1)
+    return { name : int(size) for name in header }
+
+def get_file_column_sizes(path):
+    """Return dict of column sizes of a data file or None if unknown"""
+    if not os.path.isfile(path):
+        return None
+
+    ext = os.path.splitext(path)[1].lower()
+
+    try:
+        if ext in [ '.h5', '.hdf', '.hdf5' ]:
+            return get_hdf_column_sizes(path)
+
+        if ext == '.csv':
+            return get_csv_column_sizes(path)
+
+    except (ImportError, OSError, StopIteration) as e:
+        LOGGER.debug("Failed to inspect columns of '%s': %s", path, e)
+
+    return None
+
+def log_skipped_columns(path, columns):
+    """Log number and size of the columns of `path` that will not be read"""
+    sizes = get_file_column_sizes(path)
+
+    if sizes is None:
+        LOGGER.info("Loading %d columns from '%s'", len(columns), path)
+        return
+
+    skipped = [ x for x in sizes if not is_column_needed(x, columns) ]
+
+    LOGGER.info(
+        "Loading %d columns from '%s'. Skipped %d of %d columns (%.1f MB)",
+        len(columns), path, len(skipped), len(sizes),
+        sum(sizes[x] for x in skipped) / 2**20
+    )
@@ -2,53 +2,234 @@
 A collection of routines to simplify data handling.
 """
 
+import functools
+import hashlib
 import itertools
+import json
 import logging
+import math
 import os
 
-from vlndata.data_frame import (
-    select_frame, ShuffleFrame, VarFrame, train_test_split
-)
+import numpy as np
+
+from vlndata.data_frame import select_frame, VarFrame
 from vlndata.dataset    import construct_dataset_from_data_frame, SPLIT_INDEX
 
+from vlne.data.columns        import (
+    get_group_columns, get_required_columns, log_skipped_columns
+)
 from vlne.data.data_generator import DataGenerator
-from vlne.data.data_generator.funcs.weights import flat_weights
+from vlne.data.data_generator.caching_generator import CachingGenerator
+from vlne.data.data_generator.funcs.batch_transforms import BatchTransforms
+from vlne.data.data_generator.funcs.batch_store import (
+    BatchStore, batch_store_exists, write_batch_store
+)
+from vlne.data.data_generator.funcs.compact import ArrayCompactor
+from vlne.data.data_generator.prefetching_generator import (
+    PrefetchingGenerator
+)
+from vlne.data.data_generator.replay_generator import ReplayGenerator
+from vlne.data.data_generator.shuffling_generator import ShufflingGenerator
+from vlne.data.data_generator.worker_pool_generator import (
+    WorkerPoolGenerator
+)
+from vlne.data.dataset        import (
+    ArrayDataset, CachedDataset, FrameDataset, PrefixCachedDataset
+)
+from vlne.data.dataset.precache import precache_dataset
+from vlne.data.event_frame    import EventFrame
+from vlne.data.extra_vars     import parse_extra_vars
+from vlne.data.feature_stats  import load_feature_stats
+from vlne.data.hdf_chunk_frame import HDFChunkFrame
+from vlne.data.materialize    import (
+    load_materialized, make_derived_frame, materialized_exists,
+    save_materialized
+)
+from vlne.data.samplers       import (
+    BlockShuffleSampler, BucketSampler, SequentialSampler, WeightedSampler
+)
+from vlne.data.samplers.funcs import get_vlarr_lengths
+from vlne.data.selection      import apply_selection
+from vlne.data.sharded_frame  import (
+    create_sharded_frame, get_files_stat, get_shard_paths
+)
+from vlne.data.splits         import get_split_key, split_data_frame
+from vlne.data.subset         import apply_subset
+from vlne.data.truncation     import apply_read_limits
+from vlne.data.transforms     import (
+    get_batch_transforms, get_dataset_transforms, get_pipeline_transforms,
+    is_deterministic, split_transforms
+)
 
 from vlne.funcs import unpack_name_args
 
 LOGGER  = logging.getLogger('vlne.data')
 
-def select_vlne_frame(name, path, datadir, **args):
+# Fractions of the out-of-core memory limit given to the LRU caches and to
+# the passes over data frame columns (e.g. computation of `flat` weights)
+CACHE_MEMORY_FRACTION = 0.5
+CHUNK_MEMORY_FRACTION = 0.1
+
+# Upper estimate of memory used per row by the passes over columns
+CHUNK_ROW_NBYTES = 64
+
+def get_frame_path(frame, datadir):
+    """Return path of the data file of `frame` or None if it has none"""
+    path = frame.get('path')
+
+    if (frame.get('name') == 'sharded') or (not isinstance(path, str)):
+        return None
+
+    return os.path.join(datadir, path)
+
+def get_frame_stat(frame, datadir):
+    """Return list of [ path, size, mtime ] of the data files of `frame`"""
+    if frame.get('name') == 'sharded':
+        return get_files_stat(get_shard_paths(frame['path'], datadir))
+
+    path = get_frame_path(frame, datadir or '')
+
+    if (path is None) or (not os.path.exists(path)):
+        return None
+
+    return get_files_stat([ path ])
+
+def get_frame_fingerprint(data_config):
+    """Return configuration that rows of the data frame depend on"""
+    return [
+        { k : v for (k, v) in data_config.frame.items() if k != 'columns' },
+        data_config.selection,
+    ]
+
+def load_frame(name, path, columns = None, **args):
+    """Construct data frame of `path` that loads only `columns`"""
+    if (name == 'hdf-ra-frame') and ('chunk_cache' in args):
+        return HDFChunkFrame(path, columns, **args)
+
+    if columns is None:
+        return select_frame({ 'name' : name, 'path' : path, **args })
+
+    try:
+        return select_frame({
+            'name' : name, 'path' : path, 'columns' : sorted(columns), **args
+        })
+    except TypeError:
+        LOGGER.warning(
+            "Frame '%s' does not support column projection."
+            " Loading all columns", name
+        )
+        return select_frame({ 'name' : name, 'path' : path, **args })
+
+def select_vlne_frame(name, path, datadir, columns = None, **args):
+    """Construct data frame that loads only `columns` (if not None)"""
+    if name == 'sharded':
+        shard = args.pop('shard', { 'name' : 'hdf-ra-frame' })
+        shard_name, shard_args = unpack_name_args(shard)
+
+        return create_sharded_frame(
+            path,
+            functools.partial(
+                load_frame, shard_name, columns = columns, **shard_args
+            ),
+            datadir, **args
+        )
+
     path = os.path.join(datadir, path)
-    return select_frame({ 'name' : name, 'path' : path, **args})
 
-def parse_extra_vars(extra_vars):
-    result = {}
+    if columns is not None:
+        log_skipped_columns(path, columns)
 
-    for (column, var_spec) in extra_vars.items():
-        name, kwargs = unpack_name_args(var_spec)
-        if name == 'flat':
-            result[column] = \
-                lambda df, kwargs = kwargs : flat_weights(df, **kwargs)
-        else:
-            raise ValueError(f"Unknown variable {name}")
+    return load_frame(name, path, columns, **args)
 
-    return result
+def get_sampling_weights(dset, data_config, column = None):
+    """Return weights of `dset` events to use in the weighted sampling"""
+    if column is None:
+        columns = set((data_config.weights or {}).values())
 
-def create_data_frame(data_config, datadir = None):
-    df = select_vlne_frame(**data_config.frame, datadir = datadir)
+        if len(columns) != 1:
+            raise ValueError(
+                "Weighted sampling requires a single weight column,"
+                f" but found {sorted(columns)}"
+            )
 
-    if data_config.extra_vars is not None:
-        extra_vars = parse_extra_vars(data_config.extra_vars)
-        df = VarFrame(df, variables = extra_vars, lazy = False)
+        column = columns.pop()
+
+    return dset.df[column]
+
+def select_sampler(sampler, dset, data_config, batch_size, split):
+    if sampler is None:
+        return None
+
+    name, kwargs = unpack_name_args(sampler)
+
+    if name == 'weighted':
+        if split != 'train':
+            # Evaluation needs every event exactly once with its weight
+            return None
+
+        weights = get_sampling_weights(
+            dset, data_config, kwargs.pop('column', None)
+        )
+        kwargs['seed'] = kwargs.get('seed', data_config.seed)
+
+        return WeightedSampler(weights, batch_size, **kwargs)
+    kwargs = {
+        'seed'    : data_config.seed,
+        'shuffle' : (split == 'train'),
+        **kwargs
+    }
 
-    if data_config.shuffle:
-        df = ShuffleFrame(df, seed = data_config.seed)
+    if name == 'bucket':
+        vlarr_limits = data_config.vlarr_limits or {}
+        lengths = {
+            group : get_vlarr_lengths(dset, group, vlarr_limits.get(group))
+                for group in data_config.input_groups_vlarr
+        }
 
-    if (data_config.test_size is None) and (data_config.val_size is None):
-        return df
+        return BucketSampler(lengths, batch_size, **kwargs)
 
-    return train_test_split(df, data_config.val_size, data_config.test_size)
+    if name == 'block-shuffle':
+        return BlockShuffleSampler(len(dset), batch_size, **kwargs)
+
+    raise ValueError(f"Unknown sampler {name}")
+
+def create_data_frame(
+    data_config, datadir = None, extra_columns = None, chunk_size = None
+):
+    frame = data_config.frame
+
+    if 'columns' not in frame:
+        frame = {
+            **frame,
+            'columns' : get_required_columns(data_config, extra_columns)
+        }
+
+    df = select_vlne_frame(**frame, datadir = datadir)
+
+    # Derived row indices and variables are cached next to the data files
+    frame_stat  = get_frame_stat(data_config.frame, datadir)
+    fingerprint = get_frame_fingerprint(data_config)
+
+    if data_config.selection:
+        df = apply_selection(
+            df, data_config.selection, get_frame_path(frame, datadir)
+        )
+
+    if data_config.subset:
+        df = apply_subset(df, data_config.subset, frame_stat, fingerprint)
+
+    fingerprint = [ *fingerprint, data_config.subset ]
+
+    if data_config.vlarr_limits:
+        df = apply_read_limits(df, data_config)
+
+    if data_config.extra_vars is not None:
+        extra_vars = parse_extra_vars(
+            data_config.extra_vars, frame_stat, fingerprint, chunk_size
+        )
+        df = VarFrame(df, variables = extra_vars, lazy = False)
+
+    return split_data_frame(df, data_config, frame_stat, fingerprint)
 
 def create_datasets_from_single_df(df, data_config, cache, splits):
     scalar_groups = {
@@ -65,8 +246,8 @@ def create_datasets_from_single_df(df, data_config, cache, splits):
         df, cache, split, scalar_groups,
         vlarr_groups    = data_config.vlarr_groups,
         vlarr_limits    = data_config.vlarr_limits,
-        transform_train = data_config.transform_train,
-        transform_test  = data_config.transform_test
+        transform_train = get_dataset_transforms(data_config, split),
+        transform_test  = get_dataset_transforms(data_config, split)
     ), ]
 
 def create_datasets_from_df_list(df_list, data_config, cache, splits):
@@ -80,13 +261,15 @@ def create_datasets_from_df_list(df_list, data_config, cache, splits):
     result = []
 
     for split in splits:
+        transforms = get_dataset_transforms(data_config, split)
+
         result.append(
             construct_dataset_from_data_frame(
                 df_list[SPLIT_INDEX[split]], cache, split, scalar_groups,
                 vlarr_groups    = data_config.input_groups_vlarr,
                 vlarr_limits    = data_config.vlarr_limits,
-                transform_train = data_config.transform_train,
-                transform_test  = data_config.transform_test
+                transform_train = transforms,
+                transform_test  = transforms
             )
         )
 
@@ -98,42 +281,981 @@ def create_datasets(df, data_config, cache, splits):
 
     return create_datasets_from_df_list(df, data_config, cache, splits)
 
-def create_data_generators_from_datasets(dset_list, data_config, batch_size):
+def uses_ragged_inputs(model):
+    if model is None:
+        return False
+
+    _, kwargs = unpack_name_args(model)
+    return kwargs.get('ragged', False)
+
+def create_batch_transforms(data_config, split):
+    """Construct batch level transformations of `split` or None"""
+    transforms = get_batch_transforms(data_config, split)
+
+    if len(transforms) == 0:
+        return None
+
+    LOGGER.info(
+        "Applying %s transformations of '%s' split to whole batches",
+        [ unpack_name_args(x)[0] for x in transforms ], split
+    )
+
+    return BatchTransforms(
+        transforms,
+        { **data_config.input_groups_scalar, **data_config.target_groups },
+        data_config.input_groups_vlarr,
+        seed = [ data_config.seed or 0, SPLIT_INDEX[split] ]
+    )
+
+def create_data_generators_from_datasets(
+    dset_list, data_config, batch_size, splits, ragged = False,
+    stream_weights = False
+):
     LOGGER.info("Creating data generators with batch size %d", batch_size)
+
+    if not isinstance(splits, (tuple, list)):
+        splits = [ splits, ]
+
     input_groups = list(itertools.chain(
         data_config.input_groups_scalar.keys(),
         data_config.input_groups_vlarr.keys()
     ))
 
     target_groups = list(data_config.target_groups.keys())
+    result        = []
+
+    for (dset, split) in zip(dset_list, splits):
+        sampler = select_sampler(
+            data_config.sampler, dset, data_config, batch_size, split
+        )
+        weights = data_config.weights
+
+        if isinstance(sampler, WeightedSampler):
+            # Weights are accounted for by the sampling frequency
+            weights = None
+
+        result.append(DataGenerator(
+            dset, input_groups, target_groups, batch_size, weights,
+            sampler    = sampler,
+            ragged     = ragged,
+            transforms = create_batch_transforms(data_config, split),
+            stream_weights = stream_weights,
+        ))
+
+    return result
+
+def get_cache_budget(cache, splits, cache_dtype = None, pools = False):
+    """Return LRU cache budget per split or None if LRU cache is disabled"""
+    if (cache is True) and ((cache_dtype is not None) or pools):
+        # Unbounded LRU caches replace vlndata cache to store compact arrays,
+        # and to let worker pools detect the cached splits
+        return math.inf
+
+    if isinstance(cache, bool) or (cache is None):
+        return None
+
+    return cache // len(splits)
+
+def get_chunk_size(memory_limit):
+    """Return number of rows to read at a time within `memory_limit`"""
+    if memory_limit is None:
+        return None
+
+    return max(
+        int(memory_limit * CHUNK_MEMORY_FRACTION) // CHUNK_ROW_NBYTES, 1
+    )
+
+def apply_memory_limit(memory_limit, cache, precache, materialize):
+    """Adjust in-memory data options to fit within `memory_limit` bytes.
+
+    Returns
+    -------
+    (cache, precache, materialize)
+        Options, where unbounded caches are replaced by the LRU ones, and the
+        ones that hold whole datasets in memory are disabled.
+    """
+    if memory_limit is None:
+        return (cache, precache, materialize)
+
+    budget = int(memory_limit * CACHE_MEMORY_FRACTION)
+
+    if (cache is True) or (
+        (not isinstance(cache, bool)) and (cache is not None)
+        and (cache > budget)
+    ):
+        LOGGER.warning(
+            "Limiting cache to %d bytes to fit into memory limit", budget
+        )
+        cache = budget
+
+    if precache:
+        LOGGER.warning(
+            "Disabling precache, since datasets may not fit into memory limit"
+        )
+        precache = False
+
+    if materialize is True:
+        LOGGER.warning(
+            "Disabling in-memory materialization, since datasets may not fit"
+            " into memory limit. Specify materialization directory instead"
+        )
+        materialize = None
+
+    return (cache, precache, materialize)
+
+def can_cache_split(data_config, split):
+    # In-graph augmentation does not change the batches
+    if is_deterministic(get_pipeline_transforms(data_config, split)):
+        return True
+
+    LOGGER.warning(
+        "Not caching batches of '%s' split, since its transformations are"
+        " stochastic", split
+    )
+    return False
+
+def create_compactor(data_config, cache_dtype):
+    """Create `ArrayCompactor` of input groups or None if it is disabled"""
+    if cache_dtype is None:
+        return None
+
+    return ArrayCompactor(
+        cache_dtype,
+        input_groups = itertools.chain(
+            data_config.input_groups_scalar.keys(),
+            data_config.input_groups_vlarr.keys()
+        ),
+        columns      = {
+            **data_config.input_groups_scalar,
+            **data_config.input_groups_vlarr,
+        }
+    )
+
+def is_event_cached(dset):
+    """Check whether events of `dset` are kept in an LRU cache"""
+    return isinstance(dset, (CachedDataset, PrefixCachedDataset))
+
+def cache_transform_prefix(
+    df, dset, data_config, split, budget, cache_dtype = None
+):
+    """Cache events of the deterministic prefix of `split` transformations.
+
+    Returns
+    -------
+    Dataset
+        `PrefixCachedDataset` that applies only the stochastic
+        transformations on top of the cached deterministic ones, or `dset`
+        if there is nothing to cache.
+    """
+    prefix, suffix = split_transforms(
+        get_dataset_transforms(data_config, split)
+    )
+
+    if len(prefix) == 0:
+        LOGGER.warning(
+            "Not caching '%s' split, since all its transformations are"
+            " stochastic", split
+        )
+        return dset
+
+    scalar_groups = {
+        **data_config.input_groups_scalar, **data_config.target_groups
+    }
+    vlarr_groups  = data_config.input_groups_vlarr
+
+    LOGGER.info(
+        "Caching %s transformations of '%s' split",
+        [ unpack_name_args(x)[0] for x in prefix ], split
+    )
+
+    prefix_dset = CachedDataset(
+        construct_dataset_from_data_frame(
+            df, False, split, scalar_groups,
+            vlarr_groups    = vlarr_groups,
+            vlarr_limits    = data_config.vlarr_limits,
+            transform_train = prefix,
+            transform_test  = prefix
+        ),
+        budget, split, create_compactor(data_config, cache_dtype)
+    )
+
+    event_df = EventFrame(
+        prefix_dset, scalar_groups, vlarr_groups, prefix_dset.df
+    )
+
+    dset = construct_dataset_from_data_frame(
+        event_df, False, split, scalar_groups,
+        vlarr_groups    = vlarr_groups,
+        vlarr_limits    = data_config.vlarr_limits,
+        transform_train = suffix,
+        transform_test  = suffix
+    )
+
+    return PrefixCachedDataset(dset, prefix_dset)
+
+def add_event_caches(
+    df_list, dset_list, data_config, splits, budget, cache_dtype = None,
+    materialize = None
+):
+    """Cache events of datasets which batches cannot be cached.
+
+    Events are cached for datasets which batches are reshuffled by samplers.
+    For splits with stochastic transformations only the deterministic
+    prefix of the transformations is cached, unless it has been
+    materialized already.
+    """
+    if budget is None:
+        return dset_list
+
+    result = []
+
+    for (dset, split) in zip(dset_list, splits):
+        if isinstance(df_list, (tuple, list)):
+            df = df_list[SPLIT_INDEX[split]]
+        else:
+            df = df_list
+
+        if isinstance(dset, ArrayDataset):
+            result.append(dset)
+
+        elif not is_deterministic(get_dataset_transforms(data_config, split)):
+            if materialize:
+                # Deterministic prefix is materialized already
+                result.append(dset)
+            else:
+                result.append(cache_transform_prefix(
+                    df, dset, data_config, split, budget, cache_dtype
+                ))
+
+        elif data_config.sampler is not None:
+            result.append(CachedDataset(
+                dset, budget, split, create_compactor(data_config, cache_dtype)
+            ))
+
+        else:
+            result.append(dset)
+
+    return result
+
+def add_bulk_readers(dset_list, data_config, splits, cache = False):
+    """Read batches of datasets without transformations in bulk"""
+    if cache:
+        # Events are kept by the dataset cache itself
+        return dset_list
+
+    result = []
+
+    for (dset, split) in zip(dset_list, splits):
+        if (
+               is_event_cached(dset) or isinstance(dset, ArrayDataset)
+            or (len(get_dataset_transforms(data_config, split)) > 0)
+        ):
+            # Events are either extracted in bulk already, cached, or
+            # constructed by the dataset transformations
+            result.append(dset)
+            continue
+
+        result.append(FrameDataset(
+            dset,
+            { **data_config.input_groups_scalar, **data_config.target_groups },
+            data_config.input_groups_vlarr,
+            data_config.vlarr_limits
+        ))
+
+    return result
+
+def add_batch_caches(
+    dgen_list, data_config, splits, budget, cache_dtype = None
+):
+    """Cache collated batches of sequential data generators"""
+    if (budget is None) or (data_config.sampler is not None):
+        return dgen_list
+
+    return [
+        CachingGenerator(
+            dgen, budget, split, create_compactor(data_config, cache_dtype)
+        )
+            if (
+                    not isinstance(dgen, ReplayGenerator)
+                and not isinstance(dgen.dataset, ArrayDataset)
+                and can_cache_split(data_config, split)
+            )
+            else dgen
+        for (dgen, split) in zip(dgen_list, splits)
+    ]
+
+def add_batch_shuffles(dgen_list, data_config, splits):
+    """Reshuffle order of the training batches every epoch.
+
+    Batches are requested by `keras` sequentially, and the order is
+    permuted by `ShufflingGenerator` underneath the prefetching decorators,
+    such that their look-ahead matches the requested batches.
+    """
+    if uses_tf_data_backend(data_config):
+        # tf.data reshuffles batch indices itself
+        return dgen_list
 
     return [
-        DataGenerator(
-            x, input_groups, target_groups, batch_size, data_config.weights
+        ShufflingGenerator(
+            dgen, seed = [ data_config.seed or 0, SPLIT_INDEX[split] ]
         )
-        for x in dset_list
+            if (split == 'train') and (not dgen.sampler.shuffle)
+            else dgen
+        for (dgen, split) in zip(dgen_list, splits)
     ]
 
-def create_data_generators(data_config, batch_size, splits, datadir, cache):
-    df_list   = create_data_frame(data_config, datadir)
-    dset_list = create_datasets(df_list, data_config, cache, splits)
+def uses_worker_pools(data_config, workers):
+    """Check whether batches are built by pools of worker processes"""
+    return (
+            (workers is not None) and (workers >= 1)
+        and not uses_tf_data_backend(data_config)
+    )
+
+def add_worker_pools(dgen_list, data_config, splits, workers, prefetch):
+    """Build batches of data generators in pools of worker processes"""
+    if (workers is None) or (workers < 1):
+        return dgen_list
+
+    if not uses_worker_pools(data_config, workers):
+        LOGGER.warning(
+            "Not using worker pools, since tf.data backend builds batches"
+            " itself"
+        )
+        return dgen_list
+
+    result = []
+
+    for (dgen, split) in zip(dgen_list, splits):
+        base = dgen.decorated if isinstance(dgen, ShufflingGenerator) else dgen
+
+        # Stored batches are read without copies already, and batch caches
+        # would be filled in every worker separately
+        if isinstance(base, (CachingGenerator, ReplayGenerator)):
+            result.append(dgen)
+            continue
+
+        if is_event_cached(base.dataset):
+            LOGGER.warning(
+                "Building batches of '%s' split in the main process, since"
+                " each worker would fill a separate copy of its event cache",
+                split
+            )
+            result.append(dgen)
+            continue
+
+        result.append(WorkerPoolGenerator(
+            dgen, workers, prefetch,
+            seed = [ data_config.seed or 0, SPLIT_INDEX[split] ]
+        ))
+
+    return result
+
+def uses_parallel_precache(workers):
+    """Check whether `precache` preloads datasets with a pool of processes"""
+    return (workers is not None) and (workers >= 2)
+
+def precache_datasets(dset_list, data_config, splits, workers):
+    """Preload deterministic datasets into RAM with a pool of processes"""
+    if not uses_parallel_precache(workers):
+        return dset_list
+
+    result = []
+
+    for (dset, split) in zip(dset_list, splits):
+        if isinstance(dset, ArrayDataset):
+            # Dataset has been materialized in RAM already
+            result.append(dset)
+            continue
+
+        if is_deterministic(get_dataset_transforms(data_config, split)):
+            dset = precache_dataset(dset, workers, split)
+        else:
+            LOGGER.warning(
+                "Not precaching '%s' split in parallel, since its"
+                " transformations are stochastic", split
+            )
+
+        result.append(dset)
+
+    return result
+
+def is_memory_mapped(scalar, vlarr):
+    """Check whether any of the group arrays is memory-mapped from disk"""
+    arrays  = list(scalar.values())
+    arrays += [ values for (values, _) in vlarr.values() ]
+
+    return any(isinstance(x, np.memmap) for x in arrays)
+
+def compact_datasets(dset_list, data_config, splits, cache_dtype):
+    """Store inputs of in-memory datasets in a compact `cache_dtype`"""
+    if cache_dtype is None:
+        return dset_list
+
+    result = []
+
+    for (dset, split) in zip(dset_list, splits):
+        if (not isinstance(dset, ArrayDataset)) or is_compacted(dset):
+            result.append(dset)
+            continue
+
+        if is_memory_mapped(dset.scalar, dset.vlarr):
+            LOGGER.warning(
+                "Not compacting '%s' split, since it is memory-mapped from"
+                " disk", split
+            )
+            result.append(dset)
+            continue
+
+        result.append(
+            dset.compact(create_compactor(data_config, cache_dtype), split)
+        )
+
+    return result
+
+def is_compacted(dset):
+    """Check whether `dset` stores its events in a compact dtype"""
+    return getattr(dset, 'compactor', None) is not None
+
+def get_passthrough_columns(data_config, extra_columns = None):
+    """Return columns outside of data groups that are read from `dset.df`"""
+    result = set((data_config.weights or {}).values())
+    result |= set(extra_columns or [])
+
+    if data_config.sampler is not None:
+        _, kwargs = unpack_name_args(data_config.sampler)
+
+        if kwargs.get('column') is not None:
+            result.add(kwargs['column'])
+
+    result -= get_group_columns({
+        **data_config.input_groups_scalar,
+        **data_config.input_groups_vlarr,
+        **data_config.target_groups,
+    })
+
+    return sorted(result)
+
+def get_materialize_path(
+    materialize, data_config, split, prefix, columns, datadir
+):
+    """Return path of the materialized split unique to its transformations"""
+    if not isinstance(materialize, str):
+        return None
+
+    frame_stat = get_frame_stat(data_config.frame, datadir)
+
+    # Materialization does not depend on the stochastic transformations
+    config = {
+        **data_config.to_dict(),
+        'transform_train' : None,
+        'transform_test'  : None,
+        'augment'         : None,
+        'sampler'         : None,
+        'backend'         : None,
+    }
+
+    md5 = hashlib.md5()
+    md5.update(json.dumps(
+        [ config, prefix, columns, frame_stat ],
+        sort_keys = True
+    ).encode())
+
+    return os.path.join(materialize, f'{md5.hexdigest()}_{split}')
+
+def materialize_transforms(
+    df, data_config, split, materialize, workers = None, datadir = None,
+    extra_columns = None, cache_dtype = None
+):
+    """Apply deterministic prefix of `split` transformations once.
+
+    Returns
+    -------
+    Dataset or None
+        Dataset that applies only the stochastic transformations on top of
+        the materialized deterministic ones, or `ArrayDataset` if there are
+        no stochastic transformations. None if there is nothing to
+        materialize.
+    """
+    prefix, suffix = split_transforms(
+        get_dataset_transforms(data_config, split)
+    )
+
+    if len(prefix) == 0:
+        return None
+
+    scalar_groups = {
+        **data_config.input_groups_scalar, **data_config.target_groups
+    }
+    vlarr_groups  = data_config.input_groups_vlarr
+    columns       = get_passthrough_columns(data_config, extra_columns)
+
+    path = get_materialize_path(
+        materialize, data_config, split, prefix, columns, datadir
+    )
+
+    if (path is not None) and materialized_exists(path):
+        LOGGER.info("Loading materialized '%s' split from '%s'", split, path)
+        scalar, vlarr, extra = load_materialized(path)
+
+    else:
+        dset = construct_dataset_from_data_frame(
+            df, False, split, scalar_groups,
+            vlarr_groups    = vlarr_groups,
+            vlarr_limits    = data_config.vlarr_limits,
+            transform_train = prefix,
+            transform_test  = prefix
+        )
+
+        if len(dset) == 0:
+            return None
+
+        LOGGER.info(
+            "Materializing %s transformations of '%s' split",
+            [ unpack_name_args(x)[0] for x in prefix ], split
+        )
+
+        if (workers is not None) and (workers >= 2):
+            dset = precache_dataset(dset, workers, split)
+        else:
+            dset = ArrayDataset.from_dataset(dset)
+
+        scalar = dset.scalar
+        vlarr  = dset.vlarr
+        extra  = { x : np.asarray(df[x]) for x in columns }
+
+        if path is not None:
+            save_materialized(path, scalar, vlarr, extra)
+
+    compactor = None
+
+    if (
+            (len(suffix) == 0) and (cache_dtype is not None)
+        and not is_memory_mapped(scalar, vlarr)
+    ):
+        # Compacted before the derived frame is made, such that the frame
+        # does not keep the full precision arrays alive
+        compactor = create_compactor(data_config, cache_dtype)
+        scalar    = compactor.compact(scalar)
+        vlarr     = compactor.compact(vlarr)
+        compactor.log_savings(split)
+
+    derived_df = make_derived_frame(
+        scalar, vlarr, extra, scalar_groups, vlarr_groups
+    )
+
+    if len(suffix) == 0:
+        return ArrayDataset(
+            scalar, vlarr,
+            df            = derived_df,
+            scalar_groups = scalar_groups,
+            vlarr_groups  = vlarr_groups,
+            compactor     = compactor,
+        )
+
+    return construct_dataset_from_data_frame(
+        derived_df, False, split, scalar_groups,
+        vlarr_groups    = vlarr_groups,
+        vlarr_limits    = data_config.vlarr_limits,
+        transform_train = suffix,
+        transform_test  = suffix
+    )
+
+def materialize_datasets(
+    df_list, dset_list, data_config, splits, materialize, workers = None,
+    datadir = None, extra_columns = None, cache_dtype = None
+):
+    """Replace datasets by the ones with materialized transformations"""
+    result = []
+
+    for (dset, split) in zip(dset_list, splits):
+        if isinstance(df_list, (tuple, list)):
+            df = df_list[SPLIT_INDEX[split]]
+        else:
+            df = df_list
+
+        materialized = materialize_transforms(
+            df, data_config, split, materialize, workers, datadir,
+            extra_columns, cache_dtype
+        )
+
+        result.append(dset if materialized is None else materialized)
+
+    return result
+
+def get_batch_store_path(
+    batch_store, data_config, batch_size, split, ragged, datadir,
+    cache_dtype = None
+):
+    """Return batch store path unique to the data configuration and split"""
+    frame_stat = get_frame_stat(data_config.frame, datadir)
+    settings   = [ batch_size, ragged, frame_stat ]
+
+    if cache_dtype is not None:
+        # Batches of compact datasets are rounded to `cache_dtype`
+        settings.append(cache_dtype)
+
+    md5 = hashlib.md5()
+    md5.update(data_config.to_json(sort_keys = True).encode())
+    md5.update(json.dumps(settings).encode())
+
+    return os.path.join(batch_store, f'{md5.hexdigest()}_{split}')
+
+def can_freeze_split(dgen, data_config, split, action = 'storing'):
+    """Check whether batches of `split` are the same in every epoch"""
+    if isinstance(dgen, ReplayGenerator):
+        # Batches have been frozen in a batch store already
+        return True
+
+    if dgen.sampler.shuffle:
+        LOGGER.warning(
+            "Not %s '%s' split, since its batches are reshuffled",
+            action, split
+        )
+        return False
+
+    if not is_deterministic(get_pipeline_transforms(data_config, split)):
+        LOGGER.warning(
+            "Not %s '%s' split, since its transformations are stochastic",
+            action, split
+        )
+        return False
+
+    return True
+
+def add_batch_store(dgen, path):
+    if not batch_store_exists(path):
+        LOGGER.info("Writing batch store '%s'", path)
+        write_batch_store(dgen, path)
+
+    LOGGER.info("Replaying batches from '%s'", path)
+    return ReplayGenerator(dgen, path)
+
+def add_batch_stores(
+    dgen_list, data_config, batch_size, splits, ragged, datadir,
+    batch_store, cache_dtype = None
+):
+    """Replace deterministic data generators by on-disk batch replays.
+
+    This is a fallback of `find_replay_stores` for stores that cannot be
+    looked up before the datasets are constructed. Only batch construction
+    is skipped here.
+    """
+    if batch_store is None:
+        return dgen_list
+
+    result = []
+
+    for (dgen, split) in zip(dgen_list, splits):
+        if can_freeze_split(dgen, data_config, split):
+            path = get_batch_store_path(
+                batch_store, data_config, batch_size, split, ragged, datadir,
+                cache_dtype if is_compacted(dgen.dataset) else None
+            )
+            dgen = add_batch_store(dgen, path)
+
+        result.append(dgen)
+
+    return result
+
+def uses_sequential_sampler(data_config, split):
+    """Check whether batches of `split` are made by `SequentialSampler`"""
+    if data_config.sampler is None:
+        return True
+
+    name, _ = unpack_name_args(data_config.sampler)
+
+    # c.f. `select_sampler`
+    return (name == 'weighted') and (split != 'train')
+
+def find_replay_stores(
+    data_config, batch_size, splits, ragged, datadir, batch_store,
+    precache = False, workers = None, materialize = None, cache_dtype = None
+):
+    """Look up batch stores of `splits` before any data is read.
+
+    Returns
+    -------
+    list of str or None
+        Paths of the existing batch stores of `splits`. None if a store of
+        any split is missing, or whether it can be used depends on the
+        constructed datasets. In this case `add_batch_stores` decides.
+    """
+    if batch_store is None:
+        return None
+
+    # Only datasets held in RAM by `materialize` or parallel `precache` are
+    # compacted, which changes the store path, c.f. `add_batch_stores`
+    if (cache_dtype is not None) and (
+        materialize or (precache and uses_parallel_precache(workers))
+    ):
+        return None
+
+    result = []
+
+    for split in splits:
+        if not uses_sequential_sampler(data_config, split):
+            return None
+
+        if not is_deterministic(get_pipeline_transforms(data_config, split)):
+            return None
+
+        path = get_batch_store_path(
+            batch_store, data_config, batch_size, split, ragged, datadir
+        )
+
+        if not batch_store_exists(path):
+            return None
+
+        result.append(path)
+
+    return result
+
+def create_replay_source(
+    data_config, batch_size, split, datadir, ragged = False,
+    extra_columns = None, memory_limit = None
+):
+    """Construct data generator of the replayed `split` without caches"""
+    df_list   = create_data_frame(
+        data_config, datadir, extra_columns, get_chunk_size(memory_limit)
+    )
+    dset_list = create_datasets(df_list, data_config, False, [ split, ])
+
+    return create_data_generators_from_datasets(
+        dset_list, data_config, batch_size, [ split, ], ragged,
+        stream_weights = (memory_limit is not None)
+    )[0]
+
+def create_replay_generators(
+    paths, data_config, batch_size, splits, datadir, ragged = False,
+    extra_columns = None, memory_limit = None
+):
+    """Construct generators that replay batch stores `paths`.
+
+    Data frames and datasets of the replayed splits are constructed only if
+    their events are requested, e.g. by the evaluation.
+    """
+    result = []
+
+    for (path, split) in zip(paths, splits):
+        LOGGER.info("Replaying batches from '%s'", path)
+
+        store = BatchStore(path)
+        make  = functools.partial(
+            create_replay_source, data_config, batch_size, split, datadir,
+            ragged, extra_columns, memory_limit
+        )
+
+        result.append(ReplayGenerator(
+            make, path, SequentialSampler(store.n_events, batch_size)
+        ))
+
+    return result
+
+def get_tf_data_cache(cache, dgen, data_config, split):
+    if not cache:
+        return False
+
+    if not can_freeze_split(dgen, data_config, split, 'caching'):
+        return False
+
+    if isinstance(cache, str):
+        return f'{cache}_{split}'
+
+    return cache
+
+def get_tf_data_parallel_calls(parallel_calls, data_config, split):
+    # Per event stochastic transformations draw random numbers from a
+    # generator shared by all events. Building their batches concurrently
+    # would make the augmentation depend on the thread scheduling.
+    if is_deterministic(get_dataset_transforms(data_config, split)):
+        return parallel_calls
+
+    if parallel_calls != 1:
+        LOGGER.warning(
+            "Building batches of '%s' split sequentially, since its per"
+            " event transformations are stochastic", split
+        )
+
+    return 1
+
+def select_backend(dgen, data_config, split):
+    """Wrap data generator `dgen` into a keras input pipeline backend"""
+    name, kwargs = unpack_name_args(data_config.backend or 'sequence')
+
+    if name == 'sequence':
+        # pylint: disable = import-outside-toplevel
+        from vlne.data.data_generator.keras_sequence import KerasSequence
+        return KerasSequence(dgen, **kwargs)
+
+    if name == 'tf-data':
+        # pylint: disable = import-outside-toplevel
+        from vlne.data.data_generator.tf_data_generator import (
+            TFDataGenerator
+        )
+
+        kwargs['cache'] = get_tf_data_cache(
+            kwargs.get('cache', False), dgen, data_config, split
+        )
+        kwargs['parallel_calls'] = get_tf_data_parallel_calls(
+            kwargs.get('parallel_calls', None), data_config, split
+        )
+        return TFDataGenerator(dgen, **kwargs)
+
+    raise ValueError(f"Unknown data backend {name}")
+
+def uses_tf_data_backend(data_config):
+    if data_config.backend is None:
+        return False
+
+    name, _ = unpack_name_args(data_config.backend)
+    return (name == 'tf-data')
+
+def create_data_generators(
+    data_config, batch_size, splits, datadir, cache, ragged = False,
+    prefetch = None, batch_store = None, precache = False, workers = None,
+    extra_columns = None, materialize = None, cache_dtype = None,
+    memory_limit  = None, shuffle = False
+):
+    if not isinstance(splits, (tuple, list)):
+        splits = [ splits, ]
+
+    cache, precache, materialize = apply_memory_limit(
+        memory_limit, cache, precache, materialize
+    )
+
+    paths = find_replay_stores(
+        data_config, batch_size, splits, ragged, datadir, batch_store,
+        precache, workers, materialize, cache_dtype
+    )
+
+    if paths is not None:
+        dgen_list = create_replay_generators(
+            paths, data_config, batch_size, splits, datadir, ragged,
+            extra_columns, memory_limit
+        )
+        return finalize_data_generators(
+            dgen_list, data_config, splits, workers, prefetch, shuffle
+        )
+
+    budget     = get_cache_budget(
+        cache, splits, cache_dtype, uses_worker_pools(data_config, workers)
+    )
+    # Unbounded caches without compaction are kept by vlndata datasets
+    dset_cache = (cache is True) and (budget is None)
+    df_list    = create_data_frame(
+        data_config, datadir, extra_columns, get_chunk_size(memory_limit)
+    )
+    dset_list  = create_datasets(df_list, data_config, dset_cache, splits)
+    if materialize:
+        dset_list = materialize_datasets(
+            df_list, dset_list, data_config, splits, materialize, workers,
+            datadir, extra_columns, cache_dtype
+        )
+
+    if precache:
+        dset_list = precache_datasets(dset_list, data_config, splits, workers)
+
+    dset_list = compact_datasets(dset_list, data_config, splits, cache_dtype)
+    dset_list = add_event_caches(
+        df_list, dset_list, data_config, splits, budget, cache_dtype,
+        materialize
+    )
+    dset_list = add_bulk_readers(dset_list, data_config, splits, dset_cache)
 
     dgen_list = create_data_generators_from_datasets(
-        dset_list, data_config, batch_size
+        dset_list, data_config, batch_size, splits, ragged,
+        stream_weights = (memory_limit is not None)
+    )
+    dgen_list = add_batch_stores(
+        dgen_list, data_config, batch_size, splits, ragged, datadir,
+        batch_store, cache_dtype
+    )
+    dgen_list = add_batch_caches(
+        dgen_list, data_config, splits, budget, cache_dtype
     )
 
-    # pylint: disable = import-outside-toplevel
-    from vlne.data.data_generator.keras_sequence import KerasSequence
-    dgen_list = [ KerasSequence(x) for x in dgen_list ]
+    return finalize_data_generators(
+        dgen_list, data_config, splits, workers, prefetch, shuffle
+    )
 
-    return dgen_list
+def finalize_data_generators(
+    dgen_list, data_config, splits, workers, prefetch, shuffle = False
+):
+    """Add batch shuffles, prefetching and the keras backend"""
+    if shuffle:
+        dgen_list = add_batch_shuffles(dgen_list, data_config, splits)
 
-def load_data(args, splits):
+    dgen_list = add_worker_pools(
+        dgen_list, data_config, splits, workers, prefetch
+    )
+
+    if prefetch and uses_tf_data_backend(data_config):
+        LOGGER.warning(
+            "Ignoring prefetch option, since tf.data backend prefetches"
+            " batches itself"
+        )
+    elif prefetch:
+        # Worker pools prefetch batches themselves
+        dgen_list = [
+            x if isinstance(x, WorkerPoolGenerator)
+              else PrefetchingGenerator(x, prefetch)
+            for x in dgen_list
+        ]
+
+    return [
+        select_backend(dgen, data_config, split)
+            for (dgen, split) in zip(dgen_list, splits)
+    ]
+
+def load_data(args, splits, extra_columns = None, shuffle = False):
     return create_data_generators(
         data_config = args.config.data,
         batch_size  = args.config.batch_size,
         splits      = splits,
         datadir     = args.root_datadir,
         cache       = args.cache,
+        ragged      = uses_ragged_inputs(args.config.model),
+        prefetch    = args.prefetch,
+        batch_store = args.batch_store,
+        precache    = args.precache,
+        workers     = args.workers,
+        materialize = args.materialize,
+        cache_dtype = args.cache_dtype,
+        memory_limit  = args.memory_limit,
+        extra_columns = extra_columns,
+        shuffle       = shuffle,
+    )
+
+def load_input_stats(args, split = 'train'):
+    """Return statistics of the input columns of the `split` data.
+
+    The statistics are computed once per dataset and saved next to the data
+    files. C.f. `vlne.data.feature_stats.load_feature_stats`.
+    """
+    data_config = args.config.data
+    df = create_data_frame(
+        data_config, args.root_datadir,
+        chunk_size = get_chunk_size(args.memory_limit)
+    )
+
+    if isinstance(df, (tuple, list)):
+        df = df[SPLIT_INDEX[split]]
+
+    columns = sorted(
+          get_group_columns(data_config.input_groups_scalar)
+        | get_group_columns(data_config.input_groups_vlarr)
     )
 
+    fingerprint = [
+        *get_frame_fingerprint(data_config), data_config.subset,
+        data_config.extra_vars, data_config.vlarr_limits,
+        get_split_key(len(df), data_config, split),
+    ]
+
+    return load_feature_stats(
+        df, columns,
+        frame_stat  = get_frame_stat(data_config.frame, args.root_datadir),
+        fingerprint = fingerprint,
+        workers     = args.workers,
+        chunk_size  = get_chunk_size(args.memory_limit),
+    )
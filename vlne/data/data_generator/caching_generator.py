@@ -0,0 +1,61 @@
+from .funcs.lru_cache import LRUCache
+from .idata_decorator import IDataDecorator
+
+class CachingGenerator(IDataDecorator):
+    """Decorator that keeps collated batches in a memory bounded LRU cache.
+
+    Batches are identified by the event indices they are made of. Therefore,
+    this decorator should only be used if the batches are constructed
+    deterministically, i.e. without stochastic transformations.
+
+    The decorator is thread-safe. A batch that is requested concurrently
+    before it is cached is built by each of the requesting threads.
+
+    Parameters
+    ----------
+    dgen : DataGenerator
+        Data generator which batches will be cached.
+    budget : int or None
+        Cache memory budget in bytes. If None, the cache is unbounded.
+    name : str, optional
+        Cache name to use in log messages. Default: ''.
+    compactor : ArrayCompactor or None, optional
+        If not None, batches are cached in the compact representation of
+        `compactor`. Default: None.
+    """
+
+    def __init__(self, dgen, budget, name = '', compactor = None):
+        super().__init__(dgen)
+        self._cache     = LRUCache(budget, name)
+        self._name      = name
+        self._compactor = compactor
+
+    @property
+    def cache(self):
+        return self._cache
+
+    def __getitem__(self, index):
+        indices = self._dgen.sampler[index]
+        key     = indices.tobytes()
+        batch   = self._cache.get(key)
+
+        if batch is None:
+            batch = self._dgen.get_data(indices)
+
+            if self._compactor is None:
+                self._cache.put(key, batch)
+            else:
+                self._cache.put(key, self._compactor.compact_batch(batch))
+
+        elif self._compactor is not None:
+            batch = self._compactor.restore_batch(batch)
+
+        return batch
+
+    def on_epoch_end(self):
+        self._cache.log_stats()
+        self._cache.reset_stats()
+
+        if self._compactor is not None:
+            self._compactor.log_savings(self._name)
+        self._dgen.on_epoch_end()
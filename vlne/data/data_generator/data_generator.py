@@ -1,7 +1,12 @@
-import math
+import time
+
 import numpy as np
 
 from vlndata.data_loader import vldata_dict_collate
+from vlne.data.samplers  import SequentialSampler
+from .funcs.collate      import collate_bulk_batch, collate_events_ragged
+from .funcs.frame_column import ConstColumn, FrameColumn
+from .funcs.lru_cache    import calc_nbytes
 from .idata_generator    import IDataGenerator
 
 class DataGenerator(IDataGenerator):
@@ -10,26 +15,91 @@ class DataGenerator(IDataGenerator):
         self, dataset, input_groups, target_groups,
         batch_size = 1024,
         weights    = None,
+        bulk       = True,
+        sampler    = None,
+        ragged     = False,
+        transforms = None,
+        stream_weights = False,
     ):
         super().__init__(dataset, input_groups, target_groups)
 
         self._batch_size = batch_size
         self._weights    = { }
+        self._bulk       = bulk
+        self._sampler    = sampler
+        self._ragged     = ragged
+        self._transforms = transforms
+        # (nbytes, seconds) of the batches constructed in this epoch
+        self._reads      = []
+
+        if sampler is None:
+            self._sampler = SequentialSampler(len(dataset), batch_size)
 
         weights = weights or {}
 
         for t in self.target_groups:
-            if t in weights:
+            if stream_weights:
+                # Out-of-core mode: weights are read for each batch
+                self._weights[t] = (
+                    FrameColumn(dataset.df, weights[t]) if t in weights
+                    else ConstColumn(len(dataset))
+                )
+            elif t in weights:
                 self._weights[t] = dataset.df[weights[t]]
             else:
                 self._weights[t] = np.ones(len(dataset))
 
-    def get_data(self, indices):
+    def _collate_events(self, indices, index):
+        data_batch = [ self._dataset[i] for i in indices ]
+
+        if self._transforms:
+            return self._transform_batch(
+                collate_events_ragged(data_batch), index
+            )
+
+        if self._ragged:
+            return collate_events_ragged(data_batch)
+
+        return vldata_dict_collate(data_batch, pad = 0)
+
+    def _collate_bulk(self, indices, index):
+        data_batch = self._dataset.get_batch(indices)
+
+        if self._transforms:
+            return self._transform_batch(data_batch, index)
+
+        if self._ragged:
+            return data_batch
+
+        return collate_bulk_batch(data_batch, pad = 0)
+
+    def _transform_batch(self, data_batch, index):
+        # Batch transformations act on the unpadded bulk batches
+        data_batch = self._transforms(data_batch, index)
+
+        if self._ragged:
+            return data_batch
+
+        return collate_bulk_batch(data_batch, pad = 0)
+
+    def get_data(self, indices, index = 0):
+        """Construct batch of events `indices`.
+
+        Batch index `index` selects random numbers of the batch level
+        transformations.
+        """
         inputs  = {}
         targets = {}
+        start   = time.perf_counter()
+
+        if self.bulk:
+            data_batch = self._collate_bulk(indices, index)
+        else:
+            data_batch = self._collate_events(indices, index)
 
-        data_batch = [ self._dataset[index] for index in indices ]
-        data_batch = vldata_dict_collate(data_batch, pad = 0)
+        self._reads.append(
+            (calc_nbytes(data_batch), time.perf_counter() - start)
+        )
 
         if len(data_batch) == 0:
             raise ValueError("Empty data batch extracted from dataset")
@@ -41,15 +111,47 @@ class DataGenerator(IDataGenerator):
         return (inputs, targets, weights)
 
     def __len__(self):
-        return math.ceil(len(self._dataset) / self._batch_size)
+        return len(self._sampler)
+
+    def on_epoch_end(self):
+        if self._reads:
+            nbytes, elapsed = np.sum(self._reads, axis = 0)
+            self._sampler.log_reads(nbytes, elapsed)
+            self._reads = []
+
+        self._sampler.on_epoch_end()
+
+        if self._transforms:
+            self._transforms.on_epoch_end()
+
+        if hasattr(self._dataset, 'on_epoch_end'):
+            self._dataset.on_epoch_end()
+
+    def reseed(self, seed):
+        if self._transforms:
+            self._transforms.reseed(seed)
+
+    @property
+    def sampler(self):
+        return self._sampler
+
+    @property
+    def event_order(self):
+        return self._sampler.event_order
+
+    @property
+    def ragged(self):
+        """Whether vlarr groups are returned as (values, offsets) pairs"""
+        return self._ragged
+
+    @property
+    def bulk(self):
+        """Whether batches are extracted with a single `get_batch` call"""
+        return self._bulk and hasattr(self._dataset, 'get_batch')
 
     @property
     def weights(self):
         return self._weights
 
     def __getitem__(self, index):
-        start = index * self._batch_size
-        end   = min((index + 1) * self._batch_size, len(self._dataset))
-
-        return self.get_data(np.arange(start, end))
-
+        return self.get_data(self._sampler[index], index)
@@ -0,0 +1,264 @@
+"""
+On-disk storage of collated batches backed by memory-mapped files.
+
+A batch store is a directory that holds one flat binary file per batch
+array (e.g. input group, target, weight, or a `values`/`offsets` part of a
+ragged group) and an `index.json` file. The index records dtype of each
+array and (offset, shape) of its piece in each batch, such that batches can
+be read back as zero-copy views of `np.memmap` buffers.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+from .collate import is_ragged
+
+FNAME_INDEX   = 'index.json'
+STORE_VERSION = 1
+ALIGNMENT     = 64
+
+def flatten_batch(batch):
+    """Flatten batch into a list of ((part, group, subpart), array) pairs.
+
+    Parameters
+    ----------
+    batch : tuple of dict
+        Batch (`inputs`, `targets`, `weights`) as returned by data generators.
+        Values of the dictionaries are either arrays or ragged
+        (`values`, `offsets`) pairs.
+
+    Returns
+    -------
+    list of (tuple, ndarray)
+        Flattened batch arrays in a deterministic order. `subpart` is None
+        for dense arrays and 0/1 for `values`/`offsets` of ragged pairs.
+    """
+    result = []
+
+    for (part, data) in enumerate(batch):
+        for group in sorted(data.keys()):
+            value = data[group]
+
+            if is_ragged(value):
+                result.append(((part, group, 0), np.asarray(value[0])))
+                result.append(((part, group, 1), np.asarray(value[1])))
+            else:
+                result.append(((part, group, None), np.asarray(value)))
+
+    return result
+
+def unflatten_batch(keys, arrays, n_parts):
+    """Inverse of `flatten_batch`"""
+    result = tuple({} for _ in range(n_parts))
+
+    for ((part, group, subpart), array) in zip(keys, arrays):
+        if subpart is None:
+            result[part][group] = array
+        elif subpart == 0:
+            result[part][group] = (array, None)
+        else:
+            result[part][group] = (result[part][group][0], array)
+
+    return result
+
+def align_offset(offset):
+    return ((offset + ALIGNMENT - 1) // ALIGNMENT) * ALIGNMENT
+
+def get_array_fname(index):
+    return 'array_%04d.bin' % (index)
+
+def write_batch_store(dgen, path):
+    """Collate all batches of `dgen` and save them under `path`.
+
+    Batches are written into a temporary directory first, which is renamed
+    to `path` only after all of them have been saved. Therefore, an
+    interrupted write never leaves an incomplete store behind.
+
+    Parameters
+    ----------
+    dgen : IDataGenerator
+        Data generator which batches will be stored.
+    path : str
+        Directory of the batch store.
+    """
+    tmpdir = '%s.tmp-%d' % (path, os.getpid())
+    os.makedirs(tmpdir, exist_ok = True)
+
+    index = {
+        'version' : STORE_VERSION,
+        'n_parts' : 0,
+        'arrays'  : [],
+        'batches' : [],
+    }
+
+    files   = []
+    offsets = []
+    keys    = None
+
+    try:
+        for batch_idx in range(len(dgen)):
+            batch = dgen[batch_idx]
+            flat  = flatten_batch(batch)
+
+            if keys is None:
+                keys    = [ k for (k, _) in flat ]
+                offsets = [ 0 ] * len(flat)
+
+                index['n_parts'] = len(batch)
+                index['arrays']  = [
+                    {
+                        'part'    : part,
+                        'group'   : group,
+                        'subpart' : subpart,
+                        'dtype'   : array.dtype.str,
+                        'fname'   : get_array_fname(i),
+                    }
+                    for (i, ((part, group, subpart), array))
+                        in enumerate(flat)
+                ]
+
+                files = [
+                    open(os.path.join(tmpdir, x['fname']), 'wb')
+                        for x in index['arrays']
+                ]
+
+            if [ k for (k, _) in flat ] != keys:
+                raise RuntimeError(
+                    f"Structure of batch {batch_idx} differs from the first"
+                )
+
+            entry = []
+
+            for (idx, (_, array)) in enumerate(flat):
+                array = np.ascontiguousarray(
+                    array, dtype = index['arrays'][idx]['dtype']
+                )
+                start = align_offset(offsets[idx])
+
+                files[idx].seek(start)
+                files[idx].write(array.tobytes())
+
+                offsets[idx] = start + array.nbytes
+                entry.append([ start, list(array.shape) ])
+
+            index['batches'].append(entry)
+
+    except BaseException:
+        for f in files:
+            f.close()
+
+        shutil.rmtree(tmpdir, ignore_errors = True)
+        raise
+
+    for f in files:
+        f.close()
+
+    with open(os.path.join(tmpdir, FNAME_INDEX), 'wt') as f:
+        json.dump(index, f)
+
+    try:
+        os.replace(tmpdir, path)
+    except OSError:
+        # Store has been created concurrently by another process
+        shutil.rmtree(tmpdir, ignore_errors = True)
+
+def batch_store_exists(path):
+    return os.path.exists(os.path.join(path, FNAME_INDEX))
+
+class BatchStore:
+    """Read-only access to batches saved by `write_batch_store`.
+
+    Batch arrays are returned as views of memory-mapped files, so no data is
+    copied until it is actually used.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the batch store.
+    """
+
+    def __init__(self, path):
+        self._path = path
+
+        with open(os.path.join(path, FNAME_INDEX), 'rt') as f:
+            index = json.load(f)
+
+        if index['version'] != STORE_VERSION:
+            raise ValueError(
+                f"Unsupported batch store version {index['version']}"
+            )
+
+        self._n_parts = index['n_parts']
+        self._batches = index['batches']
+        self._keys    = [
+            (x['part'], x['group'], x['subpart']) for x in index['arrays']
+        ]
+        self._dtypes  = [ np.dtype(x['dtype']) for x in index['arrays'] ]
+        self._fnames  = [ x['fname'] for x in index['arrays'] ]
+        self._buffers = None
+
+    def _open_buffers(self):
+        self._buffers = []
+
+        for fname in self._fnames:
+            path = os.path.join(self._path, fname)
+
+            if os.path.getsize(path) == 0:
+                self._buffers.append(np.empty(0, dtype = np.uint8))
+            else:
+                self._buffers.append(
+                    np.memmap(path, dtype = np.uint8, mode = 'r')
+                )
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def ragged(self):
+        """Whether any of the stored groups are ragged (values, offsets)"""
+        return any(subpart is not None for (_, _, subpart) in self._keys)
+
+    @property
+    def n_events(self):
+        """Total number of events in the stored batches"""
+        if len(self._batches) == 0:
+            return 0
+
+        # Dense arrays (e.g. weights) hold one row per event
+        idx = [ subpart for (_, _, subpart) in self._keys ].index(None)
+        return sum(batch[idx][1][0] for batch in self._batches)
+
+    def get_groups(self, part):
+        """Return names of the groups of batch part `part`"""
+        return [
+            group for (p, group, subpart) in self._keys
+                if (p == part) and (subpart != 1)
+        ]
+
+    def __len__(self):
+        return len(self._batches)
+
+    def __getitem__(self, index):
+        if self._buffers is None:
+            self._open_buffers()
+
+        arrays = []
+
+        for (idx, (offset, shape)) in enumerate(self._batches[index]):
+            dtype  = self._dtypes[idx]
+            nbytes = int(np.prod(shape, dtype = np.int64)) * dtype.itemsize
+            buffer = self._buffers[idx][offset:offset + nbytes]
+
+            arrays.append(np.ndarray(shape, dtype = dtype, buffer = buffer))
+
+        return unflatten_batch(self._keys, arrays, self._n_parts)
+
+    def __getstate__(self):
+        # Memory maps are reopened lazily instead of being pickled by value
+        state = self.__dict__.copy()
+        state['_buffers'] = None
+        return state
@@ -0,0 +1,306 @@
+"""
+Batch level equivalents of the stochastic per event transformations.
+
+Batch transformations act on whole bulk batches: dictionaries where scalar
+groups are arrays of shape (N, n_vars) and vlarr groups are ragged
+(`values`, `offsets`) pairs. Random numbers are drawn for the entire batch
+at once and applied with vectorized numpy operations, instead of a python
+loop over events.
+
+Supported transformations:
+  - `noise` : relative or absolute noise added to a subset of variables.
+     If `correlated`, a single noise value is drawn per event (shape (N,))
+     and shared by all affected variables and vlarr elements of the event.
+     Otherwise, each affected value gets an independent draw.
+  - `vlarr-shuffle` : random permutation of vlarr elements of each event.
+"""
+
+import inspect
+
+import numpy as np
+
+from vlne.funcs import unpack_name_args
+
+def gaussian_noise(prg, size, mu = 0, sigma = 1):
+    return prg.normal(mu, sigma, size = size)
+
+def discrete_noise(prg, size, values, probs = None):
+    return prg.choice(values, size = size, p = probs)
+
+NOISES = {
+    'gaussian' : gaussian_noise,
+    'discrete' : discrete_noise,
+}
+
+def select_noise(noise):
+    """Return function `draw(prg, size)` that samples `noise`"""
+    name, kwargs = unpack_name_args(noise)
+
+    if name not in NOISES:
+        raise ValueError(f"Unknown noise {name}")
+
+    func = NOISES[name]
+
+    try:
+        inspect.signature(func).bind(None, None, **kwargs)
+    except TypeError as e:
+        raise ValueError(f"Invalid arguments of {name} noise: {e}") from e
+
+    return lambda prg, size : func(prg, size, **kwargs)
+
+def get_ragged_rows(offsets):
+    """Return event index of each element of a ragged batch"""
+    return np.repeat(
+        np.arange(len(offsets) - 1, dtype = np.int64), np.diff(offsets)
+    )
+
+def get_batch_length(batch):
+    """Return number of events in a bulk batch"""
+    for value in batch.values():
+        if isinstance(value, tuple):
+            return len(value[1]) - 1
+
+        return len(value)
+
+    return 0
+
+def get_var_indices(affected, groups):
+    """Return dict of column indices of `affected` variables of `groups`"""
+    result = {}
+
+    for (group, variables) in (affected or {}).items():
+        if group not in groups:
+            continue
+
+        result[group] = np.array(
+            [ groups[group].index(x) for x in variables ], dtype = np.int64
+        )
+
+    return result
+
+def apply_noise(values, indices, noise, relative):
+    """Apply `noise` to columns `indices` of a copy of `values`"""
+    result = np.array(values, copy = True)
+
+    if relative:
+        result[:, indices] *= (1 + noise).astype(result.dtype)
+    else:
+        result[:, indices] += noise.astype(result.dtype)
+
+    return result
+
+class BatchNoise:
+    """Batch level `noise` transformation.
+
+    Parameters
+    ----------
+    noise : dict
+        Noise distribution specification, e.g.
+        `{ 'name' : 'gaussian', 'mu' : 0, 'sigma' : 0.1 }`.
+    scalar_groups : dict
+        Dictionary of the affected variables of the scalar groups.
+    vlarr_groups : dict
+        Dictionary of the affected variables of the vlarr groups.
+    correlated : bool
+        Whether to use a single noise value per event.
+    relative : bool
+        Whether the noise is multiplicative (`x * (1 + noise)`) or
+        additive (`x + noise`).
+    """
+
+    def __init__(
+        self, noise, scalar_groups, vlarr_groups, correlated, relative
+    ):
+        self._draw          = select_noise(noise)
+        self._scalar_groups = scalar_groups
+        self._vlarr_groups  = vlarr_groups
+        self._correlated    = correlated
+        self._relative      = relative
+
+    def _get_noise(self, prg, event_noise, rows, n_vars):
+        if self._correlated:
+            return event_noise[rows][:, np.newaxis]
+
+        return self._draw(prg, (len(rows), n_vars))
+
+    def __call__(self, batch, prg):
+        n_events    = get_batch_length(batch)
+        event_noise = None
+
+        if self._correlated:
+            event_noise = self._draw(prg, n_events)
+
+        result = dict(batch)
+
+        for (group, indices) in self._scalar_groups.items():
+            rows  = np.arange(n_events)
+            noise = self._get_noise(prg, event_noise, rows, len(indices))
+
+            result[group] = apply_noise(
+                batch[group], indices, noise, self._relative
+            )
+
+        for (group, indices) in self._vlarr_groups.items():
+            values, offsets = batch[group]
+
+            values = values[offsets[0]:offsets[-1]]
+            rows   = get_ragged_rows(offsets)
+            noise  = self._get_noise(prg, event_noise, rows, len(indices))
+
+            result[group] = (
+                apply_noise(values, indices, noise, self._relative),
+                offsets - offsets[0]
+            )
+
+        return result
+
+class BatchVlarrShuffle:
+    """Batch level `vlarr-shuffle` transformation of a vlarr `group`"""
+
+    def __init__(self, group):
+        self._group = group
+
+    def __call__(self, batch, prg):
+        values, offsets = batch[self._group]
+
+        values = values[offsets[0]:offsets[-1]]
+        rows   = get_ragged_rows(offsets)
+
+        # Sort random keys within each event, keeping events in place
+        order  = np.lexsort((prg.random(len(rows)), rows))
+
+        result = dict(batch)
+        result[self._group] = (values[order], offsets - offsets[0])
+
+        return result
+
+def select_batch_transform(transform, scalar_groups, vlarr_groups):
+    """Construct batch transformation from its specification.
+
+    Parameters
+    ----------
+    transform : dict or str
+        Per event transformation specification.
+    scalar_groups : dict
+        Column names of the scalar groups.
+    vlarr_groups : dict
+        Column names of the vlarr groups.
+
+    Raises
+    ------
+    ValueError
+        If `transform` does not have a batch level equivalent.
+    """
+    name, kwargs = unpack_name_args(transform)
+
+    if name == 'noise':
+        return BatchNoise(
+            kwargs['noise'],
+            get_var_indices(kwargs.get('scalar_groups'), scalar_groups),
+            get_var_indices(kwargs.get('vlarr_groups'),  vlarr_groups),
+            correlated = kwargs.get('correlated', False),
+            relative   = kwargs.get('relative',   False),
+        )
+
+    if name == 'vlarr-shuffle':
+        return BatchVlarrShuffle(kwargs['vlarr_group'])
+
+    raise ValueError(f"No batch equivalent of the {name} transformation")
+
+def can_batch_transform(transform, scalar_groups, vlarr_groups, vlarr_limits):
+    """Check whether `transform` can be moved to the batch level"""
+    name, kwargs = unpack_name_args(transform)
+
+    if name == 'vlarr-shuffle':
+        # Datasets truncate vlarrs after the shuffle
+        if (vlarr_limits or {}).get(kwargs.get('vlarr_group')) is not None:
+            return False
+
+    try:
+        select_batch_transform(transform, scalar_groups, vlarr_groups)
+    except (ValueError, KeyError):
+        return False
+
+    return True
+
+def split_batch_transforms(
+    transforms, scalar_groups, vlarr_groups, vlarr_limits = None
+):
+    """Split `transforms` into per event part and the batch level suffix.
+
+    Returns
+    -------
+    (event, batch) : (list, list)
+        `batch` is the longest suffix of `transforms` that has batch level
+        equivalents, and `event` holds the preceding transformations.
+    """
+    transforms = transforms or []
+    idx        = len(transforms)
+
+    while (idx > 0) and can_batch_transform(
+        transforms[idx - 1], scalar_groups, vlarr_groups, vlarr_limits
+    ):
+        idx -= 1
+
+    return (transforms[:idx], transforms[idx:])
+
+def get_seed_entropy(seed):
+    """Return list of ints that seeds `SeedSequence` like `seed` does"""
+    if seed is None:
+        return [ np.random.SeedSequence().entropy ]
+
+    if isinstance(seed, np.random.SeedSequence):
+        return [ int(x) for x in seed.generate_state(4) ]
+
+    return [ int(x) for x in np.ravel(seed) ]
+
+class BatchTransforms:
+    """Chain of batch level transformations with per batch random generators.
+
+    Random numbers of each batch are drawn from a generator seeded by
+    (`seed`, epoch, batch index). Therefore, the augmentation of a batch
+    does not depend on the order in which batches are constructed, nor on
+    the thread or worker process that constructs it.
+
+    Parameters
+    ----------
+    transforms : list
+        Transformation specifications.
+    scalar_groups : dict
+        Column names of the scalar groups.
+    vlarr_groups : dict
+        Column names of the vlarr groups.
+    seed : int, list of int or None, optional
+        Base seed of the random number generators. Default: None.
+    """
+
+    def __init__(self, transforms, scalar_groups, vlarr_groups, seed = None):
+        self._seed       = get_seed_entropy(seed)
+        self._epoch      = 0
+        self._transforms = [
+            select_batch_transform(x, scalar_groups, vlarr_groups)
+                for x in transforms
+        ]
+
+    def __len__(self):
+        return len(self._transforms)
+
+    def reseed(self, seed):
+        self._seed = get_seed_entropy(seed)
+
+    def on_epoch_end(self):
+        self._epoch += 1
+
+    def get_prg(self, index):
+        """Return random generator of batch `index` of the current epoch"""
+        return np.random.default_rng(
+            np.random.SeedSequence([ *self._seed, self._epoch, int(index) ])
+        )
+
+    def __call__(self, batch, index = 0):
+        prg = self.get_prg(index)
+
+        for transform in self._transforms:
+            batch = transform(batch, prg)
+
+        return batch
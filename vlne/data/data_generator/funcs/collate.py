@@ -0,0 +1,200 @@
+"""
+Functions to assemble batches of events into dense arrays.
+
+Variable length arrays (vlarr) are passed around in a ragged form: a pair
+(`values`, `offsets`), where `values` is an array of shape (M, n_vars) holding
+elements of all events concatenated together and `offsets` is an array of
+shape (N + 1,), such that elements of the event `i` are
+`values[offsets[i]:offsets[i+1]]`.
+"""
+
+import numpy as np
+
+def is_ragged(batch):
+    """Check whether `batch` is a ragged (`values`, `offsets`) pair"""
+    return isinstance(batch, tuple) and (len(batch) == 2)
+
+def get_ragged_lengths(offsets):
+    """Return number of elements of each event in a ragged batch"""
+    return np.diff(offsets)
+
+def ragged_from_list(arrays, n_vars = None, dtype = np.float32):
+    """Convert a list of per event arrays into a ragged batch.
+
+    Parameters
+    ----------
+    arrays : list of ndarray, shape (len_i, n_vars)
+        Variable length arrays of individual events.
+    n_vars : int or None, optional
+        Number of variables. If None, it will be inferred from `arrays`.
+    dtype : dtype, optional
+        Data type of the resulting `values`. Default: float32.
+
+    Returns
+    -------
+    (values, offsets) : (ndarray, ndarray)
+        Ragged representation of `arrays`.
+    """
+    lengths = np.fromiter(
+        (len(x) for x in arrays), dtype = np.int64, count = len(arrays)
+    )
+
+    offsets     = np.zeros(len(arrays) + 1, dtype = np.int64)
+    offsets[1:] = np.cumsum(lengths)
+
+    if n_vars is None:
+        n_vars = next(
+            (x.shape[1] for x in arrays if np.ndim(x) == 2), 0
+        )
+
+    values = np.empty((offsets[-1], n_vars), dtype = dtype)
+
+    for (idx, arr) in enumerate(arrays):
+        if lengths[idx] > 0:
+            values[offsets[idx]:offsets[idx+1]] = arr
+
+    return (values, offsets)
+
+def take_ragged(values, offsets, indices):
+    """Extract events `indices` from a ragged array without a python loop.
+
+    Parameters
+    ----------
+    values : ndarray, shape (M, n_vars)
+        Concatenated elements of all events.
+    offsets : ndarray, shape (N + 1,)
+        Event boundaries in `values`.
+    indices : ndarray of int
+        Indices of events to extract.
+
+    Returns
+    -------
+    (values, offsets) : (ndarray, ndarray)
+        Ragged batch made of the events `indices`.
+    """
+    indices = np.asarray(indices, dtype = np.int64)
+    starts  = offsets[indices]
+    lengths = offsets[indices + 1] - starts
+
+    batch_offsets     = np.zeros(len(indices) + 1, dtype = np.int64)
+    batch_offsets[1:] = np.cumsum(lengths)
+
+    if (len(indices) > 0) and np.all(indices[1:] - indices[:-1] == 1):
+        # Fast path for contiguous ranges
+        start = starts[0]
+        return (values[start:start + batch_offsets[-1]], batch_offsets)
+
+    positions = (
+          np.arange(batch_offsets[-1], dtype = np.int64)
+        + np.repeat(starts - batch_offsets[:-1], lengths)
+    )
+
+    return (values[positions], batch_offsets)
+
+def pad_ragged(values, offsets, pad = 0, max_length = None, dtype = None):
+    """Convert ragged batch into a dense padded array.
+
+    Parameters
+    ----------
+    values : ndarray, shape (M, n_vars)
+        Concatenated elements of all events.
+    offsets : ndarray, shape (N + 1,)
+        Event boundaries in `values`.
+    pad : float, optional
+        Value to pad missing elements with. Default: 0.
+    max_length : int or None, optional
+        Length of the padded dimension. If None, it is set to the length of
+        the longest event. Longer events will be truncated. Default: None.
+    dtype : dtype or None, optional
+        Data type of the result. If None, dtype of `values` is used.
+
+    Returns
+    -------
+    ndarray, shape (N, max_length, n_vars)
+        Padded batch.
+    """
+    lengths = get_ragged_lengths(offsets)
+    n_vars  = values.shape[1] if values.ndim == 2 else 0
+
+    if max_length is None:
+        max_length = int(lengths.max()) if len(lengths) > 0 else 0
+
+    result = np.full(
+        (len(lengths), max_length, n_vars), pad,
+        dtype = dtype or values.dtype
+    )
+
+    if len(lengths) == 0:
+        return result
+
+    values = values[offsets[0]:offsets[-1]]
+
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    cols = (
+          np.arange(len(values), dtype = np.int64)
+        - np.repeat(offsets[:-1] - offsets[0], lengths)
+    )
+    mask = (cols < max_length)
+
+    result[rows[mask], cols[mask]] = values[mask]
+
+    return result
+
+def collate_bulk_batch(batch, pad = 0):
+    """Assemble bulk batch returned by `get_batch` into dense arrays.
+
+    Parameters
+    ----------
+    batch : dict
+        Dictionary where keys are group names and values are either arrays of
+        shape (N, n_vars) for scalar groups or ragged (`values`, `offsets`)
+        pairs for vlarr groups.
+    pad : float, optional
+        Value to pad vlarr groups with. Default: 0.
+
+    Returns
+    -------
+    dict
+        Dictionary of dense arrays. Vlarr groups are padded to the length of
+        the longest event in the batch.
+    """
+    result = {}
+
+    for (group, values) in batch.items():
+        if is_ragged(values):
+            result[group] = pad_ragged(*values, pad = pad)
+        else:
+            result[group] = np.asarray(values)
+
+    return result
+
+def collate_events_ragged(events):
+    """Assemble a list of per event dicts into a bulk batch.
+
+    Parameters
+    ----------
+    events : list of dict
+        List of events, where each event is a dictionary of group arrays.
+
+    Returns
+    -------
+    dict
+        Dictionary where scalar groups are arrays of shape (N, n_vars) and
+        vlarr groups are ragged (`values`, `offsets`) pairs.
+    """
+    result = {}
+
+    if len(events) == 0:
+        return result
+
+    for (group, value) in events[0].items():
+        values = [ x[group] for x in events ]
+
+        if np.ndim(value) == 2:
+            result[group] = ragged_from_list(
+                values, n_vars = value.shape[1], dtype = value.dtype
+            )
+        else:
+            result[group] = np.stack(values)
+
+    return result
@@ -0,0 +1,232 @@
+"""
+Compact storage of cached arrays in a reduced floating point precision.
+
+Cached input groups can be stored as float16 or bfloat16 arrays, taking two
+(or four, for float64 inputs) times less memory. Target and weight arrays
+are stored as float32. Inputs are cast back to float32 when events or
+batches are extracted from the cache.
+
+float16 has a limited range (|x| < 65504) and bfloat16 has a limited
+precision (8 significant bits), so each cached column is checked and a
+warning is issued if its values overflow or lose too much precision.
+"""
+
+import logging
+import numpy as np
+
+from .collate import is_ragged
+
+LOGGER = logging.getLogger('vlne.data')
+
+# Relative rounding error above which a column is reported as imprecise
+DEF_RTOL = 1e-2
+
+def get_compact_dtype(name):
+    """Return numpy dtype of the compact storage `name`"""
+    if name == 'float16':
+        return np.dtype(np.float16)
+
+    if name == 'bfloat16':
+        # pylint: disable=import-outside-toplevel
+        try:
+            import ml_dtypes
+        except ImportError as e:
+            raise ImportError(
+                "bfloat16 cache requires the `ml_dtypes` package."
+                " Install it with `pip install vlne[bfloat16]`"
+            ) from e
+
+        return np.dtype(ml_dtypes.bfloat16)
+
+    raise ValueError(f"Unknown cache dtype {name}")
+
+def is_float_array(array):
+    """Check whether `array` holds floating point numbers of any precision"""
+    return (array.dtype.kind == 'f') or (array.dtype.name == 'bfloat16')
+
+def to_float32(array):
+    """Cast floating point `array` to float32, keeping other arrays intact"""
+    array = np.asarray(array)
+
+    if is_float_array(array) and (array.dtype != np.float32):
+        return array.astype(np.float32)
+
+    return array
+
+class PrecisionChecker:
+    """Warn (once per column) if values do not fit into a compact dtype.
+
+    Parameters
+    ----------
+    dtype : dtype
+        Compact dtype.
+    columns : dict or None, optional
+        Column names of each group, used in the warning messages.
+        Default: None.
+    rtol : float, optional
+        Maximum tolerated relative rounding error. Default: DEF_RTOL.
+    """
+
+    def __init__(self, dtype, columns = None, rtol = DEF_RTOL):
+        self._dtype   = dtype
+        self._columns = columns or {}
+        self._rtol    = rtol
+        self._warned  = set()
+
+    def _get_column_name(self, group, index):
+        columns = self._columns.get(group, None)
+
+        if (columns is None) or (index >= len(columns)):
+            return f'{group}[{index}]'
+
+        return f'{group}:{columns[index]}'
+
+    def _warn(self, kind, group, index, message, *args):
+        if (kind, group, index) in self._warned:
+            return
+
+        self._warned.add((kind, group, index))
+        LOGGER.warning(
+            "Column '%s' " + message,
+            self._get_column_name(group, index), *args
+        )
+
+    def check(self, group, values, compact):
+        """Compare `values` of `group` to their `compact` representation"""
+        if values.size == 0:
+            return
+
+        n_vars   = values.shape[-1] if values.ndim > 1 else 1
+        values   = values.astype(np.float64).reshape((-1, n_vars))
+        restored = compact.astype(np.float64).reshape((-1, n_vars))
+
+        finite   = np.isfinite(values)
+        overflow = finite & ~np.isfinite(restored)
+        nonzero  = finite & ~overflow & (values != 0)
+
+        error = np.zeros_like(values)
+        error[nonzero] = (
+            np.abs(restored[nonzero] - values[nonzero])
+            / np.abs(values[nonzero])
+        )
+
+        n_overflow = np.sum(overflow, axis = 0)
+        max_error  = np.max(error, axis = 0)
+
+        for index in np.flatnonzero(n_overflow):
+            self._warn(
+                'overflow', group, index,
+                "overflows %s cache: %d values are out of range",
+                self._dtype.name, n_overflow[index]
+            )
+
+        for index in np.flatnonzero(max_error > self._rtol):
+            self._warn(
+                'precision', group, index,
+                "loses precision in %s cache: relative error up to %.2g",
+                self._dtype.name, max_error[index]
+            )
+
+class ArrayCompactor:
+    """Convert cached data into the compact representation and back.
+
+    Parameters
+    ----------
+    dtype : str
+        Storage type of the input groups: 'float16' or 'bfloat16'.
+    input_groups : list of str
+        Groups to store in `dtype`. Floating point arrays of other groups
+        (targets and weights) are stored as float32.
+    columns : dict or None, optional
+        Column names of each group, used in the warning messages.
+        Default: None.
+    rtol : float, optional
+        Relative rounding error above which a warning is issued.
+        Default: DEF_RTOL.
+
+    Attributes
+    ----------
+    nbytes_full : int
+        Size of all compacted arrays before compaction.
+    nbytes_compact : int
+        Size of all compacted arrays after compaction.
+    """
+
+    def __init__(self, dtype, input_groups, columns = None, rtol = DEF_RTOL):
+        self._dtype        = get_compact_dtype(dtype)
+        self._input_groups = set(input_groups)
+        self._checker      = PrecisionChecker(self._dtype, columns, rtol)
+
+        self.nbytes_full    = 0
+        self.nbytes_compact = 0
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    def _compact_array(self, group, array):
+        array = np.asarray(array)
+
+        if not is_float_array(array):
+            result = array
+        elif group in self._input_groups:
+            # Overflows are reported by the checker per column
+            with np.errstate(over = 'ignore'):
+                result = array.astype(self._dtype)
+
+            self._checker.check(group, array, result)
+        else:
+            result = to_float32(array)
+
+        self.nbytes_full    += array.nbytes
+        self.nbytes_compact += result.nbytes
+
+        return result
+
+    def compact_group(self, group, value):
+        """Compact array (or ragged pair) `value` of `group`"""
+        if is_ragged(value):
+            values, offsets = value
+            return (self._compact_array(group, values), offsets)
+
+        return self._compact_array(group, value)
+
+    def restore_group(self, group, value):
+        """Cast compact `value` of `group` back to float32"""
+        if group not in self._input_groups:
+            return value
+
+        if is_ragged(value):
+            values, offsets = value
+            return (to_float32(values), offsets)
+
+        return to_float32(value)
+
+    def compact(self, data):
+        """Compact dict of groups `data`"""
+        return { k : self.compact_group(k, v) for (k, v) in data.items() }
+
+    def restore(self, data):
+        """Restore dict of groups `data` compacted by `compact`"""
+        return { k : self.restore_group(k, v) for (k, v) in data.items() }
+
+    def compact_batch(self, batch):
+        """Compact (inputs, targets, weights) batch"""
+        return tuple(self.compact(x) for x in batch)
+
+    def restore_batch(self, batch):
+        """Restore (inputs, targets, weights) batch compacted earlier"""
+        return tuple(self.restore(x) for x in batch)
+
+    def log_savings(self, name = ''):
+        """Log memory saved by the compact representation"""
+        if self.nbytes_full == 0:
+            return
+
+        LOGGER.info(
+            "Compact %s cache %s: %.1f MiB instead of %.1f MiB"
+            " (%.1f%% saved)",
+            self._dtype.name, name,
+            self.nbytes_compact / 2**20, self.nbytes_full / 2**20,
+            100 * (1 - self.nbytes_compact / self.nbytes_full)
+        )
@@ -0,0 +1,83 @@
+"""
+Lazy columns that read rows of a data frame on demand.
+
+These columns let data generators keep per event arrays (e.g. weights)
+without loading the whole data frame columns into memory.
+"""
+
+import numpy as np
+
+def get_row_indices(rows, length):
+    """Convert `rows` (int, slice, mask or indices) into array of indices"""
+    if isinstance(rows, (int, np.integer)):
+        return np.array([ rows % length ], dtype = np.int64)
+
+    if isinstance(rows, slice):
+        return np.arange(length)[rows]
+
+    rows = np.asarray(rows)
+
+    if rows.dtype == bool:
+        return np.flatnonzero(rows)
+
+    return rows
+
+class FrameColumn:
+    """Column of a data frame which rows are read only when accessed.
+
+    Parameters
+    ----------
+    df : IDataFrame
+        Data frame that supports (`column`, `rows`) keys.
+    column : str
+        Column name.
+    """
+
+    def __init__(self, df, column):
+        self._df     = df
+        self._column = column
+
+    def __len__(self):
+        return len(self._df)
+
+    def __getitem__(self, rows):
+        indices = get_row_indices(rows, len(self))
+        result  = np.asarray(self._df[self._column, indices])
+
+        if isinstance(rows, (int, np.integer)):
+            return result[0]
+
+        return result
+
+    def __array__(self, dtype = None, copy = None):
+        # pylint: disable=unused-argument
+        return np.asarray(self._df[self._column], dtype)
+
+class ConstColumn:
+    """Column of `length` identical values that takes no memory.
+
+    Parameters
+    ----------
+    length : int
+        Number of rows.
+    value : float, optional
+        Value of each row. Default: 1.
+    """
+
+    def __init__(self, length, value = 1):
+        self._length = length
+        self._value  = value
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, rows):
+        if isinstance(rows, (int, np.integer)):
+            return np.float64(self._value)
+
+        indices = get_row_indices(rows, len(self))
+        return np.full(len(indices), self._value, dtype = np.float64)
+
+    def __array__(self, dtype = None, copy = None):
+        # pylint: disable=unused-argument
+        return np.full(self._length, self._value, dtype = dtype or np.float64)
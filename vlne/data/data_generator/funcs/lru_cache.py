@@ -0,0 +1,137 @@
+"""
+Definition of a memory bounded LRU cache for data batches and events.
+"""
+
+import collections
+import logging
+import threading
+
+import numpy as np
+
+LOGGER = logging.getLogger('vlne.data')
+
+def calc_nbytes(obj):
+    """Calculate memory (in bytes) used by arrays of a nested structure"""
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            # Variable length arrays
+            return obj.nbytes + sum(calc_nbytes(x) for x in obj.flat)
+
+        return obj.nbytes
+
+    if isinstance(obj, dict):
+        return sum(calc_nbytes(x) for x in obj.values())
+
+    if isinstance(obj, (list, tuple)):
+        return sum(calc_nbytes(x) for x in obj)
+
+    return np.asarray(obj).nbytes
+
+class LRUCache:
+    """Cache that evicts least recently used items to stay within a budget.
+
+    The cache can be shared between threads (e.g. the prefetching threads
+    and the parallel calls of `tf.data`): all accesses are serialized by a
+    lock.
+
+    Parameters
+    ----------
+    budget : int or None
+        Memory budget in bytes. If None, the cache is unbounded.
+    name : str, optional
+        Cache name to use in log messages. Default: ''.
+
+    Attributes
+    ----------
+    hits : int
+        Number of cache hits since the last `reset_stats`.
+    misses : int
+        Number of cache misses since the last `reset_stats`.
+    evictions : int
+        Number of evicted items since the last `reset_stats`.
+    nbytes : int
+        Memory used by the cached items.
+    """
+
+    def __init__(self, budget, name = ''):
+        self._budget = budget
+        self._name   = name
+        self._items  = collections.OrderedDict()
+        self._lock   = threading.Lock()
+
+        self.nbytes    = 0
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, count_miss = True):
+        """Return item `key` or None if it is not in the cache.
+
+        If `count_miss` is False, a missing item is not counted as a miss,
+        e.g. when the lookup is going to be repeated under another lock.
+        """
+        with self._lock:
+            item = self._items.get(key, None)
+
+            if item is None:
+                self.misses += int(count_miss)
+                return None
+
+            self.hits += 1
+            self._items.move_to_end(key)
+
+            return item[0]
+
+    def put(self, key, value):
+        """Insert `value` into the cache, evicting old items if needed"""
+        size = calc_nbytes(value)
+
+        if (self._budget is not None) and (size > self._budget):
+            return
+
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= self._items.pop(key)[1]
+
+            self._items[key] = (value, size)
+            self.nbytes     += size
+
+            while (self._budget is not None) and (self.nbytes > self._budget):
+                _, (_, evicted_size) = self._items.popitem(last = False)
+                self.nbytes    -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items = collections.OrderedDict()
+            self.nbytes = 0
+
+    def log_stats(self):
+        """Log cache counters"""
+        with self._lock:
+            LOGGER.info(
+                "Cache %s: %d hits, %d misses, %d evictions."
+                " %d items use %.1f MiB",
+                self._name, self.hits, self.misses, self.evictions,
+                len(self._items), self.nbytes / 2**20
+            )
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits      = 0
+            self.misses    = 0
+            self.evictions = 0
+
+    def __getstate__(self):
+        # Locks cannot be pickled
+        state = self.__dict__.copy()
+        state.pop('_lock')
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
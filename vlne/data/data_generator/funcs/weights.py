@@ -41,8 +41,12 @@ def calc_flat_whist(
     wvalues    = df[var]
     hist, bins = np.histogram(wvalues, bins = bins, range = range)
 
+    return (wvalues, invert_hist(hist, clip), bins)
+
+def invert_hist(hist, clip = None):
+    """Return normalized inverse of the regularized histogram `hist`"""
     # Regularization
-    hist += 1
+    hist  = hist + 1
     whist = 1 / hist
 
     if clip is not None:
@@ -51,9 +55,17 @@ def calc_flat_whist(
 
         whist[whist > max_w] = max_w
 
-    whist = whist / sum(whist)
+    return whist / sum(whist)
+
+def get_weight_positions(values, bins):
+    """Return indices of the inverse histogram bins of `values`"""
+    wpos = np.digitize(values, bins)
 
-    return (wvalues, whist, bins)
+    # [0, len(bins)] are overflow bins
+    wpos[wpos == 0] = 1
+    wpos[wpos == len(bins)] = len(bins) - 1
+
+    return wpos - 1
 
 def flat_weights(
     df, var = 'trueE', bins = 50, range = (0, 5), clip = None
@@ -85,14 +97,85 @@ def flat_weights(
     # pylint: disable=redefined-builtin
     (wvalues, whist, bins) = calc_flat_whist(df, var, bins, range, clip)
 
-    wpos = np.digitize(wvalues, bins)
-
-    # [0, len(bins)] are overflow bins
-    wpos[wpos == 0] = 1
-    wpos[wpos == len(bins)] = len(bins) - 1
-
-    weights = whist[wpos - 1]
+    weights = whist[get_weight_positions(wvalues, bins)]
     weights = weights / sum(weights) * len(df)
 
     return weights
 
+def iter_chunks(n, chunk_size):
+    """Yield row indices of `n` rows split into chunks of `chunk_size`"""
+    for start in range(0, n, chunk_size):
+        yield np.arange(start, min(start + chunk_size, n))
+
+def read_chunk(df, var, rows):
+    """Read values of column `var` of `df` at `rows`"""
+    return np.asarray(df[var, rows]).reshape(len(rows), -1)[:, 0]
+
+def get_chunked_range(df, var, chunk_size):
+    """Find (min, max) of column `var`, reading `chunk_size` rows at a time"""
+    vmin = np.inf
+    vmax = -np.inf
+
+    for rows in iter_chunks(len(df), chunk_size):
+        values = read_chunk(df, var, rows)
+
+        if len(values) > 0:
+            vmin = min(vmin, np.min(values))
+            vmax = max(vmax, np.max(values))
+
+    if vmin > vmax:
+        return (0, 1)
+
+    return (vmin, vmax)
+
+def flat_weights_chunked(
+    df, out, chunk_size, var = 'trueE', bins = 50, range = (0, 5),
+    clip = None
+):
+    """Calculate `flat_weights` reading `chunk_size` rows of `df` at a time.
+
+    This function produces the same weights as `flat_weights`, but it never
+    holds whole `var` column in memory. Instead, it makes two passes over the
+    data (three if `range` is None): the first one accumulates the histogram
+    of `var`, and the second one writes the weights into `out`.
+
+    Parameters
+    ----------
+    df : IDataFrame
+        Data Frame that contains `var` column and supports (`column`, `rows`)
+        keys.
+    out : ndarray, shape (len(df),)
+        Array (e.g. memory-mapped one) to write weights to.
+    chunk_size : int
+        Number of rows to read at a time.
+    var, bins, range, clip
+        C.f. `flat_weights`.
+
+    Returns
+    -------
+    ndarray, shape (len(df),)
+        `out`, filled with weights.
+    """
+    # pylint: disable=redefined-builtin
+    if range is None:
+        range = get_chunked_range(df, var, chunk_size)
+
+    bins   = np.histogram_bin_edges([], bins = bins, range = range)
+    hist   = np.zeros(len(bins) - 1, dtype = np.int64)
+    counts = np.zeros(len(bins) - 1, dtype = np.int64)
+
+    for rows in iter_chunks(len(df), chunk_size):
+        values  = read_chunk(df, var, rows)
+        hist   += np.histogram(values, bins = bins)[0]
+        counts += np.bincount(
+            get_weight_positions(values, bins), minlength = len(counts)
+        )
+
+    whist = invert_hist(hist, clip)
+    whist = whist / np.sum(counts * whist) * len(df)
+
+    for rows in iter_chunks(len(df), chunk_size):
+        values    = read_chunk(df, var, rows)
+        out[rows] = whist[get_weight_positions(values, bins)]
+
+    return out
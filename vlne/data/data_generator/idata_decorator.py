@@ -3,7 +3,9 @@ from .idata_generator import IDataGenerator
 class IDataDecorator(IDataGenerator):
 
     def __init__(self, dgen):
-        super().__init__(dgen.dataset, dgen.input_groups, dgen.target_groups)
+        # Dataset is looked up lazily, since replayed data generators
+        # construct it only on demand
+        super().__init__(None, dgen.input_groups, dgen.target_groups)
         self._dgen = dgen
 
     def __len__(self):
@@ -12,6 +14,12 @@ class IDataDecorator(IDataGenerator):
     def __getitem__(self, index):
         return self._dgen[index]
 
+    def on_epoch_end(self):
+        self._dgen.on_epoch_end()
+
+    def reseed(self, seed):
+        self._dgen.reseed(seed)
+
     @property
     def dataset(self):
         return self._dgen.dataset
@@ -20,3 +28,18 @@ class IDataDecorator(IDataGenerator):
     def weights(self):
         return self._dgen.weights
 
+    @property
+    def sampler(self):
+        return self._dgen.sampler
+
+    @property
+    def event_order(self):
+        return self._dgen.event_order
+
+    @property
+    def ragged(self):
+        return self._dgen.ragged
+
+    @property
+    def replayed(self):
+        return self._dgen.replayed
@@ -22,6 +22,34 @@ class IDataGenerator:
     def weights(self):
         raise NotImplementedError
 
+    @property
+    def ragged(self):
+        """Whether vlarr inputs are ragged (values, offsets) pairs"""
+        return False
+
+    @property
+    def replayed(self):
+        """Whether batches are replayed from a batch store"""
+        return False
+
+    @property
+    def event_order(self):
+        """Order of events in the concatenated batches.
+
+        Returns
+        -------
+        ndarray or None
+            Dataset indices of events in the order they appear in batches
+            `[0, len(self))`. None if events are not reordered.
+        """
+        return None
+
+    def on_epoch_end(self):
+        pass
+
+    def reseed(self, seed):
+        """Reseed random number generators of the stochastic batch parts"""
+
     def __len__(self):
         raise NotImplementedError
 
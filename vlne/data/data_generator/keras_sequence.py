@@ -1,6 +1,17 @@
+import tensorflow as tf
 from tensorflow.keras.utils import Sequence
+
+from .funcs.collate   import is_ragged
 from .idata_decorator import IDataDecorator
 
+def convert_ragged_inputs(inputs):
+    """Convert ragged (values, offsets) pairs into `tf.RaggedTensor`"""
+    return {
+        k : tf.RaggedTensor.from_row_splits(*v, validate = False)
+                if is_ragged(v) else v
+            for (k, v) in inputs.items()
+    }
+
 class KerasSequence(IDataDecorator, Sequence):
 
     def __init__(self, dgen):
@@ -10,5 +21,13 @@ class KerasSequence(IDataDecorator, Sequence):
         return len(self._dgen)
 
     def __getitem__(self, index):
-        return self._dgen[index]
+        batch = self._dgen[index]
+
+        if self.ragged:
+            (inputs, targets, weights) = batch
+            batch = (convert_ragged_inputs(inputs), targets, weights)
+
+        return batch
 
+    def on_epoch_end(self):
+        self._dgen.on_epoch_end()
@@ -0,0 +1,130 @@
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .idata_decorator import IDataDecorator
+
+LOGGER = logging.getLogger('vlne.data')
+
+class PrefetchingGenerator(IDataDecorator):
+    """Decorator that builds upcoming batches in a background thread pool.
+
+    When batch `index` is requested, the batches with indices in the range
+    [`index` + 1, `index` + `prefetch`] are scheduled for construction in
+    background threads, so that they are ready by the time they are
+    requested. Batches are returned in order.
+
+    The look-ahead is useful only if batches are requested sequentially.
+    Batches that need to be reshuffled every epoch should be permuted by
+    the decorated generator instead (c.f. `ShufflingGenerator`).
+
+    Parameters
+    ----------
+    dgen : IDataGenerator
+        Data generator to prefetch batches from.
+    prefetch : int
+        Maximum number of batches being prefetched at any moment.
+    threads : int or None, optional
+        Number of background threads. If None, it is equal to `prefetch`.
+        Default: None.
+
+    Attributes
+    ----------
+    wait_times : list of float
+        Times (in seconds) that consumer waited for each batch of the current
+        epoch.
+    """
+
+    def __init__(self, dgen, prefetch, threads = None):
+        super().__init__(dgen)
+
+        self._prefetch   = prefetch
+        self._threads    = threads or prefetch
+        self._executor   = None
+        self._pending    = {}
+        self.wait_times  = []
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers        = self._threads,
+                thread_name_prefix = 'vlne-prefetch',
+            )
+
+        return self._executor
+
+    def _cancel_pending(self, keep = ()):
+        """Cancel prefetching of batches, except the ones in `keep`"""
+        pending = {}
+
+        for (index, future) in self._pending.items():
+            if index in keep:
+                pending[index] = future
+            else:
+                future.cancel()
+
+        self._pending = pending
+
+    def _get_window(self, index):
+        return range(index + 1, min(index + self._prefetch, len(self) - 1) + 1)
+
+    def _schedule(self, index):
+        for i in self._get_window(index):
+            if i not in self._pending:
+                self._pending[i] = self._get_executor().submit(
+                    self._dgen.__getitem__, i
+                )
+
+    def __getitem__(self, index):
+        future = self._pending.pop(index, None)
+
+        # Only the prefetched batches that follow `index` are still useful
+        # (e.g. after an out of order access)
+        self._cancel_pending(keep = self._get_window(index))
+
+        if future is None:
+            future = self._get_executor().submit(self._dgen.__getitem__, index)
+
+        self._schedule(index)
+
+        start  = time.perf_counter()
+        result = future.result()
+        self.wait_times.append(time.perf_counter() - start)
+
+        return result
+
+    def on_epoch_end(self):
+        # Batch composition may change at the epoch end.
+        self._cancel_pending()
+
+        if len(self.wait_times) > 0:
+            LOGGER.info(
+                "Prefetching: waited for batches %.3f s in total,"
+                " %.2f ms on average, %.2f ms at most over %d batches",
+                np.sum(self.wait_times),
+                1000 * np.mean(self.wait_times),
+                1000 * np.max(self.wait_times),
+                len(self.wait_times)
+            )
+
+        self.wait_times = []
+        self._dgen.on_epoch_end()
+
+    def close(self):
+        """Stop background threads"""
+        self._cancel_pending()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait = True)
+            self._executor = None
+
+    def __getstate__(self):
+        # Thread pools cannot be pickled (e.g. by keras multiprocessing)
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_pending']  = {}
+
+        return state
@@ -0,0 +1,106 @@
+from .funcs.batch_store import BatchStore
+from .idata_generator   import IDataGenerator
+
+class ReplayGenerator(IDataGenerator):
+    """Data generator that serves batches from an on-disk batch store.
+
+    Batches are read as zero-copy views of memory-mapped files, created by
+    `write_batch_store`. Therefore, batches are served without data frame
+    reads, transformations or collation.
+
+    The data generator that has produced the stored batches provides access
+    to the dataset and weights of the events. It can be given as a function
+    that is called only when they are requested (e.g. by the evaluation), such
+    that training replays batches without constructing any data frames.
+
+    Parameters
+    ----------
+    dgen : IDataGenerator or callable
+        Data generator that has produced the stored batches, or a function
+        without arguments that constructs it.
+    path : str
+        Directory of the batch store.
+    sampler : ISampler or None, optional
+        Sampler of the stored batches. If None, the sampler of `dgen` is used.
+        Default: None.
+    """
+
+    def __init__(self, dgen, path, sampler = None):
+        self._store   = BatchStore(path)
+        self._path    = path
+        self._dgen    = None
+        self._make    = None
+        self._sampler = sampler
+
+        super().__init__(
+            None, self._store.get_groups(0), self._store.get_groups(1)
+        )
+
+        if callable(dgen) and not isinstance(dgen, IDataGenerator):
+            self._make = dgen
+        else:
+            self._set_dgen(dgen)
+
+    def _set_dgen(self, dgen):
+        if len(self._store) != len(dgen):
+            raise ValueError(
+                f"Batch store '{self._path}' holds {len(self._store)}"
+                f" batches, but {len(dgen)} were expected"
+            )
+
+        self._dgen = dgen
+
+    @property
+    def store(self):
+        return self._store
+
+    @property
+    def decorated(self):
+        """Data generator that has produced the stored batches"""
+        if self._dgen is None:
+            self._set_dgen(self._make())
+            self._make = None
+
+        return self._dgen
+
+    def __len__(self):
+        return len(self._store)
+
+    def __getitem__(self, index):
+        return self._store[index]
+
+    def on_epoch_end(self):
+        # Data generator that has not been constructed has no state to update
+        if self._dgen is not None:
+            self._dgen.on_epoch_end()
+
+    def reseed(self, seed):
+        if self._dgen is not None:
+            self._dgen.reseed(seed)
+
+    @property
+    def dataset(self):
+        return self.decorated.dataset
+
+    @property
+    def weights(self):
+        return self.decorated.weights
+
+    @property
+    def sampler(self):
+        if self._sampler is not None:
+            return self._sampler
+
+        return self.decorated.sampler
+
+    @property
+    def event_order(self):
+        return self.sampler.event_order
+
+    @property
+    def ragged(self):
+        return self._store.ragged
+
+    @property
+    def replayed(self):
+        return True
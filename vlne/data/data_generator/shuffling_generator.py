@@ -0,0 +1,58 @@
+import numpy as np
+
+from .idata_decorator import IDataDecorator
+
+class ShufflingGenerator(IDataDecorator):
+    """Decorator that reshuffles the order of batches every epoch.
+
+    `keras` reshuffles batches of a `Sequence` by requesting them in a random
+    order, which defeats the look-ahead of the prefetching decorators.
+    Instead, this decorator owns the batch permutation: batches should be
+    requested from it sequentially, and batch `index` is taken from the
+    decorated generator at the permuted position. The decorated generators
+    still see the original batch indices, so their caches and batch stores
+    remain valid.
+
+    Parameters
+    ----------
+    dgen : IDataGenerator
+        Data generator which batches will be reshuffled.
+    seed : int or list of int, optional
+        Base seed of the batch permutations. Default: 0.
+    """
+
+    def __init__(self, dgen, seed = 0):
+        super().__init__(dgen)
+
+        self._seed  = [ int(x) for x in np.ravel(seed) ]
+        self._epoch = 0
+        self._order = self._make_order()
+
+    def _make_order(self):
+        seed = np.random.SeedSequence([ *self._seed, self._epoch ])
+        return np.random.default_rng(seed).permutation(len(self._dgen))
+
+    @property
+    def decorated(self):
+        """Data generator which batches are reshuffled"""
+        return self._dgen
+
+    @property
+    def order(self):
+        """Indices of the decorated batches in the current epoch order"""
+        return self._order
+
+    def __getitem__(self, index):
+        return self._dgen[int(self._order[index])]
+
+    def on_epoch_end(self):
+        self._dgen.on_epoch_end()
+
+        self._epoch += 1
+        self._order  = self._make_order()
+
+    @property
+    def event_order(self):
+        return np.concatenate(
+            [ np.asarray(self.sampler[i]) for i in self._order ]
+        )
@@ -0,0 +1,214 @@
+"""
+Definition of a `tf.data` input pipeline backend for data generators.
+"""
+
+import tensorflow as tf
+from tensorflow import keras
+
+from .funcs.batch_store import flatten_batch, unflatten_batch
+from .idata_decorator   import IDataDecorator
+
+def get_tensor_spec(array):
+    """Return `tf.TensorSpec` of `array` with unknown batch dimensions"""
+    shape = [ None, ] + list(array.shape[1:])
+
+    if array.ndim == 3:
+        # Padded vlarr groups have variable length
+        shape[1] = None
+
+    return tf.TensorSpec(shape, dtype = tf.as_dtype(array.dtype))
+
+def convert_ragged_parts(inputs):
+    """Convert ragged (values, offsets) tensor pairs into `tf.RaggedTensor`"""
+    return {
+        k : tf.RaggedTensor.from_row_splits(*v, validate = False)
+                if isinstance(v, tuple) else v
+            for (k, v) in inputs.items()
+    }
+
+class TFDataGenerator(IDataDecorator):
+    """Decorator that exposes batches of `dgen` as a `tf.data.Dataset`.
+
+    Batches are constructed by `dgen` in python, but their construction is
+    parallelized by `tf.data` with a parallel map over batch indices, and the
+    following batches are prefetched while the model is busy.
+    The resulting dataset yields (inputs, targets, weights) dictionaries
+    in the same structure as `KerasSequence`.
+
+    Parallel calls request batches of `dgen` from several threads at once,
+    so `dgen` has to be thread-safe. The caches and batch level
+    transformations of `vlne` are, but per event stochastic transformations
+    draw random numbers from a shared generator, and their batches are
+    reproducible only with `parallel_calls` equal to 1.
+
+    The structure of batches is inferred from batch 0, which is constructed
+    by the constructor. This batch is kept and served by the first request
+    of batch 0, unless the data generator is updated by an epoch end before.
+
+    Parameters
+    ----------
+    dgen : IDataGenerator
+        Data generator that will construct batches.
+    parallel_calls : int or None, optional
+        Number of batches to construct in parallel. If None, it will be
+        tuned by `tf.data` automatically. Default: None.
+    cache : bool or str, optional
+        If True, batches will be cached by `tf.data` in memory during the
+        first epoch. If str, batches will be cached in files with the given
+        prefix. Only deterministic generators should be cached.
+        Default: False.
+    """
+
+    def __init__(self, dgen, parallel_calls = None, cache = False):
+        super().__init__(dgen)
+
+        self._parallel_calls = parallel_calls or tf.data.AUTOTUNE
+        self._cache          = cache
+        self._tf_datasets    = {}
+        # Whether epoch ends are signaled by a repeated `tf.data.Dataset`
+        self._chains_epochs  = False
+
+        batch      = dgen[0]
+        flat_batch = flatten_batch(batch)
+
+        self._n_parts = len(batch)
+        self._keys    = [ k for (k, _) in flat_batch ]
+        self._specs   = [ get_tensor_spec(x) for (_, x) in flat_batch ]
+        self._probe   = batch
+
+    def _load_batch(self, index):
+        index = int(index)
+        batch = None
+
+        if index == 0:
+            (batch, self._probe) = (self._probe, None)
+
+        if batch is None:
+            batch = self._dgen[index]
+
+        return [ x for (_, x) in flatten_batch(batch) ]
+
+    def _load_batch_tensors(self, index):
+        arrays = tf.numpy_function(
+            self._load_batch, [ index ], [ x.dtype for x in self._specs ]
+        )
+
+        for (array, spec) in zip(arrays, self._specs):
+            array.set_shape(spec.shape)
+
+        (inputs, targets, weights) = unflatten_batch(
+            self._keys, arrays, self._n_parts
+        )
+
+        if self.ragged:
+            inputs = convert_ragged_parts(inputs)
+
+        return (inputs, targets, weights)
+
+    def _make_tf_dataset(self, shuffle, repeat):
+        n_batches = len(self._dgen)
+        result    = tf.data.Dataset.range(n_batches)
+
+        if shuffle and (not self._cache):
+            result = result.shuffle(n_batches, reshuffle_each_iteration = True)
+
+        result = result.map(
+            self._load_batch_tensors,
+            num_parallel_calls = self._parallel_calls,
+            deterministic      = True,
+        )
+
+        if self._cache:
+            filename = self._cache if isinstance(self._cache, str) else ''
+            result   = result.cache(filename)
+
+            if shuffle:
+                # Shuffle after the cache, such that it is not frozen
+                result = result.shuffle(
+                    n_batches, reshuffle_each_iteration = True
+                )
+
+        if repeat:
+            # `repeat` would construct batches of the next epoch before the
+            # epoch end callback updates `dgen`. Instead, epochs are chained
+            # by `flat_map`, which starts the next epoch only after all
+            # batches of the previous one are constructed.
+            self._chains_epochs = True
+            epoch  = result
+            result = tf.data.Dataset.counter().map(
+                lambda x: tf.numpy_function(self._start_epoch, [ x ], tf.int64)
+            )
+            result = result.flat_map(lambda _: epoch)
+
+        return result.prefetch(tf.data.AUTOTUNE)
+
+    def _start_epoch(self, epoch):
+        if epoch > 0:
+            self._end_epoch()
+
+        return epoch
+
+    def _end_epoch(self):
+        self._probe = None
+        self._dgen.on_epoch_end()
+
+    def on_epoch_end(self):
+        # Repeated datasets signal epoch ends themselves
+        if not self._chains_epochs:
+            self._end_epoch()
+
+    def get_tf_dataset(self, shuffle = False, repeat = False):
+        """Return `tf.data.Dataset` of batches.
+
+        Parameters
+        ----------
+        shuffle : bool, optional
+            If True, the order of batches will be reshuffled each epoch,
+            similar to `keras.Model.fit(shuffle = True)`. Otherwise, batches
+            are yielded in order, as needed by `keras.Model.predict`.
+            Default: False.
+        repeat : bool, optional
+            If True, the dataset will be repeated indefinitely. This is needed
+            when `keras.Model.fit` is limited by `steps_per_epoch`. Epoch ends
+            of `dgen` are signaled between the repetitions, instead of by
+            `EpochEndCallback`. Default: False.
+        """
+        key = (shuffle, repeat)
+
+        if key not in self._tf_datasets:
+            self._tf_datasets[key] = self._make_tf_dataset(shuffle, repeat)
+
+        return self._tf_datasets[key]
+
+class EpochEndCallback(keras.callbacks.Callback):
+    """Keras callback that notifies data generators about the epoch end.
+
+    Unlike `keras.utils.Sequence`, `tf.data.Dataset` has no `on_epoch_end`
+    hook, so batch samplers and caches of `TFDataGenerator` need to be
+    updated by a callback. Data generators of repeated datasets are updated
+    by the datasets themselves, and are skipped by the callback.
+    """
+
+    def __init__(self, dgen_list):
+        super().__init__()
+        self._dgen_list = dgen_list
+
+    def on_epoch_end(self, epoch, logs = None):
+        for dgen in self._dgen_list:
+            dgen.on_epoch_end()
+
+def get_keras_data(dgen, shuffle = False, repeat = False):
+    """Return object that should be passed to `keras.Model.fit/predict`"""
+    if isinstance(dgen, TFDataGenerator):
+        return dgen.get_tf_dataset(shuffle, repeat)
+
+    return dgen
+
+def get_data_callbacks(dgen_list):
+    """Return keras callbacks needed by the data generators `dgen_list`"""
+    dgen_list = [ x for x in dgen_list if isinstance(x, TFDataGenerator) ]
+
+    if len(dgen_list) == 0:
+        return []
+
+    return [ EpochEndCallback(dgen_list) ]
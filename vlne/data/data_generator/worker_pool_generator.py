@@ -0,0 +1,366 @@
+"""
+Data generator decorator that builds batches in a pool of worker processes.
+
+Workers are forked from the parent process, so they see the dataset arrays
+already in the parent memory (e.g. precached datasets, memory-mapped
+materializations and batch stores) instead of receiving pickled copies.
+Only the memory-mapped arrays are shared explicitly. The rest are shared by
+the copy-on-write of the fork, which holds for the data buffers of the
+contiguous arrays of the precached datasets. However, memory pages of python
+objects (e.g. object arrays of vlarr columns of data frames) are copied into
+a worker once it touches their reference counts. Finished batches are not
+pickled back either. Instead, each worker writes
+the batch arrays into one slot of a ring of shared memory buffers, and the
+parent returns zero-copy views of that slot.
+"""
+
+import collections
+import logging
+import multiprocessing
+import os
+import time
+
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .funcs.batch_store import align_offset, flatten_batch, unflatten_batch
+from .idata_decorator   import IDataDecorator
+
+LOGGER = logging.getLogger('vlne.data')
+
+# Data generator that is inherited by the forked worker processes
+_WORKER_DGEN  = None
+# Shared memory slots attached by a worker process: { slot : (name, shm) }
+_WORKER_SLOTS = {}
+
+def init_worker(seed):
+    """Give each worker its own stream of random numbers.
+
+    Batch level transformations are not reseeded: they draw random numbers
+    per batch, so their results do not depend on the worker.
+    """
+    seed = np.random.SeedSequence([ *seed, os.getpid() ])
+    np.random.seed(seed.generate_state(1)[0])
+
+def attach_slot(slot, name):
+    """Attach worker process to shared memory block `name` of `slot`"""
+    prev_name, shm = _WORKER_SLOTS.get(slot, (None, None))
+
+    if prev_name != name:
+        if shm is not None:
+            shm.close()
+
+        shm = shared_memory.SharedMemory(name = name)
+        _WORKER_SLOTS[slot] = (name, shm)
+
+    return shm
+
+def get_batch_layout(flat):
+    """Return list of (key, dtype, shape, offset) of flattened batch arrays"""
+    result = []
+    offset = 0
+
+    for (key, array) in flat:
+        start  = align_offset(offset)
+        offset = start + array.nbytes
+        result.append((key, array.dtype.str, array.shape, start))
+
+    return (result, offset)
+
+def build_batch(task):
+    """Construct batch `index` and write it into shared memory `slot`.
+
+    Returns
+    -------
+    (layout, n_parts, batch, nbytes)
+        If the batch fits into the slot, `layout` describes the placement
+        of its arrays and `batch` is None. Otherwise, `layout` is None and
+        the `batch` is returned by value. `nbytes` is the size of the batch.
+    """
+    index, slot, name, capacity = task
+
+    batch = _WORKER_DGEN[index]
+    flat  = [ (k, np.ascontiguousarray(v)) for (k, v) in flatten_batch(batch) ]
+
+    layout, nbytes = get_batch_layout(flat)
+
+    if nbytes > capacity:
+        return (None, len(batch), batch, nbytes)
+
+    buffer = attach_slot(slot, name).buf
+
+    for ((_, array), (_, dtype, shape, offset)) in zip(flat, layout):
+        view = np.ndarray(shape, dtype, buffer = buffer, offset = offset)
+        view[...] = array
+
+    del buffer
+
+    return (layout, len(batch), None, nbytes)
+
+def read_batch(shm, layout, n_parts):
+    """Return batch of zero-copy views of shared memory `shm`"""
+    keys   = [ key for (key, _, _, _) in layout ]
+    arrays = [
+        np.ndarray(shape, dtype = dtype, buffer = shm.buf, offset = offset)
+            for (_, dtype, shape, offset) in layout
+    ]
+
+    return unflatten_batch(keys, arrays, n_parts)
+
+class WorkerPoolGenerator(IDataDecorator):
+    """Decorator that builds batches in a pool of forked worker processes.
+
+    When batch `index` is requested, the batches [`index` + 1,
+    `index` + `prefetch`] are scheduled for construction in the workers.
+    Each scheduled batch gets a free slot of a ring of shared memory
+    buffers. The slots grow on demand: a batch that does not fit into its
+    slot is returned by value, and the slot is enlarged for the next use.
+
+    The look-ahead is useful only if batches are requested sequentially.
+    Batches that need to be reshuffled every epoch should be permuted by
+    the decorated generator instead (c.f. `ShufflingGenerator`).
+
+    The returned batches are views of the shared buffers. They remain valid
+    until `hold` more batches have been requested from the generator.
+    Consumers that need batches for longer must copy them.
+
+    The pool is (re)started lazily after every epoch end, such that workers
+    see the current state of the decorated generator (e.g. reshuffled event
+    order).
+
+    Parameters
+    ----------
+    dgen : IDataGenerator
+        Data generator to build batches with.
+    workers : int
+        Number of worker processes.
+    prefetch : int or None, optional
+        Maximum number of batches being built at any moment. If None, it is
+        equal to twice the number of `workers`. Default: None.
+    hold : int, optional
+        Number of previously returned batches that are kept valid.
+        Default: 4.
+    seed : int or list of int, optional
+        Base seed of the worker random number generators. Default: 0.
+
+    Attributes
+    ----------
+    wait_times : list of float
+        Times (in seconds) that consumer waited for each batch of the current
+        epoch.
+    """
+
+    def __init__(self, dgen, workers, prefetch = None, hold = 4, seed = 0):
+        super().__init__(dgen)
+
+        self._workers  = workers
+        self._prefetch = prefetch or (2 * workers)
+        self._hold     = hold
+        self._seed     = seed
+        self._epoch    = 0
+
+        self._pool     = None
+        self._slots    = [ None ] * (self._prefetch + hold + 2)
+        self._free     = collections.deque(range(len(self._slots)))
+        self._held     = collections.deque()
+        self._pending  = {}
+        self._orphans  = []
+
+        self.wait_times = []
+
+    def _get_pool(self):
+        # pylint: disable=global-statement
+        global _WORKER_DGEN
+
+        if self._pool is None:
+            # Workers should share the resource tracker of the parent.
+            # Otherwise, each worker starts its own tracker, that unlinks
+            # the shared buffers attached by the worker when it is stopped.
+            resource_tracker.ensure_running()
+
+            _WORKER_DGEN = self._dgen
+            seed = [ int(x) for x in np.ravel(self._seed) ] + [ self._epoch ]
+
+            try:
+                self._pool = multiprocessing.get_context('fork').Pool(
+                    self._workers,
+                    initializer = init_worker,
+                    initargs    = (seed, ),
+                )
+            finally:
+                _WORKER_DGEN = None
+
+        return self._pool
+
+    def _get_slot_spec(self, slot):
+        shm = self._slots[slot]
+
+        if shm is None:
+            return (None, 0)
+
+        return (shm.name, shm.size)
+
+    def _resize_slot(self, slot, nbytes):
+        if self._slots[slot] is not None:
+            self._slots[slot].close()
+            self._slots[slot].unlink()
+
+        # Leave some room for the variable batch sizes (e.g. ragged inputs)
+        self._slots[slot] = shared_memory.SharedMemory(
+            create = True, size = max(int(1.25 * nbytes), 1)
+        )
+
+    def _collect_orphans(self, wait = False):
+        """Release slots of the abandoned tasks that have finished"""
+        if wait and self._orphans:
+            self._orphans[0][0].wait()
+
+        orphans = []
+
+        for (result, slot) in self._orphans:
+            if result.ready():
+                self._free.append(slot)
+            else:
+                orphans.append((result, slot))
+
+        self._orphans = orphans
+
+    def _abandon_pending(self, keep = ()):
+        """Abandon scheduled batches, except the ones in `keep`"""
+        pending = {}
+
+        for (index, task) in self._pending.items():
+            if index in keep:
+                pending[index] = task
+            else:
+                # Workers may still write into slots of the abandoned tasks
+                self._orphans.append(task)
+
+        self._pending = pending
+
+    def _submit(self, index):
+        if not self._free:
+            self._collect_orphans()
+
+        if not self._free:
+            return False
+
+        slot       = self._free.popleft()
+        name, size = self._get_slot_spec(slot)
+
+        self._pending[index] = (
+            self._get_pool().apply_async(
+                build_batch, ((index, slot, name, size), )
+            ),
+            slot
+        )
+
+        return True
+
+    def _get_window(self, index):
+        return range(index + 1, min(index + self._prefetch, len(self) - 1) + 1)
+
+    def _schedule(self, index):
+        for i in self._get_window(index):
+            if (i not in self._pending) and (not self._submit(i)):
+                break
+
+    def _release_held(self):
+        # The last returned batch and `hold` batches before it stay valid
+        while len(self._held) > self._hold + 1:
+            self._free.append(self._held.popleft())
+
+    def __getitem__(self, index):
+        task = self._pending.pop(index, None)
+
+        # Only the scheduled batches that follow `index` are still useful
+        # (e.g. after an out of order access)
+        self._abandon_pending(keep = self._get_window(index))
+
+        if task is None:
+            while not self._submit(index):
+                self._collect_orphans(wait = True)
+
+            task = self._pending.pop(index)
+
+        result, slot = task
+        self._schedule(index)
+
+        start = time.perf_counter()
+        layout, n_parts, batch, nbytes = result.get()
+        self.wait_times.append(time.perf_counter() - start)
+
+        if layout is None:
+            self._resize_slot(slot, nbytes)
+        else:
+            batch = read_batch(self._slots[slot], layout, n_parts)
+
+        self._held.append(slot)
+        self._release_held()
+
+        return batch
+
+    def _stop_pool(self):
+        if self._pool is not None:
+            # At most a ring of slots worth of batches is queued. Workers
+            # finish them instead of being killed by `terminate`, which may
+            # leave the task queue locked and stall the pool shutdown.
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+        self._abandon_pending()
+
+        # Workers are stopped, so slots of abandoned tasks are free again
+        self._free.extend(slot for (_, slot) in self._orphans)
+        self._orphans = []
+
+    def on_epoch_end(self):
+        self._stop_pool()
+        self._epoch += 1
+
+        if len(self.wait_times) > 0:
+            LOGGER.info(
+                "Worker pool: waited for batches %.3f s in total,"
+                " %.2f ms on average, %.2f ms at most over %d batches",
+                np.sum(self.wait_times),
+                1000 * np.mean(self.wait_times),
+                1000 * np.max(self.wait_times),
+                len(self.wait_times)
+            )
+
+        self.wait_times = []
+        self._dgen.on_epoch_end()
+
+    def close(self):
+        """Stop worker processes and free the shared memory buffers.
+
+        Batches returned by the generator become invalid after this call.
+        """
+        self._stop_pool()
+
+        for shm in self._slots:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+        self._slots = [ None ] * len(self._slots)
+        self._free  = collections.deque(range(len(self._slots)))
+        self._held  = collections.deque()
+
+    def __del__(self):
+        if getattr(self, '_slots', None) is not None:
+            self.close()
+
+    def __getstate__(self):
+        # Worker pools and shared buffers cannot be pickled
+        state = self.__dict__.copy()
+        state['_pool']    = None
+        state['_slots']   = [ None ] * len(self._slots)
+        state['_free']    = collections.deque(range(len(self._slots)))
+        state['_held']    = collections.deque()
+        state['_pending'] = {}
+        state['_orphans'] = []
+
+        return state
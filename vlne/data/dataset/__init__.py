@@ -0,0 +1,7 @@
+from .array_dataset  import ArrayDataset
+from .cached_dataset import CachedDataset, PrefixCachedDataset
+from .frame_dataset  import FrameDataset
+
+__all__ = [
+    'ArrayDataset', 'CachedDataset', 'FrameDataset', 'PrefixCachedDataset'
+]
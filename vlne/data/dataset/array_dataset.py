@@ -0,0 +1,140 @@
+"""
+Definition of an in-memory dataset that supports bulk batch extraction.
+"""
+
+from vlne.data.data_generator.funcs.collate import (
+    collate_events_ragged, is_ragged, take_ragged
+)
+
+class ArrayDataset:
+    """Dataset that holds event groups in contiguous in-memory arrays.
+
+    Unlike generic datasets, `ArrayDataset` can extract a whole batch of
+    events with a single `get_batch` call, without a python loop over events.
+
+    Parameters
+    ----------
+    scalar : dict
+        Dictionary where keys are scalar group names and values are arrays of
+        shape (N, n_vars).
+    vlarr : dict
+        Dictionary where keys are vlarr group names and values are ragged
+        (`values`, `offsets`) pairs.
+        C.f. `vlne.data.data_generator.funcs.collate`
+    df : DataFrame or None, optional
+        Data frame that events were extracted from. Default: None.
+    scalar_groups : dict or None, optional
+        Columns of the scalar groups. Default: None.
+    vlarr_groups : dict or None, optional
+        Columns of the vlarr groups. Default: None.
+    compactor : ArrayCompactor or None, optional
+        If not None, groups are stored in the compact representation of
+        `compactor` and are restored on extraction. Default: None.
+        C.f. `vlne.data.data_generator.funcs.compact`
+    """
+
+    def __init__(
+        self, scalar, vlarr,
+        df            = None,
+        scalar_groups = None,
+        vlarr_groups  = None,
+        compactor     = None,
+    ):
+        self._scalar    = scalar
+        self._vlarr     = vlarr
+        self._len       = None
+        self._compactor = compactor
+
+        self.df            = df
+        self.scalar_groups = scalar_groups
+        self.vlarr_groups  = vlarr_groups
+
+        for values in scalar.values():
+            self._len = len(values)
+
+        for (_, offsets) in vlarr.values():
+            self._len = len(offsets) - 1
+
+        if self._len is None:
+            raise ValueError("Cannot construct dataset without data groups")
+
+    @staticmethod
+    def from_events(events, **kwargs):
+        """Construct `ArrayDataset` from a list of per event dicts"""
+        if len(events) == 0:
+            raise ValueError("Cannot construct dataset from empty event list")
+
+        batch  = collate_events_ragged(events)
+        scalar = { k : v for (k, v) in batch.items() if not is_ragged(v) }
+        vlarr  = { k : v for (k, v) in batch.items() if is_ragged(v) }
+
+        return ArrayDataset(scalar, vlarr, **kwargs)
+
+    @staticmethod
+    def from_dataset(dset):
+        """Extract all events of `dset` into `ArrayDataset`"""
+        return ArrayDataset.from_events(
+            [ dset[i] for i in range(len(dset)) ],
+            df            = getattr(dset, 'df',            None),
+            scalar_groups = getattr(dset, 'scalar_groups', None),
+            vlarr_groups  = getattr(dset, 'vlarr_groups',  None),
+        )
+
+    def compact(self, compactor, name = ''):
+        """Return copy of the dataset that stores groups compactly"""
+        result = ArrayDataset(
+            compactor.compact(self._scalar),
+            compactor.compact(self._vlarr),
+            df            = self.df,
+            scalar_groups = self.scalar_groups,
+            vlarr_groups  = self.vlarr_groups,
+            compactor     = compactor,
+        )
+
+        compactor.log_savings(name)
+        return result
+
+    def _restore(self, result):
+        if self._compactor is None:
+            return result
+
+        return self._compactor.restore(result)
+
+    @property
+    def compactor(self):
+        return self._compactor
+
+    @property
+    def scalar(self):
+        return self._scalar
+
+    @property
+    def vlarr(self):
+        return self._vlarr
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        result = { k : v[index] for (k, v) in self._scalar.items() }
+
+        for (group, (values, offsets)) in self._vlarr.items():
+            result[group] = values[offsets[index]:offsets[index + 1]]
+
+        return self._restore(result)
+
+    def get_batch(self, indices):
+        """Extract events `indices` in a bulk form.
+
+        Returns
+        -------
+        dict
+            Dictionary where scalar groups are arrays of shape (N, n_vars) and
+            vlarr groups are ragged (`values`, `offsets`) pairs.
+        """
+        result = { k : v[indices] for (k, v) in self._scalar.items() }
+
+        for (group, (values, offsets)) in self._vlarr.items():
+            result[group] = take_ragged(values, offsets, indices)
+
+        return self._restore(result)
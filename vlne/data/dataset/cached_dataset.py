@@ -0,0 +1,116 @@
+"""
+Definition of a dataset decorator that caches events in memory.
+"""
+
+from vlne.data.data_generator.funcs.lru_cache import LRUCache
+
+class CachedDataset:
+    """Dataset decorator that keeps events in a memory bounded LRU cache.
+
+    This decorator should only be used with datasets that produce events
+    deterministically, i.e. without stochastic transformations.
+
+    Events may be requested from several threads at once (e.g. by the
+    prefetching threads). An event missing from the cache may then be
+    read more than once.
+
+    Parameters
+    ----------
+    dset : Dataset
+        Dataset which events will be cached.
+    budget : int or None
+        Cache memory budget in bytes. If None, the cache is unbounded.
+    name : str, optional
+        Cache name to use in log messages. Default: ''.
+    compactor : ArrayCompactor or None, optional
+        If not None, events are cached in the compact representation of
+        `compactor`. Default: None.
+    """
+
+    def __init__(self, dset, budget, name = '', compactor = None):
+        self._dset      = dset
+        self._cache     = LRUCache(budget, name)
+        self._name      = name
+        self._compactor = compactor
+
+    @property
+    def cache(self):
+        return self._cache
+
+    def __len__(self):
+        return len(self._dset)
+
+    def __getitem__(self, index):
+        event = self._cache.get(index)
+
+        if event is None:
+            event = self._dset[index]
+
+            if self._compactor is None:
+                self._cache.put(index, event)
+            else:
+                self._cache.put(index, self._compactor.compact(event))
+
+        elif self._compactor is not None:
+            event = self._compactor.restore(event)
+
+        return event
+
+    def on_epoch_end(self):
+        self._cache.log_stats()
+        self._cache.reset_stats()
+
+        if self._compactor is not None:
+            self._compactor.log_savings(self._name)
+
+    def __getattr__(self, name):
+        # Delegate `df`, `scalar_groups`, etc to the underlying dataset
+        if name.startswith('__') or (name == '_dset'):
+            raise AttributeError(name)
+
+        return getattr(self._dset, name)
+
+class PrefixCachedDataset:
+    """Dataset decorator that links a dataset to the event cache it reads.
+
+    Splits with stochastic transformations cache only the events of the
+    deterministic prefix of their transformations, and a separate dataset
+    applies the rest of them on top of the cache (c.f. `EventFrame`). This
+    decorator keeps a reference to that cache, such that its counters are
+    logged at the end of each epoch.
+
+    Parameters
+    ----------
+    dset : Dataset
+        Dataset that applies the stochastic transformations to the events
+        of `cache`.
+    cache : CachedDataset
+        Event cache of the deterministic transformations.
+    """
+
+    def __init__(self, dset, cache):
+        self._dset  = dset
+        self._cache = cache
+
+    @property
+    def cache(self):
+        return self._cache.cache
+
+    def __len__(self):
+        return len(self._dset)
+
+    def __getitem__(self, index):
+        return self._dset[index]
+
+    def on_epoch_end(self):
+        if hasattr(self._dset, 'on_epoch_end'):
+            self._dset.on_epoch_end()
+
+        self._cache.on_epoch_end()
+
+    def __getattr__(self, name):
+        # Delegate `df`, `scalar_groups`, etc to the underlying dataset
+        if name.startswith('__') or (name in [ '_dset', '_cache' ]):
+            raise AttributeError(name)
+
+        return getattr(self._dset, name)
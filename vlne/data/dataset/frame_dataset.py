@@ -0,0 +1,108 @@
+"""
+Definition of a dataset decorator that reads batches from a data frame.
+"""
+
+import numpy as np
+
+class FrameDataset:
+    """Dataset decorator that reads whole batches of events column by column.
+
+    Batches are extracted with a single `get_batch` call, that reads rows of
+    each group column from the data frame of the dataset at once, instead
+    of constructing events one by one. Therefore, this decorator should only
+    be used with datasets that apply no transformations.
+
+    Parameters
+    ----------
+    dset : Dataset
+        Dataset which batches will be read in bulk.
+    scalar_groups : dict
+        Columns of the scalar groups.
+    vlarr_groups : dict
+        Columns of the vlarr groups.
+    vlarr_limits : dict or None, optional
+        Maximum number of elements of each vlarr group. Default: None.
+    """
+
+    def __init__(
+        self, dset, scalar_groups, vlarr_groups, vlarr_limits = None
+    ):
+        self._dset          = dset
+        self._scalar_groups = scalar_groups
+        self._vlarr_groups  = vlarr_groups
+        self._vlarr_limits  = vlarr_limits or {}
+
+    def __len__(self):
+        return len(self._dset)
+
+    def __getitem__(self, index):
+        return self._dset[index]
+
+    def _read_scalar(self, columns, indices):
+        result = np.empty((len(indices), len(columns)), dtype = np.float32)
+
+        for (idx, column) in enumerate(columns):
+            result[:, idx] = self._dset.df[column, indices]
+
+        return result
+
+    def _read_vlarr(self, columns, indices, limit = None):
+        offsets = None
+        values  = None
+
+        for (idx, column) in enumerate(columns):
+            arrays = self._dset.df[column, indices]
+
+            if limit is not None:
+                arrays = [ np.asarray(x)[:limit] for x in arrays ]
+
+            if offsets is None:
+                lengths     = np.fromiter(
+                    (len(x) for x in arrays), dtype = np.int64,
+                    count = len(arrays)
+                )
+                offsets     = np.zeros(len(arrays) + 1, dtype = np.int64)
+                offsets[1:] = np.cumsum(lengths)
+                values      = np.empty(
+                    (offsets[-1], len(columns)), dtype = np.float32
+                )
+
+            if offsets[-1] > 0:
+                values[:, idx] = np.concatenate(
+                    [ np.asarray(x).ravel() for x in arrays ]
+                )
+
+        if offsets is None:
+            offsets = np.zeros(len(indices) + 1, dtype = np.int64)
+            values  = np.empty((0, 0), dtype = np.float32)
+
+        return (values, offsets)
+
+    def get_batch(self, indices):
+        """Extract events `indices` in a bulk form.
+
+        Returns
+        -------
+        dict
+            Dictionary where scalar groups are arrays of shape (N, n_vars) and
+            vlarr groups are ragged (`values`, `offsets`) pairs.
+        """
+        indices = np.asarray(indices)
+        result  = {
+            group : self._read_scalar(columns, indices)
+                for (group, columns) in self._scalar_groups.items()
+        }
+
+        for (group, columns) in self._vlarr_groups.items():
+            result[group] = self._read_vlarr(
+                columns, indices, self._vlarr_limits.get(group)
+            )
+
+        return result
+
+    def __getattr__(self, name):
+        # Delegate `df`, `scalar_groups`, etc to the underlying dataset
+        if name.startswith('__') or (name == '_dset'):
+            raise AttributeError(name)
+
+        return getattr(self._dset, name)
@@ -0,0 +1,222 @@
+"""
+Parallel preloading of datasets into contiguous in-memory arrays.
+
+The event range of a dataset is split into chunks that are decoded and
+transformed by a pool of forked worker processes. Each worker collates its
+chunk into ragged arrays and places them into shared memory blocks. The
+parent process then assembles the chunks into an `ArrayDataset`.
+"""
+
+import logging
+import math
+import multiprocessing
+import time
+
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import tqdm
+
+from vlne.data.data_generator.funcs.collate import (
+    collate_events_ragged, is_ragged
+)
+from .array_dataset import ArrayDataset
+
+LOGGER = logging.getLogger('vlne.data')
+
+# Dataset that is inherited by the forked worker processes
+_WORKER_DSET = None
+
+def put_shared_array(array):
+    """Copy `array` into a new shared memory block owned by the parent"""
+    array = np.ascontiguousarray(array)
+    shm   = shared_memory.SharedMemory(
+        create = True, size = max(array.nbytes, 1)
+    )
+
+    view    = np.ndarray(array.shape, dtype = array.dtype, buffer = shm.buf)
+    view[:] = array
+
+    # Ownership of the block is transferred to the parent process
+    resource_tracker.unregister(
+        getattr(shm, '_name', shm.name), 'shared_memory'
+    )
+
+    del view
+    shm.close()
+
+    return (shm.name, array.dtype.str, array.shape)
+
+def take_shared_array(spec, out):
+    """Copy shared array `spec` into `out` and free its memory block"""
+    name, dtype, shape = spec
+    shm = shared_memory.SharedMemory(name = name)
+
+    out[:] = np.ndarray(shape, dtype = dtype, buffer = shm.buf)
+
+    shm.close()
+    shm.unlink()
+
+def get_shared_specs(spec):
+    """Return a flat list of shared arrays of a chunk `spec`"""
+    result = []
+
+    for value in spec.values():
+        if isinstance(value[0], tuple):
+            result += list(value)
+        else:
+            result.append(value)
+
+    return result
+
+def free_shared_arrays(spec):
+    """Free shared memory blocks of a chunk that will not be assembled"""
+    for (name, _, _) in get_shared_specs(spec):
+        shm = shared_memory.SharedMemory(name = name)
+        shm.close()
+        shm.unlink()
+
+def precache_chunk(chunk):
+    """Decode events `[start, end)` and place them into shared memory"""
+    start, end = chunk
+
+    events = [ _WORKER_DSET[i] for i in range(start, end) ]
+    batch  = collate_events_ragged(events)
+    result = {}
+
+    for (group, value) in batch.items():
+        if is_ragged(value):
+            result[group] = tuple(put_shared_array(x) for x in value)
+        else:
+            result[group] = put_shared_array(value)
+
+    return (chunk, result)
+
+def concatenate_shared(specs):
+    """Concatenate shared arrays `specs` along the first axis"""
+    _, dtype, shape = specs[0]
+
+    length = sum(x[2][0] for x in specs)
+    result = np.empty((length, *shape[1:]), dtype = dtype)
+    start  = 0
+
+    for spec in specs:
+        end = start + spec[2][0]
+        take_shared_array(spec, result[start:end])
+        start = end
+
+    return result
+
+def concatenate_shared_ragged(specs):
+    """Concatenate shared ragged (`values`, `offsets`) chunks"""
+    values        = concatenate_shared([ x[0] for x in specs ])
+    chunk_offsets = [ np.zeros(1, dtype = np.int64) ]
+    base          = 0
+
+    for (_, spec_offsets) in specs:
+        offsets = np.empty(spec_offsets[2], dtype = spec_offsets[1])
+        take_shared_array(spec_offsets, offsets)
+
+        chunk_offsets.append(offsets[1:] + base)
+        base += offsets[-1] - offsets[0]
+
+    return (values, np.concatenate(chunk_offsets))
+
+def assemble_chunks(chunk_specs):
+    """Collect shared memory chunks ordered by start index into arrays"""
+    scalar = {}
+    vlarr  = {}
+
+    for group in chunk_specs[0].keys():
+        specs = [ spec[group] for spec in chunk_specs ]
+
+        if isinstance(specs[0][0], tuple):
+            vlarr[group] = concatenate_shared_ragged(specs)
+        else:
+            scalar[group] = concatenate_shared(specs)
+
+    return (scalar, vlarr)
+
+def calc_nbytes(scalar, vlarr):
+    result  = sum(x.nbytes for x in scalar.values())
+    result += sum(v.nbytes + o.nbytes for (v, o) in vlarr.values())
+
+    return result
+
+def get_chunks(n, workers, chunk_size = None):
+    if chunk_size is None:
+        # A few chunks per worker to balance the load
+        chunk_size = max(1, math.ceil(n / (8 * workers)))
+
+    return [
+        (start, min(start + chunk_size, n))
+            for start in range(0, n, chunk_size)
+    ]
+
+def precache_dataset(dset, workers, name = '', chunk_size = None):
+    """Load all events of `dset` into RAM with a pool of worker processes.
+
+    Parameters
+    ----------
+    dset : Dataset
+        Dataset to precache. Its events must be deterministic, since they
+        will be decoded and transformed only once.
+    workers : int
+        Number of worker processes.
+    name : str, optional
+        Dataset name to use in log messages. Default: ''.
+    chunk_size : int or None, optional
+        Number of events decoded by a worker at once. If None, it is chosen
+        such that each worker gets about 8 chunks. Default: None.
+
+    Returns
+    -------
+    ArrayDataset
+        In-memory dataset holding all events of `dset`.
+    """
+    # pylint: disable=global-statement
+    global _WORKER_DSET
+
+    if len(dset) == 0:
+        return dset
+
+    chunks      = get_chunks(len(dset), workers, chunk_size)
+    chunk_specs = {}
+    time_start  = time.perf_counter()
+
+    _WORKER_DSET = dset
+    pbar = tqdm.tqdm(desc = f'Precaching {name}', total = len(dset))
+
+    try:
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            for (chunk, spec) in pool.imap_unordered(precache_chunk, chunks):
+                chunk_specs[chunk] = spec
+                pbar.update(chunk[1] - chunk[0])
+
+    except BaseException:
+        for spec in chunk_specs.values():
+            free_shared_arrays(spec)
+        raise
+
+    finally:
+        _WORKER_DSET = None
+        pbar.close()
+
+    scalar, vlarr = assemble_chunks([ chunk_specs[x] for x in chunks ])
+
+    elapsed = max(time.perf_counter() - time_start, 1e-9)
+    nbytes  = calc_nbytes(scalar, vlarr)
+
+    LOGGER.info(
+        "Precached %d events of '%s' dset with %d workers in %.1fs:"
+        " %.0f events/s, %.1f MB/s",
+        len(dset), name, workers, elapsed, len(dset) / elapsed,
+        nbytes / elapsed / 1024**2
+    )
+
+    return ArrayDataset(
+        scalar, vlarr,
+        df            = getattr(dset, 'df',            None),
+        scalar_groups = getattr(dset, 'scalar_groups', None),
+        vlarr_groups  = getattr(dset, 'vlarr_groups',  None),
+    )
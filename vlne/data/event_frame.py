@@ -0,0 +1,112 @@
+"""
+Data frame that exposes events of a dataset as plain columns.
+
+Group values of each event are split back into the columns of the groups,
+such that a new dataset (e.g. one that applies the stochastic part of the
+transformations) can be constructed on top of another dataset (e.g. one that
+caches results of the deterministic part). Unlike the materialized frames,
+events are produced on demand.
+"""
+
+import numpy as np
+
+from vlne.data.frame_funcs import get_wrapped_attr
+from vlne.data.truncation  import to_object_array
+
+class EventColumn:
+    """Lazy column of `EventFrame` that reads rows from the dataset events"""
+
+    def __init__(self, frame, column):
+        self._frame  = frame
+        self._column = column
+
+    def __len__(self):
+        return len(self._frame)
+
+    def __getitem__(self, rows):
+        return self._frame.read_rows(self._column, rows)
+
+    def __array__(self, dtype = None, copy = None):
+        # pylint: disable=unused-argument
+        values = self._frame.read_rows(self._column, slice(None))
+        return np.asarray(values, dtype)
+
+class EventFrame:
+    """Data frame of the group columns of events of `dset`.
+
+    Parameters
+    ----------
+    dset : Dataset
+        Dataset that produces events: dictionaries of group arrays.
+    scalar_groups : dict
+        Column names of the scalar groups.
+    vlarr_groups : dict
+        Column names of the vlarr groups.
+    df : IDataFrame
+        Data frame that the columns outside of groups (e.g. weights) are
+        read from.
+    """
+
+    def __init__(self, dset, scalar_groups, vlarr_groups, df):
+        self._dset    = dset
+        self._df      = df
+        self._columns = {}
+
+        for (group, columns) in vlarr_groups.items():
+            for (idx, column) in enumerate(columns):
+                self._columns.setdefault(column, (group, idx, True))
+
+        for (group, columns) in scalar_groups.items():
+            for (idx, column) in enumerate(columns):
+                self._columns.setdefault(column, (group, idx, False))
+
+    def __len__(self):
+        return len(self._dset)
+
+    def _read_row(self, column, row):
+        group, idx, _ = self._columns[column]
+        values        = np.asarray(self._dset[row][group])
+
+        if values.ndim == 2:
+            return values[:, idx]
+
+        return values[idx]
+
+    def read_rows(self, column, rows):
+        """Read `rows` of `column` from the dataset events"""
+        if column not in self._columns:
+            return self._df[column, rows]
+
+        if isinstance(rows, (int, np.integer)):
+            return self._read_row(column, rows % len(self))
+
+        values = [
+            self._read_row(column, i) for i in np.arange(len(self))[rows]
+        ]
+
+        if self._columns[column][2]:
+            return to_object_array(values)
+
+        return np.array(values)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self.read_rows(*key)
+
+        if key not in self._columns:
+            return self._df[key]
+
+        return EventColumn(self, key)
+
+    def _call_rows(self, name, column, rows):
+        if column not in self._columns:
+            return getattr(self._df, name)(column, rows)
+
+        return self.read_rows(column, rows)
+
+    def __getattr__(self, name):
+        # Column names are inherited from `df`
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return get_wrapped_attr(self, self._df, name, self._call_rows)
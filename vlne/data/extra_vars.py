@@ -0,0 +1,175 @@
+"""
+Extra variables (e.g. flat weights) computed once and cached on disk.
+
+Extra variables are computed over whole data frame columns, e.g. `flat`
+weights need a histogram of the target column. Their values are saved next
+to the data files, keyed by the data file fingerprint (path, size and
+modification time), the frame configuration and the variable specification,
+such that subsequent runs memory-map the saved values instead of reading the
+source column and recomputing them.
+
+In the out-of-core mode (`chunk_size` is not None), the variables are
+computed reading the source columns `chunk_size` rows at a time and written
+directly to the memory-mapped file on disk.
+"""
+
+import logging
+import numpy as np
+
+from vlne.data.data_generator.funcs.weights import (
+    flat_weights, flat_weights_chunked
+)
+from vlne.data.sidecar import (
+    fill_sidecar, get_sidecar_path, load_sidecar, save_sidecar
+)
+from vlne.funcs import unpack_name_args
+
+LOGGER = logging.getLogger('vlne.data')
+
+EXTRA_VARS = {
+    'flat' : flat_weights,
+}
+
+CHUNKED_EXTRA_VARS = {
+    'flat' : flat_weights_chunked,
+}
+
+def compute_extra_var(df, var_spec):
+    """Compute values of the extra variable `var_spec` over `df`"""
+    name, kwargs = unpack_name_args(var_spec)
+
+    if name not in EXTRA_VARS:
+        raise ValueError(f"Unknown variable {name}")
+
+    return np.asarray(EXTRA_VARS[name](df, **kwargs))
+
+def compute_extra_var_chunked(df, var_spec, chunk_size, path = None):
+    """Compute `var_spec` over `df`, reading `chunk_size` rows at a time.
+
+    If `path` is not None, the values are written directly to the sidecar
+    array `path` (or kept in memory if it cannot be created). Returns None if
+    the variable has no chunked implementation.
+    """
+    name, kwargs = unpack_name_args(var_spec)
+
+    if name not in CHUNKED_EXTRA_VARS:
+        LOGGER.warning(
+            "Extra variable '%s' does not support chunked computation", name
+        )
+        return None
+
+    fill = lambda out : CHUNKED_EXTRA_VARS[name](
+        df, out, chunk_size, **kwargs
+    )
+
+    if path is not None:
+        values = fill_sidecar(path, (len(df), ), np.float64, fill)
+
+        if values is not None:
+            return values
+
+    return fill(np.empty(len(df), dtype = np.float64))
+
+def get_extra_var_path(column, var_spec, frame_stat, fingerprint = None):
+    """Return path of the cached values of the extra variable `column`.
+
+    Parameters
+    ----------
+    column : str
+        Name of the extra variable.
+    var_spec : str or dict
+        Specification of the extra variable.
+    frame_stat : list
+        List of [ path, size, mtime ] of the data files.
+    fingerprint : object, optional
+        Any other json serializable configuration that the values of the
+        variable depend on (e.g. event selection). Default: None.
+    """
+    return get_sidecar_path(
+        frame_stat, 'extra', [ column, var_spec, fingerprint ]
+    )
+
+def load_extra_var(
+    df, column, var_spec, frame_stat = None, fingerprint = None,
+    chunk_size = None
+):
+    """Return values of extra variable `column`, reusing the cached ones.
+
+    Parameters
+    ----------
+    df : IDataFrame
+        Data frame to compute the variable over.
+    column : str
+        Name of the extra variable.
+    var_spec : str or dict
+        Specification of the extra variable.
+    frame_stat : list or None, optional
+        List of [ path, size, mtime ] of the data files `df` is read from.
+        If None, the values are neither loaded from nor saved to disk.
+        Default: None.
+    fingerprint : object, optional
+        Any other json serializable configuration that the values of the
+        variable depend on. Default: None.
+    chunk_size : int or None, optional
+        If not None, compute the variable reading `chunk_size` rows of `df`
+        at a time. Default: None.
+
+    Returns
+    -------
+    ndarray, shape (len(df), )
+        Values of the variable. Cached values are memory-mapped.
+    """
+    path = None
+
+    if frame_stat:
+        path   = get_extra_var_path(column, var_spec, frame_stat, fingerprint)
+        values = load_sidecar(path)
+
+        if values is not None:
+            if len(values) == len(df):
+                LOGGER.info(
+                    "Loading extra variable '%s' from '%s'", column, path
+                )
+                return values
+
+            LOGGER.warning(
+                "Ignoring cached extra variable '%s' of wrong length %d",
+                path, len(values)
+            )
+
+    if chunk_size is not None:
+        values = compute_extra_var_chunked(df, var_spec, chunk_size, path)
+
+        if values is not None:
+            return values
+
+    values = compute_extra_var(df, var_spec)
+
+    if path is not None:
+        save_sidecar(values, path)
+
+    return values
+
+def parse_extra_vars(
+    extra_vars, frame_stat = None, fingerprint = None, chunk_size = None
+):
+    """Return dict of functions `f(df)` that compute `extra_vars`.
+
+    C.f. `load_extra_var`.
+    """
+    result = {}
+
+    for (column, var_spec) in extra_vars.items():
+        name, _ = unpack_name_args(var_spec)
+
+        if name not in EXTRA_VARS:
+            raise ValueError(f"Unknown variable {name}")
+
+        result[column] = (
+            lambda df, column = column, var_spec = var_spec :
+                load_extra_var(
+                    df, column, var_spec, frame_stat, fingerprint, chunk_size
+                )
+        )
+
+    return result
@@ -0,0 +1,230 @@
+"""
+Per column statistics of the input groups, computed in a single pass.
+
+The statistics (number of values, NaN fraction, mean, variance, min and max)
+are accumulated over chunks of rows, in parallel if several workers are
+given, and merged with the pairwise update of the mean and the sum of
+squared deviations. Statistics of the vlarr columns are computed over the
+real elements of every event only, i.e. without padding. The result is saved
+next to the data files, keyed by the data file fingerprint and the frame
+configuration, such that it is computed only once per dataset. Models use
+these statistics to initialize their input normalization layers.
+"""
+
+import logging
+import multiprocessing
+import time
+
+import numpy as np
+
+from vlne.data.sidecar import get_sidecar_path, load_sidecar, save_sidecar
+
+LOGGER = logging.getLogger('vlne.data')
+
+# Fields of the saved statistics of each column. `m2` is the sum of squared
+# deviations from the mean.
+FIELDS = [ 'count', 'nan_count', 'mean', 'm2', 'min', 'max' ]
+
+DEF_CHUNK_SIZE = 65536
+
+# Data frame and columns that are inherited by the forked worker processes
+_WORKER_DF      = None
+_WORKER_COLUMNS = None
+
+def read_column_values(df, column, rows):
+    """Read values of `column` at `rows` as a flat array of real elements"""
+    values = df[column, rows]
+
+    if isinstance(values, np.ndarray) and (values.dtype != object):
+        return values.ravel().astype(np.float64, copy = False)
+
+    # Variable length arrays are stored as sequences of per event arrays
+    values = [ np.ravel(x) for x in values ]
+
+    if len(values) == 0:
+        return np.empty(0, dtype = np.float64)
+
+    return np.concatenate(values).astype(np.float64, copy = False)
+
+def calc_values_stats(values):
+    """Calculate `FIELDS` statistics of the flat array `values`"""
+    mask  = np.isnan(values)
+    valid = values[~mask]
+
+    if len(valid) == 0:
+        return np.array([ 0, np.sum(mask), 0, 0, np.inf, -np.inf ])
+
+    mean = np.mean(valid)
+
+    return np.array([
+        len(valid), np.sum(mask), mean, np.sum((valid - mean)**2),
+        np.min(valid), np.max(valid),
+    ])
+
+def merge_stats(a, b):
+    """Merge statistics `a` and `b` of shape (n_columns, len(FIELDS))"""
+    n_a, n_b = a[:, 0], b[:, 0]
+    count    = n_a + n_b
+    delta    = b[:, 2] - a[:, 2]
+
+    # Columns without values in either part keep the mean of the other one
+    frac = np.divide(n_b, count, out = np.zeros_like(count), where = count > 0)
+
+    result = np.empty_like(a)
+    result[:, 0] = count
+    result[:, 1] = a[:, 1] + b[:, 1]
+    result[:, 2] = a[:, 2] + delta * frac
+    result[:, 3] = a[:, 3] + b[:, 3] + delta**2 * n_a * frac
+    result[:, 4] = np.minimum(a[:, 4], b[:, 4])
+    result[:, 5] = np.maximum(a[:, 5], b[:, 5])
+
+    return result
+
+def calc_chunk_stats(df, columns, chunk):
+    """Calculate statistics of `columns` over rows [start, end) of `df`"""
+    rows = np.arange(*chunk)
+
+    return np.stack([
+        calc_values_stats(read_column_values(df, column, rows))
+            for column in columns
+    ])
+
+def calc_worker_chunk_stats(chunk):
+    return calc_chunk_stats(_WORKER_DF, _WORKER_COLUMNS, chunk)
+
+def get_chunks(n, chunk_size):
+    return [
+        (start, min(start + chunk_size, n))
+            for start in range(0, n, chunk_size)
+    ]
+
+def calc_feature_stats(df, columns, workers = None, chunk_size = None):
+    """Calculate statistics of `columns` of `df` in a single pass.
+
+    Parameters
+    ----------
+    df : IDataFrame
+        Data frame that supports (`column`, `rows`) keys.
+    columns : list of str
+        Names of the columns.
+    workers : int or None, optional
+        Number of worker processes to process chunks in parallel. If None,
+        chunks are processed sequentially. Default: None.
+    chunk_size : int or None, optional
+        Number of rows processed at once. Default: `DEF_CHUNK_SIZE`.
+
+    Returns
+    -------
+    ndarray, shape (len(columns), len(FIELDS))
+        Statistics of each column.
+    """
+    # pylint: disable=global-statement
+    global _WORKER_DF
+    global _WORKER_COLUMNS
+
+    chunks     = get_chunks(len(df), chunk_size or DEF_CHUNK_SIZE)
+    result     = calc_values_stats(np.empty(0))[np.newaxis]
+    result     = np.repeat(result, len(columns), axis = 0)
+    time_start = time.perf_counter()
+
+    if (workers is None) or (workers < 2):
+        for chunk in chunks:
+            result = merge_stats(result, calc_chunk_stats(df, columns, chunk))
+
+    else:
+        _WORKER_DF      = df
+        _WORKER_COLUMNS = columns
+
+        try:
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                for stats in pool.imap_unordered(
+                    calc_worker_chunk_stats, chunks
+                ):
+                    result = merge_stats(result, stats)
+
+        finally:
+            _WORKER_DF      = None
+            _WORKER_COLUMNS = None
+
+    LOGGER.info(
+        "Calculated statistics of %d columns over %d rows in %.1fs",
+        len(columns), len(df), time.perf_counter() - time_start
+    )
+
+    return result
+
+def unpack_feature_stats(stats, columns):
+    """Convert array of statistics into dict of per column dicts.
+
+    Returns
+    -------
+    dict
+        Dictionary { column : { stat : value } }, where stats are 'count',
+        'nan_fraction', 'mean', 'var', 'min' and 'max'. Variance is the
+        population variance of the non NaN values.
+    """
+    result = {}
+
+    for (column, row) in zip(columns, stats):
+        (count, nan_count, mean, m2, vmin, vmax) = row
+        total = count + nan_count
+
+        result[column] = {
+            'count'        : int(count),
+            'nan_fraction' : (nan_count / total) if total > 0 else 0.,
+            'mean'         : mean,
+            'var'          : (m2 / count) if count > 0 else 0.,
+            'min'          : vmin,
+            'max'          : vmax,
+        }
+
+    return result
+
+def load_feature_stats(
+    df, columns, frame_stat = None, fingerprint = None, workers = None,
+    chunk_size = None
+):
+    """Return statistics of `columns` of `df`, reusing the saved ones.
+
+    Parameters
+    ----------
+    df : IDataFrame
+        Data frame that supports (`column`, `rows`) keys.
+    columns : list of str
+        Names of the columns.
+    frame_stat : list or None, optional
+        List of [ path, size, mtime ] of the data files `df` is read from.
+        If None, the statistics are neither loaded from nor saved to disk.
+        Default: None.
+    fingerprint : object, optional
+        Any other json serializable configuration that rows of `df` depend
+        on (e.g. event selection and split). Default: None.
+    workers, chunk_size
+        C.f. `calc_feature_stats`.
+
+    Returns
+    -------
+    dict
+        Statistics of each column, c.f. `unpack_feature_stats`.
+    """
+    columns = list(columns)
+    path    = None
+
+    if frame_stat:
+        path  = get_sidecar_path(
+            frame_stat, 'stats', [ columns, FIELDS, fingerprint ]
+        )
+        stats = load_sidecar(path)
+
+        shape = (len(columns), len(FIELDS))
+
+        if (stats is not None) and (stats.shape == shape):
+            LOGGER.info("Loading input statistics from '%s'", path)
+            return unpack_feature_stats(stats, columns)
+
+    stats = calc_feature_stats(df, columns, workers, chunk_size)
+
+    if path is not None:
+        save_sidecar(stats, path)
+
+    return unpack_feature_stats(stats, columns)
@@ -0,0 +1,47 @@
+"""
+Attribute forwarding of the data frames that wrap other data frames.
+
+Wrapping frames (e.g. selections, truncations and shards) change the rows
+or values of the wrapped frames. Their methods that take row indices cannot
+be forwarded to the wrapped frames as they are, since the rows would refer
+to the wrong events.
+"""
+
+# Frame methods with (column, rows) arguments
+ROW_METHODS = [ 'get_vlarr', 'read_rows' ]
+
+# Frame methods that do not depend on rows
+FRAME_METHODS = [ 'columns' ]
+
+def get_wrapped_attr(frame, df, name, call_rows):
+    """Return attribute `name` of `frame` that wraps data frame `df`.
+
+    Parameters
+    ----------
+    frame : IDataFrame
+        Wrapping data frame.
+    df : IDataFrame
+        Wrapped data frame, that `FRAME_METHODS` are taken from.
+    name : str
+        Attribute name.
+    call_rows : callable
+        Function `call_rows(name, column, rows)` that calls method `name` of
+        the wrapped frame(s) with the remapped `rows`. Used for
+        `ROW_METHODS`.
+
+    Raises
+    ------
+    AttributeError
+        If attribute `name` cannot be forwarded to `df`.
+    """
+    if name in ROW_METHODS:
+        # Raise AttributeError if `df` has no such method
+        getattr(df, name)
+        return lambda column, rows : call_rows(name, column, rows)
+
+    if name in FRAME_METHODS:
+        return getattr(df, name)
+
+    raise AttributeError(
+        f"'{type(frame).__name__}' object has no attribute '{name}'"
+    )
@@ -0,0 +1,245 @@
+"""
+Random access to HDF files through a cache of decompressed chunks.
+
+HDF datasets are stored in compressed chunks, and reading a single row
+requires decompression of the whole chunk it belongs to. When rows are read
+in a random order (e.g. after shuffling), each chunk ends up decompressed
+once for every row in it. `HDFChunkFrame` keeps the recently decompressed
+chunks in a memory bounded LRU cache instead, so that a chunk is
+decompressed once and serves all of its rows.
+
+The frame can be read by several threads at once (e.g. the prefetching and
+the shard threads). A frame-wide lock guards only the bookkeeping, while
+chunks are read and decompressed under per chunk locks. Therefore, threads
+that need different chunks do not wait for each other, and a chunk
+requested by several threads is still decompressed once.
+"""
+
+import logging
+import os
+import threading
+
+import numpy as np
+
+from vlne.data.data_generator.funcs.lru_cache import LRUCache
+from vlne.funcs import parse_memory_size
+
+LOGGER = logging.getLogger('vlne.data')
+
+# Number of rows read at once from datasets that are not chunked
+DEF_BLOCK_SIZE = 4096
+
+class ChunkedColumn:
+    """Lazy column of `HDFChunkFrame` that reads rows through chunk cache"""
+
+    def __init__(self, frame, column):
+        self._frame  = frame
+        self._column = column
+
+    def __len__(self):
+        return len(self._frame)
+
+    def __getitem__(self, rows):
+        return self._frame.read_rows(self._column, rows)
+
+    def __iter__(self):
+        block = self._frame.get_chunk_size(self._column)
+
+        for start in range(0, len(self), block):
+            yield from self._frame.read_rows(
+                self._column, slice(start, start + block)
+            )
+
+    def __array__(self, dtype = None, copy = None):
+        # pylint: disable=unused-argument
+        return np.asarray(self._frame.read_column(self._column), dtype)
+
+class HDFChunkFrame:
+    """Data frame of a HDF file that caches decompressed chunks.
+
+    The file is expected to have the layout of the `hdf-ra-frame`: one
+    (N, ) dataset per column in the root of the file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the HDF file.
+    columns : list of str or None, optional
+        Columns to expose. If None, all datasets are exposed. Default: None.
+    chunk_cache : int or str, optional
+        Memory budget of the chunk cache, e.g. "512M". Default: "256M".
+
+    Notes
+    -----
+    Hit rate of the chunk cache is logged after every `len(self)` row reads,
+    i.e. about once per epoch.
+    """
+
+    def __init__(self, path, columns = None, chunk_cache = '256M'):
+        # pylint: disable=import-outside-toplevel
+        import h5py
+
+        self._path   = path
+        self._file   = None
+        self._pid    = None
+        self._lock   = threading.Lock()
+        self._loads  = {}
+        self._cache  = LRUCache(
+            parse_memory_size(chunk_cache), os.path.basename(path)
+        )
+        self._chunks = {}
+        self._reads  = 0
+
+        with h5py.File(path, 'r') as f:
+            for (name, dset) in f.items():
+                if not isinstance(dset, h5py.Dataset):
+                    continue
+
+                if (columns is not None) and (name not in columns):
+                    continue
+
+                self._length       = len(dset)
+                self._chunks[name] = (
+                    dset.chunks[0] if dset.chunks else DEF_BLOCK_SIZE
+                )
+
+        if not self._chunks:
+            raise ValueError(f"No columns found in '{path}'")
+
+    def _get_dset(self, column):
+        # pylint: disable=import-outside-toplevel
+        import h5py
+
+        with self._lock:
+            # HDF file handles cannot be shared with the forked processes
+            if (self._file is None) or (self._pid != os.getpid()):
+                self._file = h5py.File(self._path, 'r')
+                self._pid  = os.getpid()
+
+            return self._file[column]
+
+    def _get_chunk(self, column, chunk):
+        key    = (column, chunk)
+        result = self._cache.get(key, count_miss = False)
+
+        if result is not None:
+            return result
+
+        with self._lock:
+            lock = self._loads.setdefault(key, threading.Lock())
+
+        with lock:
+            # Chunk may have been read while this thread was waiting. Only
+            # the thread that reads the chunk counts a miss
+            result = self._cache.get(key)
+
+            if result is None:
+                size   = self._chunks[column]
+                result = self._get_dset(column)[
+                    chunk * size : (chunk + 1) * size
+                ]
+                self._cache.put(key, result)
+
+        with self._lock:
+            self._loads.pop(key, None)
+
+        return result
+
+    def _count_reads(self, n):
+        with self._lock:
+            self._reads += n
+
+            if self._reads < len(self):
+                return
+
+            self._reads = 0
+            self.log_stats()
+            self._cache.reset_stats()
+
+    def get_chunk_size(self, column):
+        """Return number of rows in a chunk of `column`"""
+        return self._chunks[column]
+
+    def read_rows(self, column, rows):
+        """Read `rows` of `column` decompressing each chunk at most once"""
+        size = self._chunks[column]
+
+        if isinstance(rows, (int, np.integer)):
+            rows = rows % len(self)
+            self._count_reads(1)
+            return self._get_chunk(column, rows // size)[rows % size]
+
+        rows   = np.arange(len(self))[rows]
+        chunks = rows // size
+
+        order  = np.argsort(chunks, kind = 'stable')
+        bounds = np.flatnonzero(np.diff(chunks[order])) + 1
+        result = None
+
+        for group in np.split(order, bounds):
+            if len(group) == 0:
+                continue
+
+            data = self._get_chunk(column, chunks[group[0]])
+
+            if result is None:
+                result = np.empty((len(rows), *data.shape[1:]), data.dtype)
+
+            result[group] = data[rows[group] % size]
+
+        self._count_reads(len(rows))
+
+        if result is None:
+            return self._get_dset(column)[0:0]
+
+        return result
+
+    def read_column(self, column):
+        """Read the whole `column` sequentially, bypassing the cache"""
+        return self._get_dset(column)[:]
+
+    def log_stats(self):
+        """Log hit rate of the chunk cache"""
+        total = self._cache.hits + self._cache.misses
+
+        LOGGER.info(
+            "Chunk cache of '%s': %.1f%% hit rate (%d hits, %d misses,"
+            " %d evictions). %d chunks use %.1f MiB",
+            os.path.basename(self._path),
+            100 * self._cache.hits / max(total, 1),
+            self._cache.hits, self._cache.misses, self._cache.evictions,
+            len(self._cache), self._cache.nbytes / 2**20
+        )
+
+    @property
+    def cache(self):
+        return self._cache
+
+    def columns(self):
+        return list(self._chunks.keys())
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self.read_rows(*key)
+
+        if key not in self._chunks:
+            raise KeyError(key)
+
+        return ChunkedColumn(self, key)
+
+    def __getstate__(self):
+        # HDF file handles and locks cannot be pickled
+        state = self.__dict__.copy()
+        state['_file'] = None
+        state['_pid']  = None
+        state['_lock']  = None
+        state['_loads'] = {}
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
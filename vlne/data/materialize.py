@@ -0,0 +1,163 @@
+"""
+Materialization of the deterministic part of the dataset transformations.
+
+Transformations like `mask-nan` and `vlarr-sort` produce the same output
+every time they are applied to an event. Instead of re-applying them on every
+event access, they can be applied once to the whole dataset. The results are
+stored as plain arrays, optionally saved to disk, and exposed as a derived
+data frame, such that only the stochastic transformations (e.g. noise) need
+to run per batch.
+
+A saved materialization is a directory with one `.npy` file per array and an
+`index.json` file, that lists the arrays:
+  - `scalar/<group>` : array of shape (N, n_vars) of a scalar group.
+  - `vlarr/<group>/values`, `vlarr/<group>/offsets` : ragged vlarr group.
+  - `column/<name>` : array of shape (N, ) of a column outside of groups.
+"""
+
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+from vlndata.data_frame import DictFrame
+
+LOGGER = logging.getLogger('vlne.data')
+
+FNAME_INDEX = 'index.json'
+
+def get_array_fname(index):
+    return 'array_%04d.npy' % (index)
+
+def flatten_arrays(scalar, vlarr, columns):
+    """Return list of (name, array) pairs of the materialized arrays"""
+    result = []
+
+    for (group, values) in scalar.items():
+        result.append((f'scalar/{group}', values))
+
+    for (group, (values, offsets)) in vlarr.items():
+        result.append((f'vlarr/{group}/values',  values))
+        result.append((f'vlarr/{group}/offsets', offsets))
+
+    for (name, values) in columns.items():
+        result.append((f'column/{name}', values))
+
+    return result
+
+def unflatten_arrays(arrays):
+    """Inverse of `flatten_arrays`"""
+    scalar  = {}
+    vlarr   = {}
+    columns = {}
+
+    for (name, values) in arrays:
+        kind, key = name.split('/', 1)
+
+        if kind == 'scalar':
+            scalar[key] = values
+
+        elif kind == 'vlarr':
+            group, part = key.rsplit('/', 1)
+            pair = vlarr.get(group, (None, None))
+
+            if part == 'values':
+                vlarr[group] = (values, pair[1])
+            else:
+                vlarr[group] = (pair[0], values)
+
+        else:
+            columns[key] = values
+
+    return (scalar, vlarr, columns)
+
+def save_materialized(path, scalar, vlarr, columns):
+    """Save materialized arrays into directory `path` atomically"""
+    tmpdir = '%s.tmp-%d' % (path, os.getpid())
+    os.makedirs(tmpdir, exist_ok = True)
+
+    index = []
+
+    try:
+        for (idx, (name, values)) in enumerate(
+            flatten_arrays(scalar, vlarr, columns)
+        ):
+            fname = get_array_fname(idx)
+            np.save(os.path.join(tmpdir, fname), np.asarray(values))
+            index.append({ 'name' : name, 'fname' : fname })
+
+        with open(os.path.join(tmpdir, FNAME_INDEX), 'wt') as f:
+            json.dump(index, f)
+
+    except BaseException:
+        shutil.rmtree(tmpdir, ignore_errors = True)
+        raise
+
+    try:
+        os.replace(tmpdir, path)
+    except OSError:
+        # Materialization has been saved concurrently by another process
+        shutil.rmtree(tmpdir, ignore_errors = True)
+
+def materialized_exists(path):
+    return os.path.exists(os.path.join(path, FNAME_INDEX))
+
+def load_materialized(path):
+    """Load materialized arrays from `path` as memory-mapped arrays"""
+    with open(os.path.join(path, FNAME_INDEX), 'rt') as f:
+        index = json.load(f)
+
+    return unflatten_arrays([
+        (
+            x['name'],
+            np.load(os.path.join(path, x['fname']), mmap_mode = 'r')
+        )
+        for x in index
+    ])
+
+def split_vlarr_column(values, offsets):
+    """Convert ragged column into an object array of per event views"""
+    result = np.empty(len(offsets) - 1, dtype = object)
+    result[:] = [
+        values[start:end] for (start, end) in zip(offsets[:-1], offsets[1:])
+    ]
+
+    return result
+
+def make_derived_frame(
+    scalar, vlarr, columns, scalar_groups, vlarr_groups
+):
+    """Construct data frame of the materialized arrays.
+
+    Parameters
+    ----------
+    scalar : dict
+        Dictionary of scalar group arrays of shape (N, n_vars).
+    vlarr : dict
+        Dictionary of ragged (`values`, `offsets`) vlarr groups.
+    columns : dict
+        Dictionary of extra columns of shape (N, ) to add to the frame.
+    scalar_groups : dict
+        Column names of the scalar groups.
+    vlarr_groups : dict
+        Column names of the vlarr groups.
+
+    Returns
+    -------
+    DictFrame
+        Data frame where each group column holds transformed values.
+    """
+    data = dict(columns)
+
+    for (group, values) in scalar.items():
+        for (idx, column) in enumerate(scalar_groups[group]):
+            data.setdefault(column, values[:, idx])
+
+    for (group, (values, offsets)) in vlarr.items():
+        for (idx, column) in enumerate(vlarr_groups[group]):
+            data.setdefault(
+                column, split_vlarr_column(values[:, idx], offsets)
+            )
+
+    return DictFrame(data)
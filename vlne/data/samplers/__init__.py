@@ -0,0 +1,10 @@
+from .isampler              import ISampler
+from .sequential_sampler    import SequentialSampler
+from .bucket_sampler        import BucketSampler
+from .block_shuffle_sampler import BlockShuffleSampler
+from .weighted_sampler      import WeightedSampler
+
+__all__ = [
+    'ISampler', 'SequentialSampler', 'BucketSampler', 'BlockShuffleSampler',
+    'WeightedSampler',
+]
@@ -0,0 +1,138 @@
+import logging
+import math
+import numpy as np
+
+from .isampler import ISampler
+
+LOGGER = logging.getLogger('vlne.data')
+
+class BlockShuffleSampler(ISampler):
+    """Sampler that reshuffles batches while keeping the reads local.
+
+    A full random permutation of events turns reading of chunked (e.g. HDF)
+    frames into random access. Instead, this sampler splits the events into
+    contiguous blocks of `block_size` rows and permutes the order of blocks.
+    Events are then shuffled inside windows of `window` consecutive blocks
+    and the permuted sequence is cut into batches. Event indices of each
+    batch are sorted, such that a batch is read by a few sequential reads.
+
+    The mean number of sequential reads per batch is logged once, when the
+    sampler is constructed. The read throughput of the batches is logged at
+    the end of each epoch.
+
+    Parameters
+    ----------
+    n : int
+        Number of events in a dataset.
+    batch_size : int
+        Batch size.
+    block_size : int, optional
+        Number of contiguous rows in a block. Default: 128.
+    window : int, optional
+        Number of consecutive blocks to shuffle events within. If the window
+        spans more rows than `batch_size`, batches are mixed better, but
+        are made of more reads. Default: 4.
+    shuffle : bool, optional
+        If True, batches will be reshuffled at the end of each epoch.
+        Otherwise, events are batched sequentially. Default: True.
+    seed : int, optional
+        Seed of the shuffling. Default: 0.
+    """
+
+    def __init__(
+        self, n, batch_size,
+        block_size = 128,
+        window     = 4,
+        shuffle    = True,
+        seed       = 0,
+    ):
+        # pylint: disable=too-many-arguments
+        self._n          = n
+        self._batch_size = batch_size
+        self._block_size = block_size
+        self._window     = window
+        self._shuffle    = shuffle
+        self._prg        = np.random.default_rng(seed)
+        self._reads      = None
+        self._order      = self._make_order()
+
+        LOGGER.info(
+            "Block shuffle sampler: %.1f sequential reads per batch"
+            " (block size %d, window %d)",
+            self._reads, self._block_size, self._window
+        )
+
+    def _sort_batches(self, order):
+        """Sort events of each batch and count reads per batch in place"""
+        n_full = (self._n // self._batch_size) * self._batch_size
+        head   = order[:n_full].reshape((-1, self._batch_size))
+        head.sort(axis = 1)
+        order[n_full:].sort()
+
+        # Runs of consecutive indices are broken inside batches only
+        breaks = (np.diff(order) != 1)
+        breaks[self._batch_size - 1::self._batch_size] = False
+
+        n_batches   = max(len(self), 1)
+        self._reads = (n_batches + np.count_nonzero(breaks)) / n_batches
+
+    def _make_order(self):
+        if not self._shuffle:
+            self._reads = 1
+            return np.arange(self._n)
+
+        n_blocks = math.ceil(self._n / self._block_size)
+        blocks   = self._prg.permutation(n_blocks)
+
+        starts  = blocks * self._block_size
+        lengths = np.minimum(starts + self._block_size, self._n) - starts
+
+        result = (
+              np.arange(lengths.sum())
+            + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        )
+
+        window_size = self._window * self._block_size
+
+        for start in range(0, len(result), window_size):
+            self._prg.shuffle(result[start:start + window_size])
+
+        self._sort_batches(result)
+        return result
+
+    def __len__(self):
+        return math.ceil(self._n / self._batch_size)
+
+    def __getitem__(self, index):
+        start = index * self._batch_size
+        end   = min((index + 1) * self._batch_size, self._n)
+
+        return self._order[start:end]
+
+    def on_epoch_end(self):
+        if self._shuffle:
+            self._order = self._make_order()
+
+    def log_reads(self, nbytes, elapsed):
+        LOGGER.info(
+            "Block shuffle sampler: %.1f MB/s read (%.1f MB in %.2fs,"
+            " %.1f sequential reads per batch)",
+            nbytes / max(elapsed, 1e-9) / 2**20, nbytes / 2**20, elapsed,
+            self._reads
+        )
+
+    @property
+    def reads_per_batch(self):
+        """Mean number of sequential reads per batch of the current epoch"""
+        return self._reads
+
+    @property
+    def event_order(self):
+        if not self._shuffle:
+            return None
+
+        return self._order
+
+    @property
+    def shuffle(self):
+        return self._shuffle
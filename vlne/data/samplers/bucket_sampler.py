@@ -0,0 +1,109 @@
+import logging
+import numpy as np
+
+from .isampler           import ISampler
+from .funcs              import calc_padding_fraction
+from .sequential_sampler import SequentialSampler
+
+LOGGER = logging.getLogger('vlne.data')
+
+def calc_bucket_boundaries(lengths, n_buckets):
+    """Calculate bucket boundaries from quantiles of `lengths`"""
+    quantiles  = np.linspace(0, 1, n_buckets + 1)[1:-1]
+    boundaries = np.quantile(lengths, quantiles, method = 'higher')
+
+    return np.unique(boundaries)
+
+class BucketSampler(ISampler):
+    """Sampler that batches together events of similar vlarr lengths.
+
+    Events are split into buckets according to the total length of their
+    vlarr groups, such that each bucket holds roughly the same number of
+    events. Batches are then made from events of a single bucket, which
+    reduces the number of padded vlarr elements.
+
+    Parameters
+    ----------
+    lengths : dict
+        Dictionary where keys are vlarr group names and values are arrays of
+        vlarr lengths of each event.
+    batch_size : int
+        Batch size.
+    n_buckets : int, optional
+        Number of buckets. Default: 10.
+    shuffle : bool, optional
+        If True, events inside buckets and the order of batches will be
+        reshuffled at the end of each epoch. Default: True.
+    seed : int, optional
+        Seed of the shuffling. Default: 0.
+    """
+
+    def __init__(
+        self, lengths, batch_size,
+        n_buckets = 10,
+        shuffle   = True,
+        seed      = 0,
+    ):
+        if len(lengths) == 0:
+            raise ValueError("Bucketing requires at least one vlarr group")
+
+        self._batch_size = batch_size
+        self._shuffle    = shuffle
+        self._prg        = np.random.default_rng(seed)
+
+        total_lengths = sum(lengths.values())
+        boundaries    = calc_bucket_boundaries(total_lengths, n_buckets)
+        bucket_index  = np.digitize(total_lengths, boundaries, right = True)
+
+        self._buckets = [
+            np.flatnonzero(bucket_index == i)
+                for i in range(len(boundaries) + 1)
+        ]
+        self._batches = self._make_batches()
+
+        seq_sampler = SequentialSampler(len(total_lengths), batch_size)
+
+        LOGGER.info(
+            "Bucketing events by vlarr length with boundaries %s."
+            " Padding fraction: %.3f (sequential) -> %.3f (bucketed)",
+            boundaries,
+            calc_padding_fraction(
+                lengths, [ seq_sampler[i] for i in range(len(seq_sampler)) ]
+            ),
+            calc_padding_fraction(lengths, self._batches)
+        )
+
+    def _make_batches(self):
+        result = []
+
+        for bucket in self._buckets:
+            if self._shuffle:
+                bucket = self._prg.permutation(bucket)
+
+            result += [
+                bucket[i:i + self._batch_size]
+                    for i in range(0, len(bucket), self._batch_size)
+            ]
+
+        if self._shuffle:
+            result = [ result[i] for i in self._prg.permutation(len(result)) ]
+
+        return result
+
+    def __len__(self):
+        return len(self._batches)
+
+    def __getitem__(self, index):
+        return self._batches[index]
+
+    def on_epoch_end(self):
+        if self._shuffle:
+            self._batches = self._make_batches()
+
+    @property
+    def event_order(self):
+        return np.concatenate(self._batches)
+
+    @property
+    def shuffle(self):
+        return self._shuffle
@@ -0,0 +1,153 @@
+"""
+Helper functions for the batch samplers.
+"""
+
+import numpy as np
+
+def get_vlarr_lengths(dset, group, limit = None):
+    """Return number of vlarr elements of each event of a `dset` group.
+
+    Parameters
+    ----------
+    dset : Dataset
+        Dataset to extract vlarr lengths from.
+    group : str
+        Name of the vlarr group.
+    limit : int or None, optional
+        If not None, lengths will be clipped by `limit`, similar to the
+        `vlarr_limits` truncation. Default: None.
+
+    Returns
+    -------
+    ndarray, shape (len(dset), )
+        Array of vlarr lengths.
+    """
+    if hasattr(dset, 'vlarr') and (group in dset.vlarr):
+        result = np.diff(dset.vlarr[group][1])
+    else:
+        column = dset.vlarr_groups[group][0]
+        values = dset.df[column]
+
+        result = np.fromiter(
+            (len(x) for x in values), dtype = np.int64, count = len(values)
+        )
+
+    if limit is not None:
+        result = np.minimum(result, limit)
+
+    return result
+
+def calc_padding_fraction(lengths, batches):
+    """Calculate fraction of padded elements among all vlarr elements.
+
+    Parameters
+    ----------
+    lengths : dict
+        Dictionary where keys are vlarr group names and values are arrays of
+        lengths of each event.
+    batches : list of ndarray
+        List of event indices of each batch.
+
+    Returns
+    -------
+    float
+        Fraction of the padded elements in the dense batches.
+    """
+    batches = [ b for b in batches if len(b) > 0 ]
+
+    if len(batches) == 0:
+        return 0
+
+    indices = np.concatenate(batches)
+    sizes   = np.array([ len(b) for b in batches ])
+    starts  = np.concatenate([ [ 0 ], np.cumsum(sizes)[:-1] ])
+
+    n_total  = 0
+    n_padded = 0
+
+    for values in lengths.values():
+        batch_lengths = values[indices]
+        max_lengths   = np.maximum.reduceat(batch_lengths, starts)
+
+        n_total  += batch_lengths.sum()
+        n_padded += (sizes * max_lengths).sum()
+
+    if n_padded == 0:
+        return 0
+
+    return 1 - n_total / n_padded
+
+def calc_reads_per_batch(batches):
+    """Calculate mean number of contiguous index runs per batch.
+
+    Each run of consecutive event indices can be read from a chunked frame
+    by a single sequential read. Therefore, the number of runs estimates the
+    number of reads needed to construct a batch.
+
+    Parameters
+    ----------
+    batches : list of ndarray
+        List of sorted event indices of each batch.
+
+    Returns
+    -------
+    float
+        Mean number of contiguous runs per batch.
+    """
+    batches = [ b for b in batches if len(b) > 0 ]
+
+    if len(batches) == 0:
+        return 0
+
+    return np.mean([ 1 + np.count_nonzero(np.diff(b) != 1) for b in batches ])
+
+def build_alias_table(weights):
+    """Construct alias table of a discrete distribution (Vose's method).
+
+    Parameters
+    ----------
+    weights : ndarray, shape (N, )
+        Non-negative weights of the distribution outcomes.
+
+    Returns
+    -------
+    (prob, alias) : (ndarray, ndarray)
+        Arrays of shape (N, ). Outcome `i` is drawn by choosing a uniform
+        column `i` and keeping it with probability `prob[i]`, otherwise
+        `alias[i]` is taken.
+    """
+    weights = np.asarray(weights, dtype = np.float64).ravel()
+
+    if (len(weights) == 0) or np.any(weights < 0) or (weights.sum() <= 0):
+        raise ValueError("Weights must be non-negative with positive sum")
+
+    scaled = weights * (len(weights) / weights.sum())
+    small  = np.flatnonzero(scaled <  1).tolist()
+    large  = np.flatnonzero(scaled >= 1).tolist()
+
+    # Python lists are much faster than numpy arrays for scalar access
+    prob  = scaled.tolist()
+    alias = list(range(len(weights)))
+
+    while small and large:
+        s = small.pop()
+        l = large[-1]
+
+        alias[s]  = l
+        prob[l]  -= (1 - prob[s])
+
+        if prob[l] < 1:
+            small.append(large.pop())
+
+    # Leftovers are equal to 1 up to rounding errors
+    for i in small + large:
+        prob[i] = 1
+
+    return (np.array(prob), np.array(alias, dtype = np.int64))
+
+def sample_alias(prob, alias, size, prg):
+    """Draw `size` outcomes from the alias table (`prob`, `alias`)"""
+    columns = prg.integers(0, len(prob), size = size)
+    keep    = prg.random(size = size) < prob[columns]
+
+    return np.where(keep, columns, alias[columns])
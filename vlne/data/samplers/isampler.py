@@ -0,0 +1,34 @@
+
+class ISampler:
+    """Interface of an object that splits dataset events into batches."""
+
+    def __len__(self):
+        """Return number of batches"""
+        raise NotImplementedError
+
+    def __getitem__(self, index):
+        """Return array of event indices that make batch `index`"""
+        raise NotImplementedError
+
+    def on_epoch_end(self):
+        """Update batch composition at the end of an epoch"""
+
+    def log_reads(self, nbytes, elapsed):
+        """Log throughput of reading `nbytes` of batches in `elapsed` s"""
+
+    @property
+    def shuffle(self):
+        """Whether batch composition changes between epochs"""
+        return False
+
+    @property
+    def event_order(self):
+        """Order in which events are visited by batches `[0, len(self))`.
+
+        Returns
+        -------
+        ndarray or None
+            Concatenated event indices of all batches. None if events are
+            visited sequentially.
+        """
+        raise NotImplementedError
@@ -0,0 +1,32 @@
+import math
+import numpy as np
+
+from .isampler import ISampler
+
+class SequentialSampler(ISampler):
+    """Sampler that splits events into contiguous batches.
+
+    Parameters
+    ----------
+    n : int
+        Number of events in a dataset.
+    batch_size : int
+        Batch size.
+    """
+
+    def __init__(self, n, batch_size):
+        self._n          = n
+        self._batch_size = batch_size
+
+    def __len__(self):
+        return math.ceil(self._n / self._batch_size)
+
+    def __getitem__(self, index):
+        start = index * self._batch_size
+        end   = min((index + 1) * self._batch_size, self._n)
+
+        return np.arange(start, end)
+
+    @property
+    def event_order(self):
+        return None
@@ -0,0 +1,77 @@
+import logging
+import math
+import numpy as np
+
+from .isampler import ISampler
+from .funcs    import build_alias_table, sample_alias
+
+LOGGER = logging.getLogger('vlne.data')
+
+class WeightedSampler(ISampler):
+    """Sampler that draws events with probability proportional to weights.
+
+    This sampler is an alternative to the weighted loss. Instead of spending
+    forward and backward passes on events with negligible weights, events
+    are drawn (with replacement) proportionally to their weights, and the
+    loss weights are set to one. Events are drawn with the alias method,
+    such that each draw takes O(1) time.
+
+    Parameters
+    ----------
+    weights : ndarray, shape (N, )
+        Non-negative weights of the dataset events.
+    batch_size : int
+        Batch size.
+    n_samples : int or None, optional
+        Number of events to draw per epoch. If None, it is equal to the number
+        of events in the dataset. Default: None.
+    seed : int, optional
+        Seed of the sampling. Default: 0.
+    """
+
+    def __init__(self, weights, batch_size, n_samples = None, seed = 0):
+        weights = np.asarray(weights, dtype = np.float64).ravel()
+
+        self._batch_size = batch_size
+        self._n_samples  = n_samples or len(weights)
+        self._prg        = np.random.default_rng(seed)
+
+        self._prob, self._alias = build_alias_table(weights)
+        self._batches = self._make_batches()
+
+        LOGGER.info(
+            "Weighted sampling of %d events per epoch."
+            " Effective sample size: %.0f of %d events",
+            self._n_samples, weights.sum()**2 / np.sum(weights**2),
+            len(weights)
+        )
+
+    def _make_batches(self):
+        samples = sample_alias(
+            self._prob, self._alias, self._n_samples, self._prg
+        )
+
+        return [
+            np.sort(samples[i:i + self._batch_size])
+                for i in range(0, len(samples), self._batch_size)
+        ]
+
+    def __len__(self):
+        return math.ceil(self._n_samples / self._batch_size)
+
+    def __getitem__(self, index):
+        return self._batches[index]
+
+    def on_epoch_end(self):
+        self._batches = self._make_batches()
+
+    @property
+    def event_order(self):
+        raise RuntimeError(
+            "Weighted sampler draws events with replacement,"
+            " so predictions cannot be mapped back to the dataset events"
+        )
+
+    @property
+    def shuffle(self):
+        return True
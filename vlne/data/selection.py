@@ -0,0 +1,195 @@
+"""
+Event selection by simple column predicates.
+
+A selection is a list of predicates `[ column, operator, value ]` that are
+combined with a logical AND, e.g.
+
+    [ [ "isCC", "==", 1 ], [ "trueE", "<", 5 ], [ "pdg", "in", [ 12, -12 ] ] ]
+
+Predicates are evaluated in a vectorized way on the selection columns only.
+The resulting row index is saved next to the data file, such that subsequent
+runs can reuse it without scanning the file again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+from vlne.data.frame_funcs import get_wrapped_attr
+
+LOGGER = logging.getLogger('vlne.data')
+
+OPERATORS = {
+    '=='     : np.equal,
+    '!='     : np.not_equal,
+    '<'      : np.less,
+    '<='     : np.less_equal,
+    '>'      : np.greater,
+    '>='     : np.greater_equal,
+    'in'     : np.isin,
+    'not in' : lambda x, y : np.logical_not(np.isin(x, y)),
+}
+
+def parse_selection(selection):
+    """Validate selection and return it as a list of (column, op, value)"""
+    result = []
+
+    for predicate in (selection or []):
+        if len(predicate) != 3:
+            raise ValueError(
+                f"Selection predicate must be [ column, op, value ],"
+                f" but got {predicate}"
+            )
+
+        column, op, value = predicate
+
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown selection operator {op}")
+
+        result.append((column, op, value))
+
+    return result
+
+def get_selection_columns(selection):
+    """Return set of columns that `selection` depends on"""
+    return set(column for (column, _, _) in parse_selection(selection))
+
+def evaluate_selection(df, selection):
+    """Return sorted indices of rows of `df` that pass `selection`"""
+    mask = np.ones(len(df), dtype = bool)
+
+    for (column, op, value) in parse_selection(selection):
+        values = np.asarray(df[column]).reshape(len(df), -1)[:, 0]
+        mask  &= OPERATORS[op](values, value)
+
+    return np.flatnonzero(mask).astype(np.int64)
+
+def get_selection_index_path(path, selection):
+    """Return path of the cached row index of `selection` applied to `path`.
+
+    The cache is keyed by the hash of the selection and the size and
+    modification time of the data file, so it is invalidated when either of
+    them changes.
+    """
+    stat = os.stat(path)
+    key  = json.dumps(
+        [ parse_selection(selection), stat.st_size, stat.st_mtime_ns ],
+        sort_keys = True
+    )
+
+    digest = hashlib.md5(key.encode()).hexdigest()
+    return f'{path}.selection_{digest}.npy'
+
+def save_selection_index(index, path):
+    """Save row `index` to `path` atomically, ignoring unwritable dirs"""
+    tmp_path = '%s.tmp-%d.npy' % (path, os.getpid())
+
+    try:
+        np.save(tmp_path, index)
+        os.replace(tmp_path, path)
+
+    except OSError as e:
+        LOGGER.warning("Failed to save selection index '%s': %s", path, e)
+
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load_selection_index(df, selection, path = None):
+    """Return row index of `selection`, reusing the one cached for `path`.
+
+    Parameters
+    ----------
+    df : IDataFrame
+        Data frame to apply selection to.
+    selection : list
+        List of selection predicates.
+    path : str or None, optional
+        Path of the data file `df` is read from. If None, the index is neither
+        loaded from nor saved to disk. Default: None.
+
+    Returns
+    -------
+    ndarray of int64
+        Sorted indices of the rows that pass the selection.
+    """
+    index_path = None
+
+    if (path is not None) and os.path.isfile(path):
+        index_path = get_selection_index_path(path, selection)
+
+        if os.path.exists(index_path):
+            LOGGER.info("Loading selection index from '%s'", index_path)
+            return np.load(index_path)
+
+    index = evaluate_selection(df, selection)
+
+    if index_path is not None:
+        save_selection_index(index, index_path)
+
+    return index
+
+class SelectionFrame:
+    """Data frame that exposes only rows `index` of `df`.
+
+    Columns are indexed lazily, so the rows that fail the selection are never
+    read by datasets constructed on top of this frame.
+
+    Parameters
+    ----------
+    df : IDataFrame
+        Data frame to select rows from.
+    index : ndarray of int
+        Indices of the selected rows of `df`. Usually sorted, but any order
+        (e.g. a permutation) is supported.
+    """
+
+    def __init__(self, df, index):
+        self._df    = df
+        self._index = np.asarray(index)
+
+        # Memory-mapped integer indices are used as they are, without a copy
+        if self._index.dtype.kind not in 'iu':
+            self._index = self._index.astype(np.int64)
+
+    @property
+    def index(self):
+        return self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            column, rows = key
+            return self._df[column, self._index[rows]]
+
+        # Only the selected rows are read
+        return self._df[key, self._index]
+
+    def _call_rows(self, name, column, rows):
+        return getattr(self._df, name)(column, self._index[rows])
+
+    def __getattr__(self, name):
+        # Column names are inherited from `df`, and row indexed methods
+        # are remapped to the selected rows
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return get_wrapped_attr(self, self._df, name, self._call_rows)
+
+def apply_selection(df, selection, path = None):
+    """Return `df` restricted to the rows that pass `selection`"""
+    if not selection:
+        return df
+
+    index = load_selection_index(df, selection, path)
+
+    LOGGER.info(
+        "Selected %d of %d events (%.1f%%)",
+        len(index), len(df), 100 * len(index) / max(len(df), 1)
+    )
+
+    return SelectionFrame(df, index)
@@ -0,0 +1,317 @@
+"""
+Data frame that spans many data files (shards) without merging them.
+
+The shards are concatenated virtually: a global row index maps each row to
+a (shard, local row) pair. Number of rows of each shard is found once and
+saved into a shard index file next to the shards, keyed by the path, size
+and modification time of each shard. Therefore, adding a new shard requires
+only that shard to be inspected.
+
+Since the shuffling and the train/val/test splitting are done on top of the
+global row index, they work across shards.
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from vlne.data.data_generator.funcs.lru_cache import LRUCache
+from vlne.data.frame_funcs import get_wrapped_attr
+from vlne.data.truncation  import to_object_array
+from vlne.funcs import parse_memory_size
+
+LOGGER = logging.getLogger('vlne.data')
+
+FNAME_SHARD_INDEX = '.vlne_shard_index.json'
+
+def get_shard_paths(path, datadir = None):
+    """Expand glob pattern (or a list of them) `path` into sorted paths"""
+    patterns = [ path ] if isinstance(path, str) else list(path)
+    result   = []
+
+    for pattern in patterns:
+        pattern = os.path.join(datadir or '', pattern)
+        matches = sorted(glob.glob(pattern))
+
+        if not matches:
+            raise ValueError(f"No shards found for '{pattern}'")
+
+        result += matches
+
+    return result
+
+def get_files_stat(paths):
+    """Return list of [ path, size, mtime ] of files `paths`"""
+    result = []
+
+    for path in paths:
+        stat = os.stat(path)
+        result.append(
+            [ os.path.abspath(path), stat.st_size, stat.st_mtime_ns ]
+        )
+
+    return result
+
+def get_shard_index_path(paths):
+    dirs = [ os.path.dirname(os.path.abspath(x)) for x in paths ]
+    return os.path.join(os.path.commonpath(dirs), FNAME_SHARD_INDEX)
+
+def load_shard_index(path):
+    """Load shard index `path` as dict { shard : (size, mtime, length) }"""
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path, 'rt') as f:
+            return { k : tuple(v) for (k, v) in json.load(f).items() }
+
+    except (OSError, ValueError) as e:
+        LOGGER.warning("Failed to load shard index '%s': %s", path, e)
+        return {}
+
+def save_shard_index(index, path):
+    """Save shard `index` to `path` atomically, ignoring unwritable dirs"""
+    tmp_path = '%s.tmp-%d' % (path, os.getpid())
+
+    try:
+        with open(tmp_path, 'wt') as f:
+            json.dump(index, f, indent = 1, sort_keys = True)
+
+        os.replace(tmp_path, path)
+
+    except OSError as e:
+        LOGGER.warning("Failed to save shard index '%s': %s", path, e)
+
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def concatenate_parts(parts):
+    """Concatenate column values read from several shards"""
+    parts = [ np.asarray(x) for x in parts ]
+
+    if all(x.dtype != object for x in parts) and (
+        len(set(x.shape[1:] for x in parts)) == 1
+    ):
+        return np.concatenate(parts)
+
+    # Variable length arrays
+    return to_object_array([ y for x in parts for y in x ])
+
+class ShardedFrame:
+    """Data frame that concatenates rows of several shard data frames.
+
+    Parameters
+    ----------
+    paths : list of str
+        Paths of the shards.
+    lengths : list of int
+        Number of rows of each shard.
+    open_shard : callable
+        Function `open_shard(path)` that constructs data frame of a shard.
+        Shards are opened lazily, on the first access.
+    threads : int or None, optional
+        Number of threads that read shards concurrently. If None, the
+        `ThreadPoolExecutor` default is used. Default: None.
+    column_cache : int, str or None, optional
+        Memory budget (e.g. "1G") of an LRU cache of the whole columns. If
+        None, whole columns are concatenated on every access. Default: None.
+    """
+
+    def __init__(
+        self, paths, lengths, open_shard, threads = None, column_cache = None
+    ):
+        self._paths      = list(paths)
+        self._offsets    = np.concatenate(([ 0 ], np.cumsum(lengths)))
+        self._open_shard = open_shard
+        self._threads    = threads
+        self._shards     = [ None ] * len(paths)
+        self._locks      = [ threading.Lock() for _ in paths ]
+        self._executor   = None
+        self._columns    = None
+
+        if column_cache is not None:
+            self._columns = LRUCache(
+                parse_memory_size(column_cache), 'sharded columns'
+            )
+
+    def _get_shard(self, shard):
+        with self._locks[shard]:
+            if self._shards[shard] is None:
+                self._shards[shard] = self._open_shard(self._paths[shard])
+
+            return self._shards[shard]
+
+    def _map(self, func, args):
+        if len(args) == 1:
+            return [ func(*args[0]) ]
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers        = self._threads,
+                thread_name_prefix = 'vlne-shard',
+            )
+
+        return list(self._executor.map(lambda x : func(*x), args))
+
+    def _read_rows(self, shard, column, rows, method = None):
+        shard_df = self._get_shard(shard)
+
+        if method is None:
+            return shard_df[column, rows]
+
+        return getattr(shard_df, method)(column, rows)
+
+    def _read_column(self, shard, column):
+        return self._get_shard(shard)[column]
+
+    def locate(self, rows):
+        """Return (shard, local row) indices of the global `rows`"""
+        rows   = np.asarray(rows, dtype = np.int64)
+        shards = np.searchsorted(self._offsets, rows, side = 'right') - 1
+
+        return (shards, rows - self._offsets[shards])
+
+    def _get_rows(self, column, rows, method = None):
+        shards, local = self.locate(rows)
+
+        # Rows of each shard are read as a contiguous group concurrently
+        order  = np.argsort(shards, kind = 'stable')
+        bounds = np.flatnonzero(np.diff(shards[order])) + 1
+        groups = np.split(order, bounds) if len(order) > 0 else []
+
+        parts = self._map(
+            self._read_rows,
+            [ (shards[g[0]], column, local[g], method) for g in groups ]
+        )
+
+        if not parts:
+            return self._read_rows(0, column, local, method)
+
+        values = concatenate_parts(parts)
+        result = np.empty_like(values)
+        result[order] = values
+
+        return result
+
+    def __len__(self):
+        return int(self._offsets[-1])
+
+    def _call_rows(self, method, column, rows):
+        """Call `method` (or indexing, if None) of shards with local rows"""
+        if isinstance(rows, (int, np.integer)):
+            shards, local = self.locate([ rows % len(self) ])
+            return self._read_rows(shards[0], column, local[0], method)
+
+        return self._get_rows(column, np.arange(len(self))[rows], method)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self._call_rows(None, *key)
+
+        result = None
+
+        if self._columns is not None:
+            result = self._columns.get(key)
+
+        if result is None:
+            result = concatenate_parts(self._map(
+                self._read_column,
+                [ (shard, key) for shard in range(len(self._paths)) ]
+            ))
+
+            if self._columns is not None:
+                self._columns.put(key, result)
+
+        return result
+
+    def __getattr__(self, name):
+        # Column names are taken from a shard, and row indexed methods are
+        # called on the shards that hold the rows
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return get_wrapped_attr(
+            self, self._get_shard(0), name, self._call_rows
+        )
+
+    def __getstate__(self):
+        # Thread pools and locks cannot be pickled
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_locks']    = None
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._locks = [ threading.Lock() for _ in self._paths ]
+
+def get_shard_lengths(paths, open_shard, index_path = None, threads = None):
+    """Return number of rows of each shard, reusing the saved shard index"""
+    if index_path is None:
+        index_path = get_shard_index_path(paths)
+
+    index   = load_shard_index(index_path)
+    stats   = get_files_stat(paths)
+    missing = [
+        i for (i, (path, size, mtime)) in enumerate(stats)
+            if tuple(index.get(path, (None, None))[:2]) != (size, mtime)
+    ]
+
+    if missing:
+        LOGGER.info("Indexing %d of %d shards", len(missing), len(paths))
+
+        with ThreadPoolExecutor(max_workers = threads) as executor:
+            lengths = list(executor.map(
+                lambda i : len(open_shard(paths[i])), missing
+            ))
+
+        for (i, length) in zip(missing, lengths):
+            path, size, mtime = stats[i]
+            index[path] = (size, mtime, length)
+
+        save_shard_index(index, index_path)
+
+    return [ index[path][2] for (path, _, _) in stats ]
+
+def create_sharded_frame(
+    path, open_shard, datadir = None, threads = None, index = None,
+    column_cache = None
+):
+    """Construct data frame that spans shards matching `path`.
+
+    Parameters
+    ----------
+    path : str or list of str
+        Glob pattern(s) of the shard files, relative to `datadir`.
+    open_shard : callable
+        Function `open_shard(path)` that constructs data frame of a shard.
+    datadir : str or None, optional
+        Base directory of the shards. Default: None.
+    threads : int or None, optional
+        Number of threads that read shards concurrently. Default: None.
+    index : str or None, optional
+        Path of the shard index file. If None, the index is saved into the
+        common directory of the shards. Default: None.
+    column_cache : int, str or None, optional
+        Memory budget of the cache of the whole columns. Default: None.
+
+    Returns
+    -------
+    ShardedFrame
+    """
+    paths   = get_shard_paths(path, datadir)
+    lengths = get_shard_lengths(paths, open_shard, index, threads)
+
+    LOGGER.info(
+        "Loaded sharded frame of %d rows from %d shards",
+        sum(lengths), len(paths)
+    )
+
+    return ShardedFrame(paths, lengths, open_shard, threads, column_cache)
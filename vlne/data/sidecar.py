@@ -0,0 +1,114 @@
+"""
+Arrays derived from data files that are saved next to them.
+
+Sidecar arrays (e.g. extra variables or subset indices) are keyed by the
+fingerprint of the data files (path, size and modification time) and by the
+configuration they are derived with, so they are invalidated when either of
+them changes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+LOGGER = logging.getLogger('vlne.data')
+
+def get_sidecar_path(frame_stat, kind, key):
+    """Return path of the sidecar array `kind` of data files `frame_stat`.
+
+    Parameters
+    ----------
+    frame_stat : list
+        List of [ path, size, mtime ] of the data files.
+    kind : str
+        Kind of the sidecar array, e.g. 'extra' or 'subset'.
+    key : object
+        Json serializable configuration the array is derived with.
+
+    Returns
+    -------
+    str
+        Path next to the data file, or in the common directory of the data
+        files if there are many of them.
+    """
+    digest = hashlib.md5(
+        json.dumps([ key, frame_stat ], sort_keys = True).encode()
+    ).hexdigest()
+
+    paths = [ path for (path, _, _) in frame_stat ]
+
+    if len(paths) == 1:
+        prefix = paths[0]
+    else:
+        prefix = os.path.join(
+            os.path.commonpath([ os.path.dirname(x) for x in paths ]),
+            'shards'
+        )
+
+    return f'{prefix}.{kind}_{digest}.npy'
+
+def get_tmp_path(path):
+    return '%s.tmp-%d.npy' % (path, os.getpid())
+
+def save_sidecar(array, path):
+    """Save `array` to `path` atomically, ignoring unwritable dirs"""
+    tmp_path = get_tmp_path(path)
+
+    try:
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+
+    except OSError as e:
+        LOGGER.warning("Failed to save '%s': %s", path, e)
+
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def fill_sidecar(path, shape, dtype, fill):
+    """Create sidecar array `path` on disk and `fill` it in place.
+
+    Unlike `save_sidecar`, the array is never held in memory: `fill(out)` is
+    called with a memory-mapped array that it should write the values to.
+
+    Returns
+    -------
+    ndarray or None
+        Memory-mapped sidecar array, or None if it cannot be created.
+    """
+    tmp_path = get_tmp_path(path)
+
+    try:
+        out = np.lib.format.open_memmap(
+            tmp_path, mode = 'w+', dtype = dtype, shape = shape
+        )
+
+        fill(out)
+        out.flush()
+        del out
+
+        os.replace(tmp_path, path)
+
+    except OSError as e:
+        LOGGER.warning("Failed to save '%s': %s", path, e)
+
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        return None
+
+    return load_sidecar(path)
+
+def load_sidecar(path):
+    """Memory-map sidecar array `path` or return None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+
+    try:
+        return np.load(path, mmap_mode = 'r')
+
+    except (OSError, ValueError) as e:
+        LOGGER.warning("Failed to load '%s': %s", path, e)
+        return None
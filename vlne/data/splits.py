@@ -0,0 +1,121 @@
+"""
+Train/val/test splits with the row indices persisted next to the data files.
+
+Shuffling and splitting a data frame is repeated by every training and
+evaluation run. Instead, the split is computed once over a frame of row
+numbers, and the row indices of each split are saved next to the data file,
+keyed by the shuffle seed, split sizes and the frame configuration. The
+subsequent runs memory-map the saved indices, which guarantees that every
+tool sees identical splits.
+"""
+
+import logging
+import numpy as np
+
+from vlndata.data_frame import DictFrame, ShuffleFrame, train_test_split
+
+from vlne.data.selection import SelectionFrame
+from vlne.data.sidecar   import get_sidecar_path, load_sidecar, save_sidecar
+
+LOGGER = logging.getLogger('vlne.data')
+
+def has_splits(data_config):
+    """Check whether `data_config` splits data into train/val/test"""
+    return (data_config.test_size is not None) \
+        or (data_config.val_size is not None)
+
+def shuffle_split(df, data_config):
+    """Shuffle and split `df` according to `data_config`"""
+    if data_config.shuffle:
+        df = ShuffleFrame(df, seed = data_config.seed)
+
+    if not has_splits(data_config):
+        return df
+
+    return train_test_split(df, data_config.val_size, data_config.test_size)
+
+def get_index_dtype(n):
+    """Return the smallest integer type that can index `n` rows"""
+    return np.int32 if (n < 2**31) else np.int64
+
+def compute_split_indices(n, data_config):
+    """Return list of row indices of each split of a frame of `n` rows"""
+    rows   = DictFrame({ 'row' : np.arange(n, dtype = get_index_dtype(n)) })
+    result = shuffle_split(rows, data_config)
+
+    if not has_splits(data_config):
+        result = [ result ]
+
+    return [ np.asarray(x['row']) for x in result ]
+
+def get_split_key(n, data_config, fingerprint):
+    return [
+        n, bool(data_config.shuffle), data_config.seed,
+        data_config.val_size, data_config.test_size, fingerprint,
+    ]
+
+def load_split_indices(n, data_config, frame_stat, fingerprint = None):
+    """Return row indices of each split, reusing the ones saved on disk.
+
+    Parameters
+    ----------
+    n : int
+        Number of rows of the data frame.
+    data_config : DataConfig
+        Data configuration with the shuffle and split settings.
+    frame_stat : list
+        List of [ path, size, mtime ] of the data files.
+    fingerprint : object, optional
+        Any other json serializable configuration that rows of the data
+        frame depend on (e.g. event selection). Default: None.
+
+    Returns
+    -------
+    list of ndarray
+        Row indices of each split (or of a single shuffled frame if
+        `data_config` has no splits).
+    """
+    key        = get_split_key(n, data_config, fingerprint)
+    path_rows  = get_sidecar_path(frame_stat, 'split', key)
+    path_sizes = get_sidecar_path(frame_stat, 'split-sizes', key)
+
+    # Splits are saved concatenated, together with the number of their rows
+    rows  = load_sidecar(path_rows)
+    sizes = load_sidecar(path_sizes)
+
+    if (rows is not None) and (sizes is not None) \
+            and (len(rows) == n) and (np.sum(sizes) == n):
+        LOGGER.info("Loading split indices from '%s'", path_rows)
+        return np.split(rows, np.cumsum(sizes)[:-1])
+
+    result = compute_split_indices(n, data_config)
+
+    save_sidecar(np.concatenate(result), path_rows)
+    save_sidecar(
+        np.array([ len(x) for x in result ], dtype = np.int64), path_sizes
+    )
+
+    return result
+
+def split_data_frame(df, data_config, frame_stat = None, fingerprint = None):
+    """Shuffle and split `df`, reusing the split indices saved on disk.
+
+    If `frame_stat` is None, `df` is shuffled and split directly.
+    C.f. `load_split_indices`.
+    """
+    if (not data_config.shuffle) and (not has_splits(data_config)):
+        return df
+
+    if not frame_stat:
+        return shuffle_split(df, data_config)
+
+    result = [
+        SelectionFrame(df, indices) for indices in load_split_indices(
+            len(df), data_config, frame_stat, fingerprint
+        )
+    ]
+
+    if not has_splits(data_config):
+        return result[0]
+
+    return result
@@ -0,0 +1,161 @@
+"""
+Stratified subsets of data for the fast iteration, e.g. in tuning scans.
+
+A subset is specified by the `subset` option of the data configuration:
+
+    { "var" : "trueE", "fraction" : 0.1, "bins" : 50, "range" : [ 0, 5 ] }
+
+Events are binned by the variable `var` (with the binning of the `flat`
+weights) and the same fraction of events is drawn from every bin, such that
+the subset preserves the distribution of `var`. Instead of the `fraction`,
+the number of events can be given by `size`. The drawn row index is saved
+next to the data file, so that every run (e.g. every trial of a sweep) uses
+exactly the same rows.
+"""
+
+import logging
+import numpy as np
+
+from vlne.data.selection import SelectionFrame
+from vlne.data.sidecar   import get_sidecar_path, load_sidecar, save_sidecar
+
+LOGGER = logging.getLogger('vlne.data')
+
+DEF_SUBSET = {
+    'var'      : 'trueE',
+    'bins'     : 50,
+    'range'    : (0, 5),
+    'fraction' : None,
+    'size'     : None,
+    'seed'     : 0,
+}
+
+def parse_subset(subset):
+    """Validate subset specification and fill in the default values"""
+    unknown = set(subset) - set(DEF_SUBSET)
+
+    if unknown:
+        raise ValueError(f"Unknown subset options {sorted(unknown)}")
+
+    result = { **DEF_SUBSET, **subset }
+
+    if (result['fraction'] is None) == (result['size'] is None):
+        raise ValueError("Subset requires exactly one of fraction or size")
+
+    if (result['fraction'] is not None) and not (0 < result['fraction'] <= 1):
+        raise ValueError(
+            f"Subset fraction must be in (0, 1], but got {result['fraction']}"
+        )
+
+    if (result['size'] is not None) and (result['size'] < 1):
+        raise ValueError(f"Subset size must be positive, got {result['size']}")
+
+    return result
+
+def get_subset_columns(subset):
+    """Return set of columns that `subset` is stratified on"""
+    if not subset:
+        return set()
+
+    return { parse_subset(subset)['var'] }
+
+def get_strata(values, bins, range):
+    """Return index of the histogram bin of each value, with overflows"""
+    # pylint: disable=redefined-builtin
+    edges  = np.histogram_bin_edges(values, bins = bins, range = range)
+    result = np.digitize(values, edges)
+
+    # [0, len(edges)] are overflow bins, c.f. `flat_weights`
+    return np.clip(result, 1, len(edges) - 1) - 1
+
+def get_strata_sizes(counts, size):
+    """Split `size` between strata proportionally to their `counts`"""
+    quota  = counts * size / max(np.sum(counts), 1)
+    result = np.floor(quota).astype(np.int64)
+
+    # Largest remainders get the events left after rounding down
+    remainder = size - np.sum(result)
+    order     = np.argsort(-(quota - result), kind = 'stable')
+    result[order[:remainder]] += 1
+
+    return result
+
+def draw_subset(df, subset):
+    """Return sorted indices of a stratified subset of rows of `df`"""
+    spec   = parse_subset(subset)
+    values = np.asarray(df[spec['var']]).reshape(len(df), -1)[:, 0]
+
+    if spec['size'] is not None:
+        size = min(int(spec['size']), len(values))
+    else:
+        size = int(round(spec['fraction'] * len(values)))
+
+    strata = get_strata(values, spec['bins'], spec['range'])
+    counts = np.bincount(strata)
+    sizes  = get_strata_sizes(counts, size)
+
+    rng    = np.random.default_rng(spec['seed'])
+    order  = np.argsort(strata, kind = 'stable')
+    bounds = np.concatenate(([ 0 ], np.cumsum(counts)))
+
+    result = [
+        rng.choice(order[bounds[i]:bounds[i+1]], sizes[i], replace = False)
+            for i in range(len(counts))
+    ]
+
+    return np.sort(np.concatenate(result)).astype(np.int64)
+
+def load_subset_index(df, subset, frame_stat = None, fingerprint = None):
+    """Return row index of `subset`, reusing the one saved on disk.
+
+    Parameters
+    ----------
+    df : IDataFrame
+        Data frame to draw subset of.
+    subset : dict
+        Subset specification.
+    frame_stat : list or None, optional
+        List of [ path, size, mtime ] of the data files `df` is read from.
+        If None, the index is neither loaded from nor saved to disk.
+        Default: None.
+    fingerprint : object, optional
+        Any other json serializable configuration that rows of `df` depend
+        on (e.g. event selection). Default: None.
+
+    Returns
+    -------
+    ndarray of int64
+        Sorted indices of the rows of the subset.
+    """
+    path = None
+
+    if frame_stat:
+        path  = get_sidecar_path(
+            frame_stat, 'subset', [ parse_subset(subset), fingerprint ]
+        )
+        index = load_sidecar(path)
+
+        if (index is not None) and np.all(index < len(df)):
+            LOGGER.info("Loading subset index from '%s'", path)
+            return index
+
+    index = draw_subset(df, subset)
+
+    if path is not None:
+        save_sidecar(index, path)
+
+    return index
+
+def apply_subset(df, subset, frame_stat = None, fingerprint = None):
+    """Return `df` restricted to the rows of a stratified `subset`"""
+    if not subset:
+        return df
+
+    index = load_subset_index(df, subset, frame_stat, fingerprint)
+
+    LOGGER.info(
+        "Using stratified subset of %d of %d events (%.1f%%)",
+        len(index), len(df), 100 * len(index) / max(len(df), 1)
+    )
+
+    return SelectionFrame(df, index)
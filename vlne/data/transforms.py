@@ -0,0 +1,123 @@
+"""
+Helper functions to inspect data transformation specifications.
+"""
+
+from vlne.data.data_generator.funcs.batch_transforms import (
+    split_batch_transforms
+)
+from vlne.funcs import unpack_name_args
+
+DETERMINISTIC_TRANSFORMS = [ 'mask-nan', 'vlarr-sort' ]
+
+def is_deterministic_transform(transform):
+    """Check whether `transform` always produces the same output"""
+    name, _ = unpack_name_args(transform)
+    return name in DETERMINISTIC_TRANSFORMS
+
+def is_deterministic(transforms):
+    """Check whether a chain of `transforms` is deterministic"""
+    if transforms is None:
+        return True
+
+    return all(is_deterministic_transform(t) for t in transforms)
+
+def split_transforms(transforms):
+    """Split `transforms` into deterministic prefix and the remaining suffix.
+
+    Returns
+    -------
+    (prefix, suffix) : (list, list)
+        `prefix` is the longest deterministic prefix of `transforms` and
+        `suffix` holds the rest of the transformations.
+    """
+    transforms = transforms or []
+
+    for (idx, transform) in enumerate(transforms):
+        if not is_deterministic_transform(transform):
+            return (transforms[:idx], transforms[idx:])
+
+    return (transforms, [])
+
+def get_split_transforms(data_config, split):
+    """Return transformations that are applied to the `split` dataset"""
+    if split == 'train':
+        return data_config.transform_train
+
+    return data_config.transform_test
+
+AUGMENT_MODES = [ None, 'batch', 'graph' ]
+
+def uses_graph_augmentation(data_config):
+    """Check whether training augmentation is done by the model"""
+    augment = getattr(data_config, 'augment', None)
+
+    if augment not in AUGMENT_MODES:
+        raise ValueError(f"Unknown augmentation mode: {augment}")
+
+    return (augment == 'graph')
+
+def is_input_transform(transform, data_config):
+    """Check whether `transform` modifies only the model inputs"""
+    name, kwargs = unpack_name_args(transform)
+
+    if name != 'noise':
+        return True
+
+    return (
+            set(kwargs.get('scalar_groups') or {}).issubset(
+                data_config.input_groups_scalar or {}
+            )
+        and set(kwargs.get('vlarr_groups') or {}).issubset(
+                data_config.input_groups_vlarr or {}
+            )
+    )
+
+def split_transform_levels(data_config, split):
+    """Split `split` transformations into dataset, batch and graph parts.
+
+    Returns
+    -------
+    (dataset, batch, graph) : (list, list, list)
+        `batch` is the suffix of the transformations that is applied to
+        whole batches by the data generator. `graph` is the suffix that is
+        applied by the model itself (only for the training split with
+        `augment` set to 'graph'). `dataset` holds the rest.
+    """
+    dataset, batch = split_batch_transforms(
+        get_split_transforms(data_config, split),
+        { **data_config.input_groups_scalar, **data_config.target_groups },
+        data_config.input_groups_vlarr,
+        data_config.vlarr_limits
+    )
+
+    if (split != 'train') or (not uses_graph_augmentation(data_config)):
+        return (dataset, batch, [])
+
+    idx = len(batch)
+
+    while (idx > 0) and is_input_transform(batch[idx - 1], data_config):
+        idx -= 1
+
+    return (dataset, batch[:idx], batch[idx:])
+
+def get_dataset_transforms(data_config, split):
+    """Return transformations that are applied by the `split` dataset.
+
+    Stochastic transformations at the end of the chain that have batch level
+    equivalents are applied by the data generators (or by the model)
+    instead.
+    """
+    return split_transform_levels(data_config, split)[0]
+
+def get_batch_transforms(data_config, split):
+    """Return transformations applied to whole batches of `split`"""
+    return split_transform_levels(data_config, split)[1]
+
+def get_graph_transforms(data_config):
+    """Return transformations applied by the model during the training"""
+    return split_transform_levels(data_config, 'train')[2]
+
+def get_pipeline_transforms(data_config, split):
+    """Return transformations applied by the data pipeline of `split`"""
+    dataset, batch, _graph = split_transform_levels(data_config, split)
+    return dataset + batch
@@ -0,0 +1,207 @@
+"""
+Truncation of variable length arrays at read time.
+
+By default, `vlarr_limits` are applied by datasets after all transformations,
+so every element of every vlarr is read and transformed only to be dropped.
+If the transformations of a vlarr group do not depend on the elements beyond
+the limit, the truncation can be moved into the data frame instead:
+
+  - If the group is never reordered, only the first N elements are kept.
+  - If the group is sorted by a `vlarr-sort` transformation, the top N
+    elements (with respect to the sort column) are kept. The per event
+    ordering is computed once from the sort column.
+"""
+
+import logging
+
+import numpy as np
+
+from vlne.data.frame_funcs import get_wrapped_attr
+
+from vlne.funcs import unpack_name_args
+
+LOGGER = logging.getLogger('vlne.data')
+
+# Transformations that modify vlarr elements independently of each other
+ELEMENTWISE_TRANSFORMS = [ 'mask-nan', 'noise' ]
+
+def get_group_read_order(transforms, group):
+    """Find which elements of a vlarr `group` survive truncation.
+
+    Parameters
+    ----------
+    transforms : list or None
+        Chain of transformations applied to the dataset.
+    group : str
+        Name of the vlarr group.
+
+    Returns
+    -------
+    (bool, tuple or None)
+        The first value is False if truncation cannot be done at read time.
+        The second value is None if the first N elements survive, or
+        a tuple (`column`, `ascending`, `mask_nan`) if the elements are
+        sorted by `column` first.
+    """
+    order    = None
+    mask_nan = False
+
+    for transform in (transforms or []):
+        name, kwargs = unpack_name_args(transform)
+
+        if name == 'mask-nan':
+            mask_nan = True
+            continue
+
+        if name in ELEMENTWISE_TRANSFORMS:
+            if order is None:
+                # Sort that follows would see modified (e.g. noisy) values
+                order = False
+            continue
+
+        if kwargs.get('vlarr_group') != group:
+            if name in [ 'vlarr-sort', 'vlarr-shuffle' ]:
+                continue
+
+            return (False, None)
+
+        if (name != 'vlarr-sort') or (order is not None):
+            return (False, None)
+
+        order = (kwargs['column'], kwargs.get('ascending', True), mask_nan)
+
+    return (True, order or None)
+
+def get_read_limits(data_config):
+    """Return dict of vlarr limits that can be applied at read time.
+
+    Returns
+    -------
+    dict
+        Dictionary where keys are vlarr column names and values are pairs
+        (`limit`, `order`), where `order` is the second value returned by
+        `get_group_read_order`.
+    """
+    result = {}
+
+    for (group, limit) in (data_config.vlarr_limits or {}).items():
+        if (limit is None) or (group not in data_config.input_groups_vlarr):
+            continue
+
+        order_train = get_group_read_order(data_config.transform_train, group)
+        order_test  = get_group_read_order(data_config.transform_test,  group)
+
+        if (not order_train[0]) or (order_train != order_test):
+            LOGGER.info(
+                "Cannot truncate vlarr group '%s' at read time, since its"
+                " transformations depend on the truncated elements", group
+            )
+            continue
+
+        for column in data_config.input_groups_vlarr[group]:
+            result[column] = (limit, order_train[1])
+
+    return result
+
+def calc_top_order(values, limit, ascending = True, mask_nan = False):
+    """Return indices of the first `limit` elements of a sorted vlarr"""
+    values = np.asarray(values, dtype = np.float64).ravel()
+
+    if mask_nan:
+        values = np.nan_to_num(values, nan = 0, posinf = 0, neginf = 0)
+
+    if not ascending:
+        values = -values
+
+    return np.argsort(values, kind = 'stable')[:limit]
+
+def to_object_array(arrays):
+    result = np.empty(len(arrays), dtype = object)
+    result[:] = arrays
+    return result
+
+class VlarrLimitFrame:
+    """Data frame that truncates vlarr columns of `df` at read time.
+
+    Parameters
+    ----------
+    df : IDataFrame
+        Data frame to truncate vlarr columns of.
+    limits : dict
+        Dictionary of read limits returned by `get_read_limits`.
+    """
+
+    def __init__(self, df, limits):
+        self._df      = df
+        self._limits  = limits
+        self._columns = {}
+
+    def _truncate(self, column, values, rows = None):
+        limit, order = self._limits[column]
+
+        if order is None:
+            return to_object_array([ np.asarray(x)[:limit] for x in values ])
+
+        # Orders are computed only for the requested rows
+        order_column, ascending, mask_nan = order
+
+        if rows is None:
+            keys = self._df[order_column]
+        else:
+            keys = self._df[order_column, rows]
+
+        return to_object_array([
+            np.asarray(x)[calc_top_order(k, limit, ascending, mask_nan)]
+                for (x, k) in zip(values, keys)
+        ])
+
+    def __len__(self):
+        return len(self._df)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            column, rows = key
+
+            if column not in self._limits:
+                return self._df[key]
+
+            if isinstance(rows, (int, np.integer)):
+                return self._truncate(column, [ self._df[key] ], [ rows ])[0]
+
+            return self._truncate(column, self._df[key], rows)
+
+        if key not in self._limits:
+            return self._df[key]
+
+        if key not in self._columns:
+            self._columns[key] = self._truncate(key, self._df[key])
+
+        return self._columns[key]
+
+    def _call_rows(self, name, column, rows):
+        if column not in self._limits:
+            return getattr(self._df, name)(column, rows)
+
+        return self[column, rows]
+
+    def __getattr__(self, name):
+        # Column names are inherited from `df`, and row indexed methods
+        # return truncated vlarrs
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return get_wrapped_attr(self, self._df, name, self._call_rows)
+
+def apply_read_limits(df, data_config):
+    """Return `df` with vlarr columns truncated at read time if possible"""
+    limits = get_read_limits(data_config)
+
+    if not limits:
+        return df
+
+    LOGGER.info(
+        "Truncating vlarr columns at read time: %s",
+        ', '.join(f'{k} ({v[0]})' for (k, v) in sorted(limits.items()))
+    )
+
+    return VlarrLimitFrame(df, limits)
@@ -3,12 +3,20 @@ Function to calculate basic evaluation metrics for the `vlne` networks.
 """
 
 import logging
+
+import numpy as np
 import pandas as pd
 
+from vlne.consts import LABEL_TOTAL
+
 from vlne.eval.predict import (
-    predict_energies,get_base_energies,get_true_energies
+    predict_energies,get_base_energies,get_true_energies,
+    get_base_energy_columns, get_true_energy_columns, iter_batch_rows,
+    iter_predicted_energies, read_energies
+)
+from vlne.eval.resolution   import (
+    calc_resolution_stats, calc_resolution_hist, ResolutionAccumulator
 )
-from vlne.eval.resolution   import calc_resolution_stats, calc_resolution_hist
 from vlne.eval.gauss import fit_gaussian
 
 from .funcs import get_weights
@@ -85,12 +93,62 @@ def calc_resolution_stats_hists(
         )
         rhist_dict[target] = rhist
 
-        try:
-            x = (rhist.bins_x[1:] + rhist.bins_x[:-1]) / 2
-            stats_dict[target].update(fit_gaussian(x, rhist.hist, margin))
-        except RuntimeError:
-            LOGGER.warning("Failed to fit gaussian for: %s", target)
-            stats_dict[target].update({ 'a' : 0, 'mu' : 0, 'sigma' : 0 })
+        add_gaussian_fit(stats_dict[target], rhist, margin, target)
+
+    return stats_dict, rhist_dict
+
+def add_gaussian_fit(stats, rhist, margin, target):
+    """Add parameters of the gaussian fit to `rhist` peak to `stats`"""
+    try:
+        x = (rhist.bins_x[1:] + rhist.bins_x[:-1]) / 2
+        stats.update(fit_gaussian(x, rhist.hist, margin))
+    except RuntimeError:
+        LOGGER.warning("Failed to fit gaussian for: %s", target)
+        stats.update({ 'a' : 0, 'mu' : 0, 'sigma' : 0 })
+
+def create_accumulators(hist_specs):
+    """Create resolution accumulators for each energy label"""
+    return {
+        target : ResolutionAccumulator(
+            spec.bins_x, spec.range_x, spec.range_x
+        ) for (target, spec) in hist_specs.items()
+    }
+
+def accumulate_resolution(
+    accumulators, pred_dict, true_dict, weights_dict, rows
+):
+    """Add batch of energies of dataset `rows` to the `accumulators`"""
+    for (target, pred) in pred_dict.items():
+        if (pred is None) or (true_dict[target] is None):
+            continue
+
+        if target in weights_dict:
+            weights = weights_dict[target][rows]
+        elif LABEL_TOTAL in weights_dict:
+            weights = weights_dict[LABEL_TOTAL][rows]
+        else:
+            weights = np.ones(len(pred))
+
+        accumulators[target].update(pred, true_dict[target], weights)
+
+def finalize_resolution(accumulators, margin):
+    """Return (stats_dict, rhist_dict) of the filled `accumulators`.
+
+    C.f. `calc_resolution_stats_hists`.
+    """
+    stats_dict = {}
+    rhist_dict = {}
+
+    for (target, acc) in accumulators.items():
+        if acc.is_empty:
+            continue
+
+        stats_dict[target] = acc.get_stats()
+        rhist_dict[target] = acc.get_hist()
+
+        add_gaussian_fit(
+            stats_dict[target], rhist_dict[target], margin, target
+        )
 
     return stats_dict, rhist_dict
 
@@ -136,7 +194,7 @@ def eval_base(dgen, pred_map, hist_specs, margin = 0.5):
         pred_dict, true_dict, weights_dict, hist_specs, margin
     )
 
-def eval_model(args, dgen, model, hist_specs, margin = 0.5):
+def eval_model(dgen, model, hist_specs, margin = 0.5):
     """
     Calculate relative energy resolution stats and hists for pred energies.
 
@@ -144,8 +202,6 @@ def eval_model(args, dgen, model, hist_specs, margin = 0.5):
 
     Parameters
     ----------
-    args : Args
-        Arguments that define `vlne` training/evaluation.
     dgen : IDataGenerator
         Data generator which will be fed to the `model` to predict energies.
     model : `keras.Model`
@@ -171,13 +227,65 @@ def eval_model(args, dgen, model, hist_specs, margin = 0.5):
     """
 
     weights_dict = dgen.weights
-    pred_dict    = predict_energies(args, dgen, model)
+    pred_dict    = predict_energies(dgen, model)
     true_dict    = get_true_energies(dgen)
 
     return calc_resolution_stats_hists(
         pred_dict, true_dict, weights_dict, hist_specs, margin
     )
 
+def eval_base_streaming(dgen, pred_map, hist_specs, margin = 0.5):
+    """Streaming version of `eval_base` that reads energies batch by batch.
+
+    Statistics are accumulated over the batches of `dgen`, such that the
+    energies of the whole dataset are never held in memory.
+
+    See Also
+    --------
+    eval_base
+    ResolutionAccumulator
+    """
+    if pred_map is None:
+        return ({}, {})
+
+    accumulators = create_accumulators(hist_specs)
+    pred_columns = get_base_energy_columns(pred_map)
+    true_columns = get_true_energy_columns(dgen)
+    df           = dgen.dataset.df
+
+    for (_, rows) in iter_batch_rows(dgen):
+        accumulate_resolution(
+            accumulators,
+            read_energies(df, pred_columns, rows),
+            read_energies(df, true_columns, rows),
+            dgen.weights, rows
+        )
+
+    return finalize_resolution(accumulators, margin)
+
+def eval_model_streaming(dgen, model, hist_specs, margin = 0.5):
+    """Streaming version of `eval_model` that predicts batch by batch.
+
+    Statistics are accumulated over the batches of `dgen`, such that the
+    energies of the whole dataset are never held in memory.
+
+    See Also
+    --------
+    eval_model
+    ResolutionAccumulator
+    """
+    accumulators = create_accumulators(hist_specs)
+    true_columns = get_true_energy_columns(dgen)
+    df           = dgen.dataset.df
+
+    for (rows, pred_dict) in iter_predicted_energies(dgen, model):
+        accumulate_resolution(
+            accumulators, pred_dict, read_energies(df, true_columns, rows),
+            dgen.weights, rows
+        )
+
+    return finalize_resolution(accumulators, margin)
+
 def evaluate(
     args, dgen, model, base_map, hist_specs, fit_margin, outdir
 ):
@@ -229,14 +337,27 @@ def evaluate(
     eval_model
     eval_base
     """
-    stats_model_dict, rhist_model_dict = eval_model(
-        args, dgen, model, hist_specs, fit_margin
-    )
+    if args.memory_limit is not None:
+        # Out-of-core mode: stats are accumulated batch by batch
+        stats_model_dict, rhist_model_dict = eval_model_streaming(
+            dgen, model, hist_specs, fit_margin
+        )
+    else:
+        stats_model_dict, rhist_model_dict = eval_model(
+            dgen, model, hist_specs, fit_margin
+        )
+
     save_model_stats(stats_model_dict, outdir)
 
-    stats_base_dict, rhist_base_dict = eval_base(
-        dgen, base_map, hist_specs, fit_margin
-    )
+    if args.memory_limit is not None:
+        stats_base_dict, rhist_base_dict = eval_base_streaming(
+            dgen, base_map, hist_specs, fit_margin
+        )
+    else:
+        stats_base_dict, rhist_base_dict = eval_base(
+            dgen, base_map, hist_specs, fit_margin
+        )
+
     save_base_stats(stats_base_dict, outdir)
 
     return (
@@ -2,11 +2,12 @@ import numpy as np
 from vlne.consts import LABEL_TOTAL
 
 def get_weights(weights_dict, target, pred_dict):
+    # Weights can be lazy columns of the data frame in the out-of-core mode
     if target in weights_dict:
-        return weights_dict[target]
+        return np.asarray(weights_dict[target])
 
     if LABEL_TOTAL in weights_dict:
-        return weights_dict[LABEL_TOTAL]
+        return np.asarray(weights_dict[LABEL_TOTAL])
 
     return np.ones(len(pred_dict[target]))
 
@@ -2,9 +2,12 @@
 Functions to calculate true and predicted energies.
 """
 import logging
+import numpy as np
 
 from vlne.consts import LABEL_TOTAL, LABEL_PRIMARY, LABEL_SECONDARY
-from vlne.train.setup import get_keras_concurrency_kwargs
+from vlne.data.data_generator.keras_sequence    import convert_ragged_inputs
+from vlne.data.data_generator.tf_data_generator import get_keras_data
+from vlne.train.setup import KERAS_CONCURRENCY_KWARGS
 
 LOGGER = logging.getLogger('vlne.eval')
 
@@ -39,9 +42,23 @@ def get_output_by_label(pred, model, label):
 
     return pred[index].ravel()
 
-def predict_energies(args, dgen, model):
-    kwargs = get_keras_concurrency_kwargs(args)
-    pred   = model.predict(dgen, **kwargs)
+def restore_event_order(pred, event_order):
+    """Reorder predictions made over reordered batches to the dataset order"""
+    if event_order is None:
+        return pred
+
+    if isinstance(pred, (list, tuple)):
+        return [ restore_event_order(x, event_order) for x in pred ]
+
+    result = np.empty_like(pred)
+    result[event_order] = pred
+
+    return result
+
+def predict_energies(dgen, model):
+    order  = dgen.event_order
+    pred   = model.predict(get_keras_data(dgen), **KERAS_CONCURRENCY_KWARGS)
+    pred   = restore_event_order(pred, order)
 
     result = {
         LABEL_TOTAL     : get_output_by_label(pred, model, LABEL_TOTAL),
@@ -52,38 +69,84 @@ def predict_energies(args, dgen, model):
     fill_missing_energies(result)
     return result
 
-def get_true_energies(dgen):
-    result = {
-        LABEL_TOTAL     : None,
-        LABEL_PRIMARY   : None,
-        LABEL_SECONDARY : None,
-    }
+def get_true_energy_columns(dgen):
+    """Return dict of data frame columns that hold true energies"""
+    result = {}
 
     for label in [ LABEL_TOTAL, LABEL_PRIMARY, LABEL_SECONDARY ]:
         if (
                 (label in dgen.target_groups)
             and (len(dgen.dataset.scalar_groups[label]) == 1)
         ):
-            variable      = dgen.dataset.scalar_groups[label][0]
-            result[label] = dgen.dataset.df[variable].ravel()
+            result[label] = dgen.dataset.scalar_groups[label][0]
 
-    fill_missing_energies(result)
     return result
 
-def get_base_energies(dgen, pred_map):
-    if pred_map is None:
-        return None
-
+def read_energies(df, columns, rows = None):
+    """Read energies `columns` of `df`, at `rows` if not None"""
     result = {
         LABEL_TOTAL     : None,
         LABEL_PRIMARY   : None,
         LABEL_SECONDARY : None,
     }
 
-    for label in [ LABEL_TOTAL, LABEL_PRIMARY, LABEL_SECONDARY ]:
-        if label in pred_map:
-            result[label] = dgen.dataset.df[pred_map[label]].ravel()
+    for (label, column) in columns.items():
+        if rows is None:
+            result[label] = df[column].ravel()
+        else:
+            result[label] = np.asarray(df[column, rows]).ravel()
 
     fill_missing_energies(result)
     return result
 
+def get_true_energies(dgen):
+    return read_energies(dgen.dataset.df, get_true_energy_columns(dgen))
+
+def get_base_energy_columns(pred_map):
+    """Return dict of data frame columns that hold baseline energies"""
+    return {
+        label : pred_map[label]
+            for label in [ LABEL_TOTAL, LABEL_PRIMARY, LABEL_SECONDARY ]
+            if label in pred_map
+    }
+
+def get_base_energies(dgen, pred_map):
+    if pred_map is None:
+        return None
+
+    return read_energies(dgen.dataset.df, get_base_energy_columns(pred_map))
+
+def iter_batch_rows(dgen):
+    """Yield (index, rows) of each batch of `dgen`"""
+    for index in range(len(dgen)):
+        yield (index, np.asarray(dgen.sampler[index]))
+
+def iter_predicted_energies(dgen, model):
+    """Predict energies batch by batch, without holding all of them.
+
+    This is a streaming counterpart of `predict_energies`.
+
+    Yields
+    ------
+    (rows, pred_dict)
+        Dataset rows of the batch and the dictionary of energies predicted
+        for them.
+    """
+    for (index, rows) in iter_batch_rows(dgen):
+        inputs = convert_ragged_inputs(dgen[index][0])
+        pred   = model.predict_on_batch(inputs)
+
+        if not isinstance(pred, (list, tuple)):
+            pred = [ pred ]
+
+        pred   = [ np.asarray(x) for x in pred ]
+        result = {
+            LABEL_TOTAL     : get_output_by_label(pred, model, LABEL_TOTAL),
+            LABEL_PRIMARY   : get_output_by_label(pred, model, LABEL_PRIMARY),
+            LABEL_SECONDARY :
+                get_output_by_label(pred, model, LABEL_SECONDARY),
+        }
+
+        fill_missing_energies(result)
+        yield (rows, result)
+
@@ -4,6 +4,8 @@ Functions to calculate stats/hists of the relative energy resolution.
 The relative energy resolution is defined as (Reco - True) / True.
 """
 
+import numpy as np
+
 from cafplot.rhist import RHist1D
 from .stats import calc_all_stats
 
@@ -68,3 +70,133 @@ def calc_resolution_stats(pred, true, weights, range = (-1, 1)):
 
     return calc_all_stats(resolution[mask], weights[mask])
 
+
+class ResolutionAccumulator:
+    """Accumulate relative energy resolution stats and hist batch by batch.
+
+    This is a streaming counterpart of `calc_resolution_stats` and
+    `calc_resolution_hist`, that never holds the predicted energies of the
+    whole dataset in memory. The histogram and the moments are exact, while
+    the median is found from a fine histogram over the stats `range`, with
+    the precision of its bin width.
+
+    Parameters
+    ----------
+    bins : int or ndarray
+        If int then defined the number of bins in a histogram.
+        If ndarray then `bins` defines edges of the histogram.
+    hist_range : (float, float) or None
+        Range of a histogram (lower, upper). Cannot be None if `bins` is int,
+        since the histogram edges must be known before the data.
+    range : (float, float)
+        Range of energy resolution values that will be used in calculation
+        of statistics. Default: (-1, 1).
+    median_bins : int, optional
+        Number of bins of the histogram the median is found from.
+        Default: `DEF_MEDIAN_BINS`.
+    """
+
+    DEF_MEDIAN_BINS = 20000
+
+    def __init__(
+        self, bins, hist_range, range = (-1, 1), median_bins = None
+    ):
+        # pylint: disable=redefined-builtin
+        if (hist_range is None) and (np.ndim(bins) == 0):
+            raise ValueError(
+                "Streaming resolution histogram requires either bin edges"
+                " or histogram range"
+            )
+
+        self._range      = range
+        self._edges      = np.histogram_bin_edges(
+            [], bins = bins, range = hist_range
+        )
+        self._hist       = np.zeros(len(self._edges) - 1)
+        self._err_sq     = np.zeros(len(self._edges) - 1)
+
+        self._median_edges = np.linspace(
+            *range, (median_bins or self.DEF_MEDIAN_BINS) + 1
+        )
+        self._median_hist  = np.zeros(len(self._median_edges) - 1)
+
+        # Sums of w, w^2, w * v, w * v^2, w * v^4 within `range`
+        self._sums    = np.zeros(5)
+        self._batches = 0
+
+    def update(self, pred, true, weights):
+        """Add a batch of predicted and true energies with their weights"""
+        resolution     = (pred - true) / true
+        self._batches += 1
+
+        self._hist   += np.histogram(
+            resolution, self._edges, weights = weights
+        )[0]
+        self._err_sq += np.histogram(
+            resolution, self._edges, weights = weights**2
+        )[0]
+
+        mask = ((resolution > self._range[0]) & (resolution < self._range[1]))
+        v    = resolution[mask]
+        w    = weights[mask]
+
+        self._sums += [
+            np.sum(w), np.sum(w**2), np.sum(w * v), np.sum(w * v**2),
+            np.sum(w * v**4)
+        ]
+
+        self._median_hist += np.histogram(
+            v, self._median_edges, weights = w
+        )[0]
+
+    @property
+    def is_empty(self):
+        """Whether no batches have been accumulated"""
+        return (self._batches == 0)
+
+    def get_median(self):
+        """Return median of the accumulated values within the stats range"""
+        total = np.sum(self._median_hist)
+
+        if total == 0:
+            return 0
+
+        idx = np.searchsorted(np.cumsum(self._median_hist), total / 2)
+        return (self._median_edges[idx] + self._median_edges[idx + 1]) / 2
+
+    def get_stats(self):
+        """Return dict of stats of the accumulated values.
+
+        C.f. `calc_all_stats`.
+        """
+        (w, w2, m1, m2, m4) = self._sums
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            m1 = np.float64(m1) / w
+            m2 = np.float64(m2) / w
+            m4 = np.float64(m4) / w
+
+            # Sum of squares of the normalized weights
+            w2 = np.float64(w2) / w**2
+
+        x1var = m2 - m1**2
+        x2var = m4 - m2**2
+
+        return {
+            'mean'   : m1,
+            'rms'    : np.sqrt(m2),
+            'stdev'  : np.sqrt(x1var),
+            'stderr' : np.sqrt(w2 * x1var),
+            'median' : self.get_median(),
+            'm1'     : m1,
+            'm2'     : m2,
+            'm4'     : m4,
+            'x1var'  : x1var,
+            'x2var'  : x2var,
+            'm1var'  : w2 * x1var,
+            'm2var'  : w2 * x2var,
+        }
+
+    def get_hist(self):
+        """Return `cafplot.RHist1D` of the accumulated values"""
+        return RHist1D([ self._edges ], self._hist, self._err_sq)
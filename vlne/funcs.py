@@ -1,4 +1,5 @@
 import copy
+import re
 from typing import Any, Union, Dict, Tuple
 
 Spec = Union[str, Dict[str, Any]]
@@ -15,3 +16,16 @@ def unpack_name_args(obj : Spec) -> Tuple[str, Dict[str, Any]]:
 
     return (name, obj)
 
+MEMORY_UNITS = { '' : 1, 'K' : 2**10, 'M' : 2**20, 'G' : 2**30, 'T' : 2**40 }
+
+def parse_memory_size(value : Union[str, int]) -> int:
+    """Parse memory size like "512M" or "8G" into a number of bytes"""
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    m = re.match(r'^\s*([0-9.]+)\s*([KMGT]?)i?B?\s*$', value, re.IGNORECASE)
+
+    if not m:
+        raise ValueError(f"Failed to parse memory size '{value}'")
+
+    return int(float(m.group(1)) * MEMORY_UNITS[m.group(2).upper()])
@@ -4,3 +4,5 @@ from .models_flat  import *
 from .models_slice import *
 from .models_lstm  import *
 from .models_atten import model_trans_v1
+from .augment      import add_augmentation
+from .input_norm   import apply_input_stats
@@ -0,0 +1,321 @@
+"""
+Layers that augment model inputs inside the graph.
+
+These layers are in-graph counterparts of the stochastic `noise` and
+`vlarr-shuffle` data transformations. They modify inputs only when the model
+is called with `training = True`, and pass inputs through unchanged during
+the evaluation.
+"""
+
+import tensorflow as tf
+from tensorflow.keras.layers import Activation, Layer
+from tensorflow.keras.models import Model
+
+from vlne.consts import DEF_MASK
+from vlne.funcs  import unpack_name_args
+
+from .funcs import get_inputs
+
+def draw_noise(noise, shape, dtype = tf.float32):
+    """Draw tensor of `shape` from the `noise` distribution"""
+    name, kwargs = unpack_name_args(noise)
+
+    if name == 'gaussian':
+        return tf.random.normal(
+            shape,
+            mean   = kwargs.get('mu',    0),
+            stddev = kwargs.get('sigma', 1),
+            dtype  = dtype
+        )
+
+    if name == 'discrete':
+        values = tf.constant(kwargs['values'], dtype = dtype)
+        probs  = kwargs.get('probs', None)
+
+        if probs is None:
+            logits = tf.zeros((1, len(kwargs['values'])))
+        else:
+            logits = tf.math.log([ probs ])
+
+        indices = tf.random.categorical(logits, tf.reduce_prod(shape))
+        return tf.reshape(tf.gather(values, indices[0]), shape)
+
+    raise ValueError(f"Unknown noise {name}")
+
+def run_in_training(training, augment, inputs):
+    """Return `augment()` if `training` and `inputs` otherwise"""
+    if training is None:
+        training = tf.keras.backend.learning_phase()
+
+    if isinstance(training, (bool, int)):
+        return augment() if training else inputs
+
+    return tf.cond(tf.cast(training, tf.bool), augment, lambda : inputs)
+
+def get_padding_mask(inputs, mask_value):
+    """Return (N, L, 1) mask of the real (not padded) sequence elements"""
+    return tf.cast(
+        tf.reduce_any(tf.not_equal(inputs, mask_value), axis = -1),
+        inputs.dtype
+    )[..., tf.newaxis]
+
+@tf.keras.utils.register_keras_serializable('vlne.keras.models')
+class NoiseAugment(Layer):
+    """Layer that adds noise to a subset of variables of its inputs.
+
+    Parameters
+    ----------
+    noise : dict
+        Noise distribution specification, e.g.
+        `{ 'name' : 'gaussian', 'mu' : 0, 'sigma' : 0.1 }`.
+    indices : list of list of int
+        Indices of the affected variables of each input.
+    correlated : bool, optional
+        If True, a single noise value is drawn per event and shared by all
+        affected variables and sequence elements of the event.
+        Default: True.
+    relative : bool, optional
+        If True, noise is multiplicative (`x * (1 + noise)`), otherwise it is
+        additive (`x + noise`). Default: True.
+    mask_value : float, optional
+        Padding value of the padded sequences. Padding is never modified.
+        Default: DEF_MASK.
+    """
+
+    def __init__(
+        self, noise, indices,
+        correlated = True,
+        relative   = True,
+        mask_value = DEF_MASK,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+
+        self._noise      = noise
+        self._indices    = [ list(x) for x in indices ]
+        self._correlated = correlated
+        self._relative   = relative
+        self._mask_value = mask_value
+
+    def _apply(self, values, noise, indices, valid = None):
+        n_vars   = values.shape[-1]
+        col_mask = tf.constant(
+            [ float(i in indices) for i in range(n_vars) ],
+            dtype = values.dtype
+        )
+
+        noise = noise * col_mask
+
+        if valid is not None:
+            noise = noise * valid
+
+        if self._relative:
+            return values * (1 + noise)
+
+        return values + noise
+
+    def _augment_input(self, inputs, indices, event_noise):
+        if isinstance(inputs, tf.RaggedTensor):
+            values = inputs.flat_values
+
+            if self._correlated:
+                noise = tf.gather(event_noise, inputs.value_rowids())
+                noise = noise[:, tf.newaxis]
+            else:
+                noise = draw_noise(self._noise, tf.shape(values), values.dtype)
+
+            return inputs.with_flat_values(
+                self._apply(values, noise, indices)
+            )
+
+        valid = None
+
+        if self._correlated:
+            noise = event_noise[:, tf.newaxis]
+        else:
+            noise = draw_noise(self._noise, tf.shape(inputs), inputs.dtype)
+
+        if inputs.shape.rank == 3:
+            valid = get_padding_mask(inputs, self._mask_value)
+
+            if self._correlated:
+                noise = noise[..., tf.newaxis]
+
+        return self._apply(inputs, noise, indices, valid)
+
+    def _augment(self, inputs):
+        event_noise = None
+
+        if self._correlated:
+            first = inputs[0]
+
+            if isinstance(first, tf.RaggedTensor):
+                n_events = first.nrows()
+            else:
+                n_events = tf.shape(first)[0]
+
+            event_noise = draw_noise(self._noise, [ n_events ], first.dtype)
+
+        return [
+            self._augment_input(x, indices, event_noise)
+                for (x, indices) in zip(inputs, self._indices)
+        ]
+
+    def call(self, inputs, training = None):
+        # pylint: disable=arguments-differ
+        inputs = list(inputs)
+        return run_in_training(
+            training, lambda : self._augment(inputs), inputs
+        )
+
+    def get_config(self):
+        config = super().get_config()
+        config.update({
+            'noise'      : self._noise,
+            'indices'    : self._indices,
+            'correlated' : self._correlated,
+            'relative'   : self._relative,
+            'mask_value' : self._mask_value,
+        })
+
+        return config
+
+@tf.keras.utils.register_keras_serializable('vlne.keras.models')
+class VlarrShuffleAugment(Layer):
+    """Layer that randomly permutes elements of each input sequence.
+
+    Parameters
+    ----------
+    mask_value : float, optional
+        Padding value of the padded sequences. Padding is kept at the end of
+        the sequences. Default: DEF_MASK.
+    """
+
+    def __init__(self, mask_value = DEF_MASK, **kwargs):
+        super().__init__(**kwargs)
+        self._mask_value = mask_value
+
+    def _augment(self, inputs):
+        if isinstance(inputs, tf.RaggedTensor):
+            # Random keys sorted within each row (row index is the integer
+            # part of the key), such that rows are not mixed together.
+            rowids = tf.cast(inputs.value_rowids(), tf.float64)
+            keys   = rowids + tf.random.uniform(
+                tf.shape(rowids), dtype = tf.float64
+            )
+
+            return inputs.with_flat_values(
+                tf.gather(inputs.flat_values, tf.argsort(keys))
+            )
+
+        valid = get_padding_mask(inputs, self._mask_value)[..., 0] > 0
+        keys  = tf.random.uniform(tf.shape(inputs)[:2])
+        keys  = tf.where(valid, keys, 2 * tf.ones_like(keys))
+
+        return tf.gather(
+            inputs, tf.argsort(keys, axis = 1), axis = 1, batch_dims = 1
+        )
+
+    def call(self, inputs, training = None):
+        # pylint: disable=arguments-differ
+        return run_in_training(
+            training, lambda : self._augment(inputs), inputs
+        )
+
+    def get_config(self):
+        config = super().get_config()
+        config.update({ 'mask_value' : self._mask_value })
+
+        return config
+
+def get_noise_indices(affected, groups):
+    """Return dict of column indices of `affected` variables of `groups`"""
+    return {
+        group : [ groups[group].index(x) for x in variables ]
+            for (group, variables) in (affected or {}).items()
+    }
+
+def add_augmentation(
+    model, transforms, input_groups_scalar, input_groups_vlarr,
+    vlarr_limits = None, ragged = False
+):
+    """Prepend in-graph augmentation layers to the inputs of `model`.
+
+    Parameters
+    ----------
+    model : keras.Model
+        Model to augment inputs of.
+    transforms : list
+        Specifications of `noise` and `vlarr-shuffle` transformations.
+    input_groups_scalar : dict
+        Column names of the scalar input groups.
+    input_groups_vlarr : dict
+        Column names of the vlarr input groups.
+    vlarr_limits : dict or None, optional
+        Limits of the padded vlarr inputs. Default: None.
+    ragged : bool, optional
+        Whether vlarr inputs are ragged. Default: False.
+
+    Returns
+    -------
+    keras.Model
+        Model that augments its inputs during the training and passes them
+        to `model`. Names of the inputs and outputs are preserved.
+    """
+    inputs_scalar, inputs_vlarr = get_inputs(
+        input_groups_scalar, input_groups_vlarr, vlarr_limits, ragged
+    )
+
+    inputs    = { **inputs_scalar, **inputs_vlarr }
+    augmented = dict(inputs)
+
+    for (idx, transform) in enumerate(transforms):
+        name, kwargs = unpack_name_args(transform)
+
+        if name == 'noise':
+            indices = {
+                **get_noise_indices(
+                    kwargs.get('scalar_groups'), input_groups_scalar
+                ),
+                **get_noise_indices(
+                    kwargs.get('vlarr_groups'),  input_groups_vlarr
+                ),
+            }
+            groups  = list(indices.keys())
+
+            outputs = NoiseAugment(
+                kwargs['noise'],
+                [ indices[x] for x in groups ],
+                correlated = kwargs.get('correlated', False),
+                relative   = kwargs.get('relative',   False),
+                name       = f'augment_{idx}_noise',
+            )([ augmented[x] for x in groups ])
+
+            augmented.update(zip(groups, outputs))
+
+        elif name == 'vlarr-shuffle':
+            group = kwargs['vlarr_group']
+            augmented[group] = VlarrShuffleAugment(
+                name = f'augment_{idx}_vlarr_shuffle'
+            )(augmented[group])
+
+        else:
+            raise ValueError(
+                f"No in-graph equivalent of the {name} transformation"
+            )
+
+    outputs = model([ augmented[x] for x in model.input_names ])
+
+    if not isinstance(outputs, (list, tuple)):
+        outputs = [ outputs, ]
+
+    # Keep names of the outputs, such that targets are matched by name
+    outputs = [
+        Activation('linear', name = name)(x)
+            for (name, x) in zip(model.output_names, outputs)
+    ]
+
+    return Model(
+        inputs  = [ inputs[x] for x in model.input_names ],
+        outputs = outputs
+    )
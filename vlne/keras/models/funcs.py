@@ -10,6 +10,7 @@ from vlne.consts import DEF_MASK
 from vlne.funcs  import unpack_name_args
 
 from .layer_norm import SimpleNorm
+from .ragged     import RaggedFlatValues
 
 def get_normalization_layer(norm, **kwargs):
     norm, basic_kwargs = unpack_name_args(norm)
@@ -42,28 +43,41 @@ def modify_layer(layer, name, norm = None, dropout = None):
 
     return layer
 
+def get_series_wrapper(ragged = False):
+    """Return wrapper that applies a layer to each element of a series"""
+    if ragged:
+        return RaggedFlatValues
+
+    return TimeDistributed
+
 def modify_series_layer(
     layer, name, mask = False, norm = None, dropout = None,
-    mask_value = DEF_MASK
+    mask_value = DEF_MASK, ragged = False
 ):
-    """Add Mask and/or BatchNorm and/or Dropout on top of series `layer`"""
-    if mask:
+    """Add Mask and/or BatchNorm and/or Dropout on top of series `layer`
+
+    Ragged series do not contain padding, therefore masking is never applied
+    to them.
+    """
+    wrapper = get_series_wrapper(ragged)
+
+    if mask and (not ragged):
         name = '%s-masked' % (name)
         layer = Masking(mask_value = mask_value, name = name)(layer)
 
     if dropout is not None:
         name = "%s-dropout" % (name)
-        layer = TimeDistributed(Dropout(dropout), name = name)(layer)
+        layer = wrapper(Dropout(dropout), name = name)(layer)
 
     if norm is not None:
         name  = f'{name}-norm'
-        layer = TimeDistributed(
-            get_normalization_layer(norm), name = name
-        )(layer)
+        layer = wrapper(get_normalization_layer(norm), name = name)(layer)
 
     return layer
 
-def get_inputs(input_groups_scalar, input_groups_vlarr, vlarr_limits):
+def get_inputs(
+    input_groups_scalar, input_groups_vlarr, vlarr_limits, ragged = False
+):
     inputs_scalar = {}
     inputs_vlarr  = {}
 
@@ -77,13 +91,14 @@ def get_inputs(input_groups_scalar, input_groups_vlarr, vlarr_limits):
     for (name, columns) in input_groups_vlarr.items():
         max_length = None
 
-        if vlarr_limits is not None:
+        if (vlarr_limits is not None) and (not ragged):
             max_length = vlarr_limits.get(name, None)
 
         inputs_vlarr[name] = Input(
-            shape = (max_length, len(columns)),
-            dtype = 'float32',
-            name  = name,
+            shape  = (max_length, len(columns)),
+            dtype  = 'float32',
+            name   = name,
+            ragged = ragged,
         )
 
     return inputs_scalar, inputs_vlarr
@@ -189,36 +204,41 @@ def add_hidden_layers(
     return layer_hidden
 
 def add_hidden_series_layers(
-    layer_input, layer_sizes, name_prefix, norm, dropout, **kwargs
+    layer_input, layer_sizes, name_prefix, norm, dropout, ragged = False,
+    **kwargs
 ):
     """Add fully connected layers on top of series layer `layer_input`
     C.f. `add_hidden_layers` for the description of arguments.
 
+    If `ragged` is True, then `layer_input` is expected to be a ragged series.
+
     See Also
     --------
     add_hidden_layers
     """
     layer_hidden = layer_input
+    wrapper      = get_series_wrapper(ragged)
 
     for idx,size in enumerate(layer_sizes):
         name = "%s-%d" % (name_prefix, idx + 1)
 
-        layer_hidden = TimeDistributed(
-            Dense(size, **kwargs), name = name
-        )(layer_hidden)
+        layer_hidden = wrapper(Dense(size, **kwargs), name = name)(
+            layer_hidden
+        )
 
         layer_hidden = modify_series_layer(
             layer_hidden, name,
             mask    = False,
             norm    = norm,
-            dropout = dropout
+            dropout = dropout,
+            ragged  = ragged,
         )
 
     return layer_hidden
 
 def add_stack_of_lstms(
     layer_input, layer_size_dir_pairs, name_prefix, norm, dropout,
-    **kwargs
+    ragged = False, **kwargs
 ):
     """Add a stack of LSTM layers on top of series layer `layer_input`
 
@@ -238,6 +258,8 @@ def add_stack_of_lstms(
     dropout : float or None
         If not None then Dropout layer will be added on top of the last LSTM
         layer with a value of dropout `dropout`.
+    ragged : bool, optional
+        Whether `layer_input` is a ragged series. Default: False.
     kwargs : dict
         Arguments to be passed to the LSTM layers constructors.
 
@@ -282,7 +304,8 @@ def add_stack_of_lstms(
             name    = name,
             mask    = False,
             norm    = norm    if is_middle_layer else None,
-            dropout = dropout if is_middle_layer else None
+            dropout = dropout if is_middle_layer else None,
+            ragged  = ragged,
         )
 
     return layer_lstm
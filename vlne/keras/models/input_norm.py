@@ -0,0 +1,339 @@
+"""
+Initialization of the input normalization layers from the input statistics.
+
+Models normalize their inputs by `BatchNormalization` or `SimpleNorm`
+layers, whose moving statistics need a long warm-up. Instead, the moving
+statistics can be initialized from the statistics of the input columns
+(c.f. `vlne.data.feature_stats`), or the normalization layers can be
+replaced by a `FixedAffine` layer, that standardizes inputs with these
+statistics at a cost of a single multiply-add per value.
+"""
+
+import logging
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.layers import (
+    BatchNormalization, Concatenate, Dropout, Layer, Masking,
+    TimeDistributed
+)
+
+from .layer_norm import SimpleNorm
+from .ragged     import RaggedFlatValues
+
+LOGGER = logging.getLogger('vlne.keras')
+
+INPUT_STATS_MODES = [ 'init', 'fixed' ]
+
+@tf.keras.utils.register_keras_serializable('vlne.keras.models')
+class FixedAffine(Layer):
+    """Layer that applies a fixed affine transformation `x * scale + shift`.
+
+    Parameters
+    ----------
+    epsilon : float, optional
+        Number that is added to the variance, when `scale` and `shift` are
+        set from the mean and variance by `set_moments`. Default: 1e-3.
+    """
+
+    def __init__(self, epsilon = 1e-3, **kwargs):
+        super().__init__(**kwargs)
+
+        self._epsilon = epsilon
+        self.scale    = None
+        self.shift    = None
+
+        self.supports_masking = True
+
+    def build(self, input_shape):
+        shape = (input_shape[-1], )
+
+        self.scale = self.add_weight(
+            shape = shape, name = 'scale', initializer = 'ones',
+            trainable = False
+        )
+
+        self.shift = self.add_weight(
+            shape = shape, name = 'shift', initializer = 'zeros',
+            trainable = False
+        )
+
+        super().build(input_shape)
+
+    def set_moments(self, mean, var):
+        """Set transformation that standardizes inputs of `mean` and `var`"""
+        scale = 1 / np.sqrt(np.asarray(var) + self._epsilon)
+
+        self.scale.assign(scale)
+        self.shift.assign(-np.asarray(mean) * scale)
+
+    def call(self, inputs, mask = None):
+        # pylint: disable=arguments-differ,unused-argument
+        return inputs * self.scale + self.shift
+
+    def compute_output_shape(self, input_shape):
+        return input_shape
+
+    def get_config(self):
+        config = super().get_config()
+        config.update({ 'epsilon' : self._epsilon })
+
+        return config
+
+def unwrap_layer(layer):
+    """Return layer wrapped by the series wrappers (or `layer` itself)"""
+    if isinstance(layer, (TimeDistributed, RaggedFlatValues)):
+        return layer.layer
+
+    return layer
+
+def get_norm_layer(layer):
+    """Return normalization layer of `layer` (maybe wrapped) or None"""
+    layer = unwrap_layer(layer)
+
+    if isinstance(layer, (BatchNormalization, SimpleNorm)):
+        return layer
+
+    return None
+
+def is_passthrough_layer(layer):
+    """Check whether `layer` keeps features of its inputs in place"""
+    return isinstance(unwrap_layer(layer), (Masking, Dropout))
+
+def iter_inbound_names(node):
+    """Yield names of the layers that feed node of the layer config"""
+    if isinstance(node, dict):
+        # keras 3 format, inbound tensors are nested in the node arguments
+        if 'keras_history' in node:
+            yield node['keras_history'][0]
+            return
+
+        # masks are passed in the kwargs and are not features
+        if 'args' in node:
+            node = { 'args' : node['args'] }
+
+        for value in node.values():
+            yield from iter_inbound_names(value)
+
+    elif isinstance(node, (list, tuple)):
+        if (len(node) > 0) and isinstance(node[0], str):
+            # keras 2 format: [ layer_name, node_index, tensor_index, kwargs ]
+            yield node[0]
+            return
+
+        for value in node:
+            yield from iter_inbound_names(value)
+
+def get_inbound_layers(model):
+    """Return dict of lists of names of layers that feed each model layer"""
+    # Configuration may also contain operations that are not model layers
+    # (e.g. mask computations), those are skipped.
+    names = set(layer.name for layer in model.layers)
+
+    return {
+        layer['name'] : [
+            x for x in iter_inbound_names(layer['inbound_nodes'])
+                if x in names
+        ]
+        for layer in model.get_config()['layers'] if layer['name'] in names
+    }
+
+def get_outbound_layers(inbound):
+    result = {}
+
+    for (name, inputs) in inbound.items():
+        for x in inputs:
+            result.setdefault(x, []).append(name)
+
+    return result
+
+def find_input_norm_layers(model, input_groups):
+    """Find normalization layers that are applied to model inputs.
+
+    An input is followed through `Masking`, `Dropout` and `Concatenate`
+    layers until it reaches a normalization layer.
+
+    Parameters
+    ----------
+    model : keras.Model
+        Model which inputs are named by the input groups.
+    input_groups : dict
+        Dictionary { group : columns } of the input groups.
+
+    Returns
+    -------
+    dict
+        Dictionary { layer_name : [ (offset, columns), ... ] }, where columns
+        of the input groups occupy features [offset, offset + len(columns))
+        of the normalization layer inputs.
+    """
+    inbound  = get_inbound_layers(model)
+    outbound = get_outbound_layers(inbound)
+    result   = {}
+
+    for (group, columns) in input_groups.items():
+        name   = group
+        offset = 0
+
+        while len(outbound.get(name, [])) == 1:
+            layer = model.get_layer(outbound[name][0])
+
+            if get_norm_layer(layer) is not None:
+                result.setdefault(layer.name, []).append((offset, columns))
+                break
+
+            if isinstance(layer, Concatenate):
+                if layer.axis not in [ -1, len(layer.output.shape) - 1 ]:
+                    break
+
+                for x in inbound[layer.name]:
+                    if x == name:
+                        break
+
+                    offset += model.get_layer(x).output.shape[-1]
+
+            elif not is_passthrough_layer(layer):
+                break
+
+            name = layer.name
+
+    return result
+
+def get_norm_moments(size, pieces, input_stats):
+    """Return (mean, var, covered) of normalization layer features.
+
+    Features that are not covered by `input_stats` keep zero mean and unit
+    variance.
+    """
+    mean    = np.zeros(size)
+    var     = np.ones(size)
+    covered = np.zeros(size, dtype = bool)
+
+    for (offset, columns) in pieces:
+        for (idx, column) in enumerate(columns):
+            stats = input_stats.get(column)
+
+            if (stats is None) or (stats['count'] == 0):
+                LOGGER.warning("No input statistics of column '%s'", column)
+                continue
+
+            mean[offset + idx]    = stats['mean']
+            var[offset + idx]     = stats['var']
+            covered[offset + idx] = True
+
+    return (mean, var, covered)
+
+def get_moving_moments(norm):
+    """Return moving (mean, var) variables of the normalization layer"""
+    if isinstance(norm, SimpleNorm):
+        return (norm.moving_mean, norm.moving_var)
+
+    return (norm.moving_mean, norm.moving_variance)
+
+def init_norm_layer(norm, mean, var, covered):
+    """Set moving statistics of the `covered` features of `norm`"""
+    (moving_mean, moving_var) = get_moving_moments(norm)
+
+    moving_mean.assign(np.where(covered, mean, moving_mean.numpy()))
+    moving_var.assign(np.where(covered, var, moving_var.numpy()))
+
+def get_norm_epsilon(norm):
+    if isinstance(norm, SimpleNorm):
+        # pylint: disable=protected-access
+        return norm._epsilon
+
+    return norm.epsilon
+
+def make_fixed_layer(layer):
+    """Return `FixedAffine` counterpart of the (wrapped) normalization layer"""
+    norm  = get_norm_layer(layer)
+    fixed = FixedAffine(get_norm_epsilon(norm), name = norm.name)
+
+    if norm is layer:
+        return fixed
+
+    return layer.__class__(fixed, name = layer.name)
+
+def replace_norm_layers(model, names):
+    """Return copy of `model` with normalization layers `names` replaced.
+
+    Layers `names` are replaced by the `FixedAffine` layers, and weights of
+    the other layers are copied from `model`.
+    """
+    def clone_layer(layer):
+        if layer.name in names:
+            return make_fixed_layer(layer)
+
+        return layer.__class__.from_config(layer.get_config())
+
+    result = tf.keras.models.clone_model(model, clone_function = clone_layer)
+
+    for layer in model.layers:
+        if (layer.name not in names) and layer.weights:
+            result.get_layer(layer.name).set_weights(layer.get_weights())
+
+    return result
+
+def apply_input_stats(model, input_stats, input_groups, mode = 'init'):
+    """Set up input normalization layers of `model` from `input_stats`.
+
+    Parameters
+    ----------
+    model : keras.Model
+        Model which inputs are named by the input groups.
+    input_stats : dict
+        Statistics of the input columns, c.f.
+        `vlne.data.feature_stats.unpack_feature_stats`.
+    input_groups : dict
+        Dictionary { group : columns } of the scalar and vlarr input groups.
+    mode : { 'init', 'fixed' }, optional
+        If 'init', then moving statistics of the input normalization layers
+        are initialized by `input_stats`. If 'fixed', then normalization
+        layers, that are applied to inputs only, are replaced by the
+        `FixedAffine` ones, and the rest are initialized. Default: 'init'.
+
+    Returns
+    -------
+    keras.Model
+        Model with the initialized (or replaced) normalization layers.
+    """
+    if mode not in INPUT_STATS_MODES:
+        raise ValueError(f"Unknown input stats mode '{mode}'")
+
+    layers = find_input_norm_layers(model, input_groups)
+    fixed  = {}
+
+    if not layers:
+        LOGGER.warning("No input normalization layers found")
+        return model
+
+    for (name, pieces) in layers.items():
+        norm = get_norm_layer(model.get_layer(name))
+        (mean, var, covered) = get_norm_moments(
+            get_moving_moments(norm)[0].shape[0], pieces, input_stats
+        )
+
+        init_norm_layer(norm, mean, var, covered)
+
+        if (mode == 'fixed') and np.all(covered):
+            fixed[name] = (mean, var)
+
+    LOGGER.info(
+        "Initialized input normalization layers %s from input statistics",
+        sorted(set(layers) - set(fixed))
+    )
+
+    if not fixed:
+        return model
+
+    result = replace_norm_layers(model, set(fixed))
+
+    for (name, (mean, var)) in fixed.items():
+        unwrap_layer(result.get_layer(name)).set_moments(mean, var)
+
+    LOGGER.info(
+        "Replaced input normalization layers %s by fixed affine layers",
+        sorted(fixed)
+    )
+
+    return result
@@ -2,16 +2,22 @@
 Functions to construct Transformer based models.
 """
 
+import itertools
+
 import tensorflow as tf
 
 # pylint: disable=no-name-in-module
-from tensorflow.keras.layers import Dense, MultiHeadAttention, TimeDistributed
+from tensorflow.keras.layers import (
+    Concatenate, Dense, MultiHeadAttention, RepeatVector, TimeDistributed
+)
+from tensorflow.keras.models import Model
 
 from vlne.consts import DEF_MASK
 from .funcs import (
-    modify_series_layer, add_hidden_series_layers, get_normalization_layer
+    get_inputs, get_outputs, add_hidden_layers, modify_series_layer,
+    add_hidden_series_layers, get_normalization_layer
 )
-# get_inputs, get_outputs, add_hidden_layers,
+from .ragged import RaggedToPadded
 
 @tf.keras.utils.register_keras_serializable('vlne.keras.models')
 class PositionWiseFFN(tf.keras.layers.Layer):
@@ -151,21 +157,29 @@ class GlobalTransPooling(tf.keras.layers.Layer):
         return None
 
 def prepare_atten_vect_inputs(
-    branch_label, input_layer, num_hidden, reg, mask_value = DEF_MASK
+    branch_label, input_layer, num_hidden, reg, mask_value = DEF_MASK,
+    ragged = False
 ):
     input_shape = [ num_hidden, ]
 
     input_layer = modify_series_layer(
         input_layer, 'input_%s' % (branch_label,),
-        mask = True, norm = 'batch', mask_value = mask_value
+        mask = True, norm = 'batch', mask_value = mask_value, ragged = ragged
     )
 
     layer_hidden_pre = add_hidden_series_layers(
         input_layer, input_shape, "hidden_pre_%s" % (branch_label,),
-        norm = None, dropout = None, activation = 'relu',
+        norm = None, dropout = None, ragged = ragged, activation = 'relu',
         kernel_regularizer = reg,
     )
 
+    if ragged:
+        # Attention layers require dense inputs. Per element preprocessing
+        # above is still done on the real elements only.
+        layer_hidden_pre = RaggedToPadded(
+            mask_value, name = "hidden_pre_%s-padded" % (branch_label,)
+        )(layer_hidden_pre)
+
     return layer_hidden_pre
 
 def aggregate_trans_output(agg_type, inputs):
@@ -175,52 +189,52 @@ def aggregate_trans_output(agg_type, inputs):
     return GlobalTransPooling(agg_type)(inputs)
 
 def model_trans_v1(
-    num_heads          = 8,
-    num_hidden         = 128,
-    ffn_num_hidden     = 128,
-    num_blocks         = 3,
-    layers_post        = [],
-    max_prongs         = None,
-    reg                = None,
-    agg_type           = 'max',
-    activation         = 'gelu',
-    rezero             = True,
-    norm               = 'layer',
-    vars_input_slice   = None,
-    vars_input_png3d   = None,
-    vars_input_png2d   = None,
-    var_target_total   = None,
-    var_target_primary = None,
+    num_heads      = 8,
+    num_hidden     = 128,
+    ffn_num_hidden = 128,
+    num_blocks     = 3,
+    layers_post    = [],
+    reg            = None,
+    agg_type       = 'max',
+    activation     = 'gelu',
+    rezero         = True,
+    norm           = 'layer',
+    input_groups_scalar = None,
+    input_groups_vlarr  = None,
+    target_groups       = None,
+    vlarr_limits        = None,
+    ragged              = False,
 ):
-    # pylint: disable=dangerous-default-value
-    # pylint: disable=unused-argument
-    # pylint: disable=pointless-string-statement
-    # pylint: disable=unreachable
-
-    # TODO: port to new data config
+    """Create Transformer network that attends over all input elements.
 
-    raise NotImplementedError
+    Each scalar input group becomes a single element of the sequence, and
+    the elements of all vlarr groups follow it. If `ragged`, vlarr inputs
+    are `tf.RaggedTensor` and their elements are embedded without padding.
+    The embedded sequences are padded (and masked) only before the
+    attention blocks.
     """
-    assert(vars_input_png2d is None)
-
-    inputs = get_inputs(
-        vars_input_slice, vars_input_png3d, vars_input_png2d, max_prongs
+    # pylint: disable=dangerous-default-value
+    inputs_scalar, inputs_vlarr = get_inputs(
+        input_groups_scalar, input_groups_vlarr, vlarr_limits, ragged
     )
-    # pylint: disable=unbalanced-tuple-unpacking
-    input_slice, input_png3d = inputs
 
-    input_png3d = prepare_atten_vect_inputs(
-        'png3d', input_png3d, num_hidden, reg
-    )
-    input_slice = prepare_atten_vect_inputs(
-        'slice', tf.keras.layers.RepeatVector(1)(input_slice), num_hidden, reg
-    )
+    branches = []
 
-    layer_merged = tf.keras.layers.Concatenate(axis = 1)(
-        [ input_slice, input_png3d ]
-    )
+    for (name, input_layer) in inputs_scalar.items():
+        branches.append(prepare_atten_vect_inputs(
+            f'scalar_{name}', RepeatVector(1)(input_layer), num_hidden, reg
+        ))
+
+    for (name, input_layer) in inputs_vlarr.items():
+        branches.append(prepare_atten_vect_inputs(
+            f'vlarr_{name}', input_layer, num_hidden, reg, ragged = ragged
+        ))
+
+    if len(branches) > 1:
+        layer_trans = Concatenate(axis = 1)(branches)
+    else:
+        layer_trans = branches[0]
 
-    layer_trans = layer_merged
     for i in range(num_blocks):
         layer_trans = TransformerEncoderBlock(
             num_hidden, ffn_num_hidden, num_heads, activation, rezero, norm,
@@ -233,11 +247,11 @@ def model_trans_v1(
         activation = activation, kernel_regularizer = reg,
     )
 
-    outputs = get_outputs(
-        var_target_total, var_target_primary, reg, layer_post
-    )
-
-    return tf.keras.Model(inputs = inputs, outputs = outputs)
-    """
-
+    outputs = get_outputs(target_groups, reg, layer_post)
 
+    return Model(
+        inputs  = list(
+            itertools.chain(inputs_scalar.values(), inputs_vlarr.values())
+        ),
+        outputs = list(outputs.values())
+    )
@@ -17,7 +17,7 @@ from .funcs import (
 
 def make_standard_lstm_branch(
     branch_label, input_layer, hidden_layers_spec, lstm_units, norm,
-    dropout, reg, lstm_kwargs = None, mask_value = DEF_MASK
+    dropout, reg, lstm_kwargs = None, mask_value = DEF_MASK, ragged = False
 ):
     """Create the default block of layers to process sequential inputs.
 
@@ -45,6 +45,9 @@ def make_standard_lstm_branch(
         In sequential data missing values were padded by some value.
         The `mask_value` parameter specified that value.
         Default: DEF_MASK
+    ragged : bool, optional
+        If True, then `input_layer` is a ragged series without padding.
+        Default: False
 
     Returns
     -------
@@ -61,12 +64,12 @@ def make_standard_lstm_branch(
 
     input_layer = modify_series_layer(
         input_layer, 'input_%s' % (branch_label),
-        mask = True, norm = norm, mask_value = mask_value
+        mask = True, norm = norm, mask_value = mask_value, ragged = ragged
     )
 
     layer_hidden_pre = add_hidden_series_layers(
         input_layer, hidden_layers_spec, "hidden_pre_%s" % (branch_label),
-        norm, dropout,
+        norm, dropout, ragged,
         activation         = 'relu',
         kernel_regularizer = reg,
     )
@@ -80,7 +83,7 @@ def make_standard_lstm_branch(
 
 def make_stacked_lstm_branch(
     branch_label, input_layer, hidden_layers_spec, lstm_spec, norm,
-    dropout, reg, lstm_kwargs = None, mask_value = DEF_MASK
+    dropout, reg, lstm_kwargs = None, mask_value = DEF_MASK, ragged = False
 ):
     """Create a stack of LSTMs to process sequential inputs.
 
@@ -109,6 +112,9 @@ def make_stacked_lstm_branch(
         In sequential data missing values were padded by some value.
         The `mask_value` parameter specified that value.
         Default: DEF_MASK
+    ragged : bool, optional
+        If True, then `input_layer` is a ragged series without padding.
+        Default: False
 
     Returns
     -------
@@ -125,19 +131,19 @@ def make_stacked_lstm_branch(
 
     input_layer = modify_series_layer(
         input_layer, 'input_%s' % (branch_label),
-        mask = True, norm = norm, mask_value = mask_value
+        mask = True, norm = norm, mask_value = mask_value, ragged = ragged
     )
 
     layer_hidden_pre = add_hidden_series_layers(
         input_layer, hidden_layers_spec, "hidden_pre_%s" % (branch_label),
-        norm, dropout,
+        norm, dropout, ragged,
         activation         = 'relu',
         kernel_regularizer = reg,
     )
 
     layer_lstm = add_stack_of_lstms(
         layer_hidden_pre, lstm_spec,
-        'lstm_%s' % (branch_label), norm, dropout,
+        'lstm_%s' % (branch_label), norm, dropout, ragged,
         recurrent_regularizer = reg, kernel_regularizer = reg,
         **lstm_kwargs
     )
@@ -287,13 +293,14 @@ def model_lstm_v2(
     input_groups_vlarr  = None,
     target_groups       = None,
     vlarr_limits        = None,
+    ragged              = False,
 ):
     # pylint: disable=dangerous-default-value
     if seq_norm == 'as_norm':
         seq_norm = norm
 
     inputs_scalar, inputs_vlarr = get_inputs(
-        input_groups_scalar, input_groups_vlarr, vlarr_limits
+        input_groups_scalar, input_groups_vlarr, vlarr_limits, ragged
     )
 
     vlarr_branches = {}
@@ -303,7 +310,7 @@ def model_lstm_v2(
 
         vlarr_branches[branch_name] = make_standard_lstm_branch(
             branch_name, input_layer, layers_pre, lstm_units,
-            seq_norm, dropout, reg
+            seq_norm, dropout, reg, ragged = ragged
         )
 
     layer_merged = Concatenate()(
@@ -338,6 +345,7 @@ def model_lstm_v3(
     input_groups_vlarr  = None,
     target_groups       = None,
     vlarr_limits        = None,
+    ragged              = False,
 ):
     # pylint: disable=dangerous-default-value
     assert lstm_units3d == lstm_units2d
@@ -345,7 +353,7 @@ def model_lstm_v3(
     lstm_units = lstm_units3d
 
     inputs_scalar, inputs_vlarr = get_inputs(
-        input_groups_scalar, input_groups_vlarr, vlarr_limits
+        input_groups_scalar, input_groups_vlarr, vlarr_limits, ragged
     )
 
     vlarr_branches = {}
@@ -355,7 +363,7 @@ def model_lstm_v3(
 
         vlarr_branches[branch_name] = make_standard_lstm_branch(
             branch_name, input_layer, layers_pre, lstm_units,
-            norm, dropout, reg, lstm_kwargs
+            norm, dropout, reg, lstm_kwargs, ragged = ragged
         )
 
     layer_merged = Concatenate()(
@@ -501,10 +509,11 @@ def model_lstm_v4(
     input_groups_vlarr  = None,
     target_groups       = None,
     vlarr_limits        = None,
+    ragged              = False,
 ):
     # pylint: disable=dangerous-default-value
     inputs_scalar, inputs_vlarr = get_inputs(
-        input_groups_scalar, input_groups_vlarr, vlarr_limits
+        input_groups_scalar, input_groups_vlarr, vlarr_limits, ragged
     )
 
     vlarr_branches = {}
@@ -514,7 +523,7 @@ def model_lstm_v4(
 
         vlarr_branches[branch_name] = make_stacked_lstm_branch(
             branch_name, input_layer, layers_pre, lstm_spec,
-            seq_norm, dropout, reg
+            seq_norm, dropout, reg, ragged = ragged
         )
 
     layer_merged = Concatenate()(
@@ -0,0 +1,56 @@
+"""
+Layers to process variable length sequences stored as `tf.RaggedTensor`.
+"""
+
+import tensorflow as tf
+
+from vlne.consts import DEF_MASK
+
+@tf.keras.utils.register_keras_serializable('vlne.keras.models')
+class RaggedFlatValues(tf.keras.layers.Wrapper):
+    """Wrapper that applies `layer` to every element of a ragged sequence.
+
+    This is a ragged counterpart of the `TimeDistributed` wrapper. The wrapped
+    layer sees only the real sequence elements, i.e. no padding.
+    """
+
+    def build(self, input_shape):
+        # Wrapped layer sees flat values of shape (N, n_vars)
+        input_shape = tf.TensorShape(input_shape)
+        super().build(
+            tf.TensorShape([ None ]).concatenate(input_shape[2:])
+        )
+
+    def call(self, inputs, training = None):
+        # pylint: disable=arguments-differ
+        return inputs.with_flat_values(
+            self.layer(inputs.flat_values, training = training)
+        )
+
+@tf.keras.utils.register_keras_serializable('vlne.keras.models')
+class RaggedToPadded(tf.keras.layers.Layer):
+    """Layer that converts ragged sequences into masked padded sequences.
+
+    Parameters
+    ----------
+    mask_value : float, optional
+        Value to pad sequences with. Default: DEF_MASK
+    """
+
+    def __init__(self, mask_value = DEF_MASK, **kwargs):
+        super().__init__(**kwargs)
+        self._mask_value = mask_value
+
+    def call(self, inputs):
+        # pylint: disable=arguments-differ
+        return inputs.to_tensor(default_value = self._mask_value)
+
+    def compute_mask(self, inputs, mask = None):
+        # pylint: disable=unused-argument
+        return tf.sequence_mask(inputs.row_lengths())
+
+    def get_config(self):
+        config = super().get_config()
+        config.update({ 'mask_value' : self._mask_value })
+
+        return config
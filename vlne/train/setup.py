@@ -5,14 +5,26 @@ A collection of functions to setup keras training.
 import tensorflow as tf
 from tensorflow import keras
 
+from vlne.data.transforms  import get_graph_transforms
 from vlne.funcs import unpack_name_args
 from vlne.keras.callbacks import TrainTime
 from vlne.keras.models    import (
     flattened_model, model_lstm_v1, model_lstm_v2, model_lstm_v3,
     model_lstm_v4, model_slice_linear, model_lstm_v3_stack,
-    model_trans_v1
+    model_trans_v1, add_augmentation, apply_input_stats
 )
 
+# Models that accept ragged vlarr inputs, c.f. `vlne.keras.models.ragged`
+RAGGED_MODELS = ( 'lstm_v2', 'lstm_v3', 'lstm_v4', 'trans_v1' )
+
+# Batches are built by the `vlne` worker pools (c.f. `args.workers`) that
+# share memory with the main process. Keras workers would copy the data
+# generators into subprocesses instead.
+KERAS_CONCURRENCY_KWARGS = {
+    'workers'             : 0,
+    'use_multiprocessing' : False,
+}
+
 def get_optimizer(optimizer):
     name, kwargs = unpack_name_args(optimizer)
 
@@ -85,7 +97,7 @@ def get_regularizer(regularizer):
 
     raise ValueError("Unknown regularizer: %s" % (regularizer))
 
-def select_model(args):
+def select_base_model(args):
     # pylint: disable=too-many-return-statements
     name, kwargs = unpack_name_args(args.model)
     kwargs = {
@@ -97,6 +109,12 @@ def select_model(args):
         **kwargs
     }
 
+    # Input statistics are applied by `select_model` to the built model
+    kwargs.pop('input_stats', None)
+
+    if kwargs.get('ragged', False) and (name not in RAGGED_MODELS):
+        raise ValueError(f"ragged not supported by {name}")
+
     if name == 'lstm_v1':
         return model_lstm_v1(**kwargs)
     if name == 'lstm_v2':
@@ -116,18 +134,44 @@ def select_model(args):
     else:
         raise ValueError("Unknown model name: %s" % (args.model))
 
-def get_keras_concurrency_kwargs(args):
-    result = {
-        'workers' : 0,
-        'use_multiprocessing' : True,
-    }
-
-    if (args.workers is None) or (args.workers < 1):
-        return result
-
-    result['workers'] = args.workers
-
-    return result
+def select_model(args, input_stats = None):
+    """Construct model of `args`.
+
+    If the model configuration has `input_stats` option ('init' or 'fixed'),
+    then its input normalization layers are set up from `input_stats`.
+    C.f. `vlne.keras.models.input_norm.apply_input_stats`.
+    """
+    model      = select_base_model(args)
+    _, kwargs  = unpack_name_args(args.model)
+    stats_mode = kwargs.get('input_stats', None)
+
+    if stats_mode is not None:
+        if input_stats is None:
+            raise ValueError(
+                "Model requires input statistics, but none were provided"
+            )
+
+        model = apply_input_stats(
+            model, input_stats,
+            {
+                **args.data.input_groups_scalar,
+                **args.data.input_groups_vlarr,
+            },
+            mode = stats_mode
+        )
+
+    transforms = get_graph_transforms(args.data)
+
+    if not transforms:
+        return model
+
+    return add_augmentation(
+        model, transforms,
+        args.data.input_groups_scalar,
+        args.data.input_groups_vlarr,
+        vlarr_limits = args.data.vlarr_limits,
+        ragged       = kwargs.get('ragged', False),
+    )
 
 def limit_tf_memory_growth():
     gpus = tf.config.list_physical_devices('GPU')
@@ -7,11 +7,16 @@ import numpy as np
 
 from vlne.args       import Args
 from vlne.args.funcs import update_kwargs
-from vlne.data       import load_data
+from vlne.data       import load_data, load_input_stats
+from vlne.data.data  import uses_parallel_precache
+from vlne.data.data_generator.tf_data_generator import (
+    get_data_callbacks, get_keras_data
+)
+from vlne.funcs      import unpack_name_args
 from vlne.utils.io   import precache
 from .setup       import (
-    get_optimizer, get_default_callbacks, get_keras_concurrency_kwargs,
-    select_model, limit_tf_memory_growth
+    get_optimizer, get_default_callbacks, select_model,
+    limit_tf_memory_growth, KERAS_CONCURRENCY_KWARGS
 )
 
 LOGGER = logging.getLogger('vlne.train')
@@ -68,17 +73,28 @@ def create_and_train_model(extra_kwargs = None, **args_dict):
     )
 
     LOGGER.info("Loading data...")
-    dgen_train, dgen_test = load_data(args, [ 'train', 'val' ])
+    # Training batches are reshuffled by the data generators, such that
+    # keras requests them in order and the prefetching look-ahead works
+    dgen_train, dgen_test = load_data(
+        args, [ 'train', 'val' ], shuffle = True
+    )
 
-    if args.precache:
+    # With several workers, `load_data` has precached the datasets already
+    if args.precache and not uses_parallel_precache(args.workers):
         precache(dgen_train, 'train dset')
         precache(dgen_test,  'test dset')
 
     LOGGER.info("Compiling model..")
     np.random.seed(args.seed)
 
+    input_stats = None
+
+    if unpack_name_args(args.model)[1].get('input_stats') is not None:
+        LOGGER.info("Calculating input statistics...")
+        input_stats = load_input_stats(args)
+
     optimizer = get_optimizer(args.optimizer)
-    model     = select_model(args)
+    model     = select_model(args, input_stats)
     callbacks = get_default_callbacks(args)
 
     model.compile(
@@ -91,14 +107,19 @@ def create_and_train_model(extra_kwargs = None, **args_dict):
     if args.steps_per_epoch is not None:
         steps_per_epoch = min(args.steps_per_epoch, len(dgen_train))
 
+    callbacks += get_data_callbacks([ dgen_train, dgen_test ])
+
     LOGGER.info("Training model..")
     train_log = model.fit(
-        dgen_train,
+        get_keras_data(
+            dgen_train, shuffle = True, repeat = (steps_per_epoch is not None)
+        ),
         epochs          = args.epochs,
         steps_per_epoch = steps_per_epoch,
-        validation_data = dgen_test,
+        validation_data = get_keras_data(dgen_test),
         callbacks       = callbacks,
-        **get_keras_concurrency_kwargs(args)
+        shuffle         = False,
+        **KERAS_CONCURRENCY_KWARGS
     )
 
     LOGGER.info("Training complete.")
@@ -6,7 +6,8 @@ import copy
 import os
 
 from cafplot.plot import make_plotdir
-from vlne.data import load_data
+from vlne.data      import load_data
+from vlne.data.data import uses_parallel_precache
 
 from .eval_config import EvalConfig
 from .io          import load_model, precache
@@ -22,8 +23,14 @@ def make_eval_outdir(outdir, eval_config):
 
 def modify_concurrency_args(args, cmdargs):
     """Modify concurrency arguments of `args` from `argparse.Namespace`"""
-    args.cache   = cmdargs.cache
-    args.workers = cmdargs.workers
+    args.cache        = (cmdargs.cache or cmdargs.precache)
+    args.precache     = cmdargs.precache
+    args.prefetch     = cmdargs.prefetch
+    args.batch_store  = cmdargs.batch_store
+    args.materialize  = cmdargs.materialize
+    args.cache_dtype  = cmdargs.cache_dtype
+    args.memory_limit = cmdargs.memory_limit
+    args.workers      = cmdargs.workers
 
 def modify_specs(specs, func):
     """Map `func` over a dict of `PlotSpec`"""
@@ -58,13 +65,21 @@ def standard_eval_prologue(cmdargs, presets_eval):
     eval_config.modify_eval_args(args)
     modify_concurrency_args(args, cmdargs)
 
-    dgen = load_data(args, splits = [ eval_config.split, ])[0]
-    if cmdargs.precache:
+    preset = presets_eval[cmdargs.preset]
+
+    # Baseline energies are read from the data frame directly
+    base_columns = [ x for x in preset.base_map.values() if x is not None ]
+
+    dgen = load_data(
+        args, splits = [ eval_config.split, ], extra_columns = base_columns
+    )[0]
+
+    # With several workers, `load_data` has precached the dataset already
+    if args.precache and not uses_parallel_precache(args.workers):
         precache(dgen, f'{eval_config.split} dset')
 
     outdir  = make_eval_outdir(cmdargs.outdir, eval_config)
     plotdir = make_plotdir(outdir)
-    preset  = presets_eval[cmdargs.preset]
 
     return (dgen, args, model, outdir, plotdir, preset)
 
@@ -5,6 +5,8 @@ Definition of `EvalConfig` that holds parameters of evaluation.
 import json
 import os
 
+from vlne.funcs import unpack_name_args
+
 EVAL_CONFIG_FNAME = 'evsl_config.json'
 
 def modify_args_value_from_conf(args, attr, eval_value):
@@ -141,9 +143,21 @@ class EvalConfig:
         args.config.data.val_size      = 0
         args.config.data.test_size     = 1.0
 
+    @staticmethod
+    def modify_data_sampler(args):
+        # Weighted sampler does not visit every event exactly once
+        sampler = args.config.data.sampler
+
+        if sampler is None:
+            return
+
+        if unpack_name_args(sampler)[0] == 'weighted':
+            args.config.data.sampler = None
+
     def modify_eval_args(self, args):
         self.modify_data_path(args)
         self.modify_data_weights(args)
+        self.modify_data_sampler(args)
 
         modify_args_value_from_conf(
             args.config.data, 'transform_test', self.transform
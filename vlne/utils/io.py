@@ -1,8 +1,14 @@
 """Functions to save/load trained networks."""
 
+import logging
+import time
+
 import tqdm
 import tensorflow
 from vlne.args import Args
+from vlne.data.dataset import ArrayDataset
+
+LOGGER = logging.getLogger('vlne.data')
 
 def load_model(savedir, compile = False):
     """Load trained network and its configuration saved under `savedir`"""
@@ -16,8 +22,22 @@ def load_model(savedir, compile = False):
     return (args, model)
 
 def precache(dgen, name = ''):
+    """Load all events of `dgen` dataset into the dataset cache.
+
+    Datasets that have been already loaded into RAM in parallel by
+    `vlne.data.dataset.precache.precache_dataset` are skipped, as well as
+    data generators that replay stored batches.
+    """
+    if dgen.replayed:
+        return
+
     dset = dgen.dataset
-    pbar = tqdm.tqdm(dset, desc = f'Precaching {name}', total = len(dset))
+
+    if isinstance(dset, ArrayDataset):
+        return
+
+    pbar       = tqdm.tqdm(desc = f'Precaching {name}', total = len(dset))
+    time_start = time.perf_counter()
 
     # pylint: disable=consider-using-enumerate
     for i in range(len(dset)):
@@ -26,3 +46,9 @@ def precache(dgen, name = ''):
 
     pbar.close()
 
+    elapsed = time.perf_counter() - time_start
+    LOGGER.info(
+        "Precached %d events of %s in %.1fs: %.0f events/s",
+        len(dset), name, elapsed, len(dset) / max(elapsed, 1e-9)
+    )
+
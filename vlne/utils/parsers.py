@@ -4,6 +4,8 @@ Functions to create standard `vlne` command line argument parsers.
 
 import argparse
 
+from vlne.funcs import parse_memory_size
+
 def add_basic_eval_args(parser, presets_eval):
     """Create cmdargs parser of the standard evaluation options"""
 
@@ -79,9 +81,16 @@ def add_concurrency_parser(parser):
 
     parser.add_argument(
         '--cache',
-        help    = 'use RAM cache',
-        action  = 'store_true',
+        help    = (
+            'use RAM cache. If SIZE (e.g. 8G) is specified, then LRU cache'
+            ' limited by SIZE will be used'
+        ),
+        const   = True,
+        default = False,
         dest    = 'cache',
+        metavar = 'SIZE',
+        nargs   = '?',
+        type    = parse_memory_size,
     )
 
     parser.add_argument(
@@ -91,6 +100,61 @@ def add_concurrency_parser(parser):
         dest    = 'precache',
     )
 
+    parser.add_argument(
+        '--prefetch',
+        help    = 'number of batches to prefetch in background threads',
+        dest    = 'prefetch',
+        default = None,
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--batch-store',
+        help    = 'directory to store and replay deterministic data batches',
+        dest    = 'batch_store',
+        default = None,
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--materialize',
+        help    = (
+            'apply deterministic data transformations once. If DIR is'
+            ' specified, then transformed data will be saved in DIR'
+        ),
+        const   = True,
+        default = None,
+        dest    = 'materialize',
+        metavar = 'DIR',
+        nargs   = '?',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--cache-dtype',
+        choices = [ 'float16', 'bfloat16' ],
+        help    = (
+            'store cached (and precached) inputs in a compact dtype. They'
+            ' are cast back to float32 for every batch. bfloat16 requires'
+            ' the ml_dtypes package (pip install vlne[bfloat16])'
+        ),
+        default = None,
+        dest    = 'cache_dtype',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--memory-limit',
+        help    = (
+            'process data out-of-core, keeping memory used by the data'
+            ' pipeline and evaluation within SIZE (e.g. 8G)'
+        ),
+        default = None,
+        dest    = 'memory_limit',
+        metavar = 'SIZE',
+        type    = parse_memory_size,
+    )
+
     parser.add_argument(
         '--workers',
         help    = 'number of concurrent workers',
@@ -144,7 +208,12 @@ def parse_concurrency_cmdargs(config_dict, title = "Train"):
     add_concurrency_parser(parser)
 
     cmdargs = parser.parse_args()
-    config_dict['cache']    = cmdargs.cache
-    config_dict['precache'] = cmdargs.precache
-    config_dict['workers']  = cmdargs.workers
+    config_dict['cache']        = cmdargs.cache
+    config_dict['precache']     = cmdargs.precache
+    config_dict['prefetch']     = cmdargs.prefetch
+    config_dict['batch_store']  = cmdargs.batch_store
+    config_dict['materialize']  = cmdargs.materialize
+    config_dict['cache_dtype']  = cmdargs.cache_dtype
+    config_dict['memory_limit'] = cmdargs.memory_limit
+    config_dict['workers']      = cmdargs.workers
 